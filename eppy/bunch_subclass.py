@@ -186,6 +186,7 @@ class EpBunch(Bunch):
                               # This is None if there is no idf - a standalone epbunch
                               # This will be set by Idf_MSequence
         self['__functions'] = {}  # initialize the functions
+        self['__geometry'] = {}  # cache of fh.cachedgeometry
         addfunctions(self)
 
     @property
@@ -275,7 +276,8 @@ class EpBunch(Bunch):
         except KeyError:
             pass
 
-        if name in ('__functions', '__aliases'):  # just set the new value
+        if name in ('__functions', '__aliases', '__geometry'):
+            # just set the new value
             self[name] = value
             return None
         elif name in ('obj', 'objls', 'objidd', 'theidf'):  # let Bunch handle it
@@ -288,6 +290,7 @@ class EpBunch(Bunch):
             except IndexError:
                 extendlist(self.fieldvalues, i)
                 self.fieldvalues[i] = value
+            clearcache(self, name)
         else:
             astr = "unable to find field %s" % (name,)
             raise BadEPFieldError(astr)  # TODO: could raise AttributeError
@@ -304,8 +307,8 @@ class EpBunch(Bunch):
         except KeyError:
             pass
 
-        if name == '__functions':
-            return self['__functions']
+        if name in ('__functions', '__geometry'):
+            return self[name]
         elif name in ('__aliases', 'obj', 'objls', 'objidd', 'theidf'):
             # unit test
             return super(EpBunch, self).__getattr__(name)
@@ -321,7 +324,7 @@ class EpBunch(Bunch):
 
     def __getitem__(self, key):
         if key in ('obj', 'objls', 'objidd',
-                '__functions', '__aliases', 'theidf'):
+                '__functions', '__aliases', '__geometry', 'theidf'):
             return super(EpBunch, self).__getitem__(key)
         elif key in self.fieldnames:
             i = self.fieldnames.index(key)
@@ -335,7 +338,7 @@ class EpBunch(Bunch):
 
     def __setitem__(self, key, value):
         if key in ('obj', 'objls', 'objidd',
-                '__functions', '__aliases', 'theidf'):
+                '__functions', '__aliases', '__geometry', 'theidf'):
             super(EpBunch, self).__setitem__(key, value)
             return None
         elif key in self.fieldnames:
@@ -345,6 +348,7 @@ class EpBunch(Bunch):
             except IndexError:
                 extendlist(self.fieldvalues, i)
                 self.fieldvalues[i] = value
+            clearcache(self, key)
         else:
             astr = "unknown field %s" % (key,)
             raise BadEPFieldError(astr)
@@ -388,6 +392,12 @@ class EpBunch(Bunch):
         return super(EpBunch, self).__dir__() + fnames + func_names
 
 
+def clearcache(bch, fieldname):
+    """clear the cached geometry if fieldname is a vertex field"""
+    if fieldname == 'Number_of_Vertices' or fieldname.startswith('Vertex_'):
+        bch['__geometry'].clear()
+
+
 def getrange(bch, fieldname):
     """get the ranges for this field"""
     keys = ['maximum', 'minimum', 'maximum<', 'minimum>', 'type']
@@ -399,6 +409,12 @@ def getrange(bch, fieldname):
         therange[key] = fielddct.setdefault(key, None)
     if therange['type']:
         therange['type'] = therange['type'][0]
+    # some idd files have "\maximum < 1.0" instead of "\maximum< 1.0"
+    for key, exclusivekey, sign in (('maximum', 'maximum<', '<'),
+                                    ('minimum', 'minimum>', '>')):
+        if therange[key] and therange[key][0].strip().startswith(sign):
+            therange[exclusivekey] = [therange[key][0].strip()[1:]]
+            therange[key] = None
     if therange['type'] == 'real':
         for key in keys[:-1]:
             if therange[key]:
@@ -414,6 +430,11 @@ def checkrange(bch, fieldname):
     """throw exception if the out of range"""
     fieldvalue = bch[fieldname]
     therange = bch.getrange(fieldname)
+    return checkrangevalue(fieldvalue, therange)
+
+
+def checkrangevalue(fieldvalue, therange):
+    """throw exception if fieldvalue is out of therange (from getrange)"""
     if therange['maximum'] != None:
         if fieldvalue > therange['maximum']:
             astr = "Value %s is not less or equal to the 'maximum' of %s"
@@ -12,6 +12,7 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 from six.moves import zip_longest
+import functools
 import itertools
 from eppy.constructions import thermal_properties
 from eppy.geometry import surface as g_surface
@@ -24,6 +25,28 @@ def grouper(num, iterable, fillvalue=None):
     args = [iter(iterable)] * num
     return zip_longest(fillvalue=fillvalue, *args)
 
+def cachedgeometry(func):
+    """Cache the result of a geometry function on the surface.
+
+    The results are kept in the '__geometry' dict of the EpBunch, which is
+    cleared when Number_of_Vertices or a vertex field is set. Lists are
+    copied on the way out so that callers can change them.
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def cached(ddtt):
+        cache = ddtt['__geometry']
+        try:
+            value = cache[name]
+        except KeyError:
+            value = cache[name] = func(ddtt)
+        if isinstance(value, list):
+            return list(value)
+        return value
+    return cached
+
+@cachedgeometry
 def getcoords(ddtt):
     """return the coordinates of the surface"""
     n_vertices_index = ddtt.objls.index('Number_of_Vertices')
@@ -31,26 +54,31 @@ def getcoords(ddtt):
     pts = ddtt.obj[first_x:]
     return list(grouper(3, pts))
 
+@cachedgeometry
 def area(ddtt):
     """area of the surface"""
     coords = getcoords(ddtt)
     return g_surface.area(coords)
 
+@cachedgeometry
 def height(ddtt):
     """height of the surface"""
     coords = getcoords(ddtt)
     return g_surface.height(coords)
 
+@cachedgeometry
 def width(ddtt):
     """width of the surface"""
     coords = getcoords(ddtt)
     return g_surface.width(coords)
 
+@cachedgeometry
 def azimuth(ddtt):
     """azimuth of the surface"""
     coords = getcoords(ddtt)
     return g_surface.azimuth(coords)
 
+@cachedgeometry
 def tilt(ddtt):
     """tilt of the surface"""
     coords = getcoords(ddtt)
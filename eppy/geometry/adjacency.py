@@ -0,0 +1,357 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""Find surfaces which touch each other, e.g. the two sides of an interzone
+wall.
+
+Surfaces are put into a uniform grid over their bounding boxes. Only
+surfaces in the same cell are compared, so the whole model is matched in
+close to linear time rather than comparing every pair of surfaces. Two
+surfaces face each other if their normals are opposite and each is within
+the tolerance of the plane of the other, allowing for vertices which are
+out by up to the tolerance::
+
+    >>> from eppy.geometry import adjacency
+    >>> pairs = adjacency.matchsurfaces(idf)
+    >>> adjacency.setboundaries(idf)  # make the pairs interzone surfaces
+
+`eppy.simplesurface.wallinterzone` and `floorinterzone` then take the
+pairing from the Outside_Boundary_Condition_Object fields. Needs numpy.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+import itertools
+
+from eppy.geometry.modelgeometry import SurfaceTable
+from eppy.geometry.modelgeometry import ZONE_SURFACE_KEYS
+from eppy.geometry.modelgeometry import ModelGeometry
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# distance in m within which points are taken to be the same
+TOLERANCE = 0.01
+
+Adjacency = collections.namedtuple(
+    'Adjacency', ['first', 'second', 'area', 'coincident'])
+Adjacency.__doc__ = """Two surfaces in the same plane, facing each other.
+
+Attributes
+----------
+first, second : str
+    Names of the surfaces.
+area : float
+    Area of the overlap. NaN if neither surface is convex.
+coincident : bool
+    True if the surfaces have the same vertices, as the two sides of an
+    interzone surface should.
+
+"""
+
+
+def _convex(points):
+    """True if a 2-D polygon is convex"""
+    edges = np.roll(points, -1, axis=0) - points
+    turns = edges[:, 0] * np.roll(edges, -1, axis=0)[:, 1] - (
+        edges[:, 1] * np.roll(edges, -1, axis=0)[:, 0])
+    turns = turns[np.abs(turns) > 1e-12]
+    return bool(np.all(turns > 0) or np.all(turns < 0))
+
+
+def _signedarea(points):
+    """signed area of a 2-D polygon, > 0 if counter-clockwise"""
+    following = np.roll(points, -1, axis=0)
+    return (points[:, 0] * following[:, 1] -
+            following[:, 0] * points[:, 1]).sum() / 2
+
+
+def _clip(subject, clipper):
+    """Sutherland-Hodgman clipping of a 2-D polygon by a convex one"""
+    if _signedarea(clipper) < 0:
+        clipper = clipper[::-1]
+    output = [tuple(point) for point in subject]
+    for start, end in zip(clipper, np.roll(clipper, -1, axis=0)):
+        if not output:
+            break
+        edge = end - start
+
+        def inside(point):
+            return (edge[0] * (point[1] - start[1]) -
+                    edge[1] * (point[0] - start[0])) >= -1e-12
+
+        def crossing(first, second):
+            first, second = np.array(first), np.array(second)
+            direction = second - first
+            denominator = edge[0] * direction[1] - edge[1] * direction[0]
+            t = (edge[1] * (first[0] - start[0]) -
+                 edge[0] * (first[1] - start[1])) / denominator
+            return tuple(first + t * direction)
+
+        points, output = output, []
+        previous = points[-1]
+        for point in points:
+            if inside(point):
+                if not inside(previous):
+                    output.append(crossing(previous, point))
+                output.append(point)
+            elif inside(previous):
+                output.append(crossing(previous, point))
+            previous = point
+    return np.array(output, dtype=float).reshape(-1, 2)
+
+
+def overlaparea(first, second, normal):
+    """Area of the overlap of two polygons in the same plane.
+
+    Parameters
+    ----------
+    first, second : numpy.ndarray
+        The vertices, shape (number of vertices, 3).
+    normal : numpy.ndarray
+        The unit normal of the plane.
+
+    Returns
+    -------
+    float
+        NaN if neither polygon is convex.
+
+    """
+    # project onto the plane of the two axes other than the largest part
+    # of the normal, which scales areas by that part
+    axis = int(np.argmax(np.abs(normal)))
+    keep = [i for i in range(3) if i != axis]
+    first, second = first[:, keep], second[:, keep]
+    if _convex(second):
+        clipped = _clip(first, second)
+    elif _convex(first):
+        clipped = _clip(second, first)
+    else:
+        return float('nan')
+    if len(clipped) < 3:
+        return 0.0
+    return abs(_signedarea(clipped)) / abs(normal[axis])
+
+
+def coincident(first, second, tolerance=TOLERANCE):
+    """True if two polygons have the same vertices, in any order."""
+    if len(first) != len(second) or not len(first):
+        return False
+    distances = np.sqrt(
+        ((first[:, None, :] - second[None, :, :]) ** 2).sum(axis=2))
+    return bool((distances.min(axis=1) <= tolerance).all() and
+                (distances.min(axis=0) <= tolerance).all())
+
+
+class SpatialIndex(object):
+
+    """A grid over the bounding boxes of surfaces.
+
+    Parameters
+    ----------
+    table : eppy.geometry.modelgeometry.SurfaceTable
+    tolerance : float, optional
+        Distance within which points are the same (default: TOLERANCE).
+    cellsize : float, optional
+        Size of the cells of the grid (default: the median of the largest
+        sides of the bounding boxes).
+
+    """
+
+    def __init__(self, table, tolerance=TOLERANCE, cellsize=None):
+        if np is None:
+            raise ImportError("SpatialIndex needs numpy")
+        self.table = table
+        self.tolerance = tolerance
+        valid = table.area > tolerance ** 2
+        self.lower = table.bbox[:, 0] - tolerance
+        self.upper = table.bbox[:, 1] + tolerance
+        if cellsize is None:
+            sizes = (self.upper - self.lower)[valid].max(axis=1)
+            cellsize = max(float(np.median(sizes)), 10 * tolerance) if len(
+                sizes) else 1.0
+        self.cellsize = cellsize
+        self.cells = collections.defaultdict(list)
+        lowcells = np.floor(self.lower / cellsize).astype(int)
+        highcells = np.floor(self.upper / cellsize).astype(int)
+        for i in np.flatnonzero(valid):
+            ranges = [range(low, high + 1) for low, high in
+                      zip(lowcells[i], highcells[i])]
+            for cell in itertools.product(*ranges):
+                self.cells[cell].append(i)
+        self.valid = valid
+
+    def query(self, lower, upper):
+        """Find the surfaces whose bounding boxes meet a box.
+
+        Parameters
+        ----------
+        lower, upper : sequence of float
+            The lowest and highest x, y and z of the box.
+
+        Returns
+        -------
+        list of int
+            Positions of the surfaces in the table.
+
+        """
+        lower, upper = np.asarray(lower), np.asarray(upper)
+        ranges = [range(low, high + 1) for low, high in zip(
+            np.floor(lower / self.cellsize).astype(int),
+            np.floor(upper / self.cellsize).astype(int))]
+        found = set()
+        for cell in itertools.product(*ranges):
+            found.update(self.cells.get(cell, ()))
+        return sorted(i for i in found if
+                      np.all(self.lower[i] <= upper) and
+                      np.all(self.upper[i] >= lower))
+
+    def candidates(self):
+        """Pairs of surfaces in the same cell.
+
+        Returns
+        -------
+        numpy.ndarray
+            int array of shape (pairs, 2), each pair once.
+
+        """
+        pairs = set()
+        for members in self.cells.values():
+            pairs.update(itertools.combinations(sorted(members), 2))
+        return np.array(sorted(pairs), dtype=np.intp).reshape(-1, 2)
+
+    def pairs(self, minarea=None):
+        """Find surfaces in the same plane which face each other and
+        overlap.
+
+        Parameters
+        ----------
+        minarea : float, optional
+            Smallest overlap reported (default: tolerance squared).
+
+        Returns
+        -------
+        list of Adjacency
+            In the order of the first surface of each pair.
+
+        """
+        table = self.table
+        return [Adjacency(table.names[i], table.names[j], area, same)
+                for i, j, area, same in self._pairs(minarea)]
+
+    def _pairs(self, minarea=None):
+        """(i, j, area, coincident) of each pair, as for pairs"""
+        if minarea is None:
+            minarea = self.tolerance ** 2
+        table = self.table
+        candidates = self.candidates()
+        first, second = candidates[:, 0], candidates[:, 1]
+        # vertices out by the tolerance tilt a surface by up to about
+        # 2 * tolerance / its size
+        bbox = table.bbox
+        sizes = np.sqrt(((bbox[:, 1] - bbox[:, 0]) ** 2).sum(axis=1))
+        sine = np.clip(2 * self.tolerance / np.minimum(
+            sizes[first], sizes[second]), 0, 1)
+        facing = -(table.normal[first] * table.normal[second]).sum(axis=1)
+        # the distance between the planes, along their mean normal
+        mean = table.normal[first] - table.normal[second]
+        mean /= np.maximum(
+            np.sqrt((mean ** 2).sum(axis=1)), 1e-12)[:, None]
+        apart = np.abs((mean * (
+            table.centroid[second] - table.centroid[first])).sum(axis=1))
+        keep = (
+            (facing >= np.sqrt(1 - sine ** 2) - 1e-9) &
+            (apart <= self.tolerance) &
+            np.all(self.lower[first] <= self.upper[second], axis=1) &
+            np.all(self.upper[first] >= self.lower[second], axis=1))
+        # the overlap projected along the largest part of the normal is
+        # inside the overlap of the bounding boxes, so surfaces which only
+        # touch at an edge are left out without clipping them
+        sides = np.clip(
+            np.minimum(bbox[first, 1], bbox[second, 1]) -
+            np.maximum(bbox[first, 0], bbox[second, 0]), 0, None)
+        normal = np.abs(table.normal[first])
+        axis = np.argmax(normal, axis=1)
+        rows = np.arange(len(axis))
+        sides[rows, axis] = 1
+        keep &= sides.prod(axis=1) > minarea * normal[rows, axis]
+        result = []
+        for i, j in candidates[keep]:
+            first, second = table.vertices(i), table.vertices(j)
+            if coincident(first, second, self.tolerance):
+                area, same = min(table.area[i], table.area[j]), True
+            else:
+                area = overlaparea(first, second, table.normal[i])
+                same = False
+                if area <= minarea:
+                    continue
+            result.append((i, j, area, same))
+        return result
+
+
+def matchsurfaces(idf, tolerance=TOLERANCE, keys=ZONE_SURFACE_KEYS):
+    """Find the surfaces of a model which face each other.
+
+    Parameters
+    ----------
+    idf : eppy.modeleditor.IDF
+    tolerance : float, optional
+        Distance within which points are the same (default: TOLERANCE).
+    keys : list of str, optional
+        Types of objects (default: the surfaces of zones).
+
+    Returns
+    -------
+    list of Adjacency
+
+    """
+    table = SurfaceTable.fromobjects(ModelGeometry(idf).objects(keys))
+    return SpatialIndex(table, tolerance).pairs()
+
+
+def setboundaries(idf, tolerance=TOLERANCE):
+    """Make coincident surfaces of different zones interzone surfaces.
+
+    Outside_Boundary_Condition is set to 'Surface', with each surface as
+    the Outside_Boundary_Condition_Object of the other, and Sun_Exposure
+    and Wind_Exposure to NoSun and NoWind.
+
+    Parameters
+    ----------
+    idf : eppy.modeleditor.IDF
+    tolerance : float, optional
+        Distance within which points are the same (default: TOLERANCE).
+
+    Returns
+    -------
+    list of Adjacency
+        The pairs which were set. Pairs of surfaces in the same zone, or
+        which only partly overlap, are left alone.
+
+    """
+    objects = ModelGeometry(idf).objects(ZONE_SURFACE_KEYS)
+    table = SurfaceTable.fromobjects(objects)
+    done = []
+    for i, j, area, same in SpatialIndex(table, tolerance)._pairs():
+        if not same:
+            continue
+        first, second = objects[i], objects[j]
+        if first.Zone_Name.upper() == second.Zone_Name.upper():
+            continue
+        for surface, other in ((first, second), (second, first)):
+            surface.Outside_Boundary_Condition = 'Surface'
+            surface.Outside_Boundary_Condition_Object = other.Name
+            surface.Sun_Exposure = 'NoSun'
+            surface.Wind_Exposure = 'NoWind'
+        done.append(Adjacency(first.Name, second.Name, area, same))
+    return done
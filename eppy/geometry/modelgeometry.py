@@ -0,0 +1,729 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""Geometry of all the surfaces of a model at once.
+
+The vertices of all the surfaces are packed into one array of coordinates,
+with an array of offsets to where each surface starts, and the area,
+normal, tilt, azimuth, centroid and bounding box of every surface are
+worked out with a few numpy operations over the whole array::
+
+    >>> surfaces = idf.geometry.surfaces()
+    >>> surfaces.area.sum()
+    >>> surfaces['Wall 1'].azimuth
+
+This gives the same results as `eppy.geometry.surface`, which works on
+one surface at a time, for models of any size. Needs numpy.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+
+import six
+
+from eppy.reporttable import ReportTable
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# the objects with vertices, as in bunch_subclass.addfunctions
+SURFACE_KEYS = (
+    'BUILDINGSURFACE:DETAILED', 'WALL:DETAILED', 'ROOFCEILING:DETAILED',
+    'FLOOR:DETAILED', 'FENESTRATIONSURFACE:DETAILED',
+    'SHADING:SITE:DETAILED', 'SHADING:BUILDING:DETAILED',
+    'SHADING:ZONE:DETAILED')
+# the objects which bound zones
+ZONE_SURFACE_KEYS = (
+    'BUILDINGSURFACE:DETAILED', 'WALL:DETAILED', 'ROOFCEILING:DETAILED',
+    'FLOOR:DETAILED')
+# Surface_Type of the objects which do not have the field
+SURFACE_TYPES = {'WALL:DETAILED': 'WALL', 'ROOFCEILING:DETAILED': 'ROOF',
+                 'FLOOR:DETAILED': 'FLOOR'}
+# fenestration counted as window area
+GLAZED_TYPES = ('WINDOW', 'GLASSDOOR')
+# the columns of zonemetrics
+ZONE_METRICS = ('floor_area', 'height', 'volume', 'exterior_wall_area',
+                'window_area', 'window_wall_ratio')
+# components of a normal smaller than this are taken to be 0
+TOLERANCE = 1e-12
+# a zone is closed if the sum of the area vectors of its surfaces is less
+# than this fraction of their total area
+CLOSED_TOLERANCE = 1e-3
+
+Surface = collections.namedtuple(
+    'Surface', ['name', 'key', 'area', 'tilt', 'azimuth', 'height', 'width',
+                'normal', 'centroid', 'bbox', 'coords'])
+Surface.__doc__ = """The geometry of one surface.
+
+Attributes
+----------
+name : str
+    Name of the surface.
+key : str
+    Type of the object, e.g. 'BUILDINGSURFACE:DETAILED'.
+area : float
+tilt : float
+    Degrees from the vertical, 0 for a roof facing up.
+azimuth : float
+    Degrees clockwise from north.
+height, width : float
+    As from `eppy.geometry.surface.height` and `width`.
+normal : numpy.ndarray
+    The outward unit normal.
+centroid : numpy.ndarray
+bbox : numpy.ndarray
+    The lowest and highest x, y and z, shape (2, 3).
+coords : numpy.ndarray
+    The vertices, shape (number of vertices, 3).
+
+"""
+
+
+def firstvertex(obj):
+    """Position of the first vertex field of a surface in obj.obj."""
+    return obj.objls.index('Number_of_Vertices') + 1
+
+
+def pack(polygons):
+    """Pack polygons into one array of coordinates and an array of offsets.
+
+    Parameters
+    ----------
+    polygons : list
+        Each polygon is a list of (x, y, z) vertices.
+
+    Returns
+    -------
+    tuple
+        (coords, offsets), where coords has shape (total vertices, 3) and
+        the vertices of polygon i are coords[offsets[i]:offsets[i + 1]].
+
+    """
+    counts = [len(polygon) for polygon in polygons]
+    offsets = np.zeros(len(counts) + 1, dtype=np.intp)
+    np.cumsum(counts, out=offsets[1:])
+    flat = [value for polygon in polygons for point in polygon
+            for value in point]
+    coords = np.array(flat, dtype=float).reshape(-1, 3)
+    return coords, offsets
+
+
+def packobjects(objects):
+    """Pack the vertices of surface objects, as for `pack`.
+
+    The vertex fields are read straight from the lists of field values,
+    after the Number_of_Vertices field, as in
+    `eppy.function_helpers.getcoords`. Blank fields at the end are left
+    out.
+
+    Parameters
+    ----------
+    objects : list of EpBunch
+        Objects with vertices, e.g. BUILDINGSURFACE:DETAILED.
+
+    Returns
+    -------
+    tuple
+        (coords, offsets)
+
+    """
+    firsts = {}  # {key: first vertex field}
+    flat, counts = [], []
+    for obj in objects:
+        key = obj.key.upper()
+        first = firsts.get(key)
+        if first is None:
+            first = firsts[key] = firstvertex(obj)
+        values = obj.obj[first:]
+        end = len(values)
+        while end and values[end - 1] == '':
+            end -= 1
+        end -= end % 3
+        flat.extend(values[:end])
+        counts.append(end // 3)
+    offsets = np.zeros(len(counts) + 1, dtype=np.intp)
+    np.cumsum(counts, out=offsets[1:])
+    try:
+        coords = np.array(flat, dtype=float)
+    except ValueError:
+        coords = np.array([float(value) for value in flat])
+    return coords.reshape(-1, 3), offsets
+
+
+def _sumby(segments, values, count):
+    """sum the rows of values for each segment"""
+    result = np.zeros((count, values.shape[1]))
+    for i in range(values.shape[1]):
+        result[:, i] = np.bincount(
+            segments, weights=values[:, i], minlength=count)
+    return result
+
+
+def affine(matrix):
+    """Make a 4x4 affine matrix.
+
+    Parameters
+    ----------
+    matrix : array_like
+        A 3x3 linear transform, a 3x4 matrix with the translation in the
+        last column, or a 4x4 matrix.
+
+    Returns
+    -------
+    numpy.ndarray
+
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    result = np.eye(4)
+    if matrix.shape == (3, 3):
+        result[:3, :3] = matrix
+    elif matrix.shape in ((3, 4), (4, 4)):
+        result[:matrix.shape[0]] = matrix
+    else:
+        raise ValueError(
+            "Expected a 3x3, 3x4 or 4x4 matrix, got shape %s" % (
+                matrix.shape, ))
+    return result
+
+
+def translation(x=0, y=0, z=0):
+    """A 4x4 matrix which moves points by (x, y, z)."""
+    result = np.eye(4)
+    result[:3, 3] = x, y, z
+    return result
+
+
+def rotation(degrees, about=(0, 0, 0)):
+    """A 4x4 matrix which turns points clockwise about a vertical axis, seen
+    from above, as a positive Building North Axis does.
+
+    Parameters
+    ----------
+    degrees : float
+    about : sequence of float, optional
+        A point on the axis (default: the origin).
+
+    """
+    angle = np.radians(degrees)
+    turn = np.eye(4)
+    turn[:2, :2] = [[np.cos(angle), np.sin(angle)],
+                    [-np.sin(angle), np.cos(angle)]]
+    about = np.asarray(about, dtype=float)
+    return translation(*about).dot(turn).dot(translation(*-about))
+
+
+def scaling(factor, about=(0, 0, 0)):
+    """A 4x4 matrix which scales points about a point.
+
+    Parameters
+    ----------
+    factor : float or sequence of float
+        One factor, or one for each of x, y and z.
+    about : sequence of float, optional
+        The point which stays where it is (default: the origin).
+
+    """
+    scale = np.eye(4)
+    scale[[0, 1, 2], [0, 1, 2]] = factor
+    about = np.asarray(about, dtype=float)
+    return translation(*about).dot(scale).dot(translation(*-about))
+
+
+def applytransform(matrix, coords):
+    """Apply an affine matrix, as for `affine`, to points.
+
+    Parameters
+    ----------
+    matrix : array_like
+    coords : numpy.ndarray
+        Shape (points, 3).
+
+    Returns
+    -------
+    numpy.ndarray
+        The moved points, shape (points, 3).
+
+    """
+    matrix = affine(matrix)
+    coords = np.asarray(coords, dtype=float).reshape(-1, 3)
+    return coords.dot(matrix[:3, :3].T) + matrix[:3, 3]
+
+
+def surfaceframe(coords):
+    """The axes of a surface, as used by the simple surface objects.
+
+    x is horizontal and to the right seen from outside, from the azimuth
+    of the surface, y is up the surface and z is the outward normal.
+
+    Parameters
+    ----------
+    coords : array_like
+        The vertices, shape (number of vertices, 3).
+
+    Returns
+    -------
+    numpy.ndarray
+        A 4x4 matrix from model coordinates to the axes of the surface,
+        for `applytransform`.
+
+    """
+    table = SurfaceTable(*pack([coords]))
+    normal = table.normal[0]
+    azimuth = np.radians(table.azimuth[0])
+    across = np.array([-np.cos(azimuth), np.sin(azimuth), 0])
+    up = np.cross(normal, across)
+    result = np.eye(4)
+    result[:3, :3] = across, up, normal
+    return result
+
+
+def lowerleft(local, tolerance=1e-6):
+    """Position of the lowest, then leftmost, of points in the axes of
+    `surfaceframe`."""
+    local = np.asarray(local)
+    lowest = local[:, 1] <= local[:, 1].min() + tolerance
+    candidates = np.flatnonzero(lowest)
+    return int(candidates[np.argmin(local[candidates, 0])])
+
+
+class SurfaceTable(object):
+
+    """The geometry of many surfaces, as arrays with one row per surface.
+
+    Parameters
+    ----------
+    coords : numpy.ndarray
+        The vertices of all the surfaces, shape (total vertices, 3).
+    offsets : numpy.ndarray
+        The vertices of surface i are coords[offsets[i]:offsets[i + 1]].
+    names : list of str, optional
+        Names of the surfaces (default: their positions as strings).
+    keys : list of str, optional
+        Types of the objects.
+    objects : list of EpBunch, optional
+        The objects the vertices were read from.
+
+    Attributes
+    ----------
+    area : numpy.ndarray
+        Areas of the surfaces.
+    normal : numpy.ndarray
+        Outward unit normals, shape (surfaces, 3), from Newell's method, so
+        vertices in counter-clockwise order seen from outside face out.
+        (0, 0, 0) for surfaces with no area.
+    tilt : numpy.ndarray
+        Degrees from the vertical.
+    azimuth : numpy.ndarray
+        Degrees clockwise from north, in [0, 360).
+    centroid : numpy.ndarray
+        Area-weighted centroids, shape (surfaces, 3). The mean of the
+        vertices for surfaces with no area.
+    bbox : numpy.ndarray
+        Bounding boxes, shape (surfaces, 2, 3): the lowest then the
+        highest x, y and z. NaN for surfaces with no vertices.
+    height, width : numpy.ndarray
+        As from `eppy.geometry.surface.height` and `width`, which look at
+        the edges from the first vertex.
+
+    """
+
+    def __init__(self, coords, offsets, names=None, keys=None,
+                 objects=None):
+        if np is None:
+            raise ImportError("SurfaceTable needs numpy")
+        self.coords = np.asarray(coords, dtype=float).reshape(-1, 3)
+        self.offsets = np.asarray(offsets, dtype=np.intp)
+        count = len(self.offsets) - 1
+        if names is None:
+            names = [str(i) for i in range(count)]
+        self.names = list(names)
+        self.keys = list(keys) if keys is not None else [''] * count
+        self.objects = objects
+        self._index = None
+        self._compute()
+
+    @classmethod
+    def fromobjects(cls, objects):
+        """Make a table from surface objects.
+
+        Parameters
+        ----------
+        objects : list of EpBunch
+            Objects with vertices, e.g. BUILDINGSURFACE:DETAILED.
+
+        Returns
+        -------
+        SurfaceTable
+
+        """
+        objects = list(objects)
+        coords, offsets = packobjects(objects)
+        return cls(coords, offsets, [obj.Name for obj in objects],
+                   [obj.key.upper() for obj in objects], objects)
+
+    @property
+    def counts(self):
+        """number of vertices of each surface"""
+        return np.diff(self.offsets)
+
+    def _compute(self):
+        """work out all the properties"""
+        coords, offsets = self.coords, self.offsets
+        count = len(offsets) - 1
+        counts = np.diff(offsets)
+        segments = np.repeat(np.arange(count), counts)
+        starts = offsets[:-1]
+        # the next vertex of each vertex, going round each surface
+        following = np.arange(len(coords)) + 1
+        hasvertices = counts > 0
+        following[offsets[1:][hasvertices] - 1] = starts[hasvertices]
+        nextcoords = coords[following]
+        # Newell's method: half the sum of the cross products of the edges
+        total = _sumby(segments, np.cross(coords, nextcoords), count)
+        magnitude = np.sqrt((total ** 2).sum(axis=1))
+        self.area = magnitude / 2
+        hasarea = magnitude > TOLERANCE
+        normal = np.zeros((count, 3))
+        normal[hasarea] = total[hasarea] / magnitude[hasarea, None]
+        normal[np.abs(normal) < TOLERANCE] = 0
+        self.normal = normal
+        self.tilt = np.degrees(np.arccos(np.clip(normal[:, 2], -1, 1)))
+        self.azimuth = np.degrees(np.arctan2(normal[:, 0], normal[:, 1]))
+        self.azimuth[self.azimuth < 0] += 360
+        # centroid from the triangles fanned out from the first vertex
+        base = coords[starts[segments]] if len(coords) else coords
+        triangle = np.cross(coords - base, nextcoords - base)
+        weights = (triangle * normal[segments]).sum(axis=1) / 2
+        weighted = _sumby(
+            segments, (base + coords + nextcoords) * weights[:, None] / 3,
+            count)
+        centroid = _sumby(segments, coords, count)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            centroid /= counts[:, None]
+            centroid[hasarea] = (weighted[hasarea] /
+                                 self.area[hasarea, None])
+        self.centroid = centroid
+        # bounding boxes
+        bbox = np.full((count, 2, 3), np.nan)
+        if hasvertices.any():
+            nonempty = starts[hasvertices]
+            bbox[hasvertices, 0] = np.minimum.reduceat(coords, nonempty)
+            bbox[hasvertices, 1] = np.maximum.reduceat(coords, nonempty)
+        self.bbox = bbox
+        self._sizes(starts, counts)
+
+    def _sizes(self, starts, counts):
+        """height and width from the edges at the first vertex"""
+        count = len(counts)
+        self.height = np.zeros(count)
+        self.width = np.zeros(count)
+        valid = counts >= 2
+        if not valid.any():
+            return
+        coords = self.coords
+        first = coords[starts[valid]]
+        second = coords[starts[valid] + 1]
+        last = coords[starts[valid] + counts[valid] - 1]
+        tosecond = np.sqrt(((second - first) ** 2).sum(axis=1))
+        tolast = np.sqrt(((last - first) ** 2).sum(axis=1))
+        risesecond = np.abs(second[:, 2] - first[:, 2])
+        riselast = np.abs(last[:, 2] - first[:, 2])
+        self.width[valid] = np.where(
+            riselast < risesecond, tolast,
+            np.where(riselast > risesecond, tosecond,
+                     np.maximum(tolast, tosecond)))
+        self.height[valid] = np.where(
+            riselast > risesecond, tolast,
+            np.where(riselast < risesecond, tosecond,
+                     np.minimum(tolast, tosecond)))
+
+    def __len__(self):
+        return len(self.names)
+
+    def index(self, name):
+        """Position of a surface, found by name ignoring case.
+
+        Raises
+        ------
+        KeyError
+            If there is no surface with that name.
+
+        """
+        if self._index is None:
+            self._index = {}
+            for i, surfacename in reversed(list(enumerate(self.names))):
+                self._index[surfacename.upper()] = i
+        try:
+            return self._index[name.upper()]
+        except KeyError:
+            raise KeyError("No surface named %s" % (name, ))
+
+    def vertices(self, i):
+        """The vertices of surface i, shape (number of vertices, 3)."""
+        return self.coords[self.offsets[i]:self.offsets[i + 1]]
+
+    def __getitem__(self, name):
+        i = self.index(name)
+        return Surface(
+            self.names[i], self.keys[i], self.area[i], self.tilt[i],
+            self.azimuth[i], self.height[i], self.width[i], self.normal[i],
+            self.centroid[i], self.bbox[i], self.vertices(i))
+
+    def __contains__(self, name):
+        try:
+            self.index(name)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        for name in self.names:
+            yield self[name]
+
+    def to_dataframe(self):
+        """The properties as a pandas DataFrame, indexed by name."""
+        import pandas as pd  # optional
+        data = collections.OrderedDict([
+            ('key', self.keys), ('area', self.area), ('tilt', self.tilt),
+            ('azimuth', self.azimuth), ('height', self.height),
+            ('width', self.width)])
+        for i, axis in enumerate('xyz'):
+            data['normal_' + axis] = self.normal[:, i]
+        for i, axis in enumerate('xyz'):
+            data['centroid_' + axis] = self.centroid[:, i]
+        for j, end in enumerate(['min', 'max']):
+            for i, axis in enumerate('xyz'):
+                data['%s%s' % (axis, end)] = self.bbox[:, j, i]
+        return pd.DataFrame(data, index=pd.Index(self.names, name='name'))
+
+
+class ModelGeometry(object):
+
+    """The geometry of a model, as `IDF.geometry`.
+
+    Parameters
+    ----------
+    idf : eppy.modeleditor.IDF
+
+    """
+
+    def __init__(self, idf):
+        self.idf = idf
+
+    def objects(self, keys=None):
+        """The objects with vertices.
+
+        Parameters
+        ----------
+        keys : list of str, optional
+            Types of objects (default: SURFACE_KEYS).
+
+        Returns
+        -------
+        list of EpBunch
+
+        """
+        if keys is None:
+            keys = SURFACE_KEYS
+        elif isinstance(keys, six.string_types):
+            keys = [keys]
+        objects = []
+        for key in keys:
+            objects.extend(self.idf.idfobjects.get(key.upper(), []))
+        return objects
+
+    def surfaces(self, keys=None):
+        """Work out the geometry of all the surfaces.
+
+        Parameters
+        ----------
+        keys : list of str, optional
+            Types of objects (default: SURFACE_KEYS).
+
+        Returns
+        -------
+        SurfaceTable
+            One row per surface, in the order of keys and then of the
+            objects in the model.
+
+        """
+        if np is None:
+            raise ImportError("ModelGeometry.surfaces needs numpy")
+        return SurfaceTable.fromobjects(self.objects(keys))
+
+    def transform(self, matrix, objects=None):
+        """Move, turn or scale the vertices of many surfaces at once.
+
+        All the vertex fields are read into one array, transformed with
+        one matrix product, and written straight back to the lists of
+        field values, rather than setting the fields one at a time. Only
+        vertex fields are changed, not e.g. the origins of zones.
+
+        Parameters
+        ----------
+        matrix : array_like
+            The transform, as for `affine`, e.g. from `translation`,
+            `rotation` or `scaling`.
+        objects : list of EpBunch, optional
+            The objects to change (default: all the objects with
+            vertices).
+
+        Returns
+        -------
+        list of EpBunch
+            The objects which were changed.
+
+        """
+        if np is None:
+            raise ImportError("ModelGeometry.transform needs numpy")
+        if objects is None:
+            objects = self.objects()
+        objects = list(objects)
+        coords, offsets = packobjects(objects)
+        values = applytransform(matrix, coords).tolist()
+        firsts = {}
+        for obj, start, end in zip(objects, offsets[:-1], offsets[1:]):
+            key = obj.key.upper()
+            first = firsts.get(key)
+            if first is None:
+                first = firsts[key] = firstvertex(obj)
+            fields = obj.obj
+            for i, point in enumerate(values[start:end]):
+                position = first + 3 * i
+                fields[position:position + 3] = point
+            obj['__geometry'].clear()
+        return objects
+
+
+def _groupby(ufunc, groups, values, count, initial):
+    """reduce values by group with a ufunc, initial for empty groups"""
+    result = np.full(count, initial, dtype=float)
+    ufunc.at(result, groups, values)
+    return result
+
+
+def zonemetrics(idf):
+    """Work out the floor area, height and volume of every zone at once.
+
+    The surfaces are grouped by zone in one pass, and the sums over the
+    groups are done with numpy. floor_area and height follow
+    `eppy.modeleditor.zonearea` and `zoneheight`: the area of the floors,
+    or of the roofs and ceilings if there are none, and the height from
+    the lowest floor to the highest roof or ceiling, or of all the
+    surfaces if the zone has no floor or no roof.
+
+    The volume of a closed zone is found from its surfaces with the
+    divergence theorem, the sum of area * (centroid . normal) / 3, which
+    is the sum of the tetrahedra of `eppy.geometry.volume_zone` for any
+    shape of zone. A zone is closed if the area vectors of its surfaces
+    sum to about zero. Otherwise the volume is floor_area * height, as in
+    `eppy.modeleditor.zonevolume`.
+
+    Parameters
+    ----------
+    idf : eppy.modeleditor.IDF
+
+    Returns
+    -------
+    eppy.reporttable.ReportTable
+        One row per zone, in the order of the ZONE objects, and the
+        columns in ZONE_METRICS. exterior_wall_area is the gross area of
+        the walls with Outdoors boundary conditions, window_area is the
+        area of the windows and glass doors in them, times their
+        multipliers.
+
+    """
+    if np is None:
+        raise ImportError("zonemetrics needs numpy")
+    zonenames = [zone.Name for zone in idf.idfobjects['ZONE']]
+    zoneindex = {}
+    for i, name in reversed(list(enumerate(zonenames))):
+        zoneindex[name.upper()] = i
+    count = len(zonenames)
+    geometry = ModelGeometry(idf)
+    surfaces = SurfaceTable.fromobjects(geometry.objects(ZONE_SURFACE_KEYS))
+    zones, types, exterior, hosts = [], [], [], {}
+    for i, obj in enumerate(surfaces.objects):
+        zones.append(zoneindex.get(obj.Zone_Name.upper(), -1))
+        surfacetype = SURFACE_TYPES.get(surfaces.keys[i])
+        if surfacetype is None:
+            surfacetype = obj.Surface_Type.upper()
+        types.append(surfacetype)
+        exterior.append(
+            obj.Outside_Boundary_Condition.upper() == 'OUTDOORS')
+        hosts.setdefault(obj.Name.upper(), i)
+    zones, types = np.array(zones, dtype=np.intp), np.array(types)
+    exterior = np.array(exterior, dtype=bool)
+    known = zones >= 0
+
+    def total(select, values):
+        """sum the values of the selected surfaces by zone"""
+        select = select & known
+        return np.bincount(zones[select], weights=values[select],
+                           minlength=count)
+
+    everything = np.ones(len(zones), dtype=bool)
+    floors = types == 'FLOOR'
+    roofs = types == 'ROOF'
+    tops = roofs | (types == 'CEILING')
+    walls = (types == 'WALL') & exterior
+    area = surfaces.area
+    ones = np.ones_like(area)
+    hasfloor = total(floors, ones) > 0
+    hasroof = total(roofs, ones) > 0
+    floor_area = np.where(hasfloor, total(floors, area), total(tops, area))
+    # heights
+    lowest, highest = surfaces.bbox[:, 0, 2], surfaces.bbox[:, 1, 2]
+    top = _groupby(np.maximum, zones[tops & known],
+                   highest[tops & known], count, -np.inf)
+    bottom = _groupby(np.minimum, zones[floors & known],
+                      lowest[floors & known], count, np.inf)
+    alltop = _groupby(np.maximum, zones[known], highest[known], count,
+                      -np.inf)
+    allbottom = _groupby(np.minimum, zones[known], lowest[known], count,
+                         np.inf)
+    height = np.where(hasfloor & hasroof, top - bottom, alltop - allbottom)
+    height[~np.isfinite(height)] = 0
+    # volumes
+    flux = total(everything, area * (
+        surfaces.centroid * surfaces.normal).sum(axis=1) / 3)
+    vectors = np.column_stack([
+        total(everything, area * surfaces.normal[:, i]) for i in range(3)])
+    closure = np.sqrt((vectors ** 2).sum(axis=1))
+    closed = (closure <= CLOSED_TOLERANCE * total(everything, area)) & (
+        flux > 0)
+    volume = np.where(closed, flux, floor_area * height)
+    # windows
+    wallarea = total(walls, area)
+    windowzones, windowareas = [], []
+    windows = geometry.objects('FENESTRATIONSURFACE:DETAILED')
+    windowtable = SurfaceTable.fromobjects(windows)
+    for i, obj in enumerate(windows):
+        host = hosts.get(obj.Building_Surface_Name.upper())
+        if (host is None or not walls[host] or not known[host] or
+                obj.Surface_Type.upper() not in GLAZED_TYPES):
+            continue
+        try:
+            multiplier = float(obj.Multiplier)
+        except ValueError:  # blank
+            multiplier = 1.0
+        windowzones.append(zones[host])
+        windowareas.append(windowtable.area[i] * multiplier)
+    windowarea = np.bincount(np.array(windowzones, dtype=np.intp),
+                             weights=np.array(windowareas, dtype=float),
+                             minlength=count)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio = np.where(wallarea > 0, windowarea / wallarea, 0)
+    cells = np.column_stack([floor_area, height, volume, wallarea,
+                             windowarea, ratio])
+    return ReportTable(cells, zonenames, ZONE_METRICS)
@@ -0,0 +1,415 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""The connections of the HVAC loops of a model, found in one pass.
+
+The branches, branch lists, loops, connectors and zone equipment of a model
+are each read once, with the positions of their fields looked up once in
+the idd, and the branches are indexed by name::
+
+    >>> from eppy.hvac.topology import Topology
+    >>> topology = Topology.fromidf(idf)
+    >>> topology.loops['Hot Water Loop'].supplybranches
+    >>> topology.graph.downstream('Central Boiler')
+
+`Topology.edges` are the same edges as `loopdiagram.makeairplantloop`
+makes, and `Topology.graph` is an `eppy.walk_hvac.HVACGraph` of them.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+
+from eppy.walk_hvac import HVACGraph
+
+
+# the second part of a node in the edges
+ANODE = 'epnode'
+# the fields of each type of loop, in the order of the fields of Loop
+LOOP_FIELDS = collections.OrderedDict([
+    ('PLANTLOOP', (
+        'Plant Side Inlet Node Name', 'Plant Side Outlet Node Name',
+        'Demand Side Inlet Node Name', 'Demand Side Outlet Node Name',
+        'Plant Side Branch List Name', 'Demand Side Branch List Name')),
+    ('CONDENSERLOOP', (
+        'Condenser Side Inlet Node Name', 'Condenser Side Outlet Node Name',
+        'Demand Side Inlet Node Name', 'Demand Side Outlet Node Name',
+        'Condenser Side Branch List Name',
+        'Condenser Demand Side Branch List Name')),
+    ('AIRLOOPHVAC', (
+        'Supply Side Inlet Node Name', 'Supply Side Outlet Node Names',
+        'Demand Side Inlet Node Names', 'Demand Side Outlet Node Name',
+        'Branch List Name', None)),
+])
+# (key, inlet field, outlet fields) of the air connectors which split
+AIR_SPLITTERS = (
+    ('AIRLOOPHVAC:ZONESPLITTER', 'Inlet Node Name', 'Outlet %s Node Name'),
+    ('AIRLOOPHVAC:SUPPLYPLENUM', 'Inlet Node Name', 'Outlet %s Node Name'),
+)
+# (key, outlet field, inlet fields) of the air connectors which mix
+AIR_MIXERS = (
+    ('AIRLOOPHVAC:ZONEMIXER', 'Outlet Node Name', 'Inlet %s Node Name'),
+    ('AIRLOOPHVAC:RETURNPLENUM', 'Outlet Node Name', 'Inlet %s Node Name'),
+)
+# fields of ZONEHVAC:EQUIPMENTCONNECTIONS, with the later names of the fields
+# that have been renamed
+EQUIPMENTCONNECTIONS_FIELDS = (
+    'Zone Name', 'Zone Conditioning Equipment List Name',
+    'Zone Air Node Name',
+    ('Zone Return Air Node Name', 'Zone Return Air Node or NodeList Name'))
+
+Component = collections.namedtuple(
+    'Component', ['key', 'name', 'inlet', 'outlet'])
+Component.__doc__ = """A component of a branch.
+
+Attributes
+----------
+key : str
+    The object type, as in the branch.
+name : str
+inlet, outlet : str
+    Names of the nodes.
+
+"""
+
+Branch = collections.namedtuple(
+    'Branch', ['name', 'components', 'inlet', 'outlet'])
+Branch.__doc__ = """A branch.
+
+Attributes
+----------
+name : str
+components : list of Component
+inlet, outlet : str
+    The inlet of the first component and the outlet of the last, or ''
+    if the branch has no components.
+
+"""
+
+Loop = collections.namedtuple(
+    'Loop', ['name', 'key', 'supplyinlet', 'supplyoutlet', 'demandinlet',
+             'demandoutlet', 'supplybranches', 'demandbranches'])
+Loop.__doc__ = """A PLANTLOOP, CONDENSERLOOP or AIRLOOPHVAC.
+
+Attributes
+----------
+name : str
+key : str
+    e.g. 'PLANTLOOP'.
+supplyinlet, supplyoutlet, demandinlet, demandoutlet : str
+    Names of the nodes.
+supplybranches, demandbranches : list of str
+    Names of the branches in the branch lists of the loop. An air loop has
+    no demand branches.
+
+"""
+
+
+def _extract(theobject, positions):
+    """the fields of theobject at positions, up to the first which is past
+    its end, as in `loops.extractfields`"""
+    result = []
+    for position in positions:
+        if position >= len(theobject):
+            break
+        result.append(theobject[position])
+    return result
+
+
+class _IDDFields(object):
+    """positions of the fields of each type of object, found once"""
+
+    def __init__(self, data, commdct):
+        self.data = data
+        self.commdct = commdct
+        self.keys = dict((key, i) for i, key in enumerate(data.dtls))
+        self._names = {}
+        self._positions = {}
+
+    def __contains__(self, key):
+        return key in self.keys
+
+    def objects(self, key):
+        """the objects of key, [] if key is not in the idd"""
+        if key not in self.keys:
+            return []
+        return self.data.dt[key]
+
+    def names(self, key):
+        """the names of the fields of key, None where there is no name"""
+        try:
+            return self._names[key]
+        except KeyError:
+            pass
+        names = []
+        for comm in self.commdct[self.keys[key]]:
+            try:
+                names.append(comm['field'][0])
+            except KeyError:
+                names.append(None)
+        self._names[key] = names
+        positions = {}
+        for i, name in enumerate(names):
+            positions.setdefault(name, i)
+        self._positions[key] = positions
+        return names
+
+    def position(self, key, name):
+        """position of the field called name. name can be a tuple of the
+        names the field has had in different versions of the idd"""
+        self.names(key)
+        positions = self._positions[key]
+        if isinstance(name, tuple):
+            name = next((aname for aname in name if aname in positions),
+                        name[0])
+        return positions[name]
+
+    def repeating(self, key, patterns):
+        """positions of repeating fields, as in `loops.repeatingfields`
+
+        patterns are e.g. ['Component %s Name'], and the positions of the
+        fields of each pattern are interleaved.
+        """
+        names = self.names(key)
+        allfields = []
+        for pattern in patterns:
+            fields = []
+            for name in names:
+                if name == pattern % (len(fields) + 1, ):
+                    fields.append(name)
+            allfields.append(fields)
+        return [self.position(key, name)
+                for group in zip(*allfields) for name in group]
+
+    def keychoices(self, key, name):
+        """the keys listed for a field in the idd, e.g. object types"""
+        comm = self.commdct[self.keys[key]][self.position(key, name)]
+        return comm.get('key', [])
+
+
+class Topology(object):
+
+    """The branches, loops and connections of the HVAC of a model.
+
+    Parameters
+    ----------
+    data : eppy.EPlusInterfaceFunctions.eplusdata.Eplusdata
+        The model, as `IDF.model`.
+    commdct : list
+        The idd information, as `IDF.idd_info`.
+
+    Attributes
+    ----------
+    branches : collections.OrderedDict
+        {name: Branch}. The first branch of each name is kept.
+    branchlists : dict
+        {name: list of branch names}
+    loops : collections.OrderedDict
+        {name: Loop}, for all the plant loops, then the condenser loops,
+        then the air loops.
+    edges : list
+        The connections, as for `loopdiagram.makeairplantloop`: (from, to)
+        pairs of component names and (node name, 'epnode') nodes.
+
+    References to branches and equipment lists which are not in the model
+    are left out.
+
+    """
+
+    def __init__(self, data, commdct):
+        self.fields = _IDDFields(data, commdct)
+        self._allbranches = self._readbranches()
+        self.branches = self._branches()
+        self.branchlists = self._branchlists()
+        self.loops = self._loops()
+        self.edges = self._edges()
+        self._graph = None
+
+    @classmethod
+    def fromidf(cls, idf):
+        """Find the topology of an IDF.
+
+        Parameters
+        ----------
+        idf : eppy.modeleditor.IDF
+
+        Returns
+        -------
+        Topology
+
+        """
+        return cls(idf.model, idf.idd_info)
+
+    @property
+    def graph(self):
+        """the edges as an `eppy.walk_hvac.HVACGraph`"""
+        if self._graph is None:
+            self._graph = HVACGraph(self.edges)
+        return self._graph
+
+    def _branches(self):
+        """all the branches, by name"""
+        branches = collections.OrderedDict()
+        for branch in self._allbranches:
+            if branch.name not in branches:
+                branches[branch.name] = branch
+        return branches
+
+    def _readbranches(self):
+        """a Branch for each BRANCH object, in order"""
+        fields = self.fields
+        key = 'BRANCH'
+        if not fields.objects(key):
+            return []
+        positions = fields.repeating(key, [
+            'Component %s Object Type', 'Component %s Name',
+            'Component %s Inlet Node Name', 'Component %s Outlet Node Name'])
+        result = []
+        for theobject in fields.objects(key):
+            values = _extract(theobject, positions)
+            components = [Component(*values[i:i + 4])
+                          for i in range(0, len(values) - 3, 4)]
+            if components:
+                inlet, outlet = components[0].inlet, components[-1].outlet
+            else:
+                inlet = outlet = ''
+            result.append(Branch(theobject[1], components, inlet, outlet))
+        return result
+
+    def _branchlists(self):
+        """all the branch lists, by name"""
+        return dict((theobject[1], theobject[2:])
+                    for theobject in self.fields.objects('BRANCHLIST'))
+
+    def _loops(self):
+        """all the loops, by name"""
+        fields = self.fields
+        loops = collections.OrderedDict()
+        for key, names in LOOP_FIELDS.items():
+            if not fields.objects(key):
+                continue
+            positions = [fields.position(key, name) if name else None
+                         for name in names]
+            for theobject in fields.objects(key):
+                values = [
+                    theobject[position]
+                    if position is not None and position < len(theobject)
+                    else '' for position in positions]
+                loops[theobject[1]] = Loop(
+                    theobject[1], key, values[0], values[1], values[2],
+                    values[3], self.branchlists.get(values[4], []),
+                    self.branchlists.get(values[5], []))
+        return loops
+
+    def branchedges(self):
+        """The edges joining the components of each branch, as from
+        `loopdiagram.makebranchcomponents`."""
+        edges = []
+        for branch in self._allbranches:
+            for component in branch.components:
+                edges.append(((component.inlet, ANODE), component.name))
+                edges.append((component.name, (component.outlet, ANODE)))
+        return edges
+
+    def _connectoredges(self):
+        """edges to and from the splitters and mixers of the loops"""
+        edges = []
+        branches = self.branches
+        for theobject in self.fields.objects('CONNECTOR:SPLITTER'):
+            name, inlet = theobject[1:3]
+            if inlet in branches:
+                edges.append(((branches[inlet].outlet, ANODE), name))
+            edges.extend((name, (branches[outlet].inlet, ANODE))
+                         for outlet in theobject[3:] if outlet in branches)
+        for theobject in self.fields.objects('CONNECTOR:MIXER'):
+            name, outlet = theobject[1:3]
+            if outlet in branches:
+                edges.append((name, (branches[outlet].inlet, ANODE)))
+            edges.extend(((branches[inlet].outlet, ANODE), name)
+                         for inlet in theobject[3:] if inlet in branches)
+        return edges
+
+    def _airedges(self):
+        """edges of the air connectors and zone equipment"""
+        fields = self.fields
+        edges = []
+        for key, inletfield, outletfield in AIR_SPLITTERS:
+            if not fields.objects(key):
+                continue
+            positions = [fields.position(key, 'Name'),
+                         fields.position(key, inletfield)]
+            positions += fields.repeating(key, [outletfield])
+            for theobject in fields.objects(key):
+                values = _extract(theobject, positions)
+                name, nodes = values[0], values[1:]
+                edges.extend([((node, ANODE), name) for node in nodes[:1]])
+                edges.extend([(name, (node, ANODE)) for node in nodes[1:]])
+        for key, outletfield, inletfield in AIR_MIXERS:
+            if not fields.objects(key):
+                continue
+            positions = [fields.position(key, 'Name'),
+                         fields.position(key, outletfield)]
+            positions += fields.repeating(key, [inletfield])
+            for theobject in fields.objects(key):
+                values = _extract(theobject, positions)
+                name, nodes = values[0], values[1:]
+                edges.extend([(name, (node, ANODE)) for node in nodes[:1]])
+                edges.extend([((node, ANODE), name) for node in nodes[1:]])
+        # zones, and the equipment in them
+        equiplists = {}
+        key = 'ZONEHVAC:EQUIPMENTLIST'
+        if fields.objects(key):
+            positions = fields.repeating(key, ['Zone Equipment %s Name'])
+            for theobject in fields.objects(key):
+                equiplists[theobject[1]] = _extract(theobject, positions)
+        key = 'ZONEHVAC:EQUIPMENTCONNECTIONS'
+        connections = []
+        if fields.objects(key):
+            positions = [fields.position(key, name)
+                         for name in EQUIPMENTCONNECTIONS_FIELDS]
+            connections = [_extract(theobject, positions)
+                           for theobject in fields.objects(key)]
+        for connection in connections:
+            edges.append((connection[0], (connection[-1], ANODE)))
+        for connection in connections:
+            listname = connection[1] if len(connection) > 1 else ''
+            edges.extend((equip, connection[0])
+                         for equip in equiplists.get(listname, []))
+        # air terminals, in their air distribution units
+        key = 'ZONEHVAC:AIRDISTRIBUTIONUNIT'
+        if fields.objects(key):
+            position = fields.position(key, 'Air Terminal Name')
+            edges.extend((theobject[position], theobject[1])
+                         for theobject in fields.objects(key)
+                         if position < len(theobject))
+            terminals = fields.keychoices(key, 'Air Terminal Object Type')
+            for terminal in terminals:
+                terminal = terminal.upper()
+                if not fields.objects(terminal):
+                    continue
+                positions = [fields.position(terminal, 'Name')] + [
+                    i for i, name in enumerate(fields.names(terminal))
+                    if name and 'Air Inlet Node Name' in name]
+                for theobject in fields.objects(terminal):
+                    values = _extract(theobject, positions)
+                    edges.extend(((node, ANODE), values[0])
+                                 for node in values[1:])
+        key = 'AIRTERMINAL:SINGLEDUCT:UNCONTROLLED'
+        if fields.objects(key):
+            positions = [fields.position(key, 'Name'),
+                         fields.position(key, 'Zone Supply Air Node Name')]
+            for theobject in fields.objects(key):
+                values = _extract(theobject, positions)
+                if len(values) == 2:
+                    edges.append(((values[1], ANODE), values[0]))
+        return edges
+
+    def _edges(self):
+        """all the edges, in the order of loopdiagram.makeairplantloop"""
+        return self.branchedges() + self._connectoredges() + self._airedges()
@@ -136,14 +136,17 @@ def getbranchcomponents(idf, branch, utest=False):
 
 def renamenodes(idf, fieldtype):
     """rename all the changed nodes"""
-    renameds = []
+    # a node being renamed is [oldname, newname]
+    renameds = set()
+    tempdct = {}
     for key in idf.model.dtls:
         for idfobject in idf.idfobjects[key]:
             for fieldvalue in idfobject.obj:
                 if type(fieldvalue) is list:
-                    if fieldvalue not in renameds:
-                        cpvalue = copy.copy(fieldvalue)
-                        renameds.append(cpvalue)
+                    if tuple(fieldvalue) not in renameds:
+                        renameds.add(tuple(fieldvalue))
+                        oldname, newname = fieldvalue
+                        tempdct[oldname] = newname
 
     # do the renaming
     for key in idf.model.dtls:
@@ -152,7 +155,6 @@ def renamenodes(idf, fieldtype):
                 itsidd = idfobject.objidd[i]
                 if 'type' in itsidd:
                     if itsidd['type'][0] == fieldtype:
-                        tempdct = dict(renameds)
                         if type(fieldvalue) is list:
                             fieldvalue = fieldvalue[-1]
                             idfobject.obj[i] = fieldvalue
@@ -161,6 +163,105 @@ def renamenodes(idf, fieldtype):
                                 fieldvalue = tempdct[fieldvalue]
                                 idfobject.obj[i] = fieldvalue
 
+class NodeIndex(object):
+    """The node fields of the model, indexed by node name.
+
+    renamenodes looks at every field of every object to rename a few nodes.
+    NodeIndex finds the fields with each node name once, so that a rename
+    changes only the fields that have the old names. replacebranch takes a
+    NodeIndex, and the same one can be used to replace many branches, as
+    long as the objects that are added to the model in between are given to
+    `add`.
+
+    Parameters
+    ----------
+    idf : eppy.modeleditor.IDF
+    fieldtype : str
+        The type of the fields to rename, as for renamenodes.
+
+    """
+    def __init__(self, idf, fieldtype='node'):
+        self.fieldtype = fieldtype
+        self.fields = {}  # {nodename: {(id(idfobject), i): (idfobject, i)}}
+        self.renameds = []  # [(idfobject, i)] of fields with a list
+        self.positions = {}  # {key: indexes of the fields of fieldtype}
+        for key in idf.model.dtls:
+            for idfobject in idf.idfobjects[key]:
+                self.add(idfobject)
+
+    def nodepositions(self, idfobject):
+        """the indexes of the fields of fieldtype in idfobject"""
+        key = idfobject.obj[0].upper()
+        try:
+            return self.positions[key]
+        except KeyError:
+            positions = set(
+                i for i, itsidd in enumerate(idfobject.objidd)
+                if 'type' in itsidd and itsidd['type'][0] == self.fieldtype)
+            self.positions[key] = positions
+            return positions
+
+    def add(self, idfobject):
+        """index the node fields of idfobject, as they are now"""
+        positions = self.nodepositions(idfobject)
+        for i, fieldvalue in enumerate(idfobject.obj):
+            if type(fieldvalue) is list:
+                self.renameds.append((idfobject, i))
+            elif i in positions:
+                self.fields.setdefault(fieldvalue, {})[
+                    (id(idfobject), i)] = (idfobject, i)
+
+    def rename(self, idfobjects=()):
+        """Rename the nodes, as renamenodes does for the whole model.
+
+        Parameters
+        ----------
+        idfobjects : list of EpBunch objects
+            The objects that have changed since they were indexed, such as
+            the objects with the [oldname, newname] fields. They are indexed
+            again.
+
+        """
+        for idfobject in idfobjects:
+            self.add(idfobject)
+        renameds = []
+        seen = set()
+        for idfobject, i in self.renameds:
+            if (id(idfobject), i) not in seen:
+                seen.add((id(idfobject), i))
+                renameds.append((idfobject, i))
+        self.renameds = []
+        seen = set()
+        tempdct = {}
+        for idfobject, i in renameds:
+            fieldvalue = idfobject.obj[i]
+            if type(fieldvalue) is list:
+                if tuple(fieldvalue) not in seen:
+                    seen.add(tuple(fieldvalue))
+                    oldname, newname = fieldvalue
+                    tempdct[oldname] = newname
+        # all the old names are found before any are renamed
+        found = [(oldname, newname, self.fields.pop(oldname, {}))
+                 for oldname, newname in tempdct.items()]
+        for oldname, newname, oldfields in found:
+            newfields = self.fields.setdefault(newname, {})
+            for fieldid, (idfobject, i) in oldfields.items():
+                # skip the fields that have changed since they were indexed
+                if i < len(idfobject.obj) and idfobject.obj[i] == oldname:
+                    idfobject.obj[i] = newname
+                    newfields[fieldid] = (idfobject, i)
+        for idfobject, i in renameds:
+            fieldvalue = idfobject.obj[i]
+            if type(fieldvalue) is not list:
+                continue
+            if i in self.nodepositions(idfobject):
+                idfobject.obj[i] = fieldvalue[-1]
+                self.fields.setdefault(fieldvalue[-1], {})[
+                    (id(idfobject), i)] = (idfobject, i)
+            else:
+                # renamenodes leaves these, and keeps renaming with them
+                self.renameds.append((idfobject, i))
+
 def getfieldnamesendswith(idfobject, endswith):
     """get the filednames for the idfobject based on endswith"""
     objls = idfobject.objls
@@ -269,13 +370,14 @@ def componentsintobranch(idf, branch, listofcomponents, fluid=None):
     componentlist = [item[0] for item in listofcomponents]
     # assumes that the nodes of the component connect to each other
     # empty branch if it has existing components
-    thebranchname = branch.Name
-    thebranch = idf.removeextensibles('BRANCH', thebranchname)  # empty the branch
-    # fill in the new components with the node names into this branch
-        # find the first extensible field and fill in the data in obj.
-    e_index = idf.getextensibleindex('BRANCH', thebranchname)
+    thebranch = branch
     theobj = thebranch.obj
-    modeleditor.extendlist(theobj, e_index)  # just being careful here
+    # empty the branch from the first extensible field
+    e_index = [i for i, fieldidd in enumerate(thebranch.objidd)
+               if 'begin-extensible' in fieldidd][0]
+    del theobj[e_index:]
+    modeleditor.extendlist(theobj, e_index - 1)
+    # fill in the new components with the node names into this branch
     for comp, compnode in listofcomponents:
         theobj.append(comp.key)
         theobj.append(comp.Name)
@@ -988,7 +1090,7 @@ def getmakeidfobject(idf, key, name):
         return idfobject
 
 def replacebranch1(idf, loop, branchname, listofcomponents_tuples, fluid=None,
-                   debugsave=False):
+                   debugsave=False, nodeindex=None):
     """do I even use this ? .... yup! I do"""
     if fluid is None:
         fluid = ''
@@ -999,17 +1101,71 @@ def replacebranch1(idf, loop, branchname, listofcomponents_tuples, fluid=None,
         comp = getmakeidfobject(idf, comp_type.upper(), comp_name)
         listofcomponents.append((comp, compnode))
     newbr = replacebranch(idf, loop, branch, listofcomponents,
-                          debugsave=debugsave, fluid=fluid)
+                          debugsave=debugsave, fluid=fluid,
+                          nodeindex=nodeindex)
     return newbr
 
+def _loopendnodes(idf, loop, branch, fluid):
+    """the loop nodes the ends of the branch connect to, if it is the inlet
+    branch of a splitter or the outlet branch of a mixer of the loop.
+    Returns (inletnode, outletnode), with None for an end that does not
+    connect to the loop"""
+    loopkey = loop.key.upper()  # the key is as in the file
+    if loopkey == 'AIRLOOPHVAC':
+        fields = SomeFields.a_fields
+    if loopkey == 'PLANTLOOP':
+        fields = SomeFields.p_fields
+    if loopkey == 'CONDENSERLOOP':
+        fields = SomeFields.c_fields
+    # for use in bunch
+    flnames = [field.replace(' ', '_') for field in fields]
+
+    # (connector list, inlet node, outlet node) of each side
+    if fluid.upper() == 'WATER':
+        sides = [(flnames[3], flnames[0], flnames[1]),
+                 (flnames[7], flnames[4], flnames[5])]
+    elif fluid.upper() == 'AIR':
+        # Connector_List_Name, Supply_Side_Inlet_Node_Name,
+        # Supply_Side_Outlet_Node_Names
+        sides = [(flnames[1], flnames[2], flnames[5])]
+    else:
+        sides = []
+    inletnode, outletnode = None, None
+    for conlistfield, inletfield, outletfield in sides:
+        conlist = idf.getobject('CONNECTORLIST', loop[conlistfield])
+        for i in range(1, 100000):  # large range to hit end
+            try:
+                fieldname = 'Connector_%s_Object_Type' % (i,)
+                ctype = conlist[fieldname]
+            except bunch_subclass.BadEPFieldError:
+                break
+            if ctype.strip() == '':
+                break
+            fieldname = 'Connector_%s_Name' % (i,)
+            cname = conlist[fieldname]
+            connector = idf.getobject(ctype.upper(), cname)
+            if connector.key.upper() == 'CONNECTOR:SPLITTER':
+                if connector.Inlet_Branch_Name == branch.Name:
+                    inletnode = loop[inletfield]
+            if connector.key.upper() == 'CONNECTOR:MIXER':
+                if connector.Outlet_Branch_Name == branch.Name:
+                    outletnode = loop[outletfield]
+    return inletnode, outletnode
+
 def replacebranch(idf, loop, branch,
                   listofcomponents, fluid=None,
                   debugsave=False,
-                  testing=None):
+                  testing=None, nodeindex=None):
     """It will replace the components in the branch with components in
-    listofcomponents"""
+    listofcomponents
+
+    The nodes are renamed with nodeindex, a NodeIndex of the model, which
+    changes only the fields with the renamed nodes. If it is None, the
+    model is indexed. Pass the same NodeIndex to replace many branches."""
     if fluid is None:
         fluid = ''
+    if nodeindex is None:
+        nodeindex = NodeIndex(idf)
     # -------- testing ---------
     testn = 0
     # -------- testing ---------
@@ -1018,6 +1174,7 @@ def replacebranch(idf, loop, branch,
     # -----------------------
     # np1_inlet -> np1 -> np1_np2_node -> np2 -> np2_outlet
         # change the node names in the component
+        # connect the ends to the loop, if the branch is at an end
         # empty the old branch
         # fill in the new components with the node names into this branch
     listofcomponents = _clean_listofcomponents(listofcomponents)
@@ -1031,151 +1188,321 @@ def replacebranch(idf, loop, branch,
     if testn == None:
         returnnone()
     # -------- testing ---------
-    fields = SomeFields.a_fields
 
-    thebranch = branch
-    componentsintobranch(idf, thebranch, listofcomponents, fluid=fluid)
-    if debugsave:
-        idf.savecopy("hhh4.idf")
+    # check for the end nodes of the loop
+    inletnode, outletnode = _loopendnodes(idf, loop, branch, fluid)
+    if inletnode is not None:
+        comp = components[0]
+        inletnodename = getnodefieldname(comp, "Inlet_Node_Name", fluid)
+        _renamenode(comp, inletnodename, inletnode)
+    if outletnode is not None:
+        comp = components[-1]
+        outletnodename = getnodefieldname(comp, "Outlet_Node_Name", fluid)
+        _renamenode(comp, outletnodename, outletnode)
     # -------- testing ---------
     testn = doingtesting(testing, testn)
     if testn == None:
         returnnone()
     # -------- testing ---------
 
-    # # gather all renamed nodes
-    # # do the renaming
-    renamenodes(idf, 'node')
+    thebranch = branch
+    componentsintobranch(idf, thebranch, listofcomponents, fluid=fluid)
     if debugsave:
-        idf.savecopy("hhh7.idf")
+        idf.savecopy("hhh4.idf")
     # -------- testing ---------
     testn = doingtesting(testing, testn)
     if testn == None:
         returnnone()
     # -------- testing ---------
 
-    # check for the end nodes of the loop
-    if loop.key == 'AIRLOOPHVAC':
-        fields = SomeFields.a_fields
-    if loop.key == 'PLANTLOOP':
-        fields = SomeFields.p_fields
-    if loop.key == 'CONDENSERLOOP':
-        fields = SomeFields.c_fields
-    # for use in bunch
-    flnames = [field.replace(' ', '_') for field in fields]
-
-    if fluid.upper() == 'WATER':
-        supplyconlistname = loop[flnames[3]]
-        # Plant_Side_Connector_List_Name or Condenser_Side_Connector_List_Name
-    elif fluid.upper() == 'AIR':
-        supplyconlistname = loop[flnames[1]]  # Connector_List_Name'
-    supplyconlist = idf.getobject('CONNECTORLIST', supplyconlistname)
-    for i in range(1, 100000):  # large range to hit end
-        try:
-            fieldname = 'Connector_%s_Object_Type' % (i,)
-            ctype = supplyconlist[fieldname]
-        except bunch_subclass.BadEPFieldError:
-            break
-        if ctype.strip() == '':
-            break
-        fieldname = 'Connector_%s_Name' % (i,)
-        cname = supplyconlist[fieldname]
-        connector = idf.getobject(ctype.upper(), cname)
-        if connector.key == 'CONNECTOR:SPLITTER':
-            firstbranchname = connector.Inlet_Branch_Name
-            cbranchname = firstbranchname
-            isfirst = True
-        if connector.key == 'CONNECTOR:MIXER':
-            lastbranchname = connector.Outlet_Branch_Name
-            cbranchname = lastbranchname
-            isfirst = False
-        if cbranchname == thebranch.Name:
-            # rename end nodes
-            comps = getbranchcomponents(idf, thebranch)
-            if isfirst:
-                comp = comps[0]
-                inletnodename = getnodefieldname(
-                    comp,
-                    "Inlet_Node_Name", fluid)
-                comp[inletnodename] = [
-                    comp[inletnodename],
-                    loop[flnames[0]]]  # Plant_Side_Inlet_Node_Name
-            else:
-                comp = comps[-1]
-                outletnodename = getnodefieldname(
-                    comp,
-                    "Outlet_Node_Name", fluid)
-                comp[outletnodename] = [
-                    comp[outletnodename],
-                    loop[flnames[1]]]  # .Plant_Side_Outlet_Node_Name
+    # # do the renaming, in the fields that have the renamed nodes
+    nodeindex.rename(components + [thebranch])
     # -------- testing ---------
     testn = doingtesting(testing, testn)
     if testn == None:
         returnnone()
     # -------- testing ---------
+    if debugsave:
+        idf.savecopy("hhh9.idf")
+    return thebranch
 
-    if fluid.upper() == 'WATER':
-        demandconlistname = loop[flnames[7]]  # .Demand_Side_Connector_List_Name
-        demandconlist = idf.getobject('CONNECTORLIST', demandconlistname)
-        for i in range(1, 100000):  # large range to hit end
-            try:
-                fieldname = 'Connector_%s_Object_Type' % (i,)
-                ctype = demandconlist[fieldname]
-            except bunch_subclass.BadEPFieldError:
-                break
-            if ctype.strip() == '':
-                break
-            fieldname = 'Connector_%s_Name' % (i,)
-            cname = demandconlist[fieldname]
-            connector = idf.getobject(ctype.upper(), cname)
-            if connector.key == 'CONNECTOR:SPLITTER':
-                firstbranchname = connector.Inlet_Branch_Name
-                cbranchname = firstbranchname
-                isfirst = True
-            if connector.key == 'CONNECTOR:MIXER':
-                lastbranchname = connector.Outlet_Branch_Name
-                cbranchname = lastbranchname
-                isfirst = False
-            if cbranchname == thebranch.Name:
-                # rename end nodes
-                comps = getbranchcomponents(idf, thebranch)
-                if isfirst:
-                    comp = comps[0]
-                    inletnodename = getnodefieldname(
-                        comp,
-                        "Inlet_Node_Name", fluid)
-                    comp[inletnodename] = [
-                        comp[inletnodename],
-                        loop[flnames[4]]]  # .Demand_Side_Inlet_Node_Name
-                if not isfirst:
-                    comp = comps[-1]
-                    outletnodename = getnodefieldname(
-                        comp,
-                        "Outlet_Node_Name", fluid)
-                    comp[outletnodename] = [
-                        comp[outletnodename],
-                        loop[flnames[5]]]  # .Demand_Side_Outlet_Node_Name
+def _renamenode(idfobject, fieldname, newname):
+    """mark the node in fieldname to be renamed to newname by renamenodes"""
+    oldname = idfobject[fieldname]
+    if type(oldname) is list:
+        oldname = oldname[0]
+    idfobject[fieldname] = [oldname, newname]
 
-    # -------- testing ---------
-    testn = doingtesting(testing, testn)
-    if testn == None:
-        returnnone()
-    # -------- testing ---------
+def _loopnodenames(loopname, fields, side, supply):
+    """the names makeplantloop and makecondenserloop give the loop fields"""
+    fields1 = [field.replace(side, supply) for field in fields]
+    fields1 = [field.replace('Demand Side', 'Demand') for field in fields1]
+    fields1 = [field[:field.find('Name') - 1] for field in fields1]
+    fields1 = [field.replace(' Node', '') for field in fields1]
+    fields1 = [field.replace(' List', 's') for field in fields1]
+    return ['%s %s' % (loopname, field) for field in fields1]
+
+class _LoopsBuilder(object):
+    """make the objects of many loops, for makeloops
+
+    The objects are kept as they are made, so nothing is searched for in
+    the model. The components of the branches are looked up by name in a
+    dict made the first time a key is needed."""
+    def __init__(self, idf):
+        self.idf = idf
+        self.named = {}  # {key: {NAME: idfobject}}
+
+    def newobject(self, key, **kwargs):
+        """make a new object, and index it if its key is indexed"""
+        idfobject = self.idf.newidfobject(key, **kwargs)
+        if key in self.named:
+            self.named[key].setdefault(idfobject.obj[1].upper(), idfobject)
+        return idfobject
 
-    if debugsave:
-        idf.savecopy("hhh8.idf")
+    def getmakecomponent(self, key, name):
+        """as getmakeidfobject"""
+        key = key.upper()
+        if key not in self.named:
+            self.named[key] = named = {}
+            for idfobject in self.idf.idfobjects[key]:
+                named.setdefault(idfobject.obj[1].upper(), idfobject)
+        idfobject = self.named[key].get(name.upper())
+        if idfobject is None:
+            idfobject = self.newobject(key, Name=name)
+        return idfobject
 
-    # # gather all renamed nodes
-    # # do the renaming
-    renamenodes(idf, 'node')
-    # -------- testing ---------
-    testn = doingtesting(testing, testn)
-    if testn == None:
-        returnnone()
-    # -------- testing ---------
-    if debugsave:
-        idf.savecopy("hhh9.idf")
-    return thebranch
+    def simplebranch(self, bname, comptype, suffix, inletnode, outletnode):
+        """make a branch with a pipe or a duct, as makepipebranch"""
+        cname = "%s_%s" % (bname, suffix)
+        acomp = self.newobject(comptype.upper(), Name=cname,
+                               Inlet_Node_Name=inletnode or "%s_inlet" % (
+                                   cname,),
+                               Outlet_Node_Name=outletnode or "%s_outlet" % (
+                                   cname,))
+        return self.newobject(
+            "BRANCH", Name=bname,
+            Component_1_Object_Type=comptype,
+            Component_1_Name=cname,
+            Component_1_Inlet_Node_Name=acomp.Inlet_Node_Name,
+            Component_1_Outlet_Node_Name=acomp.Outlet_Node_Name,
+            Component_1_Branch_Control_Type="Bypass")
+
+    def componentbranch(self, branch, components, fluid, inletnode,
+                        outletnode):
+        """put the components into the branch, as replacebranch1. The nodes
+        are left for renamenodes"""
+        listofcomponents = [
+            (self.getmakecomponent(comp_type, comp_name), compnode)
+            for comp_type, comp_name, compnode
+            in _clean_listofcomponents_tuples(components)]
+        connectcomponents(self.idf, listofcomponents, fluid=fluid)
+        if inletnode:
+            comp, compnode = listofcomponents[0]
+            _renamenode(comp, getnodefieldname(
+                comp, "Inlet_Node_Name", fluid, startswith=compnode),
+                        inletnode)
+        if outletnode:
+            comp, compnode = listofcomponents[-1]
+            _renamenode(comp, getnodefieldname(
+                comp, "Outlet_Node_Name", fluid, startswith=compnode),
+                        outletnode)
+        return componentsintobranch(self.idf, branch, listofcomponents,
+                                    fluid=fluid)
+
+    def side(self, loopname, sidename, sloop, listnames, nodes,
+             branches, fluid, comptype, suffix):
+        """make the branches, branch list, connector list, splitter and
+        mixer of one side of a loop. The branches with components are made
+        empty, and returned as the arguments of componentbranch"""
+        branchlistname, connectorlistname = listnames
+        inletnode, outletnode = nodes
+        sbranchnames = flattencopy(sloop)
+        branchlist = self.newobject("BRANCHLIST", Name=branchlistname)
+        branchlist.obj.extend(sbranchnames)
+        last = len(sbranchnames) - 1
+        tofill = []
+        for i, bname in enumerate(sbranchnames):
+            thisinlet = inletnode if i == 0 else None
+            thisoutlet = outletnode if i == last else None
+            if branches.get(bname):
+                branch = self.newobject("BRANCH", Name=bname)
+                tofill.append((branch, branches[bname], fluid,
+                               thisinlet, thisoutlet))
+            else:
+                self.simplebranch(bname, comptype, suffix,
+                                  thisinlet, thisoutlet)
+        splittername = "%s_%s_splitter" % (loopname, sidename)
+        mixername = "%s_%s_mixer" % (loopname, sidename)
+        self.newobject("CONNECTORLIST", Name=connectorlistname,
+                       Connector_1_Object_Type="Connector:Splitter",
+                       Connector_1_Name=splittername,
+                       Connector_2_Object_Type="Connector:Mixer",
+                       Connector_2_Name=mixername)
+        splitter = self.newobject("CONNECTOR:SPLITTER", Name=splittername)
+        splitter.obj.extend([sloop[0]] + sloop[1])
+        mixer = self.newobject("CONNECTOR:MIXER", Name=mixername)
+        mixer.obj.extend([sloop[-1]] + sloop[1])
+        return tofill
+
+    def waterloop(self, key, loopname, sloop, dloop, branches, fluid):
+        """make a plant or condenser loop, as makeplantloop"""
+        if key == 'PLANTLOOP':
+            fields = SomeFields.p_fields
+            names = _loopnodenames(loopname, fields, 'Plant Side', 'Supply')
+        else:
+            fields = SomeFields.c_fields
+            names = _loopnodenames(
+                loopname, fields, 'Condenser Side', 'Cond_Supply')
+        flnames = [field.replace(' ', '_') for field in fields]
+        newloop = self.newobject(key, Name=loopname,
+                                 **dict(zip(flnames, names)))
+        tofill = self.side(loopname, 'supply', sloop, names[2:4],
+                           names[0:2], branches, fluid,
+                           'Pipe:Adiabatic', 'pipe')
+        tofill += self.side(loopname, 'demand', dloop, names[6:8],
+                            names[4:6], branches, fluid,
+                            'Pipe:Adiabatic', 'pipe')
+        for args in tofill:
+            self.componentbranch(*args)
+        return newloop
+
+    def airloop(self, loopname, sloop, zones, branches, fluid):
+        """make an air loop, as makeairloop"""
+        fields1 = ['Branches',
+                   'Connectors',
+                   'Supply Inlet',
+                   'Demand Outlet',
+                   'Demand Inlet',
+                   'Supply Outlet']
+        names = ['%s %s' % (loopname, field) for field in fields1]
+        flnames = [field.replace(' ', '_') for field in SomeFields.a_fields]
+        newloop = self.newobject("AIRLOOPHVAC", Name=loopname,
+                                 **dict(zip(flnames, names)))
+        tofill = self.side(loopname, 'supply', sloop, names[0:2],
+                           [names[2], names[5]], branches, fluid,
+                           'duct', 'duct')
+        # the zones, without looking up the equipment connections
+        inletnodes = ["%s Inlet Node" % (zone,) for zone in zones]
+        returnnodes = ["%s Outlet Node" % (zone,) for zone in zones]
+        for zone, inletnode, returnnode in zip(zones, inletnodes,
+                                               returnnodes):
+            self.newobject(
+                "ZONEHVAC:EQUIPMENTCONNECTIONS",
+                Zone_Name=zone,
+                Zone_Conditioning_Equipment_List_Name="%s equip list" % (
+                    zone,),
+                Zone_Air_Inlet_Node_or_NodeList_Name=inletnode,
+                Zone_Air_Node_Name="%s Node" % (zone,),
+                Zone_Return_Air_Node_Name=returnnode)
+        for zone in zones:
+            self.newobject(
+                "ZONEHVAC:EQUIPMENTLIST",
+                Name="%s equip list" % (zone,),
+                Zone_Equipment_1_Object_Type=(
+                    "AirTerminal:SingleDuct:Uncontrolled"),
+                Zone_Equipment_1_Name="%sDirectAir" % (zone,),
+                Zone_Equipment_1_Cooling_Sequence=1,
+                Zone_Equipment_1_Heating_or_NoLoad_Sequence=1)
+        for zone, inletnode in zip(zones, inletnodes):
+            self.newobject(
+                "AIRTERMINAL:SINGLEDUCT:UNCONTROLLED",
+                Name="%sDirectAir" % (zone,),
+                Zone_Supply_Air_Node_Name=inletnode,
+                Maximum_Air_Flow_Rate='autosize')
+        z_splitter = self.newobject(
+            "AIRLOOPHVAC:ZONESPLITTER",
+            Name="%s Demand Side Splitter" % (loopname,),
+            Inlet_Node_Name=newloop.Demand_Side_Inlet_Node_Names)
+        for i, inletnode in enumerate(inletnodes):
+            z_splitter["Outlet_%s_Node_Name" % (i + 1,)] = inletnode
+        self.newobject(
+            "AIRLOOPHVAC:SUPPLYPATH",
+            Name="%sSupplyPath" % (loopname,),
+            Supply_Air_Path_Inlet_Node_Name=(
+                newloop.Demand_Side_Inlet_Node_Names),
+            Component_1_Object_Type="AirLoopHVAC:ZoneSplitter",
+            Component_1_Name=z_splitter.Name)
+        z_mixer = self.newobject(
+            "AIRLOOPHVAC:ZONEMIXER",
+            Name="%s Demand Side Mixer" % (loopname,),
+            Outlet_Node_Name=newloop.Demand_Side_Outlet_Node_Name)
+        for i, returnnode in enumerate(returnnodes):
+            z_mixer["Inlet_%s_Node_Name" % (i + 1,)] = returnnode
+        self.newobject(
+            "AIRLOOPHVAC:RETURNPATH",
+            Name="%sReturnPath" % (loopname,),
+            Return_Air_Path_Outlet_Node_Name=(
+                newloop.Demand_Side_Outlet_Node_Name),
+            Component_1_Object_Type="AirLoopHVAC:ZoneMixer",
+            Component_1_Name=z_mixer.Name)
+        for args in tofill:
+            self.componentbranch(*args)
+        return newloop
+
+def makeloops(idf, loops):
+    """Make many loops at once, from a description of each loop.
+
+    Each loop is a dict such as ::
+
+        dict(key='PLANTLOOP', name='p_loop',
+             sloop=['sb0', ['sb1', 'sb2', 'sb3'], 'sb4'],
+             dloop=['db0', ['db1', 'db2', 'db3'], 'db4'],
+             branches={'sb0': [('Chiller:Electric', 'Central_Chiller',
+                                'Chilled_Water_'),
+                               ('Pipe:Adiabatic', 'np1', None)]})
+
+    key is PLANTLOOP, CONDENSERLOOP or AIRLOOPHVAC. name, sloop and dloop
+    are as for makeplantloop, makecondenserloop and makeairloop, where dloop
+    is the list of zones of an AIRLOOPHVAC. branches is optional and gives
+    the components of some of the branches, as (key, name, node) tuples like
+    replacebranch1. Components that are not in the model are made. The other
+    branches get a pipe or a duct. fluid is optional, and is 'Water' for the
+    plant and condenser loops and 'Air' for the air loops.
+
+    The loops are the same as from makeplantloop, makecondenserloop and
+    makeairloop, followed by replacebranch1 for each of the branches, but
+    the pipes and ducts of the replaced branches are not made. Nothing is
+    searched for in the model while the loops are made, and the nodes are
+    renamed by one renamenodes at the end, instead of after each branch.
+    The keys are all checked before anything is made.
+
+    Parameters
+    ----------
+    idf : eppy.modeleditor.IDF
+    loops : list of dicts
+        The loops, as above.
+
+    Returns
+    -------
+    list
+        The new loop objects, in the order of loops.
+
+    """
+    for loop in loops:
+        if loop['key'].upper() not in ('PLANTLOOP', 'CONDENSERLOOP',
+                                       'AIRLOOPHVAC'):
+            raise WhichLoopError(
+                "%s is not PLANTLOOP, CONDENSERLOOP or AIRLOOPHVAC" % (
+                    loop['key'],))
+    builder = _LoopsBuilder(idf)
+    newloops = []
+    try:
+        for loop in loops:
+            key = loop['key'].upper()
+            branches = loop.get('branches') or {}
+            if key == 'AIRLOOPHVAC':
+                fluid = loop.get('fluid', 'Air')
+                newloop = builder.airloop(loop['name'], loop['sloop'],
+                                          loop['dloop'], branches, fluid)
+            else:
+                fluid = loop.get('fluid', 'Water')
+                newloop = builder.waterloop(key, loop['name'], loop['sloop'],
+                                            loop['dloop'], branches, fluid)
+            newloops.append(newloop)
+    finally:
+        # leave no [oldname, newname] in the model, even if a loop failed
+        renamenodes(idf, 'node')
+    return newloops
 
 def main():
     """the main routine"""
@@ -34,8 +34,11 @@ def key2elements(key):
     return first2words + [namephrase] + [lastword]
     
     
-def updateidf(idf, dct):
-    """update idf using dct"""
+def updateidf(idf, dct, undo=None):
+    """update idf using dct
+
+    If undo is a list, enough information is appended to it to reverse the
+    changes later with revertidf"""
     for key in list(dct.keys()):
         if key.startswith('idf.'):
             idftag, objkey, objname, field = key2elements(key)
@@ -44,8 +47,25 @@ def updateidf(idf, dct):
                     idfobj = idf.idfobjects[objkey.upper()][0]
                 except IndexError as e:
                     idfobj = idf.newidfobject(objkey.upper())
+                    if undo is not None:
+                        undo.append((idfobj, None, None, None))
             else:
                 idfobj = idf.getobject(objkey.upper(), objname)
                 if idfobj == None:
                     idfobj = idf.newidfobject(objkey.upper(), Name=objname)
-            idfobj[field] = dct[key]
\ No newline at end of file
+                    if undo is not None:
+                        undo.append((idfobj, None, None, None))
+            if undo is not None:
+                undo.append((idfobj, field, idfobj[field], len(idfobj.obj)))
+            idfobj[field] = dct[key]
+
+
+def revertidf(idf, undo):
+    """reverse the changes made by updateidf(idf, dct, undo)"""
+    for idfobj, field, value, numfields in reversed(undo):
+        if field is None:  # the object was made by updateidf
+            idf.removeidfobject(idfobj)
+        else:
+            idfobj[field] = value
+            del idfobj.obj[numfields:]
+    del undo[:]
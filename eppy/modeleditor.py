@@ -23,12 +23,14 @@ from six import iteritems
 
 import eppy.EPlusInterfaceFunctions.iddgroups as iddgroups
 import eppy.function_helpers
+import eppy.geometry.modelgeometry
 from eppy.iddcurrent import iddcurrent
 from eppy.idfreader import idfreader1
 from eppy.idfreader import convertafield
 from eppy.idfreader import makeabunch
 from eppy.runner.run_functions import run
 from eppy.runner.run_functions import wrapped_help_text
+import eppy.validate
 
 
 class NoObjectError(Exception):
@@ -783,6 +785,33 @@ class IDF(object):
         key = idfobject.key.upper()
         self.idfobjects[key].remove(idfobject)
 
+    def removeidfobjects(self, idfobjects):
+        """Remove many IDF objects from the IDF.
+
+        The list of each type of object is rebuilt once, instead of being
+        searched for each object as in `removeidfobject`.
+
+        Parameters
+        ----------
+        idfobjects : list of EpBunch objects
+            The IDF objects to remove.
+
+        """
+        toremove = {}  # {key: ids of the objects}
+        for idfobject in idfobjects:
+            toremove.setdefault(idfobject.key.upper(), set()).add(
+                id(idfobject))
+        for key, ids in toremove.items():
+            objects = self.idfobjects[key]
+            kept = []
+            for idfobject in objects.list1:
+                if id(idfobject) in ids:
+                    idfobject.theidf = None
+                else:
+                    kept.append(idfobject)
+            objects.list1[:] = kept
+            objects.list2[:] = [idfobject.obj for idfobject in kept]
+
     def copyidfobject(self, idfobject):
         """Add an IDF object to the IDF.
 
@@ -859,6 +888,56 @@ class IDF(object):
             self.idfobjects, self.model, self.idd_info,
             key, name)
 
+    def validate(self, keys=None):
+        """Check the IDF for errors which would stop EnergyPlus.
+
+        Checks required fields, minimum and maximum values, choice fields and
+        object-list references across the whole model. This is much faster
+        than waiting for EnergyPlus to fail during input processing.
+
+        Parameters
+        ----------
+        keys : list of str, optional
+            Only check objects of these types.
+
+        Returns
+        -------
+        list of eppy.validate.Issue
+            Empty if no problems were found.
+
+        """
+        return eppy.validate.validate(self, keys=keys)
+
+    @property
+    def geometry(self):
+        """The geometry of the whole model.
+
+        Returns
+        -------
+        eppy.geometry.modelgeometry.ModelGeometry
+            e.g. `idf.geometry.surfaces()` works out the area, tilt,
+            azimuth and so on of every surface at once.
+
+        """
+        return eppy.geometry.modelgeometry.ModelGeometry(self)
+
+    def zone_metrics(self):
+        """Work out the floor area, height, volume, exterior wall area and
+        window to wall ratio of every zone.
+
+        This groups the surfaces by zone once, so is much faster for many
+        zones than calling `zonearea`, `zoneheight` and `zonevolume` for
+        each zone.
+
+        Returns
+        -------
+        eppy.reporttable.ReportTable
+            One row per zone, e.g. `idf.zone_metrics().column('volume')`.
+            See `eppy.geometry.modelgeometry.zonemetrics`.
+
+        """
+        return eppy.geometry.modelgeometry.zonemetrics(self)
+
     """Methods to do with outputting an IDF."""
 
     def printidf(self):
@@ -1004,6 +1083,11 @@ class IDF(object):
         **kwargs
             See eppy.runner.functions.run()
 
+        Returns
+        -------
+        RunResult
+            See eppy.runner.functions.run()
+
         """
         # write the IDF to the current directory
         self.saveas('in.idf')
@@ -1011,7 +1095,7 @@ class IDF(object):
         idd = kwargs.pop('idd', self.iddname)
         epw = kwargs.pop('weather', self.epw)
         try:
-            run(self, weather=epw, idd=idd, **kwargs)
+            return run(self, weather=epw, idd=idd, **kwargs)
         finally:
             os.remove('in.idf')
 
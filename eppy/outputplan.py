@@ -0,0 +1,474 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""Ask EnergyPlus for only the outputs which will be read.
+
+Models often ask for more outputs than are used, e.g.
+``Output:Variable,*,Zone Mean Air Temperature,Timestep;`` when only the
+hourly temperature of one zone is read. Writing those outputs makes the
+runs slower and the ESO files larger, and reading them back is slower too.
+
+`applyplan` replaces the Output:Variable and Output:Meter objects of a
+model with the fewest objects which give the series asked for, one for
+each key and frequency asked for::
+
+    >>> from eppy import outputplan
+    >>> plan = outputplan.applyplan(idf, [
+    ...     ('Zone Mean Air Temperature', 'ZONE ONE', 'Hourly'),
+    ...     ('Electricity:Facility', '', 'Monthly')],
+    ...     tables=['AnnualBuildingUtilityPerformanceSummary'])
+
+`estimatesize` gives a rough size of the ESO and MTR files the outputs of
+a model will make, from the numbers of zones, surfaces and nodes in it.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+
+import six
+
+
+# reporting frequencies, finest first
+FREQUENCIES = ('Detailed', 'Timestep', 'Hourly', 'Daily', 'Monthly',
+               'RunPeriod')
+# other names for the frequencies
+FREQUENCY_ALIASES = {'environment': 'RunPeriod', 'annual': 'RunPeriod'}
+VARIABLE_KEY = 'OUTPUT:VARIABLE'
+METER_KEYS = ('OUTPUT:METER', 'OUTPUT:METER:METERFILEONLY',
+              'OUTPUT:METER:CUMULATIVE',
+              'OUTPUT:METER:CUMULATIVE:METERFILEONLY')
+TABLE_KEYS = ('OUTPUT:TABLE:MONTHLY', 'OUTPUT:TABLE:ANNUAL',
+              'OUTPUT:TABLE:TIMEBINS')
+SUMMARY_KEY = 'OUTPUT:TABLE:SUMMARYREPORTS'
+
+# the objects a variable has a series for, from the start of its name.
+# keys ending in ':' match all the object types which start with them.
+SURFACE_KEYS = (
+    'BUILDINGSURFACE:DETAILED', 'FENESTRATIONSURFACE:DETAILED', 'WALL:',
+    'ROOFCEILING:', 'FLOOR:', 'ROOF', 'CEILING:', 'WINDOW', 'DOOR',
+    'GLAZEDDOOR', 'WINDOW:INTERZONE', 'DOOR:INTERZONE',
+    'GLAZEDDOOR:INTERZONE')
+VARIABLE_OBJECTS = (
+    ('Site ', None),
+    ('System Node ', 'nodes'),
+    ('Surface Window ', ('FENESTRATIONSURFACE:DETAILED', 'WINDOW',
+                         'GLAZEDDOOR')),
+    ('Surface ', SURFACE_KEYS),
+    ('Zone ', ('ZONE', )),
+    ('Space ', ('ZONE', )),
+    ('Air System ', ('AIRLOOPHVAC', )),
+    ('Plant ', ('PLANTLOOP', )),
+    ('Lights ', ('LIGHTS', )),
+    ('People ', ('PEOPLE', )),
+    ('Fan ', ('FAN:', )),
+    ('Pump ', ('PUMP:', )),
+    ('Schedule ', ('SCHEDULE:', )),
+)
+# series assumed for a meter name with a wildcard, e.g. 'Electricity:*'
+WILDCARD_METERS = 10
+# timesteps in an hour if the model has no Timestep object
+TIMESTEPS = 6
+# approximate bytes in the ESO file for one value, and for one timestamp
+VALUE_BYTES = {'Detailed': 14, 'Timestep': 14, 'Hourly': 14, 'Daily': 40,
+               'Monthly': 40, 'RunPeriod': 45}
+TIMESTAMP_BYTES = {'Detailed': 50, 'Timestep': 50, 'Hourly': 50,
+                   'Daily': 35, 'Monthly': 12, 'RunPeriod': 8}
+MONTH_DAYS = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+OutputRequest = collections.namedtuple(
+    'OutputRequest', ['name', 'key', 'frequency', 'meter'])
+OutputRequest.__doc__ = """A series which will be read from the outputs.
+
+Attributes
+----------
+name : str
+    Name of the variable or meter, e.g. 'Zone Mean Air Temperature' or
+    'Electricity:Facility'.
+key : str
+    Key of the variable, e.g. a zone name, or '*' for all keys. '' for
+    meters.
+frequency : str
+    Reporting frequency, one of FREQUENCIES.
+meter : bool
+    True for a meter.
+
+"""
+
+SizeEstimate = collections.namedtuple(
+    'SizeEstimate', ['series', 'values', 'eso', 'mtr'])
+SizeEstimate.__doc__ = """A rough size of the outputs of a model.
+
+Attributes
+----------
+series : int
+    Number of series of values, one per variable or meter and key.
+values : int
+    Number of values in all the series.
+eso : int
+    Size of the ESO file in bytes.
+mtr : int
+    Size of the MTR file in bytes.
+
+"""
+
+
+def standardfrequency(name):
+    """The standard spelling of a reporting frequency.
+
+    Parameters
+    ----------
+    name : str
+        e.g. 'hourly' or 'Annual'.
+
+    Returns
+    -------
+    str
+        One of FREQUENCIES, e.g. 'Hourly' or 'RunPeriod'.
+
+    """
+    name = (name or 'Hourly').strip()
+    name = FREQUENCY_ALIASES.get(name.lower(), name)
+    for known in FREQUENCIES:
+        if known.lower() == name.lower():
+            return known
+    raise ValueError("Unknown reporting frequency %s, use one of %s" % (
+        name, ', '.join(FREQUENCIES)))
+
+
+def request(name, key='*', frequency='Hourly', meter=None):
+    """Make an OutputRequest.
+
+    Parameters
+    ----------
+    name : str
+        Name of the variable or meter.
+    key : str, optional
+        Key of the variable (default: '*', all keys).
+    frequency : str, optional
+        Reporting frequency (default: 'Hourly').
+    meter : bool, optional
+        True for a meter (default: True if the name has a ':', as meter
+        names do and variable names do not).
+
+    Returns
+    -------
+    OutputRequest
+
+    """
+    if meter is None:
+        meter = ':' in name
+    return OutputRequest(name.strip(), '' if meter else (key or '*').strip(),
+                         standardfrequency(frequency), bool(meter))
+
+
+def _asrequest(item):
+    """an OutputRequest from a request, name, tuple or dict"""
+    if isinstance(item, OutputRequest):
+        return item
+    if isinstance(item, six.string_types):
+        return request(item)
+    if isinstance(item, dict):
+        return request(**item)
+    return request(*item)
+
+
+def _frequencies(items):
+    """the distinct frequencies of some requests, in the order asked for"""
+    frequencies = []
+    for item in items:
+        if item.frequency not in frequencies:
+            frequencies.append(item.frequency)
+    return frequencies
+
+
+def planoutputs(requests):
+    """Find the fewest outputs which give the series asked for.
+
+    Each variable or meter is asked for once at each frequency it is
+    requested at, so that the series read back are the ones EnergyPlus
+    reports, e.g. the monthly maximum and minimum as well as the mean. A
+    variable asked for with key '*' covers its other keys at the same
+    frequency.
+
+    Parameters
+    ----------
+    requests : list
+        OutputRequest, or names, (name, key, frequency) tuples or dicts of
+        arguments for `request`.
+
+    Returns
+    -------
+    list of OutputRequest
+        The variables and then the meters, in the order they were first
+        asked for.
+
+    """
+    variables = collections.OrderedDict()  # {name: {key: [requests]}}
+    meters = collections.OrderedDict()  # {name: [requests]}
+    for item in requests:
+        item = _asrequest(item)
+        if item.meter:
+            meters.setdefault(item.name.lower(), []).append(item)
+        else:
+            keys = variables.setdefault(
+                item.name.lower(), collections.OrderedDict())
+            keys.setdefault(item.key.lower(), []).append(item)
+    plan = []
+    for keys in variables.values():
+        star = keys.get('*', [])
+        starfrequencies = _frequencies(star)
+        for frequency in starfrequencies:
+            plan.append(star[0]._replace(frequency=frequency))
+        for key, items in keys.items():
+            if key == '*':
+                continue
+            for frequency in _frequencies(items):
+                if frequency not in starfrequencies:
+                    plan.append(items[0]._replace(frequency=frequency))
+    for items in meters.values():
+        for frequency in _frequencies(items):
+            plan.append(items[0]._replace(frequency=frequency))
+    return plan
+
+
+def _removeall(idf, key):
+    """remove all the objects of one type"""
+    objects = idf.idfobjects.get(key, [])
+    while objects:
+        objects.pop()
+
+
+def applyplan(idf, requests, tables=None):
+    """Replace the output objects of a model with the fewest needed.
+
+    All the Output:Variable and Output:Meter objects (and the
+    MeterFileOnly and Cumulative meters) are removed, and the outputs from
+    `planoutputs` are added.
+
+    Parameters
+    ----------
+    idf : eppy.modeleditor.IDF
+    requests : list
+        The series which will be read, as for `planoutputs`.
+    tables : list of str, optional
+        Names of the tables to keep: the names of Output:Table:Monthly and
+        Output:Table:Annual objects, the variable names of
+        Output:Table:TimeBins objects, and the names of predefined reports
+        for Output:Table:SummaryReports, e.g.
+        'AnnualBuildingUtilityPerformanceSummary'. Other table objects are
+        removed, and the summary reports are replaced with those in the
+        list, so e.g. AllSummary is not asked for when only one report is
+        read. Tables are left as they are if this is None (the default).
+
+    Raises
+    ------
+    ValueError
+        If a table is neither a table object of the model nor a predefined
+        report in the IDD. The model is not changed.
+
+    Returns
+    -------
+    list of OutputRequest
+        The outputs which were added.
+
+    """
+    plan = planoutputs(requests)
+    if tables is not None:
+        _plantables(idf, tables)
+    _removeall(idf, VARIABLE_KEY)
+    for key in METER_KEYS:
+        _removeall(idf, key)
+    for item in plan:
+        if item.meter:
+            meter = idf.newidfobject(
+                'OUTPUT:METER', Reporting_Frequency=item.frequency)
+            meter[meter.fieldnames[1]] = item.name  # Name or Key_Name
+        else:
+            idf.newidfobject(
+                VARIABLE_KEY, Key_Value=item.key, Variable_Name=item.name,
+                Reporting_Frequency=item.frequency)
+    return plan
+
+
+def _reportnames(idf):
+    """{lower case name: name} of the predefined reports in the IDD"""
+    objidd = idf.idd_info[idf.model.dtls.index(SUMMARY_KEY)]
+    return dict((name.lower(), name) for name in objidd[1].get('key', []))
+
+
+def _plantables(idf, tables):
+    """keep only the tables in a list of names"""
+    wanted = set(name.strip().lower() for name in tables)
+    removed = []
+    kept = set()
+    for key in TABLE_KEYS:
+        objects = idf.idfobjects.get(key, [])
+        field = 'Variable_Name' if key == 'OUTPUT:TABLE:TIMEBINS' else 'Name'
+        for obj in objects:
+            name = obj[field].strip().lower()
+            if name in wanted:
+                kept.add(name)
+            else:
+                removed.append(obj)
+    reportnames = _reportnames(idf)
+    reports = [name.strip() for name in tables
+               if name.strip().lower() not in kept]
+    unknown = [name for name in reports
+               if name.lower() not in reportnames]
+    if unknown:
+        raise ValueError(
+            "Unknown tables %s: not table objects in the model or "
+            "predefined reports" % (', '.join(unknown), ))
+    for obj in removed:
+        idf.removeidfobject(obj)
+    _removeall(idf, SUMMARY_KEY)
+    if reports:
+        idf.newidfobject(SUMMARY_KEY, **dict(
+            ('Report_%i_Name' % (i + 1), reportnames[name.lower()])
+            for i, name in enumerate(reports)))
+
+
+def _countobjects(idf, keys):
+    """number of objects of the types in keys (prefixes if they end in :)"""
+    total = 0
+    for key, objects in idf.idfobjects.items():
+        if not objects:
+            continue
+        for wanted in keys:
+            if key == wanted or (wanted.endswith(':') and
+                                 key.startswith(wanted)):
+                total += len(objects)
+                break
+    return total
+
+
+def _countnodes(idf):
+    """number of distinct node names in a model"""
+    nodes = set()
+    for objects in idf.idfobjects.values():
+        for obj in objects:
+            for name, value in zip(obj.fieldnames, obj.fieldvalues):
+                if name.endswith('Node_Name') and value:
+                    nodes.add(six.text_type(value).upper())
+    return len(nodes)
+
+
+def _keycount(idf, name, counts):
+    """number of keys '*' stands for in an Output:Variable"""
+    for prefix, keys in VARIABLE_OBJECTS:
+        if name.lower().startswith(prefix.lower()):
+            break
+    else:
+        keys = ('ZONE', )  # most other variables are per zone
+    if keys is None:
+        return 1
+    cachekey = keys if keys == 'nodes' else tuple(keys)
+    if cachekey not in counts:
+        if keys == 'nodes':
+            counts[cachekey] = _countnodes(idf)
+        else:
+            counts[cachekey] = _countobjects(idf, keys)
+    return counts[cachekey]
+
+
+def _dayofyear(month, day):
+    """day of a non-leap year, from 1"""
+    return sum(MONTH_DAYS[:int(month) - 1]) + int(day)
+
+
+def simulationdays(idf):
+    """Number of days simulated, and number of environments.
+
+    Counts the days of each RunPeriod and one day for each design day.
+
+    Parameters
+    ----------
+    idf : eppy.modeleditor.IDF
+
+    Returns
+    -------
+    tuple
+        (days, environments)
+
+    """
+    days, environments = 0, 0
+    for runperiod in idf.idfobjects.get('RUNPERIOD', []):
+        try:
+            start = _dayofyear(runperiod.Begin_Month,
+                               runperiod.Begin_Day_of_Month)
+            end = _dayofyear(runperiod.End_Month, runperiod.End_Day_of_Month)
+        except (ValueError, TypeError):
+            start, end = 1, 365
+        days += (end - start) % 365 + 1
+        environments += 1
+    designdays = len(idf.idfobjects.get('SIZINGPERIOD:DESIGNDAY', []))
+    return days + designdays, environments + designdays
+
+
+def estimatesize(idf):
+    """Estimate the size of the ESO and MTR files of a model.
+
+    The number of keys of an Output:Variable with key '*' is guessed from
+    the start of its name, e.g. 'Zone ' variables have one series per
+    zone, 'Surface ' variables one per surface and 'System Node '
+    variables one per node. Meters with a wildcard are taken to have
+    WILDCARD_METERS series. The sizes are only a guide, good to within a
+    factor of about two.
+
+    Parameters
+    ----------
+    idf : eppy.modeleditor.IDF
+
+    Returns
+    -------
+    SizeEstimate
+
+    """
+    days, environments = simulationdays(idf)
+    timesteps = TIMESTEPS
+    for timestep in idf.idfobjects.get('TIMESTEP', []):
+        try:
+            timesteps = int(timestep.Number_of_Timesteps_per_Hour)
+        except (ValueError, TypeError):
+            pass
+    intervals = {
+        'Detailed': days * 24 * timesteps, 'Timestep': days * 24 * timesteps,
+        'Hourly': days * 24, 'Daily': days,
+        'Monthly': max(environments, int(round(days / 30.4))),
+        'RunPeriod': environments}
+    counts = {}
+    series = dict((name, 0) for name in FREQUENCIES)
+    meterseries = dict((name, [0, 0]) for name in FREQUENCIES)  # eso, mtr
+    for obj in idf.idfobjects.get(VARIABLE_KEY, []):
+        key = (obj.Key_Value or '*').strip()
+        name = obj.Variable_Name
+        series[standardfrequency(obj.Reporting_Frequency)] += (
+            _keycount(idf, name, counts) if key == '*' else 1)
+    for meterkey in METER_KEYS:
+        for obj in idf.idfobjects.get(meterkey, []):
+            number = WILDCARD_METERS if '*' in obj[obj.fieldnames[1]] else 1
+            counted = meterseries[
+                standardfrequency(obj.Reporting_Frequency)]
+            if not meterkey.endswith('METERFILEONLY'):
+                counted[0] += number
+            counted[1] += number
+    total_series, values, eso, mtr = 0, 0, 0, 0
+    for name in FREQUENCIES:
+        inesos = series[name] + meterseries[name][0]
+        inmtr = meterseries[name][1]
+        total_series += series[name] + inmtr
+        values += intervals[name] * (series[name] + inmtr)
+        if inesos:
+            eso += intervals[name] * (
+                TIMESTAMP_BYTES[name] + inesos * VALUE_BYTES[name])
+        if inmtr:
+            mtr += intervals[name] * (
+                TIMESTAMP_BYTES[name] + inmtr * VALUE_BYTES[name])
+    return SizeEstimate(total_series, values, eso, mtr)
@@ -0,0 +1,410 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""A table from a report, held as a 2-D numpy array with labels.
+
+`ReportTable` gives the same attribute access as the named tuple grids of
+`eppy.results.readhtml.named_grid_h`, without making new classes for each
+table::
+
+    >>> table = ReportTable.fromgrid([['', 'a b', 'c d [GJ]'],
+    ...                               ['x y', 1, 2],
+    ...                               ['z z', 3, 4]])
+    >>> table.x_y.c_d
+    2
+    >>> table.values
+    array([[1., 2.],
+           [3., 4.]])
+    >>> table.units
+    ('', 'GJ')
+
+The values of tables with the same labels, e.g. from many runs, can be
+stacked into one array with `stack`.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import re
+
+import six
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+NOT_NAME = re.compile(r'[^A-Za-z0-9]')
+# a column name with units, e.g. "Total Energy [GJ]"
+UNITS = re.compile(r'^(.*?)\s*\[(.*)\]\s*$')
+
+
+def sanitise(label):
+    """Make a label usable as an attribute name.
+
+    Each character which is not an ascii letter or digit is replaced with
+    '_', as in the named tuple grids.
+
+    Parameters
+    ----------
+    label : str
+
+    Returns
+    -------
+    str
+
+    """
+    return NOT_NAME.sub('_', label)
+
+
+def splitunits(label):
+    """Split the units from a column name.
+
+    Parameters
+    ----------
+    label : str
+        e.g. 'Total Energy [GJ]'
+
+    Returns
+    -------
+    tuple
+        (name, units), e.g. ('Total Energy', 'GJ'). units is '' if there
+        are none.
+
+    """
+    match = UNITS.match(label)
+    if match:
+        return match.group(1).strip(), match.group(2).strip()
+    return label.strip(), ''
+
+
+def _tofloat(cell):
+    """a cell as a float, NaN if it is not a number"""
+    if isinstance(cell, float):
+        return cell
+    try:
+        return float(cell)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class _Labels(object):
+    """labels with their sanitised names and an index of both"""
+
+    def __init__(self, labels):
+        self.labels = tuple(labels)
+        self.names = tuple(sanitise(label) for label in self.labels)
+        self.index = {}
+        for i, name in reversed(list(enumerate(self.names))):
+            self.index[name] = i
+        for i, label in reversed(list(enumerate(self.labels))):
+            self.index[label] = i
+
+    def find(self, label):
+        """position of a label or sanitised name, or an int position"""
+        if isinstance(label, six.integer_types):
+            return label
+        try:
+            return self.index[label]
+        except KeyError:
+            raise KeyError("No label %s" % (label, ))
+
+
+class ReportTable(object):
+
+    """A table with row and column labels, backed by numpy arrays.
+
+    Parameters
+    ----------
+    cells : list of lists or numpy.ndarray
+        The cells, without the labels.
+    rows : list of str
+        Labels of the rows.
+    columns : list of str
+        Labels of the columns.
+
+    Attributes
+    ----------
+    cells : numpy.ndarray
+        The cells as they were given, in an object array.
+    values : numpy.ndarray
+        The cells as float64, NaN where a cell is not a number.
+    rows, columns : tuple of str
+        The labels.
+    rownames, columnnames : tuple of str
+        The labels made into attribute names by `sanitise`.
+
+    Rows can be got by attribute, by position or by label, and a row is a
+    `TableRow` which gets cells in the same way, so `table.x_y.c_d`,
+    `table[0][1]` and `table['x y']['c d']` are the same cell.
+
+    """
+
+    def __init__(self, cells, rows, columns):
+        if np is None:
+            raise ImportError("ReportTable needs numpy")
+        self._rows = _Labels(rows)
+        self._columns = _Labels(columns)
+        shape = (len(self._rows.labels), len(self._columns.labels))
+        if isinstance(cells, np.ndarray):
+            self.cells = cells.astype(object).reshape(shape)
+        elif all(len(row) == shape[1] for row in cells):
+            self.cells = np.empty(shape, dtype=object)
+            if shape[0] and shape[1]:
+                self.cells[:] = cells
+        else:
+            # rows may be short, as in some html tables
+            self.cells = np.empty(shape, dtype=object)
+            self.cells.fill('')
+            for i, row in enumerate(cells):
+                row = list(row)[:shape[1]]
+                self.cells[i, :len(row)] = row
+        self._values = None
+
+    @classmethod
+    def fromgrid(cls, grid):
+        """Make a table from rows with the labels in the first row and
+        column, as from `readhtml.titletable`.
+
+        Parameters
+        ----------
+        grid : list of lists
+
+        Returns
+        -------
+        ReportTable
+
+        """
+        return cls([row[1:] for row in grid[1:]],
+                   [row[0] for row in grid[1:]], grid[0][1:])
+
+    @property
+    def rows(self):
+        return self._rows.labels
+
+    @property
+    def columns(self):
+        return self._columns.labels
+
+    @property
+    def rownames(self):
+        return self._rows.names
+
+    @property
+    def columnnames(self):
+        return self._columns.names
+
+    @property
+    def _fields(self):
+        """the row names, as for the named tuple grids"""
+        return self._rows.names
+
+    @property
+    def values(self):
+        """the cells as float64, NaN where a cell is not a number"""
+        if self._values is None:
+            try:
+                self._values = self.cells.astype(float)
+            except (TypeError, ValueError):  # some cells are not numbers
+                self._values = np.empty(self.shape)
+                tofloat = np.frompyfunc(_tofloat, 1, 1)
+                for j in range(self.shape[1]):
+                    try:
+                        self._values[:, j] = self.cells[:, j].astype(float)
+                    except (TypeError, ValueError):
+                        self._values[:, j] = tofloat(self.cells[:, j])
+        return self._values
+
+    @property
+    def units(self):
+        """the units of each column, from the brackets in its label"""
+        return tuple(splitunits(label)[1] for label in self.columns)
+
+    @property
+    def shape(self):
+        return self.cells.shape
+
+    @property
+    def T(self):
+        """the transposed table, as from `readhtml.named_grid_v`"""
+        table = ReportTable.__new__(ReportTable)
+        table._rows, table._columns = self._columns, self._rows
+        table.cells = self.cells.T
+        table._values = None if self._values is None else self._values.T
+        return table
+
+    def get(self, row, column):
+        """Get one cell by the labels, names or positions of its row and
+        column."""
+        return self.cells[self._rows.find(row), self._columns.find(column)]
+
+    def value(self, row, column):
+        """Get one cell as a float, as for `get`."""
+        return self.values[self._rows.find(row), self._columns.find(column)]
+
+    def row(self, row):
+        """The values of one row, as a float array."""
+        return self.values[self._rows.find(row)]
+
+    def column(self, column):
+        """The values of one column, as a float array."""
+        return self.values[:, self._columns.find(column)]
+
+    def __getattr__(self, name):
+        if name.startswith('__') or name in ('_rows', '_columns'):
+            raise AttributeError(name)
+        try:
+            return self[self._rows.find(name)]
+        except KeyError:
+            raise AttributeError(
+                "%s has no row named %s" % (type(self).__name__, name))
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [TableRow(self, i)
+                    for i in range(*row.indices(len(self)))]
+        i = self._rows.find(row)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("row index out of range")
+        return TableRow(self, i)
+
+    def __len__(self):
+        return len(self._rows.labels)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield TableRow(self, i)
+
+    def __eq__(self, other):
+        if isinstance(other, ReportTable):
+            return (self.rows == other.rows and
+                    self.columns == other.columns and
+                    self.tolist() == other.tolist())
+        try:
+            return self.tolist() == [list(row) for row in other]
+        except TypeError:
+            return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'ReportTable(rows=%r, columns=%r)' % (
+            list(self.rows), list(self.columns))
+
+    def tolist(self):
+        """the cells as a list of lists"""
+        return self.cells.tolist()
+
+    def togrid(self):
+        """the table as rows with the labels, as from `readhtml.titletable`
+        """
+        return [[''] + list(self.columns)] + [
+            [label] + row for label, row in zip(self.rows, self.tolist())]
+
+    def to_dataframe(self):
+        """The values as a pandas DataFrame, with the labels as the index
+        and columns."""
+        import pandas as pd  # optional
+        return pd.DataFrame(self.values, index=list(self.rows),
+                            columns=list(self.columns))
+
+
+class TableRow(object):
+
+    """One row of a ReportTable, with named access to its cells."""
+
+    __slots__ = ('table', 'index')
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    @property
+    def _fields(self):
+        """the column names, as for the named tuple grids"""
+        return self.table.columnnames
+
+    @property
+    def values(self):
+        """the row as a float array"""
+        return self.table.values[self.index]
+
+    def __getattr__(self, name):
+        try:
+            return self[self.table._columns.find(name)]
+        except KeyError:
+            raise AttributeError("no column named %s" % (name, ))
+
+    def __getitem__(self, column):
+        if isinstance(column, six.string_types):
+            column = self.table._columns.find(column)
+        return self.table.cells[self.index][column]
+
+    def __len__(self):
+        return self.table.shape[1]
+
+    def __iter__(self):
+        return iter(self.table.cells[self.index].tolist())
+
+    def __eq__(self, other):
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'TableRow(%s)' % (', '.join(
+            '%s=%r' % (name, cell)
+            for name, cell in zip(self._fields, self)), )
+
+
+def stack(tables):
+    """Stack the values of tables with the same labels into one array.
+
+    Parameters
+    ----------
+    tables : list of ReportTable
+        e.g. the same table from the report of each run.
+
+    Returns
+    -------
+    numpy.ndarray
+        Shape (number of tables, rows, columns).
+
+    Raises
+    ------
+    ValueError
+        If the tables do not all have the same labels.
+
+    """
+    tables = list(tables)
+    if not tables:
+        return np.zeros((0, 0, 0))
+    first = tables[0]
+    for table in tables[1:]:
+        if table.rows != first.rows or table.columns != first.columns:
+            raise ValueError("Tables have different labels: %r and %r" % (
+                first, table))
+    return np.stack([table.values for table in tables])
@@ -0,0 +1,331 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""Extract tables from the html reports of many runs into one tidy table.
+
+Each cell of each selected table becomes one record (run_id, report, scope,
+table, row, column, units, value, text), and records are written to a CSV,
+SQLite or Parquet file as each chunk of runs is read::
+
+    >>> from eppy.results import batch
+    >>> run_dirs = batch.extract(
+    ...     'multi_runs/*', ['End Uses', {'title': 'Site and Source Energy'}],
+    ...     'results.csv', processes=4)
+
+The reports are read in parallel with the executors in
+`eppy.runner.executors`, and only one chunk of runs is held in memory.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+import csv
+import glob
+import os
+import sqlite3
+import warnings
+
+import six
+
+from eppy.reporttable import splitunits
+from eppy.results.htmlreport import HtmlReport
+from eppy.results.readhtml import NotSimpleTable
+from eppy.runner.executors import mapchunks
+
+
+Record = collections.namedtuple(
+    'Record', ['run_id', 'report', 'scope', 'table', 'row', 'column',
+               'units', 'value', 'text'])
+Record.__doc__ = """One cell of a table from the report of one run.
+
+Attributes
+----------
+run_id : int
+    Position of the run directory in the list of run directories.
+report : str
+    Name of the report, e.g. 'Annual Building Utility Performance Summary'.
+scope : str
+    What the report is for, e.g. 'Entire Facility'.
+table : str
+    Title of the table, e.g. 'Site and Source Energy'.
+row : str
+    Label of the row.
+column : str
+    Name of the column, without its units.
+units : str
+    Units from the column name, e.g. 'GJ' from 'Total Energy [GJ]'.
+value : float or None
+    The value of the cell, None if it is not a number.
+text : str
+    The text of the cell if it is not a number, otherwise ''.
+
+"""
+
+# file names of the html report, for the different output suffixes
+HTML_REPORTS = ('*tbl.htm', '*tbl.html', '*Table.html', '*Table.htm',
+                '*-table.htm', '*-table.html')
+
+
+def findreport(run_dir):
+    """Find the html report in a run directory.
+
+    Parameters
+    ----------
+    run_dir : str
+        Path to the output directory of a run.
+
+    Returns
+    -------
+    str or None
+        Path to the html report, None if there is none.
+
+    """
+    for pattern in HTML_REPORTS:
+        found = sorted(glob.glob(os.path.join(run_dir, pattern)))
+        if found:
+            return found[0]
+    return None
+
+
+def _selector(selector):
+    """a dict of HtmlReport.select arguments from a selector"""
+    if isinstance(selector, dict):
+        return selector
+    return {'title': selector}  # a string or compiled regex
+
+
+def extractrun(run_id, run_dir, selectors):
+    """Read the selected tables from the html report of one run.
+
+    Parameters
+    ----------
+    run_id : int
+        ID for the run in the records.
+    run_dir : str
+        Path to the output directory of the run.
+    selectors : list
+        Tables to read. Each one is a title (a string or compiled regex) or
+        a dict of arguments for `HtmlReport.select`, e.g.
+        {'title': 'End Uses', 'report': re.compile('Annual')}.
+
+    Returns
+    -------
+    list of Record
+
+    """
+    fname = findreport(run_dir)
+    if fname is None:
+        warnings.warn("No html report in %s" % (run_dir, ), UserWarning)
+        return []
+    report = HtmlReport(fname)
+    tables = set()
+    for selector in selectors:
+        tables.update(report.select(**_selector(selector)))
+    records = []
+    for table in sorted(tables):
+        # the cells are read as text, so that headers and labels which are
+        # numbers (years, months) are not turned into floats
+        rows = report.read(table, tofloat=False)
+        if not rows:
+            continue
+        columns = [splitunits(name) for name in rows[0][1:]]
+        for row in rows[1:]:
+            label = row[0].strip() if row else ''
+            for (column, units), text in zip(columns, row[1:]):
+                value, text = _tofloat(text.strip())
+                records.append(Record(
+                    run_id, table.report, table.scope, table.title, label,
+                    column, units, value, text))
+    return records
+
+
+def _tofloat(text):
+    """(value, text) of a cell: the float and '', or None and the text"""
+    try:
+        return float(text), ''
+    except ValueError:
+        return None, text
+
+
+def _extractrun(args):
+    """extractrun for Executor.map"""
+    run_id, run_dir, selectors = args
+    try:
+        return extractrun(run_id, run_dir, selectors)
+    except (IOError, OSError, ValueError, NotSimpleTable) as e:
+        warnings.warn("Could not read the report in %s: %s" % (run_dir, e),
+                      UserWarning)
+        return []
+
+
+class CSVWriter(object):
+
+    """Write records to a CSV file."""
+
+    def __init__(self, fname):
+        if six.PY2:
+            self._file = open(fname, 'wb')
+        else:
+            self._file = open(fname, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(Record._fields)
+
+    def write(self, records):
+        self._writer.writerows(
+            ['' if value is None else value for value in record]
+            for record in records)
+
+    def close(self):
+        self._file.close()
+
+
+class SQLiteWriter(object):
+
+    """Write records to a table in a SQLite database.
+
+    Parameters
+    ----------
+    fname : str
+        Path to the database.
+    table : str, optional
+        Name of the table for the records (default: 'results'). It is
+        replaced if it exists. The run directories are written to a table
+        with '_runs' added to the name.
+
+    """
+
+    def __init__(self, fname, table='results'):
+        self.table = table
+        self._conn = sqlite3.connect(fname)
+        self._conn.execute('DROP TABLE IF EXISTS "%s"' % (table, ))
+        self._conn.execute(
+            'CREATE TABLE "%s" (run_id INTEGER, report TEXT, scope TEXT, '
+            '"table" TEXT, row TEXT, "column" TEXT, units TEXT, value REAL, '
+            'text TEXT)' % (table, ))
+        self._conn.execute('DROP TABLE IF EXISTS "%s_runs"' % (table, ))
+        self._conn.execute(
+            'CREATE TABLE "%s_runs" (run_id INTEGER PRIMARY KEY, '
+            'run_dir TEXT)' % (table, ))
+
+    def write(self, records):
+        self._conn.executemany(
+            'INSERT INTO "%s" VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)' %
+            (self.table, ), records)
+        self._conn.commit()
+
+    def write_runs(self, run_dirs):
+        """write the run directory of each run_id"""
+        self._conn.executemany(
+            'INSERT INTO "%s_runs" VALUES (?, ?)' % (self.table, ),
+            enumerate(run_dirs))
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+class ParquetWriter(object):
+
+    """Write records to a Parquet file, one row group per chunk.
+
+    Needs pyarrow.
+    """
+
+    def __init__(self, fname):
+        import pyarrow as pa  # optional
+        import pyarrow.parquet as pq
+        self._pa = pa
+        self._schema = pa.schema([
+            ('run_id', pa.int64()), ('report', pa.string()),
+            ('scope', pa.string()), ('table', pa.string()),
+            ('row', pa.string()), ('column', pa.string()),
+            ('units', pa.string()), ('value', pa.float64()),
+            ('text', pa.string())])
+        self._writer = pq.ParquetWriter(fname, self._schema)
+
+    def write(self, records):
+        if not records:
+            return
+        columns = list(zip(*records))
+        arrays = [self._pa.array(column, type=field.type)
+                  for column, field in zip(columns, self._schema)]
+        self._writer.write_table(
+            self._pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+def getwriter(output):
+    """Get a writer for the output file, from its extension.
+
+    Parameters
+    ----------
+    output : str
+        Path to a .csv, .sqlite (or .sqlite3 or .db) or .parquet file.
+
+    Returns
+    -------
+    CSVWriter, SQLiteWriter or ParquetWriter
+
+    """
+    ext = os.path.splitext(output)[1].lower()
+    if ext == '.csv':
+        return CSVWriter(output)
+    if ext in ('.sqlite', '.sqlite3', '.db'):
+        return SQLiteWriter(output)
+    if ext == '.parquet':
+        return ParquetWriter(output)
+    raise ValueError("Unknown output file type %s, use .csv, .sqlite or "
+                     ".parquet" % (ext, ))
+
+
+def extract(run_dirs, selectors, output, processes=None, executor=None,
+            chunksize=None):
+    """Extract tables from the html reports of many runs into one file.
+
+    Parameters
+    ----------
+    run_dirs : str or list of str
+        Output directories of the runs, or a glob pattern for them. The
+        run_id of each run is its position in the (sorted) list.
+    selectors : list
+        Tables to read. Each one is a title (a string or compiled regex) or
+        a dict of arguments for `HtmlReport.select`.
+    output : str or writer
+        Path to a .csv, .sqlite or .parquet file, or an object with write
+        and close methods as from `getwriter`.
+    processes, executor, chunksize : optional
+        How to read the reports, as for `eppy.runner.executors.mapchunks`.
+        The records of each chunk of runs are written before the next
+        chunk is read.
+
+    Returns
+    -------
+    list of str
+        The run directories, in run_id order.
+
+    """
+    if isinstance(run_dirs, six.string_types):
+        run_dirs = sorted(glob.glob(run_dirs))
+    run_dirs = list(run_dirs)
+    jobs = [(run_id, run_dir, selectors)
+            for run_id, run_dir in enumerate(run_dirs)]
+    writer = getwriter(output) if isinstance(
+        output, six.string_types) else output
+    try:
+        if hasattr(writer, 'write_runs'):
+            writer.write_runs(run_dirs)
+        for chunk in mapchunks(
+                _extractrun, jobs, processes, executor, chunksize):
+            for records in chunk:
+                writer.write(records)
+    finally:
+        writer.close()
+    return run_dirs
@@ -0,0 +1,334 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""Read the CSV files written by ReadVarsESO (eplusout.csv, eplusmtr.csv).
+
+These are written by `eppy.runner.run_functions.run` with readvars=True.
+The header is parsed into an index of the columns, and only the selected
+columns are read, a chunk of rows at a time, into numpy arrays::
+
+    >>> from eppy.results.csvout import CSVOutput
+    >>> output = CSVOutput('eplusout.csv')
+    >>> columns = output.select(names='Zone Mean Air Temperature')
+    >>> for chunk in output.iterchunks(columns, chunksize=8760):
+    ...     print(chunk.values.mean(axis=0))
+
+Memory is only needed for one chunk, so files larger than memory can be
+read. Needs numpy.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+import io
+import itertools
+import re
+
+import six
+
+from eppy.results.eso import _matches
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# a column header, e.g. "ZONE ONE:Zone Mean Air Temperature [C](Hourly)"
+HEADER = re.compile(r'^(?P<name>.*?)\s*(\[(?P<units>[^\]]*)\])?\s*'
+                    r'(\((?P<frequency>[^)]*)\))?\s*$')
+# the part of a meter name before the name of a zone, e.g.
+# "InteriorLights:Electricity:Zone:ZONE ONE"
+ZONE_METER = re.compile(r':(Zone|Space|SpaceType):[^:]*$', re.IGNORECASE)
+# the columns of the times of each row
+TIME_COLUMNS = ('Month', 'Day', 'Hour', 'Minute', 'Second')
+# other Date/Time values, e.g. " 01/21" for daily values or "January"
+DATE = re.compile(r'^(\d+)/(\d+)(?:\s+(\d+):(\d+)(?::(\d+))?)?$')
+MONTHS = dict((name, i + 1) for i, name in enumerate([
+    'january', 'february', 'march', 'april', 'may', 'june', 'july',
+    'august', 'september', 'october', 'november', 'december']))
+# rows read at a time
+CHUNKSIZE = 8760
+
+Column = collections.namedtuple(
+    'Column', ['index', 'key', 'name', 'units', 'frequency', 'label'])
+Column.__doc__ = """A column of the CSV file.
+
+Attributes
+----------
+index : int
+    Position of the column in each row.
+key : str
+    The key, e.g. the name of the zone, or '' for meters.
+name : str
+    Name of the variable or meter, e.g. 'Zone Mean Air Temperature'.
+units : str
+    Units, e.g. 'C'.
+frequency : str
+    Reporting frequency, e.g. 'Hourly'.
+label : str
+    The header of the column.
+
+"""
+
+Chunk = collections.namedtuple('Chunk', ['times', 'values'])
+Chunk.__doc__ = """Rows read from the CSV file.
+
+Attributes
+----------
+times : numpy.ndarray
+    int array with one row per row of the file, and the columns in
+    TIME_COLUMNS. Parts of the time which are not in the file are 0.
+values : numpy.ndarray
+    float array with one row per row of the file and one column per
+    selected column. Blank cells, where a variable is not reported at that
+    time, are NaN.
+
+"""
+
+
+def parseheader(label, index=0):
+    """Parse a column header.
+
+    Parameters
+    ----------
+    label : str
+        e.g. 'ZONE ONE:Zone Mean Air Temperature [C](Hourly)'.
+    index : int, optional
+        Position of the column.
+
+    Returns
+    -------
+    Column
+
+    Variable names have no ':', and have more than one word, so the name
+    of a variable is the part after the last ':' and the key, which may
+    have a ':' in it, is the part before. A header is taken to be a meter
+    (with no key) if the part after the last ':' has no space, e.g.
+    'Electricity:Facility [J](Hourly)', or is the name of a zone, e.g.
+    'InteriorLights:Electricity:Zone:ZONE ONE [J](Hourly)'.
+
+    """
+    match = HEADER.match(label)
+    text = match.group('name')
+    key, _colon, name = text.rpartition(':')
+    if not key or ' ' not in name.strip() or ZONE_METER.search(text):
+        key, name = '', text  # a meter
+    return Column(index, key.strip(), name.strip(),
+                  (match.group('units') or '').strip(),
+                  (match.group('frequency') or '').strip(), label.strip())
+
+
+def _parsetime(text):
+    """parse a Date/Time value which is not in the usual format"""
+    text = text.decode('latin-1').strip()
+    match = DATE.match(text)
+    if match:
+        return [int(part or 0) for part in match.groups()]
+    return [MONTHS.get(text.lower(), 0), 0, 0, 0, 0]
+
+
+def parsetimes(texts):
+    """Parse the Date/Time column.
+
+    The usual ' MM/DD  hh:mm:ss' values are converted together from their
+    bytes, and only other values are parsed one at a time.
+
+    Parameters
+    ----------
+    texts : list of bytes
+
+    Returns
+    -------
+    numpy.ndarray
+        int array with one row per value and the columns in TIME_COLUMNS.
+
+    """
+    texts = np.array([text.strip() for text in texts], dtype='S15')
+    times = np.zeros((len(texts), len(TIME_COLUMNS)), dtype=int)
+    if not len(texts):
+        return times
+    chars = texts.view(np.uint8).reshape(len(texts), 15)
+    digits = chars[:, [0, 1, 3, 4, 7, 8, 10, 11, 13, 14]].astype(int) - 48
+    separators = np.array(bytearray(b'/  ::'), dtype=np.uint8)
+    usual = (np.all((digits >= 0) & (digits <= 9), axis=1) &
+             np.all(chars[:, [2, 5, 6, 9, 12]] == separators, axis=1))
+    pairs = digits[:, 0::2] * 10 + digits[:, 1::2]
+    times[usual] = pairs[usual]
+    for i in np.flatnonzero(~usual):
+        times[i] = _parsetime(texts[i])
+    return times
+
+
+def _tofloats(cells):
+    """a list of bytes as a float array, NaN for blanks"""
+    cells = np.array(cells)
+    try:
+        return cells.astype(float)
+    except ValueError:
+        cells = np.where(np.char.strip(cells) == b'', b'nan', cells)
+        return cells.astype(float)
+
+
+class CSVOutput(object):
+
+    """A CSV file of results, indexed by column.
+
+    Parameters
+    ----------
+    fname : str
+        Path to eplusout.csv, eplusmtr.csv or another file written by
+        ReadVarsESO.
+
+    Attributes
+    ----------
+    columns : list of Column
+        The columns after the Date/Time column.
+
+    """
+
+    def __init__(self, fname):
+        if np is None:
+            raise ImportError("CSVOutput needs numpy")
+        self.fname = fname
+        with io.open(fname, 'rb') as fhandle:
+            header = fhandle.readline().decode('latin-1').rstrip('\r\n')
+        labels = header.split(',')
+        self.timecolumn = labels[0].strip()
+        self.columns = [parseheader(label, i)
+                        for i, label in enumerate(labels) if i > 0]
+
+    def __len__(self):
+        return len(self.columns)
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def select(self, names=None, keys=None, frequencies=None):
+        """Find columns.
+
+        Parameters
+        ----------
+        names : str, regex or list of them, optional
+            Variable or meter names, matched ignoring case, or compiled
+            regexes.
+        keys : str, regex or list of them, optional
+            Keys, e.g. zone names, matched as for names.
+        frequencies : str, regex or list of them, optional
+            Reporting frequencies, e.g. 'Hourly', matched as for names.
+
+        Returns
+        -------
+        list of Column
+
+        """
+        return [column for column in self.columns
+                if _matches(column.name, names) and
+                _matches(column.key, keys) and
+                _matches(column.frequency, frequencies)]
+
+    def _column(self, column):
+        """a Column from a Column, its index or its label"""
+        if isinstance(column, Column):
+            return column
+        if isinstance(column, six.integer_types):
+            if not 1 <= column <= len(self.columns):
+                raise IndexError(
+                    "No column at position %s, the columns are at 1 to %i" %
+                    (column, len(self.columns)))
+            return self.columns[column - 1]
+        for found in self.columns:
+            if found.label == column:
+                return found
+        raise KeyError("No column %s" % (column, ))
+
+    def iterchunks(self, columns=None, chunksize=CHUNKSIZE):
+        """Read the selected columns a chunk of rows at a time.
+
+        Parameters
+        ----------
+        columns : list, optional
+            Columns to read, as Column, position in the row or header
+            (default: all).
+        chunksize : int, optional
+            Number of rows in each chunk (default: CHUNKSIZE).
+
+        Yields
+        ------
+        Chunk
+
+        """
+        if columns is None:
+            columns = self.columns
+        indexes = [self._column(column).index for column in columns]
+        with io.open(self.fname, 'rb') as fhandle:
+            fhandle.readline()
+            while True:
+                lines = list(itertools.islice(fhandle, chunksize))
+                if not lines:
+                    return
+                rows = [line.rstrip(b'\r\n').split(b',') for line in lines
+                        if line.strip()]
+                width = max(indexes) + 1 if indexes else 0
+                for row in rows:
+                    if len(row) < width:  # trailing blanks left out
+                        row.extend([b''] * (width - len(row)))
+                times = parsetimes([row[0] for row in rows])
+                values = np.empty((len(rows), len(indexes)))
+                for j, index in enumerate(indexes):
+                    values[:, j] = _tofloats([row[index] for row in rows])
+                yield Chunk(times, values)
+
+    def read(self, columns=None):
+        """Read the selected columns.
+
+        Parameters
+        ----------
+        columns : list, optional
+            Columns to read, as for `iterchunks`.
+
+        Returns
+        -------
+        Chunk
+            All the rows.
+
+        """
+        if columns is None:
+            columns = self.columns
+        chunks = list(self.iterchunks(columns))
+        if not chunks:
+            return Chunk(np.zeros((0, len(TIME_COLUMNS)), dtype=int),
+                         np.zeros((0, len(columns))))
+        return Chunk(np.concatenate([chunk.times for chunk in chunks]),
+                     np.concatenate([chunk.values for chunk in chunks]))
+
+    def to_dataframe(self, columns=None):
+        """Read the selected columns into a pandas DataFrame.
+
+        Parameters
+        ----------
+        columns : list, optional
+            Columns to read, as for `iterchunks`.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The columns in TIME_COLUMNS, then one column per selected
+            column, named by its header.
+
+        """
+        import pandas as pd  # optional
+        if columns is None:
+            columns = self.columns
+        columns = [self._column(column) for column in columns]
+        chunk = self.read(columns)
+        frame = pd.DataFrame(chunk.times, columns=TIME_COLUMNS)
+        for j, column in enumerate(columns):
+            frame[column.label] = chunk.values[:, j]
+        return frame
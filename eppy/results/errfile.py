@@ -0,0 +1,497 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""Read the EnergyPlus error file (eplusout.err).
+
+The file is read line by line and turned into one record per message, so
+very large error files are never held in memory.
+
+A message starts with a line like::
+
+       ** Warning ** Weather file location will be used rather than entered
+
+and may be followed by continuation lines like::
+
+       **   ~~~   ** ..Location object=CHICAGO_IL_USA TMY2-94846
+
+The object and field a message is about are picked out of its text where
+they can be, and messages which differ only in names and numbers share a
+signature. `buildindex` reads the error files of many runs into a SQLite
+index of signatures, so questions like "which runs had this severe error"
+can be answered from the index::
+
+    >>> from eppy.results import errfile
+    >>> errfile.buildindex('multi_runs/*', 'errors.sqlite', processes=4)
+    >>> errfile.runswith('errors.sqlite', severity='Severe',
+    ...                  pattern='Node Connection Error')
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+import glob
+import io
+import os
+import re
+import sqlite3
+import warnings
+
+import six
+
+from eppy.runner.executors import mapchunks
+
+
+# the first line of a message, e.g. "   ** Warning ** some message"
+MESSAGE_LINE = re.compile(r'\s*\*\*\s*(Warning|Severe|Fatal)\s*\*\*(.*)')
+# a continuation line, e.g. "   **   ~~~   ** ..some detail"
+CONTINUATION_LINE = re.compile(r'\s*\*\*\s*~~~\s*\*\*(.*)')
+# lines after a fatal error, e.g. "   ..... Last severe error=..."
+FATAL_SUMMARY_LINE = re.compile(r'\s*(\.\.\..*)')
+
+# an object in a message, e.g. 'BuildingSurface:Detailed="WALL 1"' or
+# 'ObjectType="OutdoorAir:Mixer"'. Object types have no spaces.
+OBJECT = re.compile(r'\b(?P<type>[A-Z][A-Za-z0-9]*(?::[A-Za-z0-9]+)*)\s*='
+                    r'\s*"(?P<name>[^"]*)"')
+# a capitalised word before an object type, which makes it part of a
+# longer name, e.g. 'Weather File Location="..."'
+NAME_BEFORE = re.compile(r'\b[A-Z][A-Za-z0-9]*\s+$')
+# a field in a message, e.g. 'invalid Construction Name="X"'
+FIELD = re.compile(r'\b(?:[Ii]nvalid|[Bb]lank|[Mm]issing|[Ii]llegal)\s+'
+                   r'(?P<field>[A-Z][\w\- /]*?)(?:\s+field)?\s*'
+                   r'(?:=|entered|is\b|was\b|,|\.|$)')
+# words before "=" which are not object types
+NOT_OBJECTS = set([
+    'name', 'node', 'objectname', 'value', 'type', 'field', 'key',
+    'variable', 'time', 'date', 'environment', 'count', 'error', 'summary'])
+# parts of a message which change from run to run, for signatures
+QUOTED = re.compile(r'"[^"]*"')
+NUMBER = re.compile(r'[-+]?\b\d+(?:\.\d+)?(?:[eE][-+]?\d+)?')
+ASSIGNED = re.compile(r'=\s*[^\s,"*#][^,]*')
+# names of the error file in a run directory
+ERR_FILES = ('eplusout.err', '*out.err', '*.err')
+
+SEVERITIES = ('Warning', 'Severe', 'Fatal')
+
+ErrRecord = collections.namedtuple(
+    'ErrRecord', ['severity', 'message', 'continuations', 'objecttype',
+                  'objectname', 'fieldname'])
+ErrRecord.__new__.__defaults__ = (None, None, None)
+ErrRecord.__doc__ = """One message from the EnergyPlus error file.
+
+Attributes
+----------
+severity : str
+    'Warning', 'Severe' or 'Fatal'.
+message : str
+    Text of the first line of the message.
+continuations : tuple of str
+    Text of the continuation lines of the message.
+objecttype : str or None
+    Type of the object the message is about, e.g. 'Construction', if
+    there is one in the text.
+objectname : str or None
+    Name of that object.
+fieldname : str or None
+    Name of the field the message is about, e.g. 'Outside Layer', if
+    there is one in the text.
+
+"""
+
+
+def readerr(fname):
+    """Read the messages in an EnergyPlus error file one at a time.
+
+    Parameters
+    ----------
+    fname : str or file handle
+        Path to the error file, or an open file handle.
+
+    Yields
+    ------
+    ErrRecord
+
+    """
+    try:
+        fhandle = io.open(fname, 'r', encoding='latin-1')
+    except TypeError:  # already a file handle
+        for record in _readerr(fname):
+            yield record
+        return
+    with fhandle:
+        for record in _readerr(fhandle):
+            yield record
+
+
+def findobject(lines):
+    """Find the object and field a message is about.
+
+    Parameters
+    ----------
+    lines : list of str
+        The message and its continuation lines.
+
+    Returns
+    -------
+    tuple
+        (objecttype, objectname, fieldname), each None if it is not found.
+
+    'ObjectType="X"' is used as the object type where it is given, and
+    otherwise the first 'Type="Name"' where Type has no spaces, is not
+    part of a longer name and is not a word like Node or Name.
+
+    """
+    objecttype, objectname, fieldname = None, None, None
+    for line in lines:
+        for match in OBJECT.finditer(line):
+            key = match.group('type')
+            value = match.group('name').strip()
+            if key.lower() == 'objecttype':
+                objecttype = value
+            elif key.lower() == 'objectname':
+                objectname = objectname or value
+            elif (objecttype is None and key.lower() not in NOT_OBJECTS and
+                  not NAME_BEFORE.search(line[:match.start()])):
+                objecttype, objectname = key, value
+        if fieldname is None:
+            match = FIELD.search(line)
+            if match:
+                fieldname = match.group('field').strip()
+    return objecttype, objectname, fieldname
+
+
+def _record(severity, message, continuations):
+    """an ErrRecord with its object and field"""
+    return ErrRecord(severity, message, tuple(continuations),
+                     *findobject([message] + continuations))
+
+
+def _readerr(fhandle):
+    """read the records from an open error file"""
+    severity, message, continuations = None, None, []
+    for line in fhandle:
+        match = MESSAGE_LINE.match(line)
+        if match:
+            if severity:
+                yield _record(severity, message, continuations)
+            severity, message = match.group(1), match.group(2).strip()
+            continuations = []
+            continue
+        if severity:
+            match = CONTINUATION_LINE.match(line)
+            if not match and severity == 'Fatal':
+                match = FATAL_SUMMARY_LINE.match(line)
+            if match:
+                continuations.append(match.group(1).strip())
+                continue
+            yield _record(severity, message, continuations)
+            severity, message, continuations = None, None, []
+    if severity:
+        yield _record(severity, message, continuations)
+
+
+def counterrors(fname):
+    """Count the messages of each severity in an EnergyPlus error file.
+
+    Parameters
+    ----------
+    fname : str or file handle
+        Path to the error file, or an open file handle.
+
+    Returns
+    -------
+    dict
+        {'Warning': n, 'Severe': n, 'Fatal': n}
+
+    """
+    counts = dict((severity, 0) for severity in SEVERITIES)
+    for record in readerr(fname):
+        counts[record.severity] += 1
+    return counts
+
+
+def formatrecord(record):
+    """Format a record as it appears in the error file.
+
+    Parameters
+    ----------
+    record : ErrRecord
+
+    Returns
+    -------
+    str
+
+    """
+    lines = ['   ** {:^7} ** {}'.format(record.severity, record.message)]
+    lines.extend('   **   ~~~   ** {}'.format(continuation)
+                 for continuation in record.continuations)
+    return '\n'.join(lines)
+
+
+def signature(record):
+    """The text of a message with its names and numbers taken out.
+
+    Messages with the same signature are the same problem, maybe with
+    different objects or values.
+
+    Parameters
+    ----------
+    record : ErrRecord
+
+    Returns
+    -------
+    str
+        e.g. 'Construction="*", invalid Outside Layer="*"' for
+        'Construction="WALL 1", invalid Outside Layer="BRICK"'.
+
+    """
+    text = QUOTED.sub('"*"', record.message)
+    text = ASSIGNED.sub('=*', text)
+    return NUMBER.sub('#', text)
+
+
+def finderr(run_dir):
+    """Find the error file in a run directory.
+
+    Parameters
+    ----------
+    run_dir : str
+        Path to the output directory of a run.
+
+    Returns
+    -------
+    str or None
+        Path to the error file, None if there is none.
+
+    """
+    for pattern in ERR_FILES:
+        found = sorted(glob.glob(os.path.join(run_dir, pattern)))
+        if found:
+            return found[0]
+    return None
+
+
+def scanrun(run_id, run_dir):
+    """Count the messages of each signature in the error file of one run.
+
+    Parameters
+    ----------
+    run_id : int
+        ID for the run.
+    run_dir : str
+        Path to the output directory of the run.
+
+    Returns
+    -------
+    tuple
+        (run_id, found, counts, signatures) where found is False if there
+        is no error file, counts is {severity: n} and signatures is a list
+        of (severity, signature, count, first record).
+
+    """
+    fname = finderr(run_dir)
+    counts = dict((severity, 0) for severity in SEVERITIES)
+    if fname is None:
+        return run_id, False, counts, []
+    signatures = collections.OrderedDict()
+    for record in readerr(fname):
+        counts[record.severity] += 1
+        key = (record.severity, signature(record))
+        if key in signatures:
+            signatures[key][0] += 1
+        else:
+            signatures[key] = [1, record]
+    return run_id, True, counts, [
+        key + tuple(value) for key, value in signatures.items()]
+
+
+def _scanrun(args):
+    """scanrun for Executor.map"""
+    run_id, run_dir = args
+    try:
+        return scanrun(run_id, run_dir)
+    except Exception as e:
+        warnings.warn("Could not read the error file in %s: %s" % (
+            run_dir, e), UserWarning)
+        return run_id, False, dict(
+            (severity, 0) for severity in SEVERITIES), []
+
+
+INDEX_SCHEMA = """
+DROP TABLE IF EXISTS runs;
+DROP TABLE IF EXISTS signatures;
+DROP TABLE IF EXISTS messages;
+CREATE TABLE runs (
+    run_id INTEGER PRIMARY KEY, run_dir TEXT, found INTEGER,
+    warnings INTEGER, severes INTEGER, fatals INTEGER);
+CREATE TABLE signatures (
+    signature_id INTEGER PRIMARY KEY, severity TEXT, signature TEXT,
+    UNIQUE (severity, signature));
+CREATE TABLE messages (
+    run_id INTEGER, signature_id INTEGER, count INTEGER, message TEXT,
+    objecttype TEXT, objectname TEXT, fieldname TEXT,
+    PRIMARY KEY (run_id, signature_id));
+CREATE INDEX messages_signature ON messages (signature_id);
+"""
+
+
+def buildindex(run_dirs, database, processes=None, executor=None,
+               chunksize=None):
+    """Index the error files of many runs in a SQLite database.
+
+    The database has the tables:
+
+    - runs: run_id, run_dir, found (0 if there is no error file), and the
+      numbers of warnings, severes and fatals.
+    - signatures: signature_id, severity and `signature`.
+    - messages: run_id, signature_id, the count of messages with that
+      signature in the run, and the first such message with its object
+      and field.
+
+    Parameters
+    ----------
+    run_dirs : str or list of str
+        Output directories of the runs, or a glob pattern for them. The
+        run_id of each run is its position in the (sorted) list.
+    database : str
+        Path to the SQLite database. The tables are replaced if they exist.
+    processes, executor, chunksize : optional
+        How to read the error files, as for
+        `eppy.runner.executors.mapchunks`. Each chunk of runs is written to
+        the database before the next chunk is read.
+
+    Returns
+    -------
+    list of str
+        The run directories, in run_id order.
+
+    """
+    if isinstance(run_dirs, six.string_types):
+        run_dirs = sorted(glob.glob(run_dirs))
+    run_dirs = list(run_dirs)
+    jobs = list(enumerate(run_dirs))
+    conn = sqlite3.connect(database)
+    try:
+        conn.executescript(INDEX_SCHEMA)
+        signature_ids = {}
+        for chunk in mapchunks(
+                _scanrun, jobs, processes, executor, chunksize):
+            for run_id, found, counts, signatures in chunk:
+                conn.execute(
+                    'INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?)',
+                    (run_id, run_dirs[run_id], int(found), counts['Warning'],
+                     counts['Severe'], counts['Fatal']))
+                rows = []
+                for severity, text, count, record in signatures:
+                    key = (severity, text)
+                    if key not in signature_ids:
+                        signature_ids[key] = len(signature_ids) + 1
+                        conn.execute(
+                            'INSERT INTO signatures VALUES (?, ?, ?)',
+                            (signature_ids[key], severity, text))
+                    rows.append((
+                        run_id, signature_ids[key], count,
+                        formatrecord(record), record.objecttype,
+                        record.objectname, record.fieldname))
+                conn.executemany(
+                    'INSERT INTO messages VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    rows)
+            conn.commit()
+    finally:
+        conn.close()
+    return run_dirs
+
+
+def _signaturewhere(severity, pattern, objecttype):
+    """WHERE clause and parameters to select signatures"""
+    clauses, params = [], []
+    if severity is not None:
+        clauses.append('s.severity = ? COLLATE NOCASE')
+        params.append(severity)
+    if pattern is not None:
+        clauses.append("s.signature LIKE ? ESCAPE '\\'")
+        params.append('%' + pattern.replace('\\', '\\\\').replace(
+            '%', '\\%').replace('_', '\\_') + '%')
+    if objecttype is not None:
+        clauses.append('m.objecttype = ? COLLATE NOCASE')
+        params.append(objecttype)
+    if not clauses:
+        return '', params
+    return ' WHERE ' + ' AND '.join(clauses), params
+
+
+def summarize(database, severity=None, pattern=None, objecttype=None):
+    """Count the runs and messages of each signature in an index.
+
+    Parameters
+    ----------
+    database : str
+        Path to a database made by `buildindex`.
+    severity : str, optional
+        Only count signatures of this severity, e.g. 'Severe'.
+    pattern : str, optional
+        Only count signatures with this text in them.
+    objecttype : str, optional
+        Only count messages about this type of object.
+
+    Returns
+    -------
+    list of tuples
+        (severity, signature, runs, messages), with the signatures in most
+        runs first.
+
+    """
+    where, params = _signaturewhere(severity, pattern, objecttype)
+    conn = sqlite3.connect(database)
+    try:
+        return [tuple(row) for row in conn.execute(
+            'SELECT s.severity, s.signature, COUNT(DISTINCT m.run_id), '
+            'SUM(m.count) FROM signatures s JOIN messages m '
+            'USING (signature_id)' + where + ' GROUP BY s.signature_id '
+            'ORDER BY COUNT(DISTINCT m.run_id) DESC, s.signature_id', params)]
+    finally:
+        conn.close()
+
+
+def runswith(database, signature=None, severity=None, pattern=None,
+             objecttype=None):
+    """Find the runs with a message in an index.
+
+    Parameters
+    ----------
+    database : str
+        Path to a database made by `buildindex`.
+    signature : str, optional
+        The exact signature, as from `summarize`.
+    severity : str, optional
+        Only find messages of this severity, e.g. 'Severe'.
+    pattern : str, optional
+        Only find messages with this text in their signature.
+    objecttype : str, optional
+        Only find messages about this type of object.
+
+    Returns
+    -------
+    list of tuples
+        (run_id, run_dir, count, message) for each run, in run_id order.
+        message is one of the matching messages in the run.
+
+    """
+    where, params = _signaturewhere(severity, pattern, objecttype)
+    if signature is not None:
+        where += (' AND ' if where else ' WHERE ') + 's.signature = ?'
+        params.append(signature)
+    conn = sqlite3.connect(database)
+    try:
+        return [tuple(row) for row in conn.execute(
+            'SELECT r.run_id, r.run_dir, SUM(m.count), MIN(m.message) '
+            'FROM messages m JOIN signatures s USING (signature_id) '
+            'JOIN runs r USING (run_id)' + where +
+            ' GROUP BY r.run_id ORDER BY r.run_id', params)]
+    finally:
+        conn.close()
@@ -0,0 +1,346 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""Read time series from the EnergyPlus output file (eplusout.eso).
+
+The data dictionary at the top of the file is read first. The data section
+is then streamed one line at a time, keeping only the lines for the
+selected variables and the timestamps they need, so the memory used is
+proportional to the selected series rather than to the file::
+
+    >>> from eppy.results import eso
+    >>> for series in eso.readeso('eplusout.eso',
+    ...                           variables=['Zone Mean Air Temperature'],
+    ...                           frequencies=['Hourly']):
+    ...     print(series.environment, series.variable.key,
+    ...           series.values.mean())
+
+The same file format is used for the meter file (eplusout.mtr).
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import array
+import collections
+import io
+import re
+
+import six
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# ids of the lines which start a new environment and timestamps
+ENVIRONMENT_ID = 1
+TIMESTAMP_IDS = (2, 3, 4, 5, 6)
+# which timestamp line each reporting frequency uses
+FREQUENCY_TIMESTAMPS = {
+    'each call': 2, 'timestep': 2, 'detailed': 2, 'hourly': 2,
+    'daily': 3, 'monthly': 4, 'runperiod': 5, 'annual': 6}
+END_OF_DICTIONARY = b'End of Data Dictionary'
+END_OF_DATA = b'End of Data'
+# bytes read at a time from the data section
+READ_SIZE = 4 * 1024 * 1024
+# a variable name with units, e.g. "Zone Mean Air Temperature [C]"
+UNITS = re.compile(r'^(.*?)\s*\[(.*)\]\s*$')
+
+Variable = collections.namedtuple(
+    'Variable', ['id', 'key', 'name', 'units', 'frequency', 'columns'])
+Variable.__doc__ = """A variable or meter in the ESO data dictionary.
+
+Attributes
+----------
+id : int
+    The report code of the variable in the data section.
+key : str
+    The key, e.g. the name of the zone, or '' for meters.
+name : str
+    Name of the variable, e.g. 'Zone Mean Air Temperature'.
+units : str
+    Units of the variable, e.g. 'C'.
+frequency : str
+    Reporting frequency, e.g. 'Hourly'.
+columns : tuple of str
+    Names of the values in each line, e.g. ('Value', ) or, for daily and
+    longer frequencies, ('Value', 'Min', 'Hour', 'Minute', 'Max', 'Hour',
+    'Minute').
+
+"""
+
+Series = collections.namedtuple(
+    'Series', ['variable', 'environment', 'timecolumns', 'times', 'values'])
+Series.__doc__ = """The values of one variable in one environment.
+
+Attributes
+----------
+variable : Variable
+environment : str
+    Name of the environment, e.g. the design day or run period.
+timecolumns : tuple of str
+    Names of the columns of times, e.g. ('Day of Simulation', 'Month',
+    'Day of Month', 'DST Indicator', 'Hour', 'StartMinute', 'EndMinute').
+times : numpy.ndarray
+    The timestamp of each value, one row per value and one column per
+    timecolumn.
+values : numpy.ndarray
+    The values, a 1-D array if the variable has one column, otherwise one
+    row per timestamp and one column per variable column.
+
+Where numpy is not installed times and values are lists of lists.
+
+"""
+
+
+def _splitunits(name):
+    """split 'name [units]' into (name, units)"""
+    match = UNITS.match(name)
+    if match:
+        return match.group(1), match.group(2)
+    return name, ''
+
+
+def _parseline(line):
+    """parse a line of the data dictionary into (id, fields, comment)"""
+    line, _bang, comment = line.partition('!')
+    fields = [field.strip() for field in line.split(',')]
+    return int(fields[0]), fields[2:], comment.strip()
+
+
+def readdictionary(fhandle):
+    """Read the data dictionary at the start of an ESO file.
+
+    Parameters
+    ----------
+    fhandle : file handle
+        ESO file opened in binary mode. It is left at the start of the data
+        section.
+
+    Returns
+    -------
+    version : str
+        The first line of the file, with the EnergyPlus version.
+    timecolumns : dict
+        {timestamp id: tuple of column names}
+    variables : list of Variable
+
+    """
+    version = fhandle.readline().decode('latin-1').strip()
+    timecolumns, variables = {}, []
+    for line in fhandle:
+        if line.startswith(END_OF_DICTIONARY):
+            break
+        varid, fields, comment = _parseline(line.decode('latin-1'))
+        if varid == ENVIRONMENT_ID or varid in TIMESTAMP_IDS:
+            # the last field of the daily and timestep lines is the DayType
+            columns = [_splitunits(field)[0] for field in fields]
+            if columns and columns[-1] == 'DayType':
+                columns.pop()
+            timecolumns[varid] = tuple(columns)
+            continue
+        frequency, _bracket, columns = comment.partition('[')
+        columns = tuple(columns.rstrip(']').split(',')) if columns else (
+            'Value', )
+        if len(fields) > 1:
+            key, name = fields[0], ','.join(fields[1:])
+        else:
+            key, name = '', fields[0]  # meters have no key
+        name, units = _splitunits(name)
+        variables.append(Variable(
+            varid, key, name, units, frequency.strip(), columns))
+    return version, timecolumns, variables
+
+
+def _matches(value, patterns):
+    """test value against strings (ignoring case) or compiled regexes"""
+    if patterns is None:
+        return True
+    if isinstance(patterns, six.string_types) or hasattr(patterns, 'search'):
+        patterns = [patterns]
+    for pattern in patterns:
+        if isinstance(pattern, six.string_types):
+            if value.lower() == pattern.lower():
+                return True
+        elif pattern.search(value):
+            return True
+    return False
+
+
+def selectvariables(variables, names=None, keys=None, frequencies=None):
+    """Select variables from the data dictionary.
+
+    Parameters
+    ----------
+    variables : list of Variable
+    names : str, regex or list of them, optional
+        Variable names, matched ignoring case, or compiled regexes.
+    keys : str, regex or list of them, optional
+        Keys, e.g. zone names, matched as for names.
+    frequencies : str, regex or list of them, optional
+        Reporting frequencies, e.g. 'Hourly', matched as for names.
+
+    Returns
+    -------
+    list of Variable
+
+    """
+    return [variable for variable in variables
+            if _matches(variable.name, names) and
+            _matches(variable.key, keys) and
+            _matches(variable.frequency, frequencies)]
+
+
+class _SeriesBuffer(object):
+    """the values of one variable in one environment while reading"""
+    __slots__ = ('rows', 'values')
+
+    def __init__(self):
+        self.rows = array.array(str('l'))  # rows in the table of times
+        self.values = array.array(str('d'))
+
+
+def readeso(fname, variables=None, keys=None, frequencies=None):
+    """Read the selected time series from an ESO file.
+
+    Parameters
+    ----------
+    fname : str
+        Path to the ESO (or MTR) file.
+    variables : str, regex or list of them, optional
+        Variable names to read, matched ignoring case, or compiled regexes
+        (default: all variables).
+    keys : str, regex or list of them, optional
+        Keys to read, e.g. zone names (default: all keys).
+    frequencies : str, regex or list of them, optional
+        Reporting frequencies to read, e.g. 'Hourly' (default: all).
+
+    Returns
+    -------
+    list of Series
+        One series per selected variable and environment, in the order of
+        the environments and then of the variables in the dictionary.
+
+    """
+    with io.open(fname, 'rb') as fhandle:
+        _version, timecolumns, dictionary = readdictionary(fhandle)
+        selected = dict(
+            (str(variable.id).encode('ascii'), variable)
+            for variable in selectvariables(
+                dictionary, variables, keys, frequencies))
+        timestamp_ids = dict(
+            (str(i).encode('ascii'), i) for i in TIMESTAMP_IDS
+            if any(_timestamp_id(variable) == i
+                   for variable in selected.values()))
+        varids = dict((rid, _timestamp_id(variable))
+                      for rid, variable in selected.items())
+        environment_id = str(ENVIRONMENT_ID).encode('ascii')
+        environments = []  # (name, times, buffers)
+        times, buffers = None, None
+        rids = list(varids) + list(timestamp_ids) + [environment_id]
+        for rid, line in _datalines(fhandle, rids):
+            timestamp_id = varids.get(rid)
+            if timestamp_id is not None:
+                buf = buffers.get(rid)
+                if buf is None:
+                    buf = buffers[rid] = _SeriesBuffer()
+                buf.rows.append(times[timestamp_id][1] - 1)
+                buf.values.extend(float(value) for value in line.split(b','))
+                continue
+            timestamp_id = timestamp_ids.get(rid)
+            if timestamp_id is not None:
+                table = times[timestamp_id]
+                ncolumns = len(timecolumns.get(timestamp_id, ()))
+                fields = line.split(b',')
+                table[0].extend(float(field) for field in fields[:ncolumns])
+                table[1] += 1
+            else:  # a new environment
+                name = line.split(b',')[0].decode('latin-1')
+                times = dict((i, [array.array(str('d')), 0])
+                             for i in timestamp_ids.values())
+                buffers = {}
+                environments.append((name.strip(), times, buffers))
+    order = dict((variable.id, i) for i, variable in enumerate(dictionary))
+    result = []
+    for name, times, buffers in environments:
+        for rid in sorted(buffers, key=lambda rid: order[selected[rid].id]):
+            variable = selected[rid]
+            timestamp_id = _timestamp_id(variable)
+            columns = timecolumns.get(timestamp_id, ())
+            result.append(Series(
+                variable, name, columns,
+                _table(times[timestamp_id][0], len(columns),
+                       buffers[rid].rows),
+                _values(buffers[rid].values, len(variable.columns))))
+    return result
+
+
+def _datalines(fhandle, rids):
+    """Find the lines of the data section which start with one of rids.
+
+    The data section is read in large chunks and searched with a regular
+    expression, so the lines which are not wanted are skipped without
+    running any python code for them.
+
+    Yields
+    ------
+    tuple
+        (rid, the rest of the line after the comma)
+
+    """
+    pattern = re.compile(
+        br'^(' + b'|'.join(re.escape(rid) for rid in rids) +
+        br'),([^\r\n]*)', re.M)
+    end = re.compile(br'^' + re.escape(END_OF_DATA), re.M)
+    remainder = b''
+    while True:
+        chunk = fhandle.read(READ_SIZE)
+        if not chunk:
+            data = remainder
+        else:
+            last = chunk.rfind(b'\n')
+            if last == -1:
+                remainder += chunk
+                continue
+            data = remainder + chunk[:last + 1]
+            remainder = chunk[last + 1:]
+        match = end.search(data)
+        if match:
+            data = data[:match.start()]
+        for line in pattern.finditer(data):
+            yield line.group(1), line.group(2)
+        if match or not chunk:
+            return
+
+
+def _timestamp_id(variable):
+    """id of the timestamp lines for a variable"""
+    return FREQUENCY_TIMESTAMPS.get(variable.frequency.lower(), 2)
+
+
+def _table(values, ncolumns, rows):
+    """the rows of a table of times, as an array"""
+    if np is not None:
+        table = np.frombuffer(values, dtype=float).reshape(-1, ncolumns)
+        return table[np.frombuffer(rows, dtype=rows.typecode)]
+    return [list(values[row * ncolumns:(row + 1) * ncolumns]) for row in rows]
+
+
+def _values(values, ncolumns):
+    """the values of a series, as an array"""
+    if np is not None:
+        values = np.array(values, dtype=float)
+        if ncolumns > 1:
+            values = values.reshape(-1, ncolumns)
+        return values
+    if ncolumns > 1:
+        return [list(values[i:i + ncolumns])
+                for i in range(0, len(values), ncolumns)]
+    return list(values)
@@ -0,0 +1,288 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""Indexed, lazy access to the tables in an EnergyPlus html report.
+
+Opening a report scans it once for the tables, recording for each one its
+title, the report it belongs to, what the report is for and where the
+table is in the file. Only the tables which are asked for are read::
+
+    >>> report = HtmlReport('eplustbl.htm')
+    >>> report.select(title='Site and Source Energy')
+    [TableInfo(index=0, title='Site and Source Energy', report='Annual
+     Building Utility Performance Summary', scope='Entire Facility', ...)]
+    >>> report.read('Site and Source Energy')
+    [['', 'Total Energy [GJ]', ...], ['Total Site Energy', 3206.37, ...]]
+
+Tables can also be read into a numpy array or a pandas DataFrame, if
+those are installed.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+import io
+import re
+
+import six
+
+from eppy.results import readhtml
+
+try:
+    from html import unescape
+except ImportError:  # python 2
+    from six.moves.html_parser import HTMLParser
+    unescape = HTMLParser().unescape
+
+
+# the parts of an E+ html report which are indexed
+TOKENS = re.compile(
+    br'<p>\s*Report:\s*<b>(?P<report>.*?)</b>'
+    br'|<p>\s*For:\s*<b>(?P<scope>.*?)</b>'
+    br'|<b>(?P<title>.*?)</b>'
+    br'|<(?P<close>/?)table\b[^>]*>',
+    re.I | re.S)
+TAG = re.compile(br'<[^>]*>')
+
+TableInfo = collections.namedtuple(
+    'TableInfo', ['index', 'title', 'report', 'scope', 'start', 'end'])
+TableInfo.__doc__ = """Where a table is in an html report.
+
+Attributes
+----------
+index : int
+    Position of the table in the report.
+title : str
+    Text of the last <b> before the table, as in `readhtml.titletable`.
+report : str
+    Name of the report the table is in, e.g. 'Annual Building Utility
+    Performance Summary'.
+scope : str
+    What the report is for, e.g. 'Entire Facility'.
+start : int
+    Byte offset of the start of the <table> tag.
+end : int
+    Byte offset of the end of the </table> tag.
+
+"""
+
+
+def _text(html):
+    """the text of a snippet of html, as a stripped str"""
+    return unescape(TAG.sub(b'', html).decode('latin-1')).strip()
+
+
+def indextables(html_doc):
+    """Find the tables in an html report in a single pass.
+
+    Parameters
+    ----------
+    html_doc : bytes
+        The html report.
+
+    Returns
+    -------
+    list of TableInfo
+
+    """
+    tables = []
+    report, scope, title = '', '', ''
+    depth, start = 0, None
+    for match in TOKENS.finditer(html_doc):
+        if match.group('close') is not None:  # a table tag
+            if not match.group('close'):
+                if depth == 0:
+                    start = match.start()
+                depth += 1
+            elif depth:
+                depth -= 1
+                if depth == 0:
+                    tables.append(TableInfo(
+                        len(tables), title, report, scope, start,
+                        match.end()))
+        elif depth:
+            continue  # nested inside a table
+        elif match.group('report') is not None:
+            report, scope = _text(match.group('report')), ''
+        elif match.group('scope') is not None:
+            scope = _text(match.group('scope'))
+        else:
+            title = _text(match.group('title'))
+    return tables
+
+
+def _matches(value, pattern):
+    """test value against a string (ignoring case) or a compiled regex"""
+    if pattern is None:
+        return True
+    if isinstance(pattern, six.string_types):
+        return value.lower() == pattern.strip().lower()
+    return pattern.search(value) is not None
+
+
+class HtmlReport(object):
+
+    """An EnergyPlus html report, indexed by table.
+
+    Parameters
+    ----------
+    fname : str
+        Path to the html report, e.g. 'eplustbl.htm'.
+    encoding : str, optional
+        Encoding of the report (default: 'latin-1').
+
+    Attributes
+    ----------
+    tables : list of TableInfo
+        The index of the tables in the report.
+
+    """
+
+    def __init__(self, fname, encoding='latin-1'):
+        self.fname = fname
+        self.encoding = encoding
+        with io.open(fname, 'rb') as fhandle:
+            self.tables = indextables(fhandle.read())
+
+    def __len__(self):
+        return len(self.tables)
+
+    def __iter__(self):
+        return iter(self.tables)
+
+    def select(self, title=None, report=None, scope=None):
+        """Find tables by title, report and scope.
+
+        Each argument can be a string, which matches ignoring case, or a
+        compiled regular expression, which matches if it is found anywhere
+        in the text.
+
+        Parameters
+        ----------
+        title : str or regex, optional
+        report : str or regex, optional
+        scope : str or regex, optional
+
+        Returns
+        -------
+        list of TableInfo
+
+        """
+        return [table for table in self.tables
+                if _matches(table.title, title) and
+                _matches(table.report, report) and
+                _matches(table.scope, scope)]
+
+    def info(self, table):
+        """Find one table.
+
+        Parameters
+        ----------
+        table : TableInfo, int, str or regex
+            The table, its index, or its title as in `select`.
+
+        Returns
+        -------
+        TableInfo
+
+        Raises
+        ------
+        KeyError
+            If no table has the title.
+
+        """
+        if isinstance(table, TableInfo):
+            return table
+        if isinstance(table, six.integer_types):
+            return self.tables[table]
+        found = self.select(title=table)
+        if not found:
+            raise KeyError("No table with the title %s" % (table, ))
+        return found[0]
+
+    def html(self, table):
+        """Read the html of one table from the report.
+
+        Parameters
+        ----------
+        table : TableInfo, int, str or regex
+            The table, its index, or its title as in `select`.
+
+        Returns
+        -------
+        str
+
+        """
+        table = self.info(table)
+        with io.open(self.fname, 'rb') as fhandle:
+            fhandle.seek(table.start)
+            html = fhandle.read(table.end - table.start)
+        return html.decode(self.encoding)
+
+    def read(self, table, tofloat=True):
+        """Read one table as rows, as in `readhtml.titletable`.
+
+        Parameters
+        ----------
+        table : TableInfo, int, str or regex
+            The table, its index, or its title as in `select`.
+        tofloat : bool, optional
+            Convert numbers to float (default: True).
+
+        Returns
+        -------
+        list of lists
+
+        """
+        scanner = readhtml._scantables(self.html(table))
+        return scanner.matrix(scanner.tables[0], tofloat)
+
+    def to_array(self, table):
+        """Read the values of one table into a numpy array.
+
+        The first row and column are taken to be the headers and are left
+        out. Cells which are not numbers are NaN.
+
+        Parameters
+        ----------
+        table : TableInfo, int, str or regex
+            The table, its index, or its title as in `select`.
+
+        Returns
+        -------
+        numpy.ndarray
+
+        """
+        import numpy as np  # optional
+        rows = self.read(table)
+        return np.array(
+            [[value if isinstance(value, float) else np.nan
+              for value in row[1:]] for row in rows[1:]], dtype=float)
+
+    def to_dataframe(self, table):
+        """Read one table into a pandas DataFrame.
+
+        The first row is used for the column names and the first column for
+        the index.
+
+        Parameters
+        ----------
+        table : TableInfo, int, str or regex
+            The table, its index, or its title as in `select`.
+
+        Returns
+        -------
+        pandas.DataFrame
+
+        """
+        import pandas as pd  # optional
+        rows = self.read(table)
+        return pd.DataFrame(
+            [row[1:] for row in rows[1:]],
+            index=[row[0] for row in rows[1:]], columns=rows[0][1:])
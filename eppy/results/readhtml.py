@@ -11,11 +11,14 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-import string
 import collections
 import six
+from six.moves.html_parser import HTMLParser
+from six.moves.html_entities import name2codepoint
 from bs4 import BeautifulSoup, NavigableString, Tag
 
+from eppy import reporttable
+
 
 class NotSimpleTable(Exception):
     """Exception Object"""
@@ -87,26 +90,300 @@ def table2val_matrix(table):
     return rows
 
 
+# tags which never have contents (as in BeautifulSoup's html tree builder)
+VOID_TAGS = set([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen',
+    'link', 'menuitem', 'meta', 'param', 'source', 'track', 'wbr',
+    'basefont', 'bgsound', 'command', 'frame', 'image', 'isindex', 'nextid',
+    'spacer'])
+# tags where whitespace is kept as it is
+PRESERVE_WHITESPACE_TAGS = set(['pre', 'textarea'])
+# tags whose text is not included in get_text()
+NOT_TEXT_TAGS = set(['script', 'style', 'template', 'rt', 'rp'])
+# tags which end the lines before a table in lines_table
+LINES_BARRIER_TAGS = set(['table', 'hr', 'tr', 'td'])
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+# characters read at a time from a file handle
+READ_SIZE = 65536
+
+
+def _collapse(txt):
+    """replace a string of only whitespace with a single space or newline"""
+    if txt.strip(ASCII_SPACES):
+        return txt
+    if '\n' in txt:
+        return '\n'
+    return ' '
+
+
+class _Element(object):
+    """an element seen by _TableScanner"""
+    __slots__ = ('name', 'parent', 'textstart', 'textend', 'first', 'parts')
+
+    def __init__(self, name, parent, textstart):
+        self.name = name
+        self.parent = parent  # name of the parent element
+        self.textstart = textstart  # index of first text in _TableScanner.texts
+        self.textend = None
+        self.first = None  # first child, for <b>
+        self.parts = None  # children of a <td>, as [kind, value]
+
+
+class _Table(object):
+    """a table seen by _TableScanner"""
+
+    def __init__(self, title, lines):
+        self.title = title  # the last <b> element before the table
+        self.lines = lines  # elements between the last barrier and the table
+        self.rows = []  # lists of <td> elements
+        self.cells = []  # all the <td> elements
+
+
+class _TableScanner(HTMLParser):
+
+    """Read all the tables in an html document in a single pass.
+
+    This builds the same matrices as `table2matrix` and `table2val_matrix`
+    and finds the same titles and lines as `titletable` and `lines_table`
+    would with BeautifulSoup, without making a tree of the whole document.
+    """
+
+    def __init__(self):
+        if six.PY2:
+            HTMLParser.__init__(self)
+        else:
+            HTMLParser.__init__(self, convert_charrefs=True)
+        self.tables = []
+        self.texts = []  # every string in the document, for get_text()
+        self._stack = []
+        self._data = []
+        self._open_tables = []
+        self._open_rows = []
+        self._pending = []  # elements that could be lines before a table
+        self._last_b = None
+        self._seen_p = False
+        self._preserve = 0
+        self._not_text = 0
+
+    # HTMLParser event handlers
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        parent = self._stack[-1] if self._stack else None
+        element = _Element(
+            tag, parent.name if parent else '[document]', len(self.texts))
+        if parent is not None:
+            self._child(parent, 'elem', element)
+        if tag in LINES_BARRIER_TAGS:
+            if tag == 'table':
+                lines = list(self._pending) if self._seen_p else None
+                table = _Table(self._last_b, lines)
+                self.tables.append(table)
+                self._open_tables.append(table)
+            elif tag == 'tr':
+                row = []
+                for table in self._open_tables:
+                    table.rows.append(row)
+                self._open_rows.append(row)
+            elif tag == 'td':
+                element.parts = []
+                for row in self._open_rows:
+                    row.append(element)
+                for table in self._open_tables:
+                    table.cells.append(element)
+            self._pending = []
+        elif tag != 'br' and element.parent != 'p':
+            self._pending.append(element)
+        if tag == 'b':
+            self._last_b = element
+        elif tag == 'p':
+            self._seen_p = True
+        if tag in VOID_TAGS:
+            element.textend = element.textstart
+            return
+        if tag in PRESERVE_WHITESPACE_TAGS:
+            self._preserve += 1
+        if tag in NOT_TEXT_TAGS:
+            self._not_text += 1
+        self._stack.append(element)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        self._flush()
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i].name == tag:
+                break
+        else:
+            return  # nothing to close
+        while len(self._stack) > i:
+            self._pop()
+
+    def handle_data(self, data):
+        self._data.append(data)
+
+    def handle_entityref(self, name):
+        # only called in python 2
+        try:
+            self._data.append(six.unichr(name2codepoint[name]))
+        except KeyError:
+            self._data.append('&%s' % (name, ))
+
+    def handle_charref(self, name):
+        # only called in python 2
+        try:
+            if name.lower().startswith('x'):
+                self._data.append(six.unichr(int(name[1:], 16)))
+            else:
+                self._data.append(six.unichr(int(name)))
+        except ValueError:
+            self._data.append('&#%s;' % (name, ))
+
+    def handle_comment(self, data):
+        self._flush()
+        if self._stack:
+            self._child(self._stack[-1], 'comment', data)
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def close(self):
+        HTMLParser.close(self)
+        self._flush()
+        while self._stack:
+            self._pop()
+
+    # building the tables
+
+    def _flush(self):
+        """end a string"""
+        if not self._data:
+            return
+        txt = ''.join(self._data)
+        self._data = []
+        if not self._preserve:
+            txt = _collapse(txt)
+        if not self._not_text:
+            self.texts.append(txt)
+        if self._stack:
+            self._child(self._stack[-1], 'text', txt)
+
+    def _child(self, parent, kind, value):
+        """add a child to an element"""
+        if parent.first is None:
+            parent.first = (kind, value)
+        if parent.parts is None:
+            return
+        if kind == 'elem' and value.name == 'br':
+            kind, value = 'text', '\n'  # as in tdbr2EOL
+        if kind == 'text' and parent.parts and parent.parts[-1][0] == 'text':
+            parent.parts[-1][1] += value
+        else:
+            parent.parts.append([kind, value])
+
+    def _pop(self):
+        """close the innermost open element"""
+        element = self._stack.pop()
+        element.textend = len(self.texts)
+        if element.name == 'table':
+            self._open_tables.pop()
+        elif element.name == 'tr':
+            self._open_rows.pop()
+        if element.name in PRESERVE_WHITESPACE_TAGS:
+            self._preserve -= 1
+        if element.name in NOT_TEXT_TAGS:
+            self._not_text -= 1
+
+    def get_text(self, element):
+        """all the text in an element"""
+        return ''.join(self.texts[element.textstart:element.textend])
+
+    def cell(self, element):
+        """the value of a <td>, as from table2matrix"""
+        parts = element.parts
+        if not parts:
+            return ''
+        if len(parts) > 1 or parts[0][0] == 'elem':
+            raise NotSimpleTable(
+                "Not able read a cell in the table as a string")
+        kind, value = parts[0]
+        if kind == 'text':
+            return _collapse(value)
+        return value
+
+    def matrix(self, table, tofloat=True):
+        """the table as a list of lists, as from table2matrix"""
+        for element in table.cells:
+            self.cell(element)  # check the whole table is simple
+        rows = []
+        for row in table.rows:
+            values = [self.cell(element) for element in row]
+            if tofloat:
+                values = [_tofloat(value) for value in values]
+            rows.append(values)
+        return rows
+
+    def title(self, table):
+        """the text of the first child of the <b> before a table"""
+        if table.title is None or table.title.first is None:
+            return ''
+        kind, value = table.title.first
+        if kind == 'elem':
+            return self.get_text(value)
+        return value
+
+    def lines(self, table):
+        """the lines before a table, as from lines_table"""
+        lines = (self.get_text(element) for element in table.lines)
+        return [line for line in lines if line]
+
+
+def _tofloat(value):
+    """convert a cell to a float if possible"""
+    if value == '':
+        return value
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def _scantables(html_doc):
+    """scan an html document (a string, bytes or file handle) for tables"""
+    scanner = _TableScanner()
+    if hasattr(html_doc, 'read'):
+        while True:
+            txt = html_doc.read(READ_SIZE)
+            if not txt:
+                break
+            if isinstance(txt, bytes):
+                txt = txt.decode('latin-1')
+            scanner.feed(txt)
+    else:
+        if isinstance(html_doc, bytes):
+            html_doc = html_doc.decode('latin-1')
+        scanner.feed(html_doc)
+    scanner.close()
+    return scanner
+
+
 def titletable(html_doc, tofloat=True):
     """return a list of [(title, table), .....]
 
     title = previous item with a <b> tag
-    table = rows -> [[cell1, cell2, ..], [cell1, cell2, ..], ..]"""
-    soup = BeautifulSoup(html_doc, "html.parser")
-    btables = soup.find_all(['b', 'table']) # find all the <b> and <table>
-    titletables = []
-    for i, item in enumerate(btables):
-        if item.name == 'table':
-            for j in range(i + 1):
-                if btables[i-j].name == 'b':# step back to find a <b>
-                    break
-            titletables.append((btables[i - j], item))
-    if tofloat:
-        t2m = table2val_matrix
-    else:
-        t2m = table2matrix
-    titlerows = [(tl.contents[0], t2m(tb)) for tl, tb in titletables]
-    return titlerows
+    table = rows -> [[cell1, cell2, ..], [cell1, cell2, ..], ..]
+
+    html_doc can be a string, bytes or a file handle. The document is read in
+    a single pass, see `_TableScanner`."""
+    scanner = _scantables(html_doc)
+    return [(scanner.title(table), scanner.matrix(table, tofloat))
+            for table in scanner.tables]
 
 def _has_name(soup_obj):
     """checks if soup_obj is really a soup object or just a string
@@ -128,48 +405,17 @@ def lines_table(html_doc, tofloat=True):
     table = rows -> [[cell1, cell2, ..], [cell1, cell2, ..], ..]
 
     The lines act as a description for what is in the table
+
+    html_doc can be a string, bytes or a file handle. The document is read in
+    a single pass, see `_TableScanner`.
     """
-    soup = BeautifulSoup(html_doc, "html.parser")
-    linestables = []
-    elements = soup.p.next_elements # start after the first para
-    for element in elements:
-        tabletup = []
-        if not _has_name(element):
-            continue
-        if element.name == 'table': # hit the first table
-            beforetable = []
-            prev_elements = element.previous_elements # walk back and get the lines
-            for prev_element in prev_elements:
-                if not _has_name(prev_element):
-                    continue
-                if prev_element.name not in ('br', None): # no lines here
-                    if prev_element.name in ('table', 'hr', 'tr', 'td'):
-                        # just hit the previous table. You got all the lines
-                        break
-                    if prev_element.parent.name == "p":
-                        # if the parent is "p", you will get it's text anyways from the parent
-                        pass
-                    else:
-                        if prev_element.get_text(): # skip blank lines
-                            beforetable.append(prev_element.get_text())
-            beforetable.reverse()
-            tabletup.append(beforetable)
-            function_selector = {True:table2val_matrix, False:table2matrix}
-            function = function_selector[tofloat]
-            tabletup.append(function(element))
-        if tabletup:
-            linestables.append(tabletup)
-    return linestables
-
-def _asciidigits(s):
-    """if s is not ascii or digit, return an '_' """
-    if s not in string.ascii_letters + string.digits:
-        s = '_'
-    return s
+    scanner = _scantables(html_doc)
+    return [[scanner.lines(table), scanner.matrix(table, tofloat)]
+            for table in scanner.tables if table.lines is not None]
 
 def _nospace(s):
     """replace all non-ascii, non_digit or space with '_' """
-    return ''.join([_asciidigits(i) for i in s])
+    return reporttable.sanitise(s)
 
 
 def _transpose(arr):
@@ -205,3 +451,17 @@ def named_grid_h(grid):
 def named_grid_v(grid):
     """make a vertical named grid"""
     return _make_ntgrid(_transpose(grid))
+
+def named_table_h(grid):
+    """make a horizontal named table
+
+    This is a `reporttable.ReportTable`, which gives the same attribute
+    access as `named_grid_h` without making new classes for each table,
+    and holds the values in a numpy array. Needs numpy."""
+    return reporttable.ReportTable.fromgrid(grid)
+
+def named_table_v(grid):
+    """make a vertical named table
+
+    The transpose of `named_table_h`."""
+    return reporttable.ReportTable.fromgrid(grid).T
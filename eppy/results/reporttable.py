@@ -0,0 +1,18 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""ReportTable has moved to `eppy.reporttable`, this module keeps the old
+imports working."""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from eppy.reporttable import ReportTable  # noqa: F401
+from eppy.reporttable import TableRow  # noqa: F401
+from eppy.reporttable import sanitise  # noqa: F401
+from eppy.reporttable import splitunits  # noqa: F401
+from eppy.reporttable import stack  # noqa: F401
@@ -0,0 +1,413 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""Query the EnergyPlus SQLite output (eplusout.sql).
+
+EnergyPlus writes this file when the IDF has an Output:SQLite object. It
+holds the tabular reports and the time series, so results can be read from
+it without parsing the html report or the ESO file::
+
+    >>> from eppy.results.sql import SQLOutput
+    >>> with SQLOutput('eplusout.sql') as sql:
+    ...     rows = sql.table('Site and Source Energy')
+    ...     series = sql.timeseries('Zone Mean Air Temperature',
+    ...                             frequencies='Hourly')
+
+The database is opened read-only. Each method runs one or two SQL
+statements however many tables or variables are asked for, and time series
+are split into numpy arrays without a python loop over the values.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+import os
+import sqlite3
+
+import six
+from six.moves.urllib.request import pathname2url
+
+from eppy.results.eso import Series
+from eppy.results.eso import _matches
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+TabularRecord = collections.namedtuple(
+    'TabularRecord', ['report', 'scope', 'table', 'row', 'column', 'units',
+                      'value', 'text'])
+TabularRecord.__doc__ = """One cell of a tabular report.
+
+Attributes
+----------
+report : str
+    Name of the report, e.g. 'AnnualBuildingUtilityPerformanceSummary'.
+scope : str
+    What the report is for, e.g. 'Entire Facility'.
+table : str
+    Name of the table, e.g. 'Site and Source Energy'.
+row : str
+    Label of the row.
+column : str
+    Name of the column.
+units : str
+    Units of the column.
+value : float or None
+    The value of the cell, None if it is not a number.
+text : str
+    The text of the cell if it is not a number, otherwise ''.
+
+"""
+
+Variable = collections.namedtuple(
+    'Variable', ['id', 'key', 'name', 'units', 'frequency', 'ismeter'])
+Variable.__doc__ = """A variable or meter in the ReportDataDictionary.
+
+Attributes
+----------
+id : int
+    The ReportDataDictionaryIndex.
+key : str
+    The key, e.g. the name of the zone, or '' for meters.
+name : str
+    Name of the variable, e.g. 'Zone Mean Air Temperature'.
+units : str
+    Units of the variable.
+frequency : str
+    Reporting frequency, e.g. 'Hourly'.
+ismeter : bool
+    True for meters.
+
+"""
+
+TIME_COLUMNS = ('Year', 'Month', 'Day', 'Hour', 'Minute', 'Dst', 'Interval',
+                'SimulationDays')
+
+
+# values passed as parameters in an IN clause, more are put in a temporary
+# table. SQLite allows 999 parameters in a statement by default.
+MAX_PARAMETERS = 250
+
+
+def _placeholders(values):
+    """'?, ?, ...' for the values of an IN clause"""
+    return ', '.join(['?'] * len(values))
+
+
+class SQLOutput(object):
+
+    """Read-only access to an eplusout.sql file.
+
+    Parameters
+    ----------
+    fname : str
+        Path to the SQLite output file.
+
+    """
+
+    def __init__(self, fname):
+        if not os.path.isfile(fname):
+            raise IOError("No such file: %s" % (fname, ))
+        self.fname = fname
+        try:
+            uri = 'file:%s?mode=ro' % (pathname2url(os.path.abspath(fname)), )
+            self.conn = sqlite3.connect(uri, uri=True)
+        except TypeError:  # python 2 has no uri argument
+            self.conn = sqlite3.connect(fname)
+        self._temptables = []
+
+    def close(self):
+        """Close the database."""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _in(self, column, values):
+        """an IN clause for column and its parameters. If there are more
+        than MAX_PARAMETERS values they are put in a temporary table, which
+        is dropped by `_droptemp`"""
+        if len(values) <= MAX_PARAMETERS:
+            return '%s IN (%s)' % (column, _placeholders(values)), list(values)
+        name = 'temp.invalues%i' % (len(self._temptables), )
+        self.conn.execute('CREATE TEMP TABLE %s (value)' % (name, ))
+        self._temptables.append(name)
+        self.conn.executemany('INSERT INTO %s VALUES (?)' % (name, ),
+                              ((value, ) for value in values))
+        return '%s IN (SELECT value FROM %s)' % (column, name), []
+
+    def _droptemp(self):
+        """drop the temporary tables made by `_in`"""
+        while self._temptables:
+            self.conn.execute('DROP TABLE %s' % (self._temptables.pop(), ))
+        self.conn.commit()
+
+    def _where(self, filters):
+        """a WHERE clause and its parameters from [(column, values)]"""
+        clauses, params = [], []
+        for column, values in filters:
+            if values is None:
+                continue
+            if isinstance(values, six.string_types):
+                values = [values]
+            clause, clauseparams = self._in(
+                '%s COLLATE NOCASE' % (column, ), values)
+            clauses.append(clause)
+            params.extend(clauseparams)
+        if not clauses:
+            return '', params
+        return ' WHERE ' + ' AND '.join(clauses), params
+
+    def tabulardata(self, tables=None, reports=None, scopes=None):
+        """Read cells of the tabular reports.
+
+        Parameters
+        ----------
+        tables : str or list of str, optional
+            Table names, e.g. 'Site and Source Energy' (default: all).
+        reports : str or list of str, optional
+            Report names, e.g. 'AnnualBuildingUtilityPerformanceSummary'
+            (default: all).
+        scopes : str or list of str, optional
+            What the reports are for, e.g. 'Entire Facility' (default: all).
+
+        Names are matched ignoring case.
+
+        Returns
+        -------
+        list of TabularRecord
+            In the order they are in the database.
+
+        """
+        records = []
+        for row in self._tabular(tables, reports, scopes):
+            text = (row[6] or '').strip()
+            try:
+                value, text = float(text), ''
+            except ValueError:
+                value = None
+            records.append(TabularRecord(*(row[:6] + (value, text))))
+        return records
+
+    def _tabular(self, tables, reports, scopes):
+        """the selected rows of TabularDataWithStrings"""
+        try:
+            where, params = self._where([('TableName', tables),
+                                         ('ReportName', reports),
+                                         ('ReportForString', scopes)])
+            return self.conn.execute(
+                'SELECT ReportName, ReportForString, TableName, RowName, '
+                'ColumnName, Units, Value FROM TabularDataWithStrings' +
+                where + ' ORDER BY TabularDataIndex', params).fetchall()
+        finally:
+            self._droptemp()
+
+    def table(self, table, report=None, scope=None, tofloat=True):
+        """Read one table as rows, like `HtmlReport.read`.
+
+        Parameters
+        ----------
+        table : str
+            Name of the table, e.g. 'Site and Source Energy'.
+        report : str, optional
+            Name of the report, needed if more than one report has a table
+            with this name.
+        scope : str, optional
+            What the report is for, as for report.
+        tofloat : bool, optional
+            Convert numbers to float (default: True).
+
+        Returns
+        -------
+        list of lists
+            The first row is '' then the column names with units in
+            brackets, each other row is the row name then the values.
+
+        Raises
+        ------
+        KeyError
+            If there is no such table.
+        ValueError
+            If more than one report has the table.
+
+        """
+        records = self._tabular(table, report, scope)
+        if not records:
+            raise KeyError("No table named %s" % (table, ))
+        reports = set(record[:2] for record in records)
+        if len(reports) > 1:
+            raise ValueError(
+                "%i reports have a table named %s, choose one with report "
+                "and scope: %s" % (len(reports), table, sorted(reports)))
+        columns, rows = [], collections.OrderedDict()
+        for _report, _scope, _table, row, column, units, value in records:
+            column = (column, units)
+            if column not in columns:
+                columns.append(column)
+            value = value or ''
+            if tofloat:
+                try:
+                    value = float(value)
+                except ValueError:
+                    pass
+            rows.setdefault(row, {})[column] = value
+        header = [''] + [
+            '%s [%s]' % column if column[1] else column[0]
+            for column in columns]
+        return [header] + [
+            [row] + [values.get(column, '') for column in columns]
+            for row, values in rows.items()]
+
+    def variables(self, names=None, keys=None, frequencies=None):
+        """Find variables and meters in the ReportDataDictionary.
+
+        Parameters
+        ----------
+        names : str, regex or list of them, optional
+            Variable names, matched ignoring case, or compiled regexes.
+        keys : str, regex or list of them, optional
+            Keys, e.g. zone names, matched as for names.
+        frequencies : str, regex or list of them, optional
+            Reporting frequencies, e.g. 'Hourly', matched as for names.
+
+        Returns
+        -------
+        list of Variable
+
+        """
+        cursor = self.conn.execute(
+            'SELECT ReportDataDictionaryIndex, KeyValue, Name, Units, '
+            'ReportingFrequency, IsMeter FROM ReportDataDictionary '
+            'ORDER BY ReportDataDictionaryIndex')
+        variables = [Variable(row[0], row[1] or '', row[2], row[3] or '',
+                              row[4], bool(row[5])) for row in cursor]
+        return [variable for variable in variables
+                if _matches(variable.name, names) and
+                _matches(variable.key, keys) and
+                _matches(variable.frequency, frequencies)]
+
+    def environments(self):
+        """Names of the environments, e.g. design days and run periods.
+
+        Returns
+        -------
+        dict
+            {EnvironmentPeriodIndex: EnvironmentName}
+
+        """
+        cursor = self.conn.execute(
+            'SELECT EnvironmentPeriodIndex, EnvironmentName '
+            'FROM EnvironmentPeriods')
+        return dict(cursor.fetchall())
+
+    def timeseries(self, names=None, keys=None, frequencies=None,
+                   environments=None, warmup=False):
+        """Read time series of variables and meters.
+
+        All the selected series are read with one SQL statement and split
+        into arrays with numpy.
+
+        Parameters
+        ----------
+        names : str, regex or list of them, optional
+            Variable names, matched ignoring case, or compiled regexes
+            (default: all variables).
+        keys : str, regex or list of them, optional
+            Keys, e.g. zone names, matched as for names.
+        frequencies : str, regex or list of them, optional
+            Reporting frequencies, e.g. 'Hourly', matched as for names.
+        environments : str, regex or list of them, optional
+            Environment names, matched as for names (default: all).
+        warmup : bool, optional
+            Include values from warmup days (default: False).
+
+        Returns
+        -------
+        list of eppy.results.eso.Series
+            One series per variable and environment, in the order of the
+            environments and then of the variables. times has one column
+            per name in TIME_COLUMNS.
+
+        """
+        if np is None:
+            raise ImportError("SQLOutput.timeseries needs numpy")
+        variables = dict((variable.id, variable) for variable in
+                         self.variables(names, keys, frequencies))
+        envnames = dict((index, name) for index, name in
+                        self.environments().items()
+                        if _matches(name, environments))
+        if not variables or not envnames:
+            return []
+        try:
+            varclause, params = self._in(
+                'd.ReportDataDictionaryIndex', list(variables))
+            envclause, envparams = self._in(
+                't.EnvironmentPeriodIndex', list(envnames))
+            sql = (
+                'SELECT t.EnvironmentPeriodIndex, '
+                'd.ReportDataDictionaryIndex, ' +
+                ', '.join('t.%s' % (column, ) for column in TIME_COLUMNS) +
+                ', d.Value FROM ReportData d JOIN Time t USING (TimeIndex) '
+                'WHERE ' + varclause + ' AND ' + envclause)
+            if not warmup:
+                sql += ' AND (t.WarmupFlag IS NULL OR t.WarmupFlag = 0)'
+            sql += (' ORDER BY t.EnvironmentPeriodIndex, '
+                    'd.ReportDataDictionaryIndex, t.TimeIndex')
+            rows = self.conn.execute(sql, params + envparams).fetchall()
+        finally:
+            self._droptemp()
+        if not rows:
+            return []
+        data = np.array(rows, dtype=float)  # NULL becomes nan
+        keys = data[:, :2]
+        starts = np.flatnonzero(np.any(keys[1:] != keys[:-1], axis=1)) + 1
+        starts = np.concatenate([[0], starts, [len(data)]])
+        result = []
+        for start, end in zip(starts[:-1], starts[1:]):
+            envindex, varindex = keys[start]
+            result.append(Series(
+                variables[int(varindex)], envnames[int(envindex)],
+                TIME_COLUMNS, data[start:end, 2:-1], data[start:end, -1]))
+        return result
+
+    def dataframe(self, names=None, keys=None, frequencies=None,
+                  environments=None, warmup=False):
+        """Read time series into a long pandas DataFrame.
+
+        The arguments are as for `timeseries`.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per value, with columns environment, key, name, units,
+            frequency, the columns in TIME_COLUMNS and value.
+
+        """
+        import pandas as pd  # optional
+        frames = []
+        for series in self.timeseries(
+                names, keys, frequencies, environments, warmup):
+            frame = pd.DataFrame(series.times, columns=TIME_COLUMNS)
+            frame.insert(0, 'environment', series.environment)
+            for i, field in enumerate(
+                    ['key', 'name', 'units', 'frequency']):
+                frame.insert(i + 1, field, getattr(series.variable, field))
+            frame['value'] = series.values
+            frames.append(frame)
+        if not frames:
+            return pd.DataFrame(
+                columns=['environment', 'key', 'name', 'units', 'frequency'] +
+                list(TIME_COLUMNS) + ['value'])
+        return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,403 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""A column-oriented store for the results of parameter sweeps.
+
+Results are appended row by row, or many rows at a time, and kept as one
+typed numpy array per column: floats and integers as float64 and int64,
+strings as int32 codes into a list of the distinct strings. The arrays
+grow in fixed size chunks, and full chunks can be spilled to memory-mapped
+files so that the store is not limited by memory::
+
+    >>> from eppy.results.store import ResultStore
+    >>> store = ResultStore([('variant', 'str'), ('metric', 'str'),
+    ...                      ('value', 'float')])
+    >>> store.append(('insulation_100mm', 'Total Site Energy', 3206.37))
+    >>> store.groupby('metric', 'value', agg='mean')
+    OrderedDict([('Total Site Energy', 3206.37)])
+
+With no columns the store has the columns of `eppy.results.batch.Record`,
+and can be passed as the output of `eppy.results.batch.extract`.
+
+Needs numpy.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+import itertools
+import os
+import shutil
+import tempfile
+
+import six
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# the columns of eppy.results.batch.Record
+RECORD_COLUMNS = (
+    ('run_id', 'int'), ('report', 'str'), ('scope', 'str'), ('table', 'str'),
+    ('row', 'str'), ('column', 'str'), ('units', 'str'), ('value', 'float'),
+    ('text', 'str'))
+# rows in each chunk of a column
+CHUNKSIZE = 65536
+# aggregates for ResultStore.groupby
+AGGREGATES = ('count', 'sum', 'mean', 'min', 'max')
+
+
+class _Column(object):
+    """the chunks of one column while they are filled"""
+
+    def __init__(self, name, kind, chunksize):
+        if kind not in ('float', 'int', 'str'):
+            raise ValueError(
+                "Unknown column type %s for %s, use 'float', 'int' or "
+                "'str'" % (kind, name))
+        self.name = name
+        self.kind = kind
+        self.dtype = {'float': np.float64, 'int': np.int64,
+                      'str': np.int32}[kind]
+        self.chunks = []  # full chunks, arrays or memmaps
+        self.current = np.empty(chunksize, dtype=self.dtype)
+        self.categories = []  # the distinct strings
+        self.codes = {}  # {string: code}
+
+    def encode(self, values):
+        """values as an array for this column"""
+        if self.kind == 'str':
+            codes = self.codes
+            result = []
+            for value in values:
+                if value is None:
+                    result.append(-1)
+                    continue
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(self.categories)
+                    self.categories.append(value)
+                result.append(code)
+            return np.array(result, dtype=self.dtype)
+        if self.kind == 'float':
+            return np.array([np.nan if value is None else value
+                             for value in values], dtype=self.dtype)
+        return np.array(values, dtype=self.dtype)
+
+    def decode(self, codes):
+        """strings from codes, as an object array"""
+        categories = np.array(self.categories + [None], dtype=object)
+        return categories[codes]  # -1 is the None at the end
+
+
+class ResultStore(object):
+
+    """Typed, column-oriented storage for many result rows.
+
+    Parameters
+    ----------
+    columns : list of tuples, optional
+        (name, type) of each column, where type is 'float', 'int' or 'str'
+        (default: the columns of `eppy.results.batch.Record`).
+    chunksize : int, optional
+        Number of rows in each chunk of the arrays (default: CHUNKSIZE).
+    spill : str, optional
+        Directory to spill full chunks to. Each chunk is then written to a
+        .npy file and read back as a read-only memmap, so only the chunk
+        being filled is held in memory. The files are in a new directory
+        in spill, which `discard` removes.
+
+    """
+
+    def __init__(self, columns=None, chunksize=CHUNKSIZE, spill=None):
+        if np is None:
+            raise ImportError("ResultStore needs numpy")
+        if columns is None:
+            columns = RECORD_COLUMNS
+        if isinstance(columns, dict):
+            columns = columns.items()
+        self.chunksize = chunksize
+        self._columns = collections.OrderedDict(
+            (name, _Column(name, kind, chunksize)) for name, kind in columns)
+        self._filled = 0  # rows in the current chunk
+        self.spill = spill
+        self.spill_dir = None  # made when the first chunk is spilled
+
+    @property
+    def columns(self):
+        """names of the columns"""
+        return list(self._columns)
+
+    def __len__(self):
+        chunks = len(next(iter(self._columns.values())).chunks)
+        return chunks * self.chunksize + self._filled
+
+    @property
+    def nbytes(self):
+        """bytes of the arrays held in memory, not counting spilled chunks"""
+        total = 0
+        for column in self._columns.values():
+            total += column.current.nbytes
+            total += sum(chunk.nbytes for chunk in column.chunks
+                         if not isinstance(chunk, np.memmap))
+        return total
+
+    def append(self, row):
+        """Append one row.
+
+        Parameters
+        ----------
+        row : sequence or dict
+            The values in the order of the columns, or {column: value}.
+            Missing floats and strings can be None.
+
+        """
+        self.extend([row])
+
+    def extend(self, rows):
+        """Append many rows.
+
+        Parameters
+        ----------
+        rows : iterable
+            Rows as for `append`.
+
+        """
+        rows = iter(rows)
+        names = self.columns
+        while True:
+            batch = list(itertools.islice(
+                rows, self.chunksize - self._filled))
+            if not batch:
+                return
+            if isinstance(batch[0], dict):
+                values = [[row.get(name) for row in batch] for name in names]
+            else:
+                values = list(zip(*batch))
+                if len(values) != len(names):
+                    raise ValueError("Rows have %i values, the store has %i "
+                                     "columns" % (len(values), len(names)))
+            end = self._filled + len(batch)
+            for column, columnvalues in zip(self._columns.values(), values):
+                column.current[self._filled:end] = column.encode(columnvalues)
+            self._filled = end
+            if self._filled == self.chunksize:
+                self._seal()
+
+    def _seal(self):
+        """move the full current chunks to the list of chunks"""
+        if self.spill is not None and self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(
+                prefix='eppystore', dir=self.spill)
+        for i, column in enumerate(self._columns.values()):
+            chunk = column.current
+            if self.spill_dir is not None:
+                fname = os.path.join(self.spill_dir, 'c%i.%06i.npy' % (
+                    i, len(column.chunks)))
+                mapped = np.lib.format.open_memmap(
+                    fname, mode='w+', dtype=column.dtype, shape=chunk.shape)
+                mapped[:] = chunk
+                mapped.flush()
+                del mapped
+                column.chunks.append(np.load(fname, mmap_mode='r'))
+            else:
+                column.chunks.append(chunk)
+                column.current = np.empty(self.chunksize, dtype=column.dtype)
+        self._filled = 0
+
+    def write(self, records):
+        """Append records, for `eppy.results.batch.extract`."""
+        self.extend(records)
+
+    def close(self):
+        """Finish writing, for `eppy.results.batch.extract`.
+
+        The store can still be read and appended to.
+        """
+
+    def discard(self):
+        """Remove all the rows, and the spill files."""
+        for column in self._columns.values():
+            column.chunks = []
+            column.categories, column.codes = [], {}
+        self._filled = 0
+        if self.spill_dir is not None:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+            self.spill_dir = None
+
+    def _column(self, name):
+        try:
+            return self._columns[name]
+        except KeyError:
+            raise KeyError("No column named %s" % (name, ))
+
+    def codes(self, name):
+        """Read the raw array of one column.
+
+        Parameters
+        ----------
+        name : str
+            Name of the column.
+
+        Returns
+        -------
+        numpy.ndarray
+            The values, or the codes into `categories` for a string column
+            (-1 for None).
+
+        """
+        column = self._column(name)
+        return np.concatenate(
+            column.chunks + [column.current[:self._filled]])
+
+    def categories(self, name):
+        """The distinct strings of a string column, in order of their codes.
+        """
+        return list(self._column(name).categories)
+
+    def column(self, name):
+        """Read one column.
+
+        Parameters
+        ----------
+        name : str
+            Name of the column.
+
+        Returns
+        -------
+        numpy.ndarray
+            float64 or int64 values, or an object array of strings.
+
+        """
+        column = self._column(name)
+        values = self.codes(name)
+        if column.kind == 'str':
+            return column.decode(values)
+        return values
+
+    def mask(self, where):
+        """Select rows by the values of columns.
+
+        Parameters
+        ----------
+        where : dict
+            {column: value or list of values}, all of which must match.
+
+        Returns
+        -------
+        numpy.ndarray
+            A boolean array, True for the selected rows.
+
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for name, values in where.items():
+            column = self._column(name)
+            if isinstance(values, six.string_types) or not isinstance(
+                    values, (list, tuple, set)):
+                values = [values]
+            if column.kind == 'str':
+                values = [column.codes.get(value, -2) if value is not None
+                          else -1 for value in values]
+            mask &= np.isin(self.codes(name), list(values))
+        return mask
+
+    def groupby(self, by, value, agg='mean', where=None):
+        """Aggregate one column over groups of rows.
+
+        Parameters
+        ----------
+        by : str or list of str
+            Columns to group by, e.g. the variant parameters.
+        value : str
+            The float or int column to aggregate.
+        agg : str, optional
+            One of AGGREGATES (default: 'mean'). NaN values are left out.
+        where : dict, optional
+            Only aggregate the rows selected by `mask`.
+
+        Returns
+        -------
+        collections.OrderedDict
+            {group: aggregate}, where group is the value of by, or a tuple
+            of the values if by is a list. Groups are in order of the codes
+            of string columns, which is None first and then the order they
+            were first appended, and of the values of numeric columns.
+
+        """
+        if agg not in AGGREGATES:
+            raise ValueError("Unknown aggregate %s, use one of %s" % (
+                agg, ', '.join(AGGREGATES)))
+        single = isinstance(by, six.string_types)
+        if single:
+            by = [by]
+        if self._column(value).kind == 'str':
+            raise ValueError("Cannot aggregate the string column %s" % (
+                value, ))
+        values = self.codes(value).astype(float)
+        keep = ~np.isnan(values)
+        if where:
+            keep &= self.mask(where)
+        values = values[keep]
+        if not len(values):
+            return collections.OrderedDict()
+        # combine the keys into one integer per row
+        uniques, combined = [], np.zeros(len(values), dtype=np.int64)
+        for name in by:
+            unique, inverse = np.unique(
+                self.codes(name)[keep], return_inverse=True)
+            uniques.append(unique)
+            combined = combined * len(unique) + inverse
+        groups, group_ids = np.unique(combined, return_inverse=True)
+        ngroups = len(groups)
+        if agg in ('count', 'sum', 'mean'):
+            counts = np.bincount(group_ids, minlength=ngroups)
+            sums = np.bincount(group_ids, weights=values, minlength=ngroups)
+            result = {'count': counts, 'sum': sums,
+                      'mean': sums / np.maximum(counts, 1)}[agg]
+        else:
+            order = np.argsort(group_ids, kind='mergesort')
+            starts = np.flatnonzero(np.r_[True, np.diff(group_ids[order])])
+            reduce = np.minimum if agg == 'min' else np.maximum
+            result = reduce.reduceat(values[order], starts)
+        # split the combined keys back into the values of each column
+        keys, remaining = [], groups
+        for name, unique in reversed(list(zip(by, uniques))):
+            index = remaining % len(unique)
+            remaining = remaining // len(unique)
+            column = self._columns[name]
+            if column.kind == 'str':
+                keys.append(column.decode(unique[index]).tolist())
+            else:
+                keys.append(unique[index].tolist())
+        keys = list(zip(*reversed(keys)))
+        if single:
+            keys = [key[0] for key in keys]
+        return collections.OrderedDict(zip(keys, result.tolist()))
+
+    def to_dataframe(self):
+        """Read the store into a pandas DataFrame.
+
+        String columns become categoricals, which keep the memory used
+        close to that of the store.
+
+        Returns
+        -------
+        pandas.DataFrame
+
+        """
+        import pandas as pd  # optional
+        data = collections.OrderedDict()
+        for name, column in self._columns.items():
+            values = self.codes(name)
+            if column.kind == 'str':
+                values = pd.Categorical.from_codes(values, column.categories)
+            data[name] = values
+        return pd.DataFrame(data, columns=self.columns)
@@ -0,0 +1,479 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""Executors to run batches of EnergyPlus jobs.
+
+An executor has a single method, `map(func, iterable, initializer=None,
+initargs=())`, which calls `func` on each item and returns a list of the
+results in order, like `multiprocessing.Pool.map`. If `initializer` is
+given it is called with `initargs` once in each worker before any jobs.
+
+- SerialExecutor runs the jobs one at a time in this process.
+- ThreadExecutor runs the jobs in a pool of threads. This works well for
+  EnergyPlus runs since the work is done in a subprocess.
+- ProcessExecutor runs the jobs in a `multiprocessing.Pool`.
+- FileQueueExecutor puts the jobs in a directory which can be shared
+  between several machines. Workers started on each machine with::
+
+      python -m eppy.runner.executors /shared/queue
+
+  claim jobs from the directory and write back the results. The executor
+  can also start local worker processes itself.
+
+`mapchunks` maps a function over a long list of jobs with an executor, one
+chunk at a time.
+
+`func`, `initializer` and the items must be picklable for ProcessExecutor
+and FileQueueExecutor, i.e. module level functions and plain data.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import errno
+import os
+import pickle
+import shutil
+import socket
+import tempfile
+import time
+
+try:
+    import multiprocessing as mp
+    from multiprocessing.pool import ThreadPool
+except ImportError:
+    pass
+
+
+# seconds between checks of the file queue
+POLL_INTERVAL = 0.5
+
+
+class Executor(object):
+
+    """Base class for executors."""
+
+    def map(self, func, iterable, initializer=None, initargs=()):
+        """Call func on each item of iterable and return the results.
+
+        Parameters
+        ----------
+        func : callable
+            Function of one argument.
+        iterable : iterable
+            Arguments for func.
+        initializer : callable, optional
+            Called once in each worker before any jobs are run.
+        initargs : tuple, optional
+            Arguments for initializer.
+
+        Returns
+        -------
+        list
+            The results, in the same order as iterable.
+
+        """
+        raise NotImplementedError
+
+
+class SerialExecutor(Executor):
+
+    """Run jobs one at a time in this process."""
+
+    def map(self, func, iterable, initializer=None, initargs=()):
+        if initializer is not None:
+            initializer(*initargs)
+        return [func(item) for item in iterable]
+
+
+class ThreadExecutor(Executor):
+
+    """Run jobs in a pool of threads.
+
+    Parameters
+    ----------
+    processes : int, optional
+        Number of threads (default: number of CPUs).
+
+    """
+
+    def __init__(self, processes=None):
+        self.processes = processes
+
+    def map(self, func, iterable, initializer=None, initargs=()):
+        pool = ThreadPool(self.processes, initializer, initargs)
+        try:
+            return pool.map(func, iterable)
+        finally:
+            pool.close()
+            pool.join()
+
+
+class ProcessExecutor(Executor):
+
+    """Run jobs in a pool of processes.
+
+    Falls back to running the jobs one at a time if multiprocessing is not
+    available.
+
+    Parameters
+    ----------
+    processes : int, optional
+        Number of processes (default: number of CPUs).
+
+    """
+
+    def __init__(self, processes=None):
+        self.processes = processes
+
+    def map(self, func, iterable, initializer=None, initargs=()):
+        try:
+            pool = mp.Pool(self.processes, initializer, initargs)
+        except NameError:
+            # multiprocessing not present so pass the jobs one at a time
+            return SerialExecutor().map(func, iterable, initializer, initargs)
+        try:
+            return pool.map(func, iterable)
+        finally:
+            pool.close()
+            pool.join()
+
+
+class FileQueueExecutor(Executor):
+
+    """Run jobs through a queue directory shared by several workers.
+
+    Each call to map makes a batch directory in the queue directory, holding
+    the initializer and one file per job. Workers claim a job by renaming its
+    file, which is atomic on a shared filesystem, and write back the result.
+    Start workers on any machine which can see the queue directory with
+    `fileworker` or::
+
+        python -m eppy.runner.executors /shared/queue
+
+    Any paths in the jobs must be valid on all the machines, e.g. absolute
+    paths on the shared filesystem.
+
+    While waiting, jobs claimed by workers which have died are put back in
+    the queue, see `requeue`. A worker on this machine which has died is
+    found from its process ID; for workers on other machines give a
+    claim_timeout longer than any job takes.
+
+    Parameters
+    ----------
+    queue_dir : str
+        Path to the queue directory. It is made if it does not exist.
+    workers : int, optional
+        Number of local worker processes to start for each batch, in
+        addition to any workers already watching the queue (default: 0).
+    timeout : float, optional
+        Seconds to wait for a batch to finish before raising
+        QueueTimeoutError (default: wait forever).
+    poll : float, optional
+        Seconds between checks for finished jobs.
+    claim_timeout : float, optional
+        Seconds after which a job claimed by a worker is put back in the
+        queue if it has no result (default: never).
+
+    """
+
+    def __init__(self, queue_dir, workers=0, timeout=None,
+                 poll=POLL_INTERVAL, claim_timeout=None):
+        self.queue_dir = os.path.abspath(queue_dir)
+        self.workers = workers
+        self.timeout = timeout
+        self.claim_timeout = claim_timeout
+        self.poll = poll
+        if not os.path.isdir(self.queue_dir):
+            os.makedirs(self.queue_dir)
+
+    def map(self, func, iterable, initializer=None, initargs=()):
+        batch_dir = tempfile.mkdtemp(prefix='batch-', dir=self.queue_dir)
+        local_workers = []
+        try:
+            results_dir = os.path.join(batch_dir, 'results')
+            os.mkdir(results_dir)
+            os.mkdir(os.path.join(batch_dir, 'claimed'))
+            _dump((initializer, initargs), os.path.join(batch_dir, 'init'))
+            # workers only look for jobs once the jobs directory exists
+            staging_dir = os.path.join(batch_dir, 'staging')
+            os.mkdir(staging_dir)
+            num_jobs = 0
+            for item in iterable:
+                _dump((func, item),
+                      os.path.join(staging_dir, _jobname(num_jobs)))
+                num_jobs += 1
+            os.rename(staging_dir, os.path.join(batch_dir, 'jobs'))
+
+            for _ in range(self.workers):
+                worker = mp.Process(target=fileworker,
+                                    args=(self.queue_dir,),
+                                    kwargs={'poll': self.poll})
+                worker.daemon = True
+                worker.start()
+                local_workers.append(worker)
+            start = time.time()
+            while _finished(results_dir) < num_jobs:
+                if (self.timeout is not None and
+                        time.time() - start > self.timeout):
+                    raise QueueTimeoutError(
+                        "%i of %i jobs in %s not finished after %s seconds" %
+                        (num_jobs - _finished(results_dir), num_jobs,
+                         batch_dir, self.timeout))
+                time.sleep(self.poll)
+                if local_workers:
+                    mp.active_children()  # reap the workers which have died
+                requeue(batch_dir, self.claim_timeout)
+            outcomes = [_load(os.path.join(results_dir, _jobname(i)))
+                        for i in range(num_jobs)]
+        finally:
+            for worker in local_workers:
+                worker.terminate()
+                worker.join()
+            # so that no more jobs are claimed if the batch failed
+            shutil.rmtree(batch_dir, ignore_errors=True)
+        results = []
+        for succeeded, result in outcomes:
+            if not succeeded:
+                raise result
+            results.append(result)
+        return results
+
+
+def mapchunks(func, jobs, processes=None, executor=None, chunksize=None):
+    """Map func over jobs with an executor, one chunk of jobs at a time.
+
+    Used to read the outputs of many runs, so that the results of a chunk
+    can be written out before the next chunk is read and only one chunk of
+    results is held in memory.
+
+    Parameters
+    ----------
+    func : function
+        Function to call on each job, must be picklable for
+        ProcessExecutor and FileQueueExecutor.
+    jobs : list
+        Arguments for each call of func.
+    processes : int, optional
+        Number of processes for the default executor (default: number of
+        CPUs).
+    executor : Executor, optional
+        How to run the jobs (default: a ProcessExecutor with `processes`
+        processes).
+    chunksize : int, optional
+        Number of jobs in each chunk (default: 64 per process).
+
+    Yields
+    ------
+    list
+        The results of func for each chunk of jobs, in order.
+
+    """
+    if executor is None:
+        executor = ProcessExecutor(processes)
+    if chunksize is None:
+        try:
+            chunksize = 64 * (processes or mp.cpu_count())
+        except NameError:
+            chunksize = 64
+    for start in range(0, len(jobs), chunksize):
+        yield executor.map(func, jobs[start:start + chunksize])
+
+
+class QueueTimeoutError(Exception):
+    """Exception Object"""
+    pass
+
+
+def _jobname(i):
+    """file name for job i of a batch"""
+    return '%08i' % i
+
+
+def _finished(results_dir):
+    """number of results written, leaving out those being written"""
+    return len([name for name in os.listdir(results_dir)
+                if not name.endswith('.tmp')])
+
+
+def _dump(obj, fname):
+    """pickle obj to fname so that it appears all at once"""
+    data = pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)  # before any file
+    tmpname = '%s.%s-%i.tmp' % (fname, socket.gethostname(), os.getpid())
+    with open(tmpname, 'wb') as f:
+        f.write(data)
+    os.rename(tmpname, fname)
+
+
+def _load(fname):
+    """unpickle from fname"""
+    with open(fname, 'rb') as f:
+        return pickle.load(f)
+
+
+def claimjob(queue_dir):
+    """Claim the next job from any batch in the queue directory.
+
+    Parameters
+    ----------
+    queue_dir : str
+        Path to the queue directory.
+
+    Returns
+    -------
+    tuple or None
+        (batch_dir, job_name, claimed_path), or None if there are no jobs.
+
+    """
+    try:
+        batches = sorted(os.listdir(queue_dir))
+    except OSError:
+        return None
+    claimant = '%s-%i' % (socket.gethostname(), os.getpid())
+    for batch in batches:
+        batch_dir = os.path.join(queue_dir, batch)
+        try:
+            jobs = sorted(os.listdir(os.path.join(batch_dir, 'jobs')))
+        except OSError:  # not a batch, or not ready yet
+            continue
+        for job in jobs:
+            claimed = os.path.join(batch_dir, 'claimed',
+                                   '%s.%s' % (job, claimant))
+            try:
+                os.rename(os.path.join(batch_dir, 'jobs', job), claimed)
+            except OSError:  # another worker got there first
+                continue
+            try:
+                os.utime(claimed, None)  # the age of the claim
+            except OSError:  # put back in the queue already
+                continue
+            return batch_dir, job, claimed
+    return None
+
+
+def requeue(batch_dir, claim_timeout=None):
+    """Put the jobs claimed by workers which have died back in the queue.
+
+    A claim is stale if the worker was on this machine and its process has
+    gone, or if it is older than claim_timeout. A job whose worker was only
+    slow may be run twice, which gives the same result.
+
+    Parameters
+    ----------
+    batch_dir : str
+        Path to the batch directory.
+    claim_timeout : float, optional
+        Seconds after which a claim is stale (default: never).
+
+    Returns
+    -------
+    list of str
+        Names of the jobs which were put back.
+
+    """
+    claimed_dir = os.path.join(batch_dir, 'claimed')
+    hostname = socket.gethostname()
+    jobs = []
+    for name in sorted(os.listdir(claimed_dir)):
+        job, _, claimant = name.partition('.')
+        host, _, pid = claimant.rpartition('-')
+        claimed = os.path.join(claimed_dir, name)
+        if host == hostname and pid.isdigit():
+            stale = not _pidalive(int(pid))
+        else:
+            stale = False
+        try:
+            if not stale and claim_timeout is not None:
+                stale = time.time() - os.path.getmtime(claimed) > claim_timeout
+            if stale and not os.path.exists(
+                    os.path.join(batch_dir, 'results', job)):
+                os.rename(claimed, os.path.join(batch_dir, 'jobs', job))
+                jobs.append(job)
+        except OSError:  # finished while we were looking
+            pass
+    return jobs
+
+
+def _pidalive(pid):
+    """True if there is a process with this ID on this machine"""
+    if os.name == 'nt':  # os.kill would end the process
+        return True
+    try:
+        os.kill(pid, 0)
+    except OSError as e:
+        return e.errno == errno.EPERM
+    return True
+
+
+def fileworker(queue_dir, idle_timeout=None, poll=POLL_INTERVAL):
+    """Run jobs from a FileQueueExecutor queue directory.
+
+    Runs until a file called 'stop' is put in the queue directory, or until
+    there have been no jobs for idle_timeout seconds.
+
+    Parameters
+    ----------
+    queue_dir : str
+        Path to the queue directory.
+    idle_timeout : float, optional
+        Seconds without jobs after which to stop (default: never).
+    poll : float, optional
+        Seconds between checks for new jobs.
+
+    """
+    current_batch = None
+    idle_since = time.time()
+    while not os.path.exists(os.path.join(queue_dir, 'stop')):
+        job = claimjob(queue_dir)
+        if job is None:
+            if (idle_timeout is not None and
+                    time.time() - idle_since > idle_timeout):
+                return
+            time.sleep(poll)
+            continue
+        batch_dir, job_name, claimed = job
+        try:
+            if batch_dir != current_batch:
+                initializer, initargs = _load(os.path.join(batch_dir, 'init'))
+                if initializer is not None:
+                    initializer(*initargs)
+                current_batch = batch_dir
+            func, item = _load(claimed)
+            outcome = (True, func(item))
+        except Exception as e:
+            outcome = (False, e)
+        result = os.path.join(batch_dir, 'results', job_name)
+        try:
+            try:
+                _dump(outcome, result)
+            except (pickle.PicklingError, TypeError, AttributeError) as e:
+                # send back an error which can be pickled instead
+                _dump((False, RuntimeError(
+                    "Could not pickle %r: %s" % (outcome[1], e))), result)
+            os.remove(claimed)
+        except (OSError, IOError):  # the batch was abandoned
+            pass
+        idle_since = time.time()
+
+
+def main():
+    """Start a worker for a FileQueueExecutor queue directory."""
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0])
+    parser.add_argument('queue_dir', help='path to the queue directory')
+    parser.add_argument('--idle-timeout', type=float, default=None,
+                        help='stop after this many seconds without jobs')
+    parser.add_argument('--poll', type=float, default=POLL_INTERVAL,
+                        help='seconds between checks for new jobs')
+    args = parser.parse_args()
+    fileworker(args.queue_dir, args.idle_timeout, args.poll)
+
+
+if __name__ == '__main__':
+    main()
@@ -12,13 +12,25 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import collections
+import csv
 import os
 import platform
 import pydoc
 import shutil
-from subprocess import CalledProcessError, check_call
+import stat
+from subprocess import PIPE, CalledProcessError, Popen, check_call
 import sys
 import tempfile
+import threading
+import time
+import warnings
+
+import six
+
+from eppy import json_functions
+from eppy.results import errfile
+from eppy.runner.executors import ProcessExecutor
 
 try:
     import multiprocessing as mp
@@ -26,6 +38,47 @@ except ImportError:
     pass
 
 
+RunResult = collections.namedtuple(
+    'RunResult',
+    ['run_id', 'idf', 'output_directory', 'exit_code', 'wall_time',
+     'cpu_time', 'max_rss', 'output_size', 'warnings', 'severe_errors'])
+RunResult.__doc__ = """Instrumentation collected for a single EnergyPlus run.
+
+Attributes
+----------
+run_id : int or None
+    Position of the job in a batch run, None for a single run.
+idf : str
+    Full path to the IDF which was run.
+output_directory : str
+    Full path to the output directory.
+exit_code : int
+    Exit code of the EnergyPlus process.
+wall_time : float
+    Wall-clock time of the run in seconds.
+cpu_time : float or None
+    User plus system CPU time of the EnergyPlus process (and any
+    processes it waited for) in seconds. None where `os.wait4` is not
+    available.
+max_rss : int or None
+    Peak resident set size of the EnergyPlus process in kilobytes. None
+    where `os.wait4` is not available.
+output_size : int
+    Total size in bytes of the output files written by the run, the files
+    in the output directory with the output prefix.
+warnings : int
+    Number of warnings in the EnergyPlus error file.
+severe_errors : int
+    Number of severe and fatal errors in the EnergyPlus error file.
+
+"""
+
+# bytes of stdout and stderr kept from each run for error messages
+CAPTURE_SIZE = 8192
+# severe errors from eplusout.err included in error messages
+MAX_ERRORS = 50
+
+
 def install_paths(version=None, iddname=None):
     """Get the install paths for EnergyPlus executable and weather files.
 
@@ -138,7 +191,7 @@ def wrapped_help_text(wrapped_func):
     return decorator
 
 
-def runIDFs(jobs, processors=1):
+def runIDFs(jobs, processors=1, summary=None, validate=False, executor=None):
     """Wrapper for run() to be used when running IDF5 runs in parallel.
 
     Parameters
@@ -149,24 +202,77 @@ def runIDFs(jobs, processors=1):
     processors : int, optional
         Number of processors to run on (default: 1). If 0 is passed then
         the process will run on all CPUs, -1 means one less than all CPUs, etc.
+    summary : str, optional
+        Path to a CSV file to write one row of run instrumentation per job.
+    validate : bool, optional
+        If True, check each IDF with `IDF.validate` first and do not run
+        the IDFs which have errors (default: False).
+    executor : eppy.runner.executors.Executor, optional
+        How to run the jobs, e.g. in threads or through a queue shared by
+        several machines (default: a ProcessExecutor with `processors`
+        processes).
+
+    Returns
+    -------
+    list of RunResult
+        One result per job, in the order the jobs were passed. Jobs rejected
+        by validation have an exit_code of None and the number of problems
+        found as their severe_errors.
 
     """
-    if processors <= 0:
-        processors = max(1, mp.cpu_count() - processors)
+    if executor is None:
+        if processors <= 0:
+            processors = max(1, mp.cpu_count() - processors)
+        executor = ProcessExecutor(processors)
 
     shutil.rmtree("multi_runs", ignore_errors=True)
     os.mkdir("multi_runs")
 
-    prepared_runs = (prepare_run(run_id, run_data) for run_id, run_data in enumerate(jobs))
-    try:
-        pool = mp.Pool(processors)
-        pool.map(multirunner, prepared_runs)
-        pool.close()
-    except NameError:
-        # multiprocessing not present so pass the jobs one at a time
-        for job in prepared_runs:
-            multirunner([job])
+    run_ids, prepared_runs, rejected = [], [], {}
+    for run_id, run_data in enumerate(jobs):
+        if validate:
+            issues = run_data[0].validate()
+            if issues:
+                rejected[run_id] = rejected_result(run_id, run_data, issues)
+                continue
+        run_ids.append(run_id)
+        prepared_runs.append(prepare_run(run_id, run_data))
+    results = executor.map(multirunner, prepared_runs)
     shutil.rmtree("multi_runs", ignore_errors=True)
+    results = dict((run_id, result._replace(run_id=run_id))
+                   for run_id, result in zip(run_ids, results))
+    results.update(rejected)
+    results = [results[run_id] for run_id in sorted(results)]
+    if summary:
+        write_summary(results, summary)
+    return results
+
+
+def rejected_result(run_id, run_data, issues):
+    """Result for a job which failed validation and so was not run.
+
+    Parameters
+    ----------
+    run_id : int
+        An ID number for the job.
+    run_data : tuple
+        The IDF and keyword args which would have been passed to run().
+    issues : list of eppy.validate.Issue
+        Problems found in the IDF.
+
+    Returns
+    -------
+    RunResult
+
+    """
+    idf, kwargs = run_data
+    warnings.warn("Run %i not started, the IDF has %i errors. First error: %s"
+                  % (run_id, len(issues), issues[0]), UserWarning)
+    output_dir = os.path.abspath(kwargs.get('output_directory', ''))
+    return RunResult(
+        run_id=run_id, idf=None, output_directory=output_dir,
+        exit_code=None, wall_time=None, cpu_time=None, max_rss=None,
+        output_size=None, warnings=0, severe_errors=len(issues))
 
 
 def prepare_run(run_id, run_data):
@@ -178,10 +284,16 @@ def prepare_run(run_id, run_data):
     """
     idf, kwargs = run_data
     epw = idf.epw
+    if os.path.isfile(epw):
+        epw = os.path.abspath(epw)
     idf_dir = os.path.join('multi_runs', 'idf_%i' % run_id)
     os.mkdir(idf_dir)
-    idf_path = os.path.join(idf_dir, 'in.idf')
+    idf_path = os.path.abspath(os.path.join(idf_dir, 'in.idf'))
     idf.saveas(idf_path)
+    # the job may run in another working directory, or on another machine
+    kwargs = dict(kwargs)
+    kwargs['output_directory'] = os.path.abspath(
+        kwargs.get('output_directory', ''))
     return (idf_path, epw), kwargs
 
 
@@ -193,8 +305,147 @@ def multirunner(args):
     args : list
         A list made up of a two-item list (IDF and EPW) and a kwargs dict.
 
+    Returns
+    -------
+    RunResult
+
+    """
+    return run(*args[0], **args[1])
+
+
+def runIDFvariants(idf, jobs, processors=1, summary=None, validate=False,
+                   executor=None):
+    """Run many variants of one IDF in parallel, sending only the changes.
+
+    Each worker process parses the base IDF once when it starts. A job is
+    then just a dict of changes in the `json_functions.updateidf` format,
+    e.g. {"idf.Building.Untitled.North_Axis": 30}, which the worker applies
+    to its copy of the IDF, saves and reverts before running EnergyPlus.
+    This avoids pickling and re-parsing a whole IDF for every job.
+
+    Parameters
+    ----------
+    idf : modeleditor.IDF
+        The base IDF. Its epw attribute is used as the weather file.
+    jobs : iterable
+        A list or generator of (changes, kwargs) pairs, where changes is a
+        dict for `json_functions.updateidf` and kwargs is a dict of keyword
+        args for `run_functions.run`.
+    processors : int, optional
+        Number of processors to run on (default: 1). If 0 is passed then
+        the process will run on all CPUs, -1 means one less than all CPUs, etc.
+    summary : str, optional
+        Path to a CSV file to write one row of run instrumentation per job.
+    validate : bool, optional
+        If True, check each variant with `IDF.validate` in the worker and do
+        not run the variants which have errors (default: False).
+    executor : eppy.runner.executors.Executor, optional
+        How to run the jobs (default: a ProcessExecutor with `processors`
+        processes). With a ThreadExecutor the threads share one copy of the
+        IDF and take turns to write their variants.
+
+    Returns
+    -------
+    list of RunResult
+        One result per job, in the order the jobs were passed.
+
+    Notes
+    -----
+    Workers need to be able to read the IDD. This is inherited from the
+    parent where processes are forked, otherwise the IDF.iddname must be a
+    file path.
+
     """
-    run(*args[0], **args[1])
+    if executor is None:
+        if processors <= 0:
+            processors = max(1, mp.cpu_count() - processors)
+        executor = ProcessExecutor(processors)
+
+    shutil.rmtree("multi_runs", ignore_errors=True)
+    os.mkdir("multi_runs")
+
+    iddname = idf.iddname
+    if not isinstance(iddname, six.string_types):
+        iddname = None  # a file handle, workers must inherit the IDD
+    ep_version = '-'.join(str(x) for x in idf.idd_version[:3])
+    epw = idf.epw
+    if os.path.isfile(epw):
+        epw = os.path.abspath(epw)
+    initargs = (idf.idfstr(), iddname, epw, ep_version, validate,
+                os.path.abspath("multi_runs"))
+    variants = []
+    for run_id, (changes, kwargs) in enumerate(jobs):
+        # the job may run in another working directory, or on another machine
+        kwargs = dict(kwargs)
+        kwargs['output_directory'] = os.path.abspath(
+            kwargs.get('output_directory', ''))
+        variants.append((run_id, changes, kwargs))
+    results = executor.map(variantrunner, variants, init_variant_worker,
+                           initargs)
+    shutil.rmtree("multi_runs", ignore_errors=True)
+    if summary:
+        write_summary(results, summary)
+    return results
+
+
+# the base IDF and settings held by each worker process of runIDFvariants
+_variant_base = {}
+# stops worker threads changing the shared base IDF at the same time
+_variant_lock = threading.Lock()
+
+
+def init_variant_worker(idftxt, iddname, epw, ep_version, validate,
+                        runs_dir='multi_runs'):
+    """Read the base IDF into a worker process of runIDFvariants.
+    """
+    from eppy.modeleditor import IDF  # modeleditor imports this module
+    with _variant_lock:
+        # threads in one process share the IDF, so only read it once
+        if _variant_base.get('idftxt') != idftxt:
+            if IDF.getiddname() is None:
+                IDF.setiddname(iddname)
+            _variant_base['idf'] = IDF(six.StringIO(idftxt), epw)
+            _variant_base['idftxt'] = idftxt
+        _variant_base['ep_version'] = ep_version
+        _variant_base['validate'] = validate
+        _variant_base['runs_dir'] = runs_dir
+
+
+def variantrunner(args):
+    """Apply the changes for one job to the worker's IDF and run it.
+
+    Parameters
+    ----------
+    args : tuple
+        The run ID, a dict of changes for `json_functions.updateidf` and a
+        kwargs dict for `run_functions.run`.
+
+    Returns
+    -------
+    RunResult
+
+    """
+    run_id, changes, kwargs = args
+    idf = _variant_base['idf']
+    undo = []
+    with _variant_lock:
+        try:
+            json_functions.updateidf(idf, changes, undo)
+            if _variant_base['validate']:
+                issues = idf.validate()
+                if issues:
+                    return rejected_result(run_id, (idf, kwargs), issues)
+            idf_dir = os.path.join(_variant_base['runs_dir'], 'idf_%i' % run_id)
+            os.mkdir(idf_dir)
+            idf_path = os.path.join(idf_dir, 'in.idf')
+            idf.savecopy(idf_path)
+        finally:
+            json_functions.revertidf(idf, undo)
+    kwargs = dict(kwargs)
+    kwargs.setdefault('ep_version', _variant_base['ep_version'])
+    weather = kwargs.pop('weather', idf.epw)
+    result = run(idf_path, weather, **kwargs)
+    return result._replace(run_id=run_id)
 
 
 def run(idf=None, weather=None, output_directory='', annual=False,
@@ -256,7 +507,9 @@ def run(idf=None, weather=None, output_directory='', annual=False,
 
     Returns
     -------
-    str : status
+    RunResult
+        Wall-clock time, CPU time, peak memory, output size and error counts
+        for the run.
 
     Raises
     ------
@@ -304,10 +557,9 @@ def run(idf=None, weather=None, output_directory='', annual=False,
     output_dir = os.path.abspath(args['output_directory'])
     args['output_directory'] = output_dir
 
-    # store the directory we start in
-    cwd = os.getcwd()
+    # run in a temporary directory, without changing our own working
+    # directory which may be shared with other threads
     run_dir = os.path.abspath(tempfile.mkdtemp())
-    os.chdir(run_dir)
 
     # build a list of command line arguments
     cmd = [eplus_exe_path]
@@ -320,35 +572,284 @@ def run(idf=None, weather=None, output_directory='', annual=False,
                 cmd.extend([args[arg]])
     cmd.extend([idf_path])
 
+    err_file = os.path.join(
+        output_dir, err_filename(output_prefix, output_suffix))
+    # capture the output of this run, not whatever is in our own stderr
+    stdout_file = tempfile.TemporaryFile()
+    stderr_file = tempfile.TemporaryFile()
+    exit_code, rusage = 0, None
+    start_time = time.time()
     try:
         if verbose == 'v':
             print("\r\n" + " ".join(cmd) + "\r\n")
-            check_call(cmd)
+            # show stderr as it comes, and keep it for the error message
+            exit_code, rusage = wait_call(
+                cmd, tee=stderr_file, cwd=run_dir, stderr=PIPE)
         elif verbose == 'q':
-            check_call(cmd, stdout=open(os.devnull, 'w'))
+            exit_code, rusage = wait_call(
+                cmd, cwd=run_dir, stdout=stdout_file, stderr=stderr_file)
+        if exit_code != 0:
+            raise CalledProcessError(exit_code, cmd)
     except CalledProcessError:
-        message = parse_error(output_dir)
+        message = parse_error(output_dir, std_err=tail(stderr_file),
+                              err_file=err_file, std_out=tail(stdout_file))
         raise EnergyPlusRunError(message)
     finally:
-        os.chdir(cwd)
-    return 'OK'
+        stdout_file.close()
+        stderr_file.close()
+    wall_time = time.time() - start_time
+    num_warnings, num_severe = count_errors(err_file)
+    cpu_time, max_rss = None, None
+    if rusage is not None:
+        cpu_time = rusage.ru_utime + rusage.ru_stime
+        max_rss = rusage.ru_maxrss
+        if platform.system() == 'Darwin':
+            max_rss //= 1024  # reported in bytes rather than kilobytes
+    return RunResult(
+        run_id=None, idf=idf_path, output_directory=output_dir,
+        exit_code=exit_code, wall_time=wall_time, cpu_time=cpu_time,
+        max_rss=max_rss,
+        output_size=outputs_size(output_dir, output_prefix or 'eplus',
+                                 start_time),
+        warnings=num_warnings, severe_errors=num_severe)
+
+
+def wait_call(cmd, tee=None, **kwargs):
+    """Run a command and wait for it, collecting its resource usage.
 
+    Parameters
+    ----------
+    cmd : list
+        The command and its arguments.
+    tee : file, optional
+        File opened in binary mode. If given, with stderr=PIPE, the stderr
+        of the process is written to this file and to our own stderr as it
+        comes.
+    **kwargs
+        Keyword arguments passed to `subprocess.Popen`.
+
+    Returns
+    -------
+    exit_code : int
+        Exit code of the process, negative if it was killed by a signal.
+    rusage : resource.struct_rusage or None
+        Resource usage of the process, None where `os.wait4` is not
+        available (e.g. on Windows).
 
-def parse_error(output_dir):
-    """Add contents of stderr and eplusout.err and put it in the exception message.
+    """
+    proc = Popen(cmd, **kwargs)
+    copier = None
+    if tee is not None:
+        copier = threading.Thread(target=_tee, args=(proc.stderr, tee))
+        copier.daemon = True
+        copier.start()
+    try:
+        try:
+            wait4 = os.wait4
+        except AttributeError:
+            return proc.wait(), None
+        _pid, status, rusage = wait4(proc.pid, 0)
+        if os.WIFSIGNALED(status):
+            proc.returncode = -os.WTERMSIG(status)
+        else:
+            proc.returncode = os.WEXITSTATUS(status)
+        return proc.returncode, rusage
+    finally:
+        if copier is not None:
+            copier.join()
+
+
+def _tee(pipe, fhandle):
+    """copy the output of a process from a pipe to a file and to our own
+    stderr until it ends"""
+    stream = getattr(sys.stderr, 'buffer', sys.stderr)  # bytes
+    try:
+        while True:
+            chunk = os.read(pipe.fileno(), 4096)
+            if not chunk:
+                break
+            fhandle.write(chunk)
+            try:
+                stream.write(chunk)
+                stream.flush()
+            except (TypeError, ValueError):  # a text stream, e.g. captured
+                sys.stderr.write(chunk.decode('utf-8', 'replace'))
+    finally:
+        pipe.close()
+
+
+def err_filename(output_prefix=None, output_suffix=None):
+    """Get the name of the EnergyPlus error file for a run.
+
+    Parameters
+    ----------
+    output_prefix : str, optional
+        Prefix for output file names (default: eplus)
+    output_suffix : str, optional
+        Suffix style for output file names (default: L)
+
+    Returns
+    -------
+    str
+
+    """
+    prefix = output_prefix or 'eplus'
+    if (output_suffix or 'L') == 'L':
+        return '{}out.err'.format(prefix)
+    return '{}.err'.format(prefix)
+
+
+def count_errors(err_file):
+    """Count the warnings and severe errors in an EnergyPlus error file.
+
+    The file is read line by line so large error files are not held in
+    memory. Fatal errors are counted as severe errors.
+
+    Parameters
+    ----------
+    err_file : str
+        Path to the EnergyPlus error file.
+
+    Returns
+    -------
+    tuple
+        (warnings, severe_errors), or (0, 0) if the file does not exist.
+
+    """
+    if not os.path.isfile(err_file):
+        return 0, 0
+    counts = errfile.counterrors(err_file)
+    return counts['Warning'], counts['Severe'] + counts['Fatal']
+
+
+def tail(fhandle, size=None):
+    """Get the end of the output captured in a file.
+
+    Parameters
+    ----------
+    fhandle : file
+        File opened in binary mode which the output was written to.
+    size : int, optional
+        Maximum number of bytes to read (default: CAPTURE_SIZE).
+
+    Returns
+    -------
+    str
+
+    """
+    size = size or CAPTURE_SIZE
+    fhandle.seek(0, os.SEEK_END)
+    start = max(0, fhandle.tell() - size)
+    fhandle.seek(start)
+    text = fhandle.read().decode('utf-8', 'replace')
+    if start:
+        text = '...' + text
+    return text
+
+
+def outputs_size(path, prefix, since):
+    """Total size in bytes of the output files of a run.
+
+    Only the files in `path` whose names start with `prefix` and which were
+    modified since the run started are counted, so other files in the
+    output directory (which may be the current directory) are left out.
+
+    Parameters
+    ----------
+    path : str
+        Path to the output directory.
+    prefix : str
+        Prefix of the output file names.
+    since : float
+        Time the run started, as from `time.time`.
+
+    Returns
+    -------
+    int
+
+    """
+    since = int(since)  # modification times may be rounded down to seconds
+    size = 0
+    for filename in os.listdir(path):
+        if not filename.startswith(prefix):
+            continue
+        try:
+            info = os.stat(os.path.join(path, filename))
+        except OSError:  # removed while we were listing the directory
+            continue
+        if stat.S_ISREG(info.st_mode) and info.st_mtime >= since:
+            size += info.st_size
+    return size
+
+
+def write_summary(results, csvfile):
+    """Write run instrumentation to a summary CSV file.
+
+    Parameters
+    ----------
+    results : iterable of RunResult
+        Results as returned by `run` or `runIDFs`.
+    csvfile : str
+        Path to the CSV file to write.
+
+    """
+    if six.PY2:
+        f = open(csvfile, 'wb')
+    else:
+        f = open(csvfile, 'w', newline='')
+    with f:
+        writer = csv.writer(f)
+        writer.writerow(RunResult._fields)
+        for result in results:
+            writer.writerow(['' if value is None else value
+                             for value in result])
+
+
+def parse_error(output_dir, std_err='', err_file=None, std_out=''):
+    """Put the output of a failed run and its errors in an exception message.
+
+    Only the severe and fatal errors from the EnergyPlus error file are
+    included, and the file is read one message at a time so that huge
+    error files are not loaded into memory.
+
+    Parameters
+    ----------
+    output_dir : str
+        Path to the output directory of the run.
+    std_err : str, optional
+        Output the run wrote to stderr.
+    err_file : str, optional
+        Path to the EnergyPlus error file (default: eplusout.err in the
+        output directory).
+    std_out : str, optional
+        Output the run wrote to stdout, if it was captured.
+
+    Returns
+    -------
+    str
 
-    :param output_dir: str
-    :return: str
     """
-    sys.stderr.seek(0)
-    std_err = sys.stderr.read().decode('utf-8')
-    err_file = os.path.join(output_dir, "eplusout.err")
+    if err_file is None:
+        err_file = os.path.join(output_dir, "eplusout.err")
     if os.path.isfile(err_file):
-        with open(err_file, "r") as f:
-            ep_err = f.read()
+        num_warnings, num_shown, num_errors = 0, 0, 0
+        errors = []
+        for record in errfile.readerr(err_file):
+            if record.severity == 'Warning':
+                num_warnings += 1
+                continue
+            num_errors += 1
+            if num_shown < MAX_ERRORS or record.severity == 'Fatal':
+                errors.append(errfile.formatrecord(record))
+                num_shown += 1
+        if num_errors > num_shown:
+            errors.append("... {} more severe errors not shown".format(
+                num_errors - num_shown))
+        errors.append("{} warnings not shown".format(num_warnings))
+        ep_err = "\r\n".join(errors)
     else:
         ep_err = "<File not found>"
-    message = "\r\n{std_err}\r\nContents of EnergyPlus error file at {err_file}\r\n{ep_err}".format(**locals())
+    message = "\r\n{std_out}{std_err}\r\nErrors in EnergyPlus error file at {err_file}\r\n{ep_err}".format(**locals())
     return message
 
 
@@ -11,6 +11,19 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import collections
+
+from eppy.geometry.modelgeometry import SurfaceTable
+from eppy.geometry.modelgeometry import ZONE_SURFACE_KEYS
+from eppy.geometry.modelgeometry import applytransform
+from eppy.geometry.modelgeometry import lowerleft
+from eppy.geometry.modelgeometry import surfaceframe
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # key fields:
 # Name
 # Surface Type
@@ -78,20 +91,43 @@ class NotImplementedError(Exception):
     pass
 
 def bsdorigin(bsdobject, setto000=False):
-    """return the origin of the surface"""
-    # not yet implemented
+    """return the origin of the surface: its lower left corner seen from
+    outside"""
     if setto000:
         return (0, 0, 0)
-    else:
-        raise NotImplementedError
+    coords = bsdobject.coords
+    local = applytransform(surfaceframe(coords), coords)
+    return tuple(coords[lowerleft(local)])
+
+def bsdsize(bsdobject):
+    """return the (length, width) of the surface: its size across and up
+    the surface, in the axes its origin is found in. The width and height
+    of a horizontal surface do not say which side is which"""
+    coords = bsdobject.coords
+    local = applytransform(surfaceframe(coords), coords)
+    extent = local.max(axis=0) - local.min(axis=0)
+    return (float(extent[0]), float(extent[1]))
 
 def fsdorigin(fsdobject, setto000=False):
-    """return the origin of the surface"""
-    # not yet implemented
+    """return the origin of the surface: the (x, z) of its lower left corner
+    from the lower left corner of its base surface, along the base
+    surface"""
     if setto000:
         return (0, 0)
+    idf = fsdobject.theidf
+    for key in ZONE_SURFACE_KEYS:
+        base = idf.getobject(key, fsdobject.Building_Surface_Name)
+        if base is not None:
+            break
     else:
-        raise NotImplementedError
+        raise ValueError(
+            "No base surface named %s" % (fsdobject.Building_Surface_Name, ))
+    frame = surfaceframe(base.coords)
+    baselocal = applytransform(frame, base.coords)
+    local = applytransform(frame, fsdobject.coords)
+    origin = baselocal[lowerleft(baselocal)]
+    corner = local[lowerleft(local)]
+    return (corner[0] - origin[0], corner[1] - origin[1])
 
 def wallexterior(idf, bsdobject, deletebsd=True, setto000=False):
     """return an wall:exterior object if the  (buildingsurface:detailed) is 
@@ -208,8 +244,7 @@ def roof(idf, bsdobject, deletebsd=True, setto000=False):
             simpleobject.Starting_X_Coordinate = surforigin[0]
             simpleobject.Starting_Y_Coordinate = surforigin[1]
             simpleobject.Starting_Z_Coordinate = surforigin[2]
-            simpleobject.Length = bsdobject.width
-            simpleobject.Width = bsdobject.height
+            simpleobject.Length, simpleobject.Width = bsdsize(bsdobject)
             if deletebsd:
                 idf.removeidfobject(bsdobject)
             return simpleobject
@@ -232,8 +267,7 @@ def ceilingadiabatic(idf, bsdobject, deletebsd=True, setto000=False):
             simpleobject.Starting_X_Coordinate = surforigin[0]
             simpleobject.Starting_Y_Coordinate = surforigin[1]
             simpleobject.Starting_Z_Coordinate = surforigin[2]
-            simpleobject.Length = bsdobject.width
-            simpleobject.Width = bsdobject.height
+            simpleobject.Length, simpleobject.Width = bsdsize(bsdobject)
             if deletebsd:
                 idf.removeidfobject(bsdobject)
             return simpleobject
@@ -259,8 +293,7 @@ def ceilinginterzone(idf, bsdobject, deletebsd=True, setto000=False):
             simpleobject.Starting_X_Coordinate = surforigin[0]
             simpleobject.Starting_Y_Coordinate = surforigin[1]
             simpleobject.Starting_Z_Coordinate = surforigin[2]
-            simpleobject.Length = bsdobject.width
-            simpleobject.Width = bsdobject.height
+            simpleobject.Length, simpleobject.Width = bsdsize(bsdobject)
             if deletebsd:
                 idf.removeidfobject(bsdobject)
             return simpleobject
@@ -283,8 +316,7 @@ def floorgroundcontact(idf, bsdobject, deletebsd=True, setto000=False):
             simpleobject.Starting_X_Coordinate = surforigin[0]
             simpleobject.Starting_Y_Coordinate = surforigin[1]
             simpleobject.Starting_Z_Coordinate = surforigin[2]
-            simpleobject.Length = bsdobject.width
-            simpleobject.Width = bsdobject.height
+            simpleobject.Length, simpleobject.Width = bsdsize(bsdobject)
             if deletebsd:
                 idf.removeidfobject(bsdobject)
             return simpleobject
@@ -307,8 +339,7 @@ def flooradiabatic(idf, bsdobject, deletebsd=True, setto000=False):
             simpleobject.Starting_X_Coordinate = surforigin[0]
             simpleobject.Starting_Y_Coordinate = surforigin[1]
             simpleobject.Starting_Z_Coordinate = surforigin[2]
-            simpleobject.Length = bsdobject.width
-            simpleobject.Width = bsdobject.height
+            simpleobject.Length, simpleobject.Width = bsdsize(bsdobject)
             if deletebsd:
                 idf.removeidfobject(bsdobject)
             return simpleobject
@@ -333,8 +364,7 @@ def floorinterzone(idf, bsdobject, deletebsd=True, setto000=False):
             simpleobject.Starting_X_Coordinate = surforigin[0]
             simpleobject.Starting_Y_Coordinate = surforigin[1]
             simpleobject.Starting_Z_Coordinate = surforigin[2]
-            simpleobject.Length = bsdobject.width
-            simpleobject.Width = bsdobject.height
+            simpleobject.Length, simpleobject.Width = bsdsize(bsdobject)
             if deletebsd:
                 idf.removeidfobject(bsdobject)
             return simpleobject
@@ -435,3 +465,247 @@ def simplefenestration(idf, fsd, deletebsd=True, setto000=False):
         if fenestration:
             return fenestration
     return None
+
+# the simple fenestration made from each Surface_Type
+FENESTRATION_KEYS = {'WINDOW': 'WINDOW', 'DOOR': 'DOOR',
+                     'GLASSDOOR': 'GLAZEDDOOR'}
+# fields copied from the detailed object to each simple object
+COPIED_FIELDS = {
+    'WALL:EXTERIOR': ('Name', 'Construction_Name', 'Zone_Name'),
+    'WALL:ADIABATIC': ('Name', 'Construction_Name', 'Zone_Name'),
+    'WALL:UNDERGROUND': ('Name', 'Construction_Name', 'Zone_Name'),
+    'WALL:INTERZONE': ('Name', 'Construction_Name', 'Zone_Name',
+                       'Outside_Boundary_Condition_Object'),
+    'ROOF': ('Name', 'Construction_Name', 'Zone_Name'),
+    'CEILING:ADIABATIC': ('Name', 'Construction_Name', 'Zone_Name'),
+    'CEILING:INTERZONE': ('Name', 'Construction_Name', 'Zone_Name',
+                          'Outside_Boundary_Condition_Object'),
+    'FLOOR:GROUNDCONTACT': ('Name', 'Construction_Name', 'Zone_Name'),
+    'FLOOR:ADIABATIC': ('Name', 'Construction_Name', 'Zone_Name'),
+    'FLOOR:INTERZONE': ('Name', 'Construction_Name', 'Zone_Name',
+                        'Outside_Boundary_Condition_Object'),
+    'WINDOW': ('Name', 'Construction_Name', 'Building_Surface_Name',
+               'Shading_Control_Name', 'Frame_and_Divider_Name',
+               'Multiplier'),
+    'DOOR': ('Name', 'Construction_Name', 'Building_Surface_Name',
+             'Multiplier'),
+    'GLAZEDDOOR': ('Name', 'Construction_Name', 'Building_Surface_Name',
+                   'Shading_Control_Name', 'Frame_and_Divider_Name',
+                   'Multiplier'),
+}
+# the field for the size up the surface, the rest have Height
+WIDTH_KEYS = ('ROOF', 'CEILING:ADIABATIC', 'CEILING:INTERZONE',
+              'FLOOR:GROUNDCONTACT', 'FLOOR:ADIABATIC', 'FLOOR:INTERZONE')
+# distance in m within which vertices are taken to line up
+TOLERANCE = 1e-4
+
+Unsimplified = collections.namedtuple(
+    'Unsimplified', ['name', 'key', 'reason'])
+Unsimplified.__doc__ = """A surface left as it was by `simplify_surfaces`.
+
+Attributes
+----------
+name : str
+key : str
+    e.g. 'BUILDINGSURFACE:DETAILED'.
+reason : str
+    Why there is no simple object for it.
+
+"""
+
+
+def classify(surfacetypes, conditions):
+    """The simple surfaces for BUILDINGSURFACE:DETAILED objects, as in
+    `simplesurface`.
+
+    Parameters
+    ----------
+    surfacetypes : list of str
+        Surface_Type of each surface.
+    conditions : list of str
+        Outside_Boundary_Condition of each surface.
+
+    Returns
+    -------
+    numpy.ndarray
+        The key of the simple object for each surface, or '' if there is
+        none.
+
+    """
+    surfacetypes = np.char.upper(np.array(surfacetypes, dtype='U'))
+    conditions = np.char.upper(np.array(conditions, dtype='U'))
+    wall = surfacetypes == 'WALL'
+    ceiling = surfacetypes == 'CEILING'
+    floor = surfacetypes == 'FLOOR'
+    outdoors = conditions == 'OUTDOORS'
+    adiabatic = conditions == 'ADIABATIC'
+    ground = np.char.startswith(conditions, 'GROUND')
+    interzone = np.isin(conditions, ['SURFACE', 'ZONE',
+                                     'OTHERSIDECOEFFICIENTS'])
+    return np.select(
+        [wall & outdoors, wall & adiabatic, wall & ground, wall & interzone,
+         (surfacetypes == 'ROOF') & (outdoors | (conditions == '')),
+         ceiling & adiabatic, ceiling & interzone, floor & ground,
+         floor & adiabatic, floor & interzone],
+        ['WALL:EXTERIOR', 'WALL:ADIABATIC', 'WALL:UNDERGROUND',
+         'WALL:INTERZONE', 'ROOF', 'CEILING:ADIABATIC', 'CEILING:INTERZONE',
+         'FLOOR:GROUNDCONTACT', 'FLOOR:ADIABATIC', 'FLOOR:INTERZONE'],
+        default='')
+
+
+def _rectangles(table, frames, tolerance):
+    """lower left corners and sizes of surfaces in the axes of frames
+
+    frames has the across and up axes of each surface, shape (surfaces, 2,
+    3). Returns (rectangle, corner, length, height), where rectangle is
+    True for the surfaces which are rectangles with sides along the axes,
+    and corner is the position of the lower left vertex in table.coords.
+    """
+    count = len(table)
+    counts = table.counts
+    segments = np.repeat(np.arange(count), counts)
+    local = np.einsum('ij,ikj->ik', table.coords, frames[segments])
+    starts = table.offsets[:-1]
+    nonempty = counts > 0
+    lowest = np.full(count, np.inf)
+    lowest[nonempty] = np.minimum.reduceat(local[:, 1], starts[nonempty])
+    extent = np.zeros((count, 2))
+    if nonempty.any():
+        extent[nonempty] = (np.maximum.reduceat(local, starts[nonempty]) -
+                            np.minimum.reduceat(local, starts[nonempty]))
+    # the lowest, then leftmost, vertex, as in lowerleft
+    across = np.where(local[:, 1] <= lowest[segments] + tolerance,
+                      local[:, 0], np.inf)
+    order = np.lexsort((across, segments))
+    corner = np.zeros(count, dtype=np.intp)
+    corner[nonempty] = order[starts[nonempty]]
+    # each edge is along one of the axes
+    following = np.arange(len(local)) + 1
+    following[table.offsets[1:][nonempty] - 1] = starts[nonempty]
+    edges = np.abs(local[following] - local)
+    crooked = ~np.any(edges <= tolerance, axis=1)
+    rectangle = ((counts == 4) & (np.bincount(
+        segments, weights=crooked, minlength=count) == 0) &
+        np.all(extent > tolerance, axis=1))
+    return rectangle, corner, extent[:, 0], extent[:, 1]
+
+
+def simplify_surfaces(idf, deletebsd=True, setto000=False,
+                      tolerance=TOLERANCE):
+    """Convert all the detailed surfaces of a model into simple surfaces.
+
+    Each BUILDINGSURFACE:DETAILED and FENESTRATIONSURFACE:DETAILED becomes
+    the simple object that `simplesurface` or `simplefenestration` would
+    make of it. The geometry of all the surfaces is worked out at once
+    with `eppy.geometry.modelgeometry.SurfaceTable`, the new objects are
+    made together and the detailed objects are removed in one pass, so
+    large models take time in proportion to their number of surfaces.
+
+    Only rectangles with horizontal and vertical sides, in the axes of
+    `surfaceframe`, can be described by the simple objects. Other
+    surfaces are left as they are, and reported.
+
+    Parameters
+    ----------
+    idf : eppy.modeleditor.IDF
+    deletebsd : bool, optional
+        Remove the detailed objects which were simplified (default: True).
+    setto000 : bool, optional
+        Put the starting coordinates at 0, as in `bsdorigin`.
+    tolerance : float, optional
+        Distance in m within which vertices are taken to be in line
+        (default: TOLERANCE).
+
+    Returns
+    -------
+    tuple
+        (simple objects, list of Unsimplified)
+
+    """
+    if np is None:
+        raise ImportError("simplify_surfaces needs numpy")
+    surfaces = list(idf.idfobjects.get('BUILDINGSURFACE:DETAILED', []))
+    fenestrations = list(
+        idf.idfobjects.get('FENESTRATIONSURFACE:DETAILED', []))
+    bases = [obj for key in ZONE_SURFACE_KEYS[1:]
+             for obj in idf.idfobjects.get(key, [])]
+    table = SurfaceTable.fromobjects(surfaces + bases + fenestrations)
+    count = len(surfaces) + len(bases)
+    azimuth = np.radians(table.azimuth)
+    acrossaxis = np.stack(
+        [-np.cos(azimuth), np.sin(azimuth), np.zeros(len(table))], axis=1)
+    frames = np.stack(
+        [acrossaxis, np.cross(table.normal, acrossaxis)], axis=1)
+    # fenestration is measured in the axes of its base surface
+    baseof = np.full(len(fenestrations), -1, dtype=np.intp)
+    for i, obj in enumerate(fenestrations):
+        try:
+            j = table.index(obj.Building_Surface_Name)
+        except KeyError:
+            continue
+        if j < count:
+            baseof[i] = j
+    hasbase = baseof >= 0
+    frames[count:][hasbase] = frames[baseof[hasbase]]
+    rectangle, corner, length, height = _rectangles(
+        table, frames, tolerance)
+    corners = table.coords[corner]
+    local = np.einsum('ij,ikj->ik', corners, frames)
+
+    simplekeys = list(classify(
+        [obj.Surface_Type for obj in surfaces],
+        [obj.Outside_Boundary_Condition for obj in surfaces]))
+    simplekeys += [FENESTRATION_KEYS.get(obj.Surface_Type.upper(), '')
+                   for obj in fenestrations]
+    rows = list(range(len(surfaces))) + list(
+        range(count, count + len(fenestrations)))
+    simplified, unsimplified, done = [], [], []
+    for obj, i, simplekey in zip(surfaces + fenestrations, rows,
+                                 simplekeys):
+        key = obj.key.upper()
+        if not simplekey:
+            if i < count:
+                reason = (
+                    "no simple surface for Surface_Type %s with "
+                    "Outside_Boundary_Condition %s" % (
+                        obj.Surface_Type, obj.Outside_Boundary_Condition))
+            else:
+                reason = "no simple fenestration for Surface_Type %s" % (
+                    obj.Surface_Type, )
+            unsimplified.append(Unsimplified(obj.Name, key, reason))
+            continue
+        if i >= count and not hasbase[i - count]:
+            unsimplified.append(Unsimplified(
+                obj.Name, key, "no base surface named %s" % (
+                    obj.Building_Surface_Name, )))
+            continue
+        if not rectangle[i]:
+            unsimplified.append(Unsimplified(
+                obj.Name, key, "not a rectangle with horizontal and "
+                "vertical sides"))
+            continue
+        fields = dict((field, obj[field])
+                      for field in COPIED_FIELDS[simplekey])
+        fields['Length'] = float(length[i])
+        if simplekey in WIDTH_KEYS:
+            fields['Width'] = float(height[i])
+        else:
+            fields['Height'] = float(height[i])
+        if i < count:
+            fields['Azimuth_Angle'] = float(table.azimuth[i])
+            fields['Tilt_Angle'] = float(table.tilt[i])
+            origin = (0, 0, 0) if setto000 else corners[i].tolist()
+            (fields['Starting_X_Coordinate'],
+             fields['Starting_Y_Coordinate'],
+             fields['Starting_Z_Coordinate']) = origin
+        else:
+            base = baseof[i - count]
+            origin = (0, 0) if setto000 else (
+                local[i] - local[base]).tolist()
+            (fields['Starting_X_Coordinate'],
+             fields['Starting_Z_Coordinate']) = origin
+        simplified.append(idf.newidfobject(simplekey, **fields))
+        done.append(obj)
+    if deletebsd:
+        idf.removeidfobjects(done)
+    return simplified, unsimplified
@@ -48,3 +48,50 @@ def base_idf():
     idfhandle = StringIO(idftxt)
     idf = IDF(idfhandle)
     return idf
+
+
+IDD_STATE = ('iddname', 'idd_info', 'block', 'idd_index', 'idd_version')
+CURRENT_IDD = {}  # the IDD state from iddcurrent, once it has been read
+
+
+def _saveidd():
+    """the IDD state of IDF"""
+    return dict((name, vars(IDF)[name]) for name in IDD_STATE
+                if name in vars(IDF))
+
+
+def _restoreidd(saved):
+    """put back the IDD state from _saveidd"""
+    for name in IDD_STATE:
+        if name in saved:
+            setattr(IDF, name, saved[name])
+        elif name in vars(IDF):
+            delattr(IDF, name)
+
+
+@pytest.fixture()
+def current_idd():
+    """Use the idd in iddcurrent for the test, and put back the IDD that was
+    set before, so that the test does not change the IDD of other tests."""
+    saved = _saveidd()
+    if CURRENT_IDD:
+        for name, value in CURRENT_IDD.items():
+            setattr(IDF, name, value)
+    else:
+        IDF.iddname = None
+        IDF.setiddname(StringIO(iddcurrent.iddtxt), testing=True)
+        IDF(StringIO(""))  # reads the idd
+        CURRENT_IDD.update(_saveidd())
+    yield
+    _restoreidd(saved)
+
+
+@pytest.fixture()
+def v8_8_idd():
+    """Use the idd of E+ 8.8 for the test, as current_idd does"""
+    saved = _saveidd()
+    IDF.iddname = None
+    IDF.setiddname(os.path.join(IDD_FILES, 'Energy+V8_8_0.idd'),
+                   testing=True)
+    yield
+    _restoreidd(saved)
@@ -0,0 +1,148 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""pytest for adjacency.py"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pytest
+from six import StringIO
+
+from eppy.modeleditor import IDF
+from eppy.pytest_helpers import almostequal
+
+np = pytest.importorskip('numpy')
+
+from eppy.geometry import adjacency  # noqa: E402
+
+# the tests use the idd in iddcurrent, see conftest.py
+pytestmark = pytest.mark.usefixtures('current_idd')
+
+
+def box(name, x, y, width, depth, height):
+    """the six surfaces of a box shaped zone, facing out"""
+    x1, y1, z1 = x + width, y + depth, height
+    surfaces = [
+        ('Floor', 'Floor', 'Ground',
+         [(x, y, 0), (x, y1, 0), (x1, y1, 0), (x1, y, 0)]),
+        ('Roof', 'Roof', 'Outdoors',
+         [(x, y, z1), (x1, y, z1), (x1, y1, z1), (x, y1, z1)]),
+        ('South', 'Wall', 'Outdoors',
+         [(x, y, z1), (x, y, 0), (x1, y, 0), (x1, y, z1)]),
+        ('North', 'Wall', 'Outdoors',
+         [(x1, y1, z1), (x1, y1, 0), (x, y1, 0), (x, y1, z1)]),
+        ('East', 'Wall', 'Outdoors',
+         [(x1, y, z1), (x1, y, 0), (x1, y1, 0), (x1, y1, z1)]),
+        ('West', 'Wall', 'Outdoors',
+         [(x, y1, z1), (x, y1, 0), (x, y, 0), (x, y, z1)]),
+    ]
+    lines = ['Zone, %s;' % (name, )]
+    for side, surfacetype, condition, points in surfaces:
+        lines.append(
+            'BuildingSurface:Detailed, %s %s, %s, , %s, %s, , SunExposed, '
+            'WindExposed, , %i, %s;' % (
+                name, side, surfacetype, name, condition, len(points),
+                ', '.join('%s' % value for point in points
+                          for value in point)))
+    return '\n'.join(lines)
+
+
+def test_overlaparea():
+    """py.test for overlaparea"""
+    square = np.array([(0, 0, 0), (2, 0, 0), (2, 2, 0), (0, 2, 0)], float)
+    shifted = square + [1, 1, 0]
+    normal = np.array([0, 0, 1.0])
+    assert almostequal(adjacency.overlaparea(square, shifted, normal), 1)
+    assert almostequal(adjacency.overlaparea(square, square[::-1], normal),
+                       4)
+    apart = square + [3, 0, 0]
+    assert adjacency.overlaparea(square, apart, normal) == 0
+    # a tilted plane, with an L shaped (not convex) polygon
+    tilted = np.array([0, -1, 1.0]) / np.sqrt(2)
+    ell = np.array([(0, 0, 0), (2, 0, 0), (2, 1, 1), (1, 1, 1), (1, 2, 2),
+                    (0, 2, 2)], float)
+    assert almostequal(adjacency.overlaparea(ell, square[:, [0, 1, 1]],
+                                             tilted), 3 * np.sqrt(2))
+    assert np.isnan(adjacency.overlaparea(ell, ell, tilted))
+
+
+def test_coincident():
+    """py.test for coincident"""
+    square = np.array([(0, 0, 0), (2, 0, 0), (2, 2, 0), (0, 2, 0)], float)
+    assert adjacency.coincident(square, square[::-1])
+    assert adjacency.coincident(square, square + 0.001)
+    assert not adjacency.coincident(square, square + 0.1)
+    assert not adjacency.coincident(square, square[:3])
+
+
+def test_matchsurfaces():
+    """py.test for matchsurfaces"""
+    idftxt = '\n'.join([box('A', 0, 0, 2, 2, 3), box('B', 2, 0, 2, 2, 3),
+                        box('C', 0, 2, 1, 2, 3)])
+    idf = IDF(StringIO(idftxt))
+    pairs = adjacency.matchsurfaces(idf)
+    found = dict(((pair.first, pair.second), pair) for pair in pairs)
+    assert set(found) == set([('A North', 'C South'), ('A East', 'B West')])
+    assert found[('A East', 'B West')].coincident
+    assert found[('A East', 'B West')].area == 6
+    assert not found[('A North', 'C South')].coincident
+    assert almostequal(found[('A North', 'C South')].area, 3)
+
+
+def test_setboundaries():
+    """py.test for setboundaries"""
+    idftxt = '\n'.join([box('A', 0, 0, 2, 2, 3), box('B', 2, 0, 2, 2, 3),
+                        box('C', 0, 2, 1, 2, 3)])
+    idf = IDF(StringIO(idftxt))
+    done = adjacency.setboundaries(idf)
+    assert [(pair.first, pair.second) for pair in done] == [
+        ('A East', 'B West')]
+    east = idf.getobject('BUILDINGSURFACE:DETAILED', 'A East')
+    west = idf.getobject('BUILDINGSURFACE:DETAILED', 'B West')
+    assert east.Outside_Boundary_Condition == 'Surface'
+    assert east.Outside_Boundary_Condition_Object == 'B West'
+    assert west.Outside_Boundary_Condition_Object == 'A East'
+    assert west.Sun_Exposure == 'NoSun'
+    assert west.Wind_Exposure == 'NoWind'
+    north = idf.getobject('BUILDINGSURFACE:DETAILED', 'A North')
+    assert north.Outside_Boundary_Condition == 'Outdoors'
+
+
+def test_spatialindex():
+    """py.test for SpatialIndex"""
+    idf = IDF(StringIO('\n'.join(
+        box('Z%i%i' % (i, j), i * 3, j * 4, 3, 4, 3)
+        for i in range(4) for j in range(3))))
+    table = idf.geometry.surfaces()
+    index = adjacency.SpatialIndex(table)
+    found = [table.names[i] for i in index.query((0.5, 0.5, 2.9),
+                                                 (1, 1, 3.1))]
+    assert found == ['Z00 Roof']
+    # 3 * 3 pairs across x and 4 * 2 across y
+    pairs = index.pairs()
+    assert len(pairs) == 17
+    assert all(pair.coincident for pair in pairs)
+
+
+@pytest.mark.parametrize('shift', [0.0005, 0.002, 0.009])
+def test_matchsurfaces_perturbed(shift):
+    """py.test that surfaces match with vertices out by less than the
+    tolerance, across and along the wall"""
+    for field in ('Vertex_1_Xcoordinate', 'Vertex_4_Xcoordinate',
+                  'Vertex_1_Ycoordinate'):
+        idf = IDF(StringIO('\n'.join([box('A', 10, 20, 2, 2, 3),
+                                      box('B', 12, 20, 2, 2, 3)])))
+        west = idf.getobject('BUILDINGSURFACE:DETAILED', 'B West')
+        west[field] = float(west[field]) + shift
+        pairs = adjacency.matchsurfaces(idf)
+        assert [(pair.first, pair.second, pair.coincident)
+                for pair in pairs] == [('A East', 'B West', True)]
+    # a gap wider than the tolerance
+    idf = IDF(StringIO('\n'.join([box('A', 10, 20, 2, 2, 3),
+                                  box('B', 12.02, 20, 2, 2, 3)])))
+    assert adjacency.matchsurfaces(idf) == []
@@ -0,0 +1,234 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""pytest for modelgeometry.py"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pytest
+from six import StringIO
+
+import eppy.geometry.surface as surface
+from eppy import modeleditor
+from eppy.modeleditor import IDF
+from eppy.pytest_helpers import almostequal
+
+np = pytest.importorskip('numpy')
+
+from eppy.geometry import modelgeometry  # noqa: E402
+
+# the tests use the idd in iddcurrent, see conftest.py
+pytestmark = pytest.mark.usefixtures('current_idd')
+
+idftxt = """
+Zone, Zone1;
+BuildingSurface:Detailed, Floor1, Floor, , Zone1, Ground, , NoSun, NoWind,
+    , 4, 2, 3, 0, 2, 0, 0, 0, 0, 0, 0, 3, 0;
+BuildingSurface:Detailed, South, Wall, , Zone1, Outdoors, , SunExposed,
+    WindExposed, , 4, 0, 0, 2.5, 0, 0, 0, 2, 0, 0, 2, 0, 2.5;
+BuildingSurface:Detailed, West, Wall, , Zone1, Outdoors, , SunExposed,
+    WindExposed, , autocalculate, 0, 3, 2.5, 0, 3, 0, 0, 0, 0, 0, 0, 2.5;
+FenestrationSurface:Detailed, Window, Window, , South, , , , , 1, 3,
+    0.5, 0, 2, 0.5, 0, 1, 1.5, 0, 1, , , ;
+Shading:Site:Detailed, Tilted, , 4, 0, 0, 0, 1, 0, 0, 1, 1, 1, 0, 1, 1;
+"""
+
+polygons = [
+    [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)],
+    [(0, 0, 0), (1, 0, 0), (1, 0, 1), (0, 0, 1)],
+    [(0, 0, 0), (0, 1, 0), (0, 1, 1), (0, 0, 1)],
+    [(0, 0, 0), (0, 1, 0), (0, 2, 0), (0, 3, 0)],
+    [(-4.611479, 6.729214, -0.332978), (-0.694944, 4.990984, 2.243709),
+     (-2.147088, 0.302854, 1.288344), (-6.063622, 2.041084, -1.288344)],
+    [(0, 0, 0), (8, 0, 0), (11, 0, 4), (3, 0, 4)],
+    [(0.0, 0.0, 3.0), (0.0, 0.0, 2.4), (30.5, 0.0, 2.4), (30.5, 0.0, 3.0)],
+]
+
+
+def test_pack():
+    """py.test for pack"""
+    coords, offsets = modelgeometry.pack([polygons[0], [], polygons[5][:3]])
+    assert offsets.tolist() == [0, 4, 4, 7]
+    assert coords.shape == (7, 3)
+    assert coords[4].tolist() == [0, 0, 0]
+
+
+def test_surfacetable():
+    """py.test for SurfaceTable, against eppy.geometry.surface"""
+    table = modelgeometry.SurfaceTable(*modelgeometry.pack(polygons))
+    assert len(table) == len(polygons)
+    for i, poly in enumerate(polygons):
+        assert almostequal(table.area[i], surface.area(poly))
+        assert almostequal(table.height[i], surface.height(poly))
+        assert almostequal(table.width[i], surface.width(poly))
+        if table.area[i]:
+            # polygons[4] is not quite flat, and surface uses 3 vertices
+            assert almostequal(table.tilt[i], surface.tilt(poly), places=4)
+            assert almostequal(
+                table.azimuth[i], surface.azimuth(poly), places=4)
+    assert table.normal[0].tolist() == [0, 0, 1]
+    assert table.normal[3].tolist() == [0, 0, 0]  # no area
+    assert np.allclose(table.centroid[5], [5.5, 0, 2])
+    assert np.allclose(table.centroid[3], [0, 1.5, 0])
+    assert table.bbox[6].tolist() == [[0, 0, 2.4], [30.5, 0, 3]]
+
+
+def test_surfacetable_empty():
+    """py.test for SurfaceTable with surfaces without vertices"""
+    table = modelgeometry.SurfaceTable(*modelgeometry.pack([[], []]))
+    assert table.area.tolist() == [0, 0]
+    assert np.isnan(table.bbox).all()
+    table = modelgeometry.SurfaceTable(*modelgeometry.pack([]))
+    assert len(table) == 0
+
+
+def test_surfaces():
+    """py.test for IDF.geometry.surfaces"""
+    idf = IDF(StringIO(idftxt))
+    table = idf.geometry.surfaces()
+    assert table.names == ['Floor1', 'South', 'West', 'Window', 'Tilted']
+    assert table.keys[3] == 'FENESTRATIONSURFACE:DETAILED'
+    assert table.counts.tolist() == [4, 4, 4, 3, 4]
+    for obj in table.objects:
+        if obj.Name == 'Window':  # trailing blanks break obj.area
+            continue
+        geometry = table[obj.Name]
+        assert almostequal(geometry.area, obj.area)
+        assert almostequal(geometry.tilt, obj.tilt)
+        assert almostequal(geometry.azimuth, obj.azimuth)
+        assert almostequal(geometry.height, obj.height)
+        assert almostequal(geometry.width, obj.width)
+    floor = table['floor1']
+    assert floor.area == 6
+    assert floor.tilt == 180
+    assert floor.normal.tolist() == [0, 0, -1]
+    assert floor.centroid.tolist() == [1, 1.5, 0]
+    assert table['Window'].area == 0.5
+    assert table['West'].azimuth == 270
+    assert table['South'].azimuth == 180
+    assert almostequal(table['Tilted'].tilt, 45)
+    assert 'West' in table
+    assert 'North' not in table
+    with pytest.raises(KeyError):
+        table['North']
+    walls = idf.geometry.surfaces('BuildingSurface:Detailed')
+    assert walls.names == ['Floor1', 'South', 'West']
+
+
+def test_to_dataframe():
+    """py.test for SurfaceTable.to_dataframe"""
+    pytest.importorskip('pandas')
+    idf = IDF(StringIO(idftxt))
+    frame = idf.geometry.surfaces().to_dataframe()
+    assert frame.loc['West', 'azimuth'] == 270
+    assert frame.loc['Floor1', 'zmax'] == 0
+    assert frame.loc['Floor1', 'area'] == 6
+
+
+zonestxt = """
+Zone, Box;
+Zone, Shed;
+Zone, Open;
+Zone, Empty;
+BuildingSurface:Detailed, Box Floor, Floor, , Box, Ground, , NoSun, NoWind,
+    , 4, 0, 0, 0, 0, 3, 0, 2, 3, 0, 2, 0, 0;
+BuildingSurface:Detailed, Box Roof, Roof, , Box, Outdoors, , SunExposed,
+    WindExposed, , 4, 0, 0, 2.5, 2, 0, 2.5, 2, 3, 2.5, 0, 3, 2.5;
+BuildingSurface:Detailed, Box South, Wall, , Box, Outdoors, , SunExposed,
+    WindExposed, , 4, 0, 0, 2.5, 0, 0, 0, 2, 0, 0, 2, 0, 2.5;
+BuildingSurface:Detailed, Box North, Wall, , Box, Outdoors, , SunExposed,
+    WindExposed, , 4, 2, 3, 2.5, 2, 3, 0, 0, 3, 0, 0, 3, 2.5;
+BuildingSurface:Detailed, Box East, Wall, , Box, Outdoors, , SunExposed,
+    WindExposed, , 4, 2, 0, 2.5, 2, 0, 0, 2, 3, 0, 2, 3, 2.5;
+BuildingSurface:Detailed, Box West, Wall, , Box, Adiabatic, , NoSun,
+    NoWind, , 4, 0, 3, 2.5, 0, 3, 0, 0, 0, 0, 0, 0, 2.5;
+FenestrationSurface:Detailed, Box Window, Window, , Box South, , , , , 2,
+    4, 0.5, 0, 2, 0.5, 0, 1, 1.5, 0, 1, 1.5, 0, 2;
+FenestrationSurface:Detailed, Box Door, Door, , Box North, , , , , 1,
+    4, 1.5, 3, 2, 1.5, 3, 0, 0.5, 3, 0, 0.5, 3, 2;
+Floor:Detailed, Shed Floor, , Shed, Ground, , NoSun, NoWind, , 4,
+    0, 10, 0, 0, 11, 0, 1, 11, 0, 1, 10, 0;
+RoofCeiling:Detailed, Shed Roof, , Shed, Outdoors, , SunExposed,
+    WindExposed, , 4, 0, 10, 1, 1, 10, 1, 1, 11, 2, 0, 11, 2;
+Wall:Detailed, Shed South, , Shed, Outdoors, , SunExposed, WindExposed, ,
+    4, 0, 10, 1, 0, 10, 0, 1, 10, 0, 1, 10, 1;
+Wall:Detailed, Shed North, , Shed, Outdoors, , SunExposed, WindExposed, ,
+    4, 1, 11, 2, 1, 11, 0, 0, 11, 0, 0, 11, 2;
+Wall:Detailed, Shed East, , Shed, Outdoors, , SunExposed, WindExposed, ,
+    4, 1, 10, 1, 1, 10, 0, 1, 11, 0, 1, 11, 2;
+Wall:Detailed, Shed West, , Shed, Outdoors, , SunExposed, WindExposed, ,
+    4, 0, 11, 2, 0, 11, 0, 0, 10, 0, 0, 10, 1;
+BuildingSurface:Detailed, Open Floor, Floor, , Open, Ground, , NoSun,
+    NoWind, , 4, 0, 20, 0, 0, 22, 0, 2, 22, 0, 2, 20, 0;
+BuildingSurface:Detailed, Open Wall, Wall, , Open, Outdoors, , SunExposed,
+    WindExposed, , 4, 0, 20, 3, 0, 20, 0, 2, 20, 0, 2, 20, 3;
+"""
+
+
+def test_zonemetrics():
+    """py.test for IDF.zone_metrics"""
+    idf = IDF(StringIO(zonestxt))
+    table = idf.zone_metrics()
+    assert table.rows == ('Box', 'Shed', 'Open', 'Empty')
+    assert table.columns == modelgeometry.ZONE_METRICS
+    assert np.allclose(table.row('Box'), [6, 2.5, 15, 17.5, 2, 2 / 17.5])
+    # not a prism, so not floor area * height
+    assert np.allclose(table.row('Shed'), [1, 2, 1.5, 6, 0, 0])
+    # not closed
+    assert np.allclose(table.row('Open'), [4, 3, 12, 6, 0, 0])
+    assert table.row('Empty').tolist() == [0] * 6
+    for zone in ['Box', 'Open']:
+        assert almostequal(table.value(zone, 'floor_area'),
+                           modeleditor.zonearea(idf, zone))
+        assert almostequal(table.value(zone, 'height'),
+                           modeleditor.zoneheight(idf, zone))
+        assert almostequal(table.value(zone, 'volume'),
+                           modeleditor.zonevolume(idf, zone))
+
+
+def test_matrices():
+    """py.test for affine, translation, rotation and scaling"""
+    points = np.array([(1, 0, 0), (0, 2, 1)], dtype=float)
+    assert modelgeometry.affine(np.eye(3)).tolist() == np.eye(4).tolist()
+    with pytest.raises(ValueError):
+        modelgeometry.affine(np.eye(2))
+    moved = modelgeometry.applytransform(
+        modelgeometry.translation(1, 2, 3), points)
+    assert moved.tolist() == [[2, 2, 3], [1, 4, 4]]
+    turned = modelgeometry.applytransform(
+        modelgeometry.rotation(90), points)
+    assert np.allclose(turned, [(0, -1, 0), (2, 0, 1)])
+    turned = modelgeometry.applytransform(
+        modelgeometry.rotation(180, about=(1, 1, 0)), points)
+    assert np.allclose(turned, [(1, 2, 0), (2, 0, 1)])
+    scaled = modelgeometry.applytransform(
+        modelgeometry.scaling(2, about=(1, 0, 0)), points)
+    assert np.allclose(scaled, [(1, 0, 0), (-1, 4, 2)])
+
+
+def test_transform():
+    """py.test for IDF.geometry.transform"""
+    idf = IDF(StringIO(idftxt))
+    before = idf.geometry.surfaces()
+    south = idf.getobject('BUILDINGSURFACE:DETAILED', 'South')
+    assert south.azimuth == 180  # fills the cache
+    changed = idf.geometry.transform(modelgeometry.rotation(90))
+    assert len(changed) == 5
+    after = idf.geometry.surfaces()
+    assert np.allclose(after.area, before.area)
+    assert np.allclose(after.tilt, before.tilt)
+    assert np.allclose(after['South'].azimuth, 270)
+    assert almostequal(south.azimuth, 270)  # the cache was cleared
+    assert np.allclose(after['South'].coords,
+                       [(0, 0, 2.5), (0, 0, 0), (0, -2, 0), (0, -2, 2.5)])
+    # only some objects, and the blank fields are left alone
+    window = idf.getobject('FENESTRATIONSURFACE:DETAILED', 'Window')
+    idf.geometry.transform(modelgeometry.translation(z=1), [window])
+    assert window.obj[-3:] == ['', '', '']
+    assert window.coords[0][2] == 3
+    assert idf.geometry.surfaces()['South'].coords[0][2] == 2.5
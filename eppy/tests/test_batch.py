@@ -0,0 +1,125 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""py.test for batch.py"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import csv
+import io
+import os
+import re
+import shutil
+import sqlite3
+
+import pytest
+
+from eppy.results import batch
+from eppy.runner.executors import ProcessExecutor, SerialExecutor
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPORT = os.path.join(
+    THIS_DIR, os.pardir, 'resources', 'outputfiles', 'V_8_1',
+    '1050PageMillRoadTable.html')
+
+
+@pytest.fixture
+def run_dirs(tmpdir):
+    """three run directories with a copy of the report in two of them"""
+    dirs = []
+    for i, name in enumerate(['eplustbl.htm', 'eplusTable.html', None]):
+        run_dir = tmpdir.join('runs', 'run_%i' % i).ensure(dir=True)
+        if name:
+            shutil.copy(REPORT, str(run_dir.join(name)))
+        dirs.append(str(run_dir))
+    return dirs
+
+
+def test_splitunits():
+    """py.test for splitunits"""
+    assert batch.splitunits('Total Energy [GJ]') == ('Total Energy', 'GJ')
+    assert batch.splitunits('Subcategory') == ('Subcategory', '')
+
+
+def test_extractrun(run_dirs):
+    """py.test for extractrun"""
+    records = batch.extractrun(
+        3, run_dirs[0], ['Site and Source Energy',
+                         {'title': re.compile('^End Uses$'),
+                          'report': 'Annual Building Utility Performance '
+                                    'Summary'}])
+    assert records[0] == batch.Record(
+        3, 'Annual Building Utility Performance Summary', 'Entire Facility',
+        'Site and Source Energy', 'Total Site Energy', 'Total Energy', 'GJ',
+        3206.37, '')
+    assert len([r for r in records if r.table == 'Site and Source Energy']
+               ) == 4 * 3
+    assert set(r.table for r in records) == set(
+        ['Site and Source Energy', 'End Uses'])
+    with pytest.warns(UserWarning):
+        assert batch.extractrun(0, run_dirs[2], ['End Uses']) == []
+
+
+NUMBERHEADERS = """<html><body>
+<p>Report:<b> Life-Cycle Cost Report</b></p>
+<p>For:<b> Entire Facility</b></p>
+<b>Costs by Year</b><br><br>
+<table border="1">
+<tr><td></td><td align="right">2019</td><td align="right">2020</td></tr>
+<tr><td align="right">1</td><td align="right">10.5</td>
+<td align="right">n/a</td></tr>
+</table>
+</body></html>
+"""
+
+
+def test_extractrun_numberheaders(tmpdir):
+    """py.test for extractrun with headers and labels that are numbers"""
+    run_dir = tmpdir.mkdir('run_0')
+    run_dir.join('eplustbl.htm').write(NUMBERHEADERS)
+    records = batch._extractrun((0, str(run_dir), ['Costs by Year']))
+    assert records == [
+        batch.Record(0, 'Life-Cycle Cost Report', 'Entire Facility',
+                     'Costs by Year', '1', '2019', '', 10.5, ''),
+        batch.Record(0, 'Life-Cycle Cost Report', 'Entire Facility',
+                     'Costs by Year', '1', '2020', '', None, 'n/a')]
+
+
+def test_extract_csv(run_dirs, tmpdir):
+    """py.test for extract to a CSV file"""
+    output = str(tmpdir.join('results.csv'))
+    result = batch.extract(
+        str(tmpdir.join('runs', 'run_*')), ['Site and Source Energy'],
+        output, executor=ProcessExecutor(2), chunksize=2)
+    assert result == run_dirs
+    with io.open(output, 'r', newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == list(batch.Record._fields)
+    assert len(rows) == 1 + 2 * 12
+    assert [row[0] for row in rows[1:]] == ['0'] * 12 + ['1'] * 12
+    assert rows[1][-2:] == ['3206.37', '']
+
+
+def test_extract_sqlite(run_dirs, tmpdir):
+    """py.test for extract to a SQLite database"""
+    output = str(tmpdir.join('results.sqlite'))
+    batch.extract(run_dirs, ['Site and Source Energy'], output,
+                  executor=SerialExecutor())
+    conn = sqlite3.connect(output)
+    rows = conn.execute(
+        'SELECT run_dir, value FROM results JOIN results_runs '
+        'USING (run_id) WHERE row = "Net Source Energy" AND units = "GJ"'
+    ).fetchall()
+    conn.close()
+    assert rows == [(run_dirs[0], 8430.99), (run_dirs[1], 8430.99)]
+
+
+def test_getwriter(tmpdir):
+    """py.test that getwriter rejects unknown file types"""
+    with pytest.raises(ValueError):
+        batch.getwriter(str(tmpdir.join('results.xls')))
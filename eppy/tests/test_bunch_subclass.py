@@ -20,6 +20,7 @@ import eppy.bunchhelpers as bunchhelpers
 from eppy.iddcurrent import iddcurrent
 import eppy.idfreader as idfreader
 from eppy.modeleditor import IDF
+from eppy.pytest_helpers import almostequal
 
 
 # This test is ugly because I have to send file names and not able to send file handles
@@ -689,6 +690,21 @@ class TestEpBunch(object):
                 with pytest.raises(theexception):
                     result = idfobject.checkrange(fieldname)
 
+    def test_getrange_spaced_exclusive(self):
+        """py.test for getrange with "\\maximum < 1.0" in the idd"""
+        obj = ['SOMEOBJECT', 0.5]
+        objls = ['key', 'Fraction']
+        objidd = [{}, {'type': ['real'], 'maximum': ['< 1.0'],
+                       'minimum': ['> 0.0']}]
+        idfobject = EpBunch(obj, objls, objidd)
+        result = idfobject.getrange('Fraction')
+        assert result == {
+            'maximum': None, 'minimum': None, 'maximum<': 1.0,
+            'minimum>': 0.0, 'type': 'real'}
+        idfobject.Fraction = 1.0
+        with pytest.raises(bunch_subclass.RangeError):
+            idfobject.checkrange('Fraction')
+
     def test_getfieldidd(self):
         """py.test for getfieldidd"""
         obj, objls, objidd = self.initdata()
@@ -981,3 +997,28 @@ BUILDING,
     assert prnt == result
     # print bunchobj.objidd
     # assert 1 == 0
+
+
+def test_cachedgeometry():
+    """py.test for the geometry cached on surfaces"""
+    idf = IDF(StringIO(bldfidf))
+    wall = idf.idfobjects['BUILDINGSURFACE:DETAILED'][0]
+    assert wall['__geometry'] == {}
+    assert almostequal(wall.area, 18.580608)
+    assert set(wall['__geometry']) == set(['area', 'getcoords'])
+    assert wall.coords == wall.coords
+    coords = wall.coords
+    coords.pop()  # callers get a copy
+    assert len(wall.coords) == 4
+    assert wall.azimuth == 180
+    # setting a vertex field clears the cache
+    wall.Vertex_1_Zcoordinate = 6.096
+    assert wall['__geometry'] == {}
+    assert almostequal(wall.area, 18.580608 * 1.5)
+    wall['Vertex_4_Zcoordinate'] = 6.096
+    assert almostequal(wall.area, 18.580608 * 2)
+    # other fields do not
+    wall.Name = 'Another Wall'
+    assert 'area' in wall['__geometry']
+    wall.Number_of_Vertices = 3
+    assert wall['__geometry'] == {}
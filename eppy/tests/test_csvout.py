@@ -0,0 +1,117 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""py.test for csvout.py"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import re
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from eppy.results import csvout
+from eppy.results.csvout import CSVOutput
+
+CSV = """Date/Time,Environment:Site Outdoor Air Drybulb Temperature [C](Hourly),ZONE ONE:Zone Mean Air Temperature [C](Hourly),ZONE ONE:Zone Mean Air Temperature [C](Daily) ,Electricity:Facility [J](Hourly),InteriorLights:Electricity:Zone:ZONE ONE [J](Hourly)
+ 01/21  01:00:00,-17.3,21.0,,1000.0,10.0
+ 01/21  02:00:00,-17.5,21.5,,2000.0,20.0
+ 01/21  24:00:00,-17.5,21.5,21.25,2000.0,20.0
+ 01/21,,,,,
+ 01/22  01:00:00,-5.0,19.0,,3000.0,30.0
+"""
+
+
+@pytest.fixture
+def csvfile(tmpdir):
+    """a small eplusout.csv"""
+    fname = tmpdir.join('eplusout.csv')
+    fname.write_binary(CSV.replace('\n', '\r\n').encode('latin-1'))
+    return str(fname)
+
+
+def test_parseheader():
+    """py.test for parseheader"""
+    result = csvout.parseheader(
+        'ZONE ONE:Zone Mean Air Temperature [C](Hourly)', 2)
+    assert result == csvout.Column(
+        2, 'ZONE ONE', 'Zone Mean Air Temperature', 'C', 'Hourly',
+        'ZONE ONE:Zone Mean Air Temperature [C](Hourly)')
+    result = csvout.parseheader('Electricity:Facility [J](Hourly)')
+    assert (result.key, result.name) == ('', 'Electricity:Facility')
+    result = csvout.parseheader(
+        'InteriorLights:Electricity:Zone:ZONE ONE [J](RunPeriod)')
+    assert (result.key, result.name, result.frequency) == (
+        '', 'InteriorLights:Electricity:Zone:ZONE ONE', 'RunPeriod')
+    result = csvout.parseheader(
+        'VAV SYS 1:MAIN COIL:Heating Coil Air Heating Rate [W](Hourly)')
+    assert (result.key, result.name, result.units) == (
+        'VAV SYS 1:MAIN COIL', 'Heating Coil Air Heating Rate', 'W')
+    result = csvout.parseheader('Some Column')
+    assert (result.key, result.name, result.units) == ('', 'Some Column', '')
+
+
+def test_parsetimes():
+    """py.test for parsetimes"""
+    result = csvout.parsetimes(
+        [b' 01/21  01:00:00', b' 12/31  24:00:00', b' 01/21', b'January',
+         b' 1/2  3:04'])
+    assert result.tolist() == [[1, 21, 1, 0, 0], [12, 31, 24, 0, 0],
+                               [1, 21, 0, 0, 0], [1, 0, 0, 0, 0],
+                               [1, 2, 3, 4, 0]]
+    assert csvout.parsetimes([]).shape == (0, len(csvout.TIME_COLUMNS))
+
+
+def test_CSVOutput(csvfile):
+    """py.test for CSVOutput"""
+    output = CSVOutput(csvfile)
+    assert output.timecolumn == 'Date/Time'
+    assert len(output) == 5
+    assert [column.index for column in output] == [1, 2, 3, 4, 5]
+    columns = output.select('zone mean air temperature', 'ZONE ONE',
+                            'Daily')
+    assert [column.index for column in columns] == [3]
+    assert columns[0].label == (
+        'ZONE ONE:Zone Mean Air Temperature [C](Daily)')
+    columns = output.select(re.compile('Electricity'))
+    assert [column.key for column in columns] == ['', '']
+
+
+def test_iterchunks(csvfile):
+    """py.test for CSVOutput.iterchunks"""
+    output = CSVOutput(csvfile)
+    columns = output.select(['Zone Mean Air Temperature',
+                             'Electricity:Facility'])
+    chunks = list(output.iterchunks(columns, chunksize=2))
+    assert [len(chunk.values) for chunk in chunks] == [2, 2, 1]
+    assert chunks[0].values[:, [0, 2]].tolist() == [[21.0, 1000.0],
+                                                     [21.5, 2000.0]]
+    assert np.isnan(chunks[0].values[:, 1]).all()
+    assert chunks[1].values[0, 1] == 21.25
+    assert chunks[1].times.tolist() == [[1, 21, 24, 0, 0], [1, 21, 0, 0, 0]]
+    result = output.read([1, 'Electricity:Facility [J](Hourly)'])
+    assert result.values.shape == (5, 2)
+    assert result.values[:, 0][[0, 4]].tolist() == [-17.3, -5.0]
+    for position in (0, -1, len(output) + 1):  # 0 is the Date/Time
+        with pytest.raises(IndexError):
+            output.read([position])
+    assert result.times.shape == (5, len(csvout.TIME_COLUMNS))
+    with pytest.raises(KeyError):
+        output.read(['No Such Column'])
+
+
+def test_to_dataframe(csvfile):
+    """py.test for CSVOutput.to_dataframe"""
+    pytest.importorskip('pandas')
+    output = CSVOutput(csvfile)
+    frame = output.to_dataframe(output.select(keys='ZONE ONE'))
+    assert list(frame.columns) == list(csvout.TIME_COLUMNS) + [
+        'ZONE ONE:Zone Mean Air Temperature [C](Hourly)',
+        'ZONE ONE:Zone Mean Air Temperature [C](Daily)']
+    assert len(frame) == 5
@@ -0,0 +1,172 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""py.test for errfile"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import sqlite3
+
+import pytest
+from six import StringIO
+
+from eppy.results import errfile
+from eppy.runner.executors import ProcessExecutor, SerialExecutor
+
+errtxt = """Program Version,EnergyPlus, Version 8.9.0-40101eaafd, YMD=2019.06.11 10:23,
+   ** Warning ** Weather file location will be used rather than entered (IDF) Location object.
+   **   ~~~   ** ..Location object=CHICAGO_IL_USA TMY2-94846
+   **   ~~~   ** ..Weather File Location=San Francisco Intl Ap CA USA TMY3 WMO#=724940
+   ** Warning ** GetSurfaceData: CAUTION -- Interzone surfaces are usually in different zones
+   ************* Testing Individual Branch Integrity
+   ** Severe  ** Node Connection Error, Node="OUTSIDE AIR INLET NODE", ObjectType="OutdoorAir:Mixer"
+   **  Fatal  ** Node Connection Errors: Program terminates.
+   ...Summary of Errors that led to program termination:
+   ..... Reference severe error count=1
+   ..... Last severe error=Node Connection Error
+   ************* Warmup Convergence Information will not be reported.
+   ************* EnergyPlus Terminated--Fatal Error Detected. 2 Warning; 1 Severe Errors; Elapsed Time=00hr 00min  0.32sec
+"""
+
+constructionerr = """Program Version,EnergyPlus, Version 8.9.0-40101eaafd, YMD=2019.06.11 10:23,
+   ** Severe  ** GetConstructData: Construction="WALL 2", invalid Outside Layer="BRICK 2" entered.
+   ** Severe  ** GetConstructData: Construction="WALL 3", invalid Outside Layer="BRICK 2" entered.
+   **  Fatal  ** GetSurfaceData: Errors discovered, program terminates.
+"""
+
+
+def test_readerr():
+    """py.test for readerr"""
+    records = list(errfile.readerr(StringIO(errtxt)))
+    assert [record.severity for record in records] == [
+        'Warning', 'Warning', 'Severe', 'Fatal']
+    assert records[0].message == (
+        'Weather file location will be used rather than entered (IDF) '
+        'Location object.')
+    assert records[0].continuations == (
+        '..Location object=CHICAGO_IL_USA TMY2-94846',
+        '..Weather File Location=San Francisco Intl Ap CA USA TMY3 '
+        'WMO#=724940')
+    assert records[1].continuations == ()
+    assert records[3].continuations == (
+        '...Summary of Errors that led to program termination:',
+        '..... Reference severe error count=1',
+        '..... Last severe error=Node Connection Error')
+
+
+def test_readerr_file(tmpdir):
+    """py.test for readerr with a file name"""
+    fname = tmpdir.join('eplusout.err')
+    fname.write(errtxt)
+    records = list(errfile.readerr(str(fname)))
+    assert len(records) == 4
+
+
+def test_counterrors():
+    """py.test for counterrors"""
+    result = errfile.counterrors(StringIO(errtxt))
+    assert result == {'Warning': 2, 'Severe': 1, 'Fatal': 1}
+
+
+def test_formatrecord():
+    """py.test for formatrecord"""
+    lines = errtxt.splitlines()
+    records = list(errfile.readerr(StringIO(errtxt)))
+    assert errfile.formatrecord(records[0]) == '\n'.join(lines[1:4])
+    assert errfile.formatrecord(records[2]) == lines[6]
+    assert errfile.formatrecord(records[3]).splitlines()[0] == lines[7]
+
+
+def test_findobject():
+    """py.test for findobject"""
+    records = list(errfile.readerr(StringIO(errtxt)))
+    assert records[0][3:] == (None, None, None)
+    assert records[2].objecttype == 'OutdoorAir:Mixer'
+    record = next(errfile.readerr(StringIO(constructionerr)))
+    assert (record.objecttype, record.objectname, record.fieldname) == (
+        'Construction', 'WALL 2', 'Outside Layer')
+    result = errfile.findobject([
+        'BuildingSurface:Detailed="WALL 1", blank Construction Name field'])
+    assert result == ('BuildingSurface:Detailed', 'WALL 1',
+                      'Construction Name')
+    result = errfile.findobject(
+        ['Weather File Location="X"', '..Surface="S1" in Zone="Z"'])
+    assert result == ('Surface', 'S1', None)
+    assert errfile.ErrRecord('Warning', 'message', ()).objecttype is None
+
+
+def test_signature():
+    """py.test for signature"""
+    records = list(errfile.readerr(StringIO(constructionerr)))
+    assert errfile.signature(records[0]) == errfile.signature(records[1])
+    assert errfile.signature(records[0]) == (
+        'GetConstructData: Construction="*", invalid Outside Layer="*" '
+        'entered.')
+    record = errfile.ErrRecord('Warning', 'Zone=ZONE 1 has 3.5 m2, see 2', ())
+    assert errfile.signature(record) == 'Zone=*, see #'
+    record = errfile.ErrRecord('Warning', 'Timestep 2 of 6 at 21.5C', ())
+    assert errfile.signature(record) == 'Timestep # of # at #C'
+
+
+@pytest.fixture
+def run_dirs(tmpdir):
+    """three run directories with an error file in two of them"""
+    dirs = []
+    for i, txt in enumerate([errtxt, constructionerr, None]):
+        run_dir = tmpdir.join('runs', 'run_%i' % i).ensure(dir=True)
+        if txt:
+            run_dir.join('eplusout.err').write(txt)
+        dirs.append(str(run_dir))
+    return dirs
+
+
+def test_scanrun(run_dirs):
+    """py.test for scanrun"""
+    run_id, found, counts, signatures = errfile.scanrun(5, run_dirs[1])
+    assert (run_id, found) == (5, True)
+    assert counts == {'Warning': 0, 'Severe': 2, 'Fatal': 1}
+    assert [signature[:3] for signature in signatures] == [
+        ('Severe', 'GetConstructData: Construction="*", invalid Outside '
+         'Layer="*" entered.', 2),
+        ('Fatal', 'GetSurfaceData: Errors discovered, program terminates.',
+         1)]
+    assert signatures[0][3].objectname == 'WALL 2'
+    assert errfile.scanrun(0, run_dirs[2])[1:] == (
+        False, {'Warning': 0, 'Severe': 0, 'Fatal': 0}, [])
+
+
+@pytest.mark.parametrize('executor', [SerialExecutor(), ProcessExecutor(2)])
+def test_buildindex(run_dirs, tmpdir, executor):
+    """py.test for buildindex, summarize and runswith"""
+    database = str(tmpdir.join('errors.sqlite'))
+    result = errfile.buildindex(str(tmpdir.join('runs', 'run_*')), database,
+                                executor=executor, chunksize=2)
+    assert result == run_dirs
+    conn = sqlite3.connect(database)
+    runs = conn.execute('SELECT * FROM runs ORDER BY run_id').fetchall()
+    conn.close()
+    assert runs == [(0, run_dirs[0], 1, 2, 1, 1), (1, run_dirs[1], 1, 0, 2, 1),
+                    (2, run_dirs[2], 0, 0, 0, 0)]
+    summary = errfile.summarize(database)
+    assert len(summary) == 6
+    assert summary[0] == (
+        'Warning', 'Weather file location will be used rather than entered '
+        '(IDF) Location object.', 1, 1)
+    summary = errfile.summarize(database, severity='severe')
+    assert [row[2:] for row in summary] == [(1, 1), (1, 2)]
+    result = errfile.runswith(database, severity='Severe',
+                              pattern='Outside Layer')
+    assert [row[:3] for row in result] == [(1, run_dirs[1], 2)]
+    assert 'WALL 2' in result[0][3]
+    result = errfile.runswith(database, severity='Fatal')
+    assert [row[0] for row in result] == [0, 1]
+    result = errfile.runswith(database, objecttype='outdoorair:mixer')
+    assert [row[0] for row in result] == [0]
+    result = errfile.runswith(database, signature=summary[0][1])
+    assert [row[0] for row in result] == [0]
+    assert errfile.runswith(database, pattern='100%_') == []
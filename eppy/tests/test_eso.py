@@ -0,0 +1,112 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""py.test for eso.py"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import re
+
+import pytest
+
+from eppy.results import eso
+
+ESO = """Program Version,EnergyPlus, Version 8.9.0-40101eaafd, YMD=2018.06.11 10:10
+1,5,Environment Title[],Latitude[deg],Longitude[deg],Time Zone[],Elevation[m]
+2,8,Day of Simulation[],Month[],Day of Month[],DST Indicator[1=yes 0=no],Hour[],StartMinute[],EndMinute[],DayType
+3,5,Cumulative Day of Simulation[],Month[],Day of Month[],DST Indicator[1=yes 0=no],DayType  ! When Daily Report Variables Requested
+4,2,Cumulative Days of Simulation[],Month[]  ! When Monthly Report Variables Requested
+5,1,Cumulative Days of Simulation[] ! When Run Period Report Variables Requested
+7,1,Environment,Site Outdoor Air Drybulb Temperature [C] !Hourly
+8,1,ZONE ONE,Zone Mean Air Temperature [C] !Hourly
+9,1,ZONE TWO,Zone Mean Air Temperature [C] !Hourly
+10,7,ZONE ONE,Zone Mean Air Temperature [C] !Daily [Value,Min,Hour,Minute,Max,Hour,Minute]
+11,1,Electricity:Facility [J] !Hourly
+End of Data Dictionary
+1,DESIGN DAY,  41.98, -87.92,  -6.00, 190.00
+2,1, 1,21, 0, 1, 0.00,60.00,WinterDesignDay
+7,-17.3
+8,21.0
+9,20.0
+11,1000.0
+2,1, 1,21, 0, 2, 0.00,60.00,WinterDesignDay
+7,-17.5
+8,21.5
+9,20.5
+11,2000.0
+3,1, 1,21, 0,WinterDesignDay
+10,21.25,21.0, 1,60,21.5, 2,60
+1,RUN PERIOD 1,  41.98, -87.92,  -6.00, 190.00
+2,2, 1, 1, 0, 1, 0.00,60.00,Sunday
+7,-5.0
+8,19.0
+9,18.0
+11,3000.0
+3,2, 1, 1, 0,Sunday
+10,19.0,19.0, 1,60,19.0, 1,60
+End of Data
+ Number of Records Written=        19
+"""
+
+
+@pytest.fixture
+def esofile(tmpdir):
+    """a small ESO file"""
+    fname = tmpdir.join('eplusout.eso')
+    fname.write(ESO.replace('\n', '\r\n').encode('latin-1'), mode='wb')
+    return str(fname)
+
+
+def test_readdictionary(esofile):
+    """py.test for readdictionary"""
+    with open(esofile, 'rb') as fhandle:
+        version, timecolumns, variables = eso.readdictionary(fhandle)
+        assert fhandle.readline().startswith(b'1,DESIGN DAY')
+    assert version.startswith('Program Version,EnergyPlus, Version 8.9.0')
+    assert timecolumns[2] == (
+        'Day of Simulation', 'Month', 'Day of Month', 'DST Indicator', 'Hour',
+        'StartMinute', 'EndMinute')
+    assert timecolumns[3] == (
+        'Cumulative Day of Simulation', 'Month', 'Day of Month',
+        'DST Indicator')
+    assert variables[1] == eso.Variable(
+        8, 'ZONE ONE', 'Zone Mean Air Temperature', 'C', 'Hourly', ('Value', ))
+    assert variables[3].columns == (
+        'Value', 'Min', 'Hour', 'Minute', 'Max', 'Hour', 'Minute')
+    assert variables[4] == eso.Variable(
+        11, '', 'Electricity:Facility', 'J', 'Hourly', ('Value', ))
+
+
+def test_readeso(esofile):
+    """py.test for readeso"""
+    result = eso.readeso(esofile, variables='Zone Mean Air Temperature',
+                         keys=['zone one'], frequencies=['Hourly'])
+    assert [(s.environment, s.variable.id) for s in result] == [
+        ('DESIGN DAY', 8), ('RUN PERIOD 1', 8)]
+    assert list(result[0].values) == [21.0, 21.5]
+    assert [list(row) for row in result[0].times] == [
+        [1, 1, 21, 0, 1, 0, 60], [1, 1, 21, 0, 2, 0, 60]]
+    assert list(result[1].values) == [19.0]
+
+
+def test_readeso_daily(esofile):
+    """py.test for readeso with values for several columns"""
+    result = eso.readeso(esofile, frequencies='daily')
+    assert [s.variable.id for s in result] == [10, 10]
+    assert [list(row) for row in result[0].values] == [
+        [21.25, 21.0, 1, 60, 21.5, 2, 60]]
+    assert [list(row) for row in result[1].times] == [[2, 1, 1, 0]]
+
+
+def test_readeso_regex(esofile):
+    """py.test for readeso selecting with a regex"""
+    result = eso.readeso(esofile, variables=re.compile('^(Site|Elec)'))
+    assert [(s.environment, s.variable.id) for s in result] == [
+        ('DESIGN DAY', 7), ('DESIGN DAY', 11),
+        ('RUN PERIOD 1', 7), ('RUN PERIOD 1', 11)]
+    assert list(result[1].values) == [1000.0, 2000.0]
@@ -0,0 +1,170 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""py.test for eppy.runner.executors"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import socket
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from eppy.runner import executors
+
+
+_initialised = []
+
+
+def init(value):
+    """initializer which records that it was called"""
+    _initialised.append(value)
+
+
+def square(x):
+    """square x, or fail if it is negative"""
+    if x < 0:
+        raise ValueError("negative")
+    return x * x
+
+
+def unpicklable(_x):
+    """return something which cannot be pickled"""
+    return threading.Lock()
+
+
+def initialised(_x):
+    """the values the initializer was called with in this worker"""
+    return list(_initialised)
+
+
+@pytest.fixture(params=['serial', 'thread', 'process', 'filequeue'])
+def executor(request, tmpdir):
+    """one of each kind of executor"""
+    if request.param == 'serial':
+        return executors.SerialExecutor()
+    if request.param == 'thread':
+        return executors.ThreadExecutor(2)
+    if request.param == 'process':
+        return executors.ProcessExecutor(2)
+    return executors.FileQueueExecutor(
+        str(tmpdir.join('queue')), workers=2, timeout=30, poll=0.05)
+
+
+def test_map(executor):
+    """py.test that results come back in order"""
+    assert executor.map(square, range(10)) == [x * x for x in range(10)]
+
+
+def test_map_initializer(executor):
+    """py.test that each worker is initialised before running jobs"""
+    del _initialised[:]
+    results = executor.map(initialised, range(4), init, ('ready', ))
+    for result in results:
+        assert result[-1] == 'ready'
+
+
+def test_map_error(executor):
+    """py.test that an error in a job is raised by map"""
+    with pytest.raises(ValueError):
+        executor.map(square, [1, -1, 2])
+
+
+def test_mapchunks():
+    """py.test that mapchunks maps each chunk of jobs in order"""
+    chunks = executors.mapchunks(
+        square, list(range(7)), executor=executors.SerialExecutor(),
+        chunksize=3)
+    assert list(chunks) == [[0, 1, 4], [9, 16, 25], [36]]
+    chunks = executors.mapchunks(
+        square, [], executor=executors.SerialExecutor())
+    assert list(chunks) == []
+
+
+def test_filequeue_external_worker(tmpdir):
+    """py.test a FileQueueExecutor with a worker started separately"""
+    queue_dir = str(tmpdir.join('queue'))
+    executor = executors.FileQueueExecutor(queue_dir, timeout=30, poll=0.05)
+    worker = executors.mp.Process(
+        target=executors.fileworker, args=(queue_dir, ),
+        kwargs={'poll': 0.05})
+    worker.start()
+    try:
+        assert executor.map(square, [3, 4]) == [9, 16]
+        assert os.listdir(queue_dir) == []  # the batch is cleaned up
+    finally:
+        open(os.path.join(queue_dir, 'stop'), 'w').close()
+        worker.join(10)
+    assert not worker.is_alive()
+
+
+def test_filequeue_timeout(tmpdir):
+    """py.test that a batch with no workers times out"""
+    executor = executors.FileQueueExecutor(
+        str(tmpdir.join('queue')), timeout=0.1, poll=0.05)
+    with pytest.raises(executors.QueueTimeoutError):
+        executor.map(square, [1])
+    assert os.listdir(executor.queue_dir) == []  # the batch is cleaned up
+
+
+def test_filequeue_unpicklable(tmpdir):
+    """py.test that a result which cannot be pickled is an error"""
+    executor = executors.FileQueueExecutor(
+        str(tmpdir.join('queue')), workers=1, timeout=30, poll=0.05)
+    with pytest.raises(RuntimeError):
+        executor.map(unpicklable, [1])
+    assert executor.map(square, [3]) == [9]
+
+
+def test_finished(tmpdir):
+    """py.test that results being written are not counted"""
+    results = tmpdir.join('results')
+    results.join('00000000').ensure()
+    results.join('00000001.host-1.tmp').ensure()
+    assert executors._finished(str(results)) == 1
+
+
+def test_claimjob(tmpdir):
+    """py.test that a job can only be claimed once"""
+    queue_dir = tmpdir.join('queue')
+    queue_dir.join('batch-1', 'jobs', '00000000').ensure()
+    queue_dir.join('batch-1', 'claimed').ensure(dir=True)
+    batch_dir, job, claimed = executors.claimjob(str(queue_dir))
+    assert batch_dir == str(queue_dir.join('batch-1'))
+    assert job == '00000000'
+    assert os.path.isfile(claimed)
+    assert executors.claimjob(str(queue_dir)) is None
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="process IDs are not checked")
+def test_requeue(tmpdir):
+    """py.test that stale claims are put back in the queue"""
+    batch_dir = tmpdir.join('queue', 'batch-1')
+    batch_dir.join('jobs').ensure(dir=True)
+    batch_dir.join('results').ensure(dir=True)
+    hostname = socket.gethostname()
+    process = subprocess.Popen([sys.executable, '-c', ''])
+    process.wait()  # a process ID which has gone
+    claimed = batch_dir.join('claimed')
+    claimed.join('00000000.%s-%i' % (hostname, process.pid)).ensure()
+    claimed.join('00000001.%s-%i' % (hostname, os.getpid())).ensure()
+    claimed.join('00000002.otherhost-1').ensure()
+    old = claimed.join('00000003.otherhost-1').ensure()
+    old.setmtime(old.mtime() - 100)
+    claimed.join('00000004.%s-%i' % (hostname, process.pid)).ensure()
+    batch_dir.join('results', '00000004').ensure()  # finished
+    assert executors.requeue(str(batch_dir)) == ['00000000']
+    assert executors.requeue(str(batch_dir), claim_timeout=50) == [
+        '00000003']
+    assert sorted(os.listdir(str(batch_dir.join('jobs')))) == [
+        '00000000', '00000003']
+    assert len(os.listdir(str(claimed))) == 3
@@ -0,0 +1,86 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""py.test for htmlreport.py"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import os
+import re
+
+import pytest
+
+from eppy.results import htmlreport
+from eppy.results import readhtml
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPORT = os.path.join(
+    THIS_DIR, os.pardir, 'resources', 'outputfiles', 'V_8_1',
+    '1050PageMillRoadTable.html')
+
+
+@pytest.fixture(scope='module')
+def report():
+    """the indexed report"""
+    return htmlreport.HtmlReport(REPORT)
+
+
+def test_index(report):
+    """py.test that the index matches titletable"""
+    with io.open(REPORT, 'rb') as fhandle:
+        titletables = readhtml.titletable(fhandle)
+    assert len(report) == len(titletables)
+    assert [table.title for table in report] == [
+        title.strip() for title, _rows in titletables]
+    assert report.tables[0] == htmlreport.TableInfo(
+        0, 'Site and Source Energy',
+        'Annual Building Utility Performance Summary', 'Entire Facility',
+        report.tables[0].start, report.tables[0].end)
+    html = report.html(0)
+    assert html.startswith('<table') and html.endswith('</table>')
+    for i in (0, 50, len(report) - 1):
+        assert report.read(i) == titletables[i][1]
+
+
+def test_select(report):
+    """py.test for HtmlReport.select"""
+    found = report.select(title='end uses')
+    assert [table.title for table in found] == ['End Uses']
+    found = report.select(title=re.compile('^End Uses'))
+    assert [table.title for table in found] == [
+        'End Uses', 'End Uses By Subcategory']
+    found = report.select(report='Envelope Summary', scope='Entire Facility')
+    assert 'Opaque Exterior' in [table.title for table in found]
+    assert report.select(title='No Such Table') == []
+    with pytest.raises(KeyError):
+        report.read('No Such Table')
+
+
+def test_read(report):
+    """py.test for HtmlReport.read"""
+    rows = report.read('Site and Source Energy')
+    assert rows[0][1] == 'Total Energy [GJ]'
+    assert rows[1] == ['Total Site Energy', 3206.37, 431.41, 431.41]
+    rows = report.read('Site and Source Energy', tofloat=False)
+    assert rows[1][1] == '     3206.37'
+
+
+def test_to_array(report):
+    """py.test for HtmlReport.to_array"""
+    pytest.importorskip('numpy')
+    values = report.to_array('Site and Source Energy')
+    assert values.shape == (4, 3)
+    assert values[0, 0] == 3206.37
+
+
+def test_to_dataframe(report):
+    """py.test for HtmlReport.to_dataframe"""
+    pytest.importorskip('pandas')
+    frame = report.to_dataframe('Site and Source Energy')
+    assert frame.loc['Net Source Energy', 'Total Energy [GJ]'] == 8430.99
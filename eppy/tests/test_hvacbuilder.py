@@ -11,6 +11,7 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import pytest
 from six import StringIO
 
 import eppy.hvacbuilder as hvacbuilder
@@ -273,6 +274,35 @@ def test_renamenodes():
     result = idf.idfobjects['PIPE:ADIABATIC'][0].obj
     assert result == outidf.idfobjects['PIPE:ADIABATIC'][0].obj
 
+def test_NodeIndex():
+    """py.test for NodeIndex"""
+    idftxt = """PIPE:ADIABATIC, np1, np1_inlet, np1_outlet;
+    PIPE:ADIABATIC, np2, np1_outlet, np2_outlet;
+    BRANCH, sb0, 0.0, , Pipe:Adiabatic, np1, np1_inlet, np1_outlet, Bypass,
+        Pipe:Adiabatic, np2, np1_outlet, np2_outlet, Bypass;
+    """
+    idf = IDF(StringIO(idftxt))
+    nodeindex = hvacbuilder.NodeIndex(idf)
+    found = nodeindex.fields['np1_outlet']
+    assert sorted(i for _idfobject, i in found.values()) == [2, 3, 7, 11]
+    pipe = idf.idfobjects['PIPE:ADIABATIC'][0]
+    pipe.Outlet_Node_Name = ['np1_outlet', 'np1_np2_node']
+    nodeindex.rename([pipe])
+    # the same as renamenodes
+    idf1 = IDF(StringIO(idftxt))
+    idf1.idfobjects['PIPE:ADIABATIC'][0].Outlet_Node_Name = [
+        'np1_outlet', 'np1_np2_node']
+    hvacbuilder.renamenodes(idf1, 'node')
+    assert str(idf.model) == str(idf1.model)
+    assert 'np1_outlet' not in nodeindex.fields
+    assert len(nodeindex.fields['np1_np2_node']) == 4
+    # a field that has changed since it was indexed is left alone
+    idf.idfobjects['PIPE:ADIABATIC'][1].Inlet_Node_Name = 'elsewhere'
+    pipe.Outlet_Node_Name = ['np1_np2_node', 'np1_np3_node']
+    nodeindex.rename([pipe])
+    assert idf.idfobjects['PIPE:ADIABATIC'][1].Inlet_Node_Name == 'elsewhere'
+    assert idf.idfobjects['BRANCH'][0].obj[7] == 'np1_np3_node'
+
 def test_getfieldnamesendswith():
     """py.test for getfieldnamesendswith"""
     idftxt = """PIPE:ADIABATIC,
@@ -539,6 +569,22 @@ def test_replacebranch():
         newbr = hvacbuilder.replacebranch(idf, loop, branch,
                                           components_thisnodes, fluid=fluid)
         assert newbr.obj == outbranch
+        # with one NodeIndex for many branches
+        idf1 = IDF(StringIO(""))
+        loop = hvacbuilder.makeplantloop(idf1, loopname, sloop, dloop)
+        nodeindex = hvacbuilder.NodeIndex(idf1)
+        newbr = hvacbuilder.replacebranch1(idf1, loop, branchname,
+                                           componenttuple, fluid=fluid,
+                                           nodeindex=nodeindex)
+        assert newbr.obj == outbranch
+        pipes = [("PIPE:ADIABATIC", 'np3', None)]
+        hvacbuilder.replacebranch1(idf, loop, 'db4', pipes, fluid=fluid)
+        hvacbuilder.replacebranch1(idf1, loop, 'db4', pipes, fluid=fluid,
+                                   nodeindex=nodeindex)
+        assert idf1.getobject('BRANCH', 'db4').obj[4:] == [
+            'PIPE:ADIABATIC', 'np3', 'np3_Inlet_Node_Name',
+            'p_loop Demand Outlet', '']
+        assert str(idf1.model) == str(idf.model)
 
 def test_makepipecomponent():
     """py.test for makepipecomponent"""
@@ -649,3 +695,81 @@ def test_clean_listofcomponents_tuples():
         result = hvacbuilder._clean_listofcomponents_tuples(lst)
         assert result == clst
 
+
+def test_makeloops():
+    """py.test for makeloops"""
+    sloop = ['sb0', ['sb1', 'sb2', 'sb3'], 'sb4']
+    dloop = ['db0', ['db1', 'db2', 'db3'], 'db4']
+    csloop = ['sc0', ['sc1', 'sc2'], 'sc3']
+    cdloop = ['dc0', ['dc1'], 'dc2']
+    asloop = ['ab0', ['ab1', 'ab2'], 'ab3']
+    zones = ['z1', 'z2', 'z3']
+    chillerbranch = [("Chiller:Electric", 'Central_Chiller', 'Chilled_Water_'),
+                     ("PIPE:ADIABATIC", 'np1', None),
+                     ("PIPE:ADIABATIC", 'np2', None)]
+    pipebranch = [("PIPE:ADIABATIC", 'np3', None)]
+    # the same loops made one at a time
+    idf1 = IDF(StringIO(""))
+    loop = hvacbuilder.makeplantloop(idf1, 'p_loop', sloop, dloop)
+    hvacbuilder.replacebranch1(idf1, loop, 'sb0', chillerbranch,
+                               fluid='Water')
+    hvacbuilder.replacebranch1(idf1, loop, 'db4', pipebranch, fluid='Water')
+    hvacbuilder.makecondenserloop(idf1, 'c_loop', csloop, cdloop)
+    hvacbuilder.makeairloop(idf1, 'a_loop', asloop, zones)
+    # makeloops does not make the pipes of the replaced branches
+    idf1.removeidfobjects([idf1.getobject('PIPE:ADIABATIC', 'sb0_pipe'),
+                           idf1.getobject('PIPE:ADIABATIC', 'db4_pipe')])
+    idf2 = IDF(StringIO(""))
+    loops = [
+        dict(key='PLANTLOOP', name='p_loop', sloop=sloop, dloop=dloop,
+             branches={'sb0': chillerbranch, 'db4': pipebranch}),
+        dict(key='CondenserLoop', name='c_loop', sloop=csloop, dloop=cdloop),
+        dict(key='AIRLOOPHVAC', name='a_loop', sloop=asloop, dloop=zones),
+    ]
+    result = hvacbuilder.makeloops(idf2, loops)
+    assert [loop.Name for loop in result] == ['p_loop', 'c_loop', 'a_loop']
+    assert str(idf2.model) == str(idf1.model)
+    # the ends of the supply side of an air loop
+    idf = IDF(StringIO(""))
+    branches = {'ab0': [("DUCT", 'd1', None), ("DUCT", 'd2', None)],
+                'ab3': [("DUCT", 'd3', None)]}
+    hvacbuilder.makeloops(idf, [dict(key='AIRLOOPHVAC', name='a_loop',
+                                     sloop=asloop, dloop=zones,
+                                     branches=branches)])
+    branch = idf.getobject('BRANCH', 'ab0')
+    assert branch.obj[4:] == ['DUCT', 'd1', 'a_loop Supply Inlet',
+                              'd1_d2_node', '',
+                              'DUCT', 'd2', 'd1_d2_node',
+                              'd2_Outlet_Node_Name', '']
+    branch = idf.getobject('BRANCH', 'ab3')
+    assert branch.obj[4:] == ['DUCT', 'd3', 'd3_Inlet_Node_Name',
+                              'a_loop Supply Outlet', '']
+    assert idf.getobject('DUCT', 'd3').Outlet_Node_Name == (
+        'a_loop Supply Outlet')
+    # components already in the model are used
+    idf = IDF(StringIO("PIPE:ADIABATIC, np3, a, b;"))
+    hvacbuilder.makeloops(idf, [dict(key='PLANTLOOP', name='p_loop',
+                                     sloop=sloop, dloop=dloop,
+                                     branches={'sb2': pipebranch})])
+    pipes = [pipe for pipe in idf.idfobjects['PIPE:ADIABATIC']
+             if pipe.Name == 'np3']
+    assert len(pipes) == 1
+    assert pipes[0].Inlet_Node_Name == 'a'
+    # a bad key is found before anything is made
+    idf = IDF(StringIO(""))
+    with pytest.raises(hvacbuilder.WhichLoopError):
+        hvacbuilder.makeloops(idf, [
+            dict(key='PLANTLOOP', name='p_loop', sloop=sloop, dloop=dloop),
+            dict(key='ZONE', name='z', sloop=sloop, dloop=dloop)])
+    assert str(idf.model) == str(IDF(StringIO("")).model)
+    # the nodes are renamed even if a loop fails
+    idf = IDF(StringIO(""))
+    with pytest.raises(KeyError):
+        hvacbuilder.makeloops(idf, [
+            dict(key='PLANTLOOP', name='p_loop', sloop=sloop, dloop=dloop,
+                 branches={'sb0': chillerbranch}),
+            dict(key='PLANTLOOP', name='p_loop2', sloop=sloop, dloop=dloop,
+                 branches={'sb0': [("NOT:A:KEY", 'x', None)]})])
+    branch = idf.getobject('BRANCH', 'sb0')
+    assert branch.obj[6] == 'p_loop Supply Inlet'
+    idf.idfstr()
@@ -131,4 +131,28 @@ def test_updateidf():
         idfhandle = StringIO(idftxt)
         idf = IDF(idfhandle)
         json_functions.updateidf(idf, dct)
-        assert idf.idfobjects[key][0][field] ==fieldval
\ No newline at end of file
+        assert idf.idfobjects[key][0][field] ==fieldval
+
+def test_revertidf():
+    """py.test for revertidf"""
+    idftxt = """Building,
+    Untitled,                !- Name
+    0.0,                     !- North Axis {deg}
+    City;                    !- Terrain
+    """
+    data = (
+        {"idf.BUilding.Untitled.Terrain": "Rural"},
+        {"idf.BUilding.Untitled.Maximum_Number_of_Warmup_Days": 30},
+        {"idf.BUilding.Taj.Terrain": "Rural"},
+        {"idf.GlobalGeometryRules..Starting_Vertex_Position":
+         "UpperLeftCorner"},
+    )  # dct
+    for dct in data:
+        idf = IDF(StringIO(idftxt))
+        expected = idf.idfstr()
+        undo = []
+        json_functions.updateidf(idf, dct, undo)
+        assert idf.idfstr() != expected
+        json_functions.revertidf(idf, undo)
+        assert idf.idfstr() == expected
+        assert undo == []
@@ -348,6 +348,24 @@ def test_newidfobject():
     assert sim_deffalse.Do_Zone_Sizing_Calculation == ''
 
 
+def test_removeidfobjects():
+    """py.test for removeidfobjects"""
+    idf = IDF()
+    idf.new()
+    objtype = 'MATERIAL:AIRGAP'
+    gases = [idf.newidfobject(objtype, Name=name)
+             for name in ['Argon', 'Krypton', 'Xenon', 'Neon']]
+    zone = idf.newidfobject('ZONE', Name='Zone1')
+    idf.removeidfobjects([gases[3], zone, gases[1]])
+    assert idf.model.dt[objtype] == [['MATERIAL:AIRGAP', 'Argon'],
+                                     ['MATERIAL:AIRGAP', 'Xenon'],
+                                     ]
+    assert list(idf.idfobjects[objtype]) == [gases[0], gases[2]]
+    assert idf.model.dt['ZONE'] == []
+    assert zone.theidf is None
+    assert gases[0].theidf is idf
+
+
 def test_newidfobject_warning():
     """Test that the warning for newidfobject created with `aname` is working.
 
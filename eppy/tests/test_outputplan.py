@@ -0,0 +1,166 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""py.test for outputplan"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pytest
+from six import StringIO
+
+from eppy import outputplan
+from eppy.modeleditor import IDF
+from eppy.outputplan import OutputRequest
+
+# the tests use the idd in iddcurrent, see conftest.py
+pytestmark = pytest.mark.usefixtures('current_idd')
+
+idftxt = """
+Timestep, 4;
+RunPeriod, Year, 1, 1, 12, 31, UseWeatherFile, Yes, Yes, No, Yes, Yes;
+SizingPeriod:DesignDay, Winter, 1, 21, WinterDesignDay;
+Zone, Zone1;
+Zone, Zone2;
+BuildingSurface:Detailed, Wall1, Wall, Wall, Zone1, Outdoors;
+BuildingSurface:Detailed, Wall2, Wall, Wall, Zone2, Outdoors;
+FenestrationSurface:Detailed, Window1, Window, Glass, Wall1;
+OutdoorAir:Node, Outside Air Node;
+OutdoorAir:Mixer, Mixer, Mixed Air Node, Outside Air Node, Relief Node,
+    Return Node;
+Output:Variable, *, Zone Mean Air Temperature, Timestep;
+Output:Variable, *, Surface Inside Face Temperature, Timestep;
+Output:Variable, *, System Node Temperature, Hourly;
+Output:Variable, *, Site Outdoor Air Drybulb Temperature, Hourly;
+Output:Meter, Electricity:Facility, Hourly;
+Output:Meter:MeterFileOnly, Electricity:*, Monthly;
+Output:Table:Monthly, Zone Cooling Summary, 2;
+Output:Table:Monthly, Building Loads - Heating, 2;
+Output:Table:SummaryReports, AllSummary;
+"""
+
+
+def test_request():
+    """py.test for request"""
+    assert outputplan.request('Zone Mean Air Temperature') == OutputRequest(
+        'Zone Mean Air Temperature', '*', 'Hourly', False)
+    assert outputplan.request(
+        'Electricity:Facility', 'ignored', 'annual') == OutputRequest(
+            'Electricity:Facility', '', 'RunPeriod', True)
+    with pytest.raises(ValueError):
+        outputplan.request('Zone Mean Air Temperature', frequency='Weekly')
+
+
+def test_planoutputs():
+    """py.test for planoutputs"""
+    plan = outputplan.planoutputs([
+        ('Zone Mean Air Temperature', 'ZONE1', 'Daily'),
+        ('Zone Mean Air Temperature', 'Zone1', 'Hourly'),
+        {'name': 'Zone Mean Air Temperature', 'key': 'Zone2',
+         'frequency': 'Monthly'},
+        ('Electricity:Facility', '', 'Monthly'),
+        ('Electricity:Facility', '', 'RunPeriod'),
+        ('Surface Inside Face Temperature', 'Wall1', 'Timestep'),
+        ('Surface Inside Face Temperature', '*', 'Daily'),
+        ('Surface Inside Face Temperature', 'Wall2', 'Monthly'),
+        'Site Outdoor Air Drybulb Temperature',
+    ])
+    assert plan == [
+        OutputRequest('Zone Mean Air Temperature', 'ZONE1', 'Daily', False),
+        OutputRequest('Zone Mean Air Temperature', 'ZONE1', 'Hourly', False),
+        OutputRequest('Zone Mean Air Temperature', 'Zone2', 'Monthly',
+                      False),
+        OutputRequest('Surface Inside Face Temperature', '*', 'Daily',
+                      False),
+        OutputRequest('Surface Inside Face Temperature', 'Wall1', 'Timestep',
+                      False),
+        OutputRequest('Surface Inside Face Temperature', 'Wall2', 'Monthly',
+                      False),
+        OutputRequest('Site Outdoor Air Drybulb Temperature', '*', 'Hourly',
+                      False),
+        OutputRequest('Electricity:Facility', '', 'Monthly', True),
+        OutputRequest('Electricity:Facility', '', 'RunPeriod', True)]
+    # a key asked for at the same frequency as '*' is covered by it
+    plan = outputplan.planoutputs([
+        ('Zone Mean Air Temperature', '*', 'Hourly'),
+        ('Zone Mean Air Temperature', 'Zone1', 'hourly'),
+        ('Zone Mean Air Temperature', 'Zone1', 'Hourly')])
+    assert plan == [
+        OutputRequest('Zone Mean Air Temperature', '*', 'Hourly', False)]
+
+
+def test_applyplan():
+    """py.test for applyplan"""
+    idf = IDF(StringIO(idftxt))
+    plan = outputplan.applyplan(idf, [
+        ('Zone Mean Air Temperature', 'Zone1', 'Hourly'),
+        ('Electricity:Facility', '', 'Monthly')])
+    assert len(plan) == 2
+    variables = idf.idfobjects['OUTPUT:VARIABLE']
+    assert [(obj.Key_Value, obj.Variable_Name, obj.Reporting_Frequency)
+            for obj in variables] == [
+                ('Zone1', 'Zone Mean Air Temperature', 'Hourly')]
+    meters = idf.idfobjects['OUTPUT:METER']
+    assert [obj.fieldvalues[1:] for obj in meters] == [
+        ['Electricity:Facility', 'Monthly']]
+    assert not idf.idfobjects['OUTPUT:METER:METERFILEONLY']
+    # tables are left alone
+    assert len(idf.idfobjects['OUTPUT:TABLE:MONTHLY']) == 2
+    assert idf.idfobjects['OUTPUT:TABLE:SUMMARYREPORTS'][0].Report_1_Name == (
+        'AllSummary')
+
+
+def test_applyplan_tables():
+    """py.test for applyplan with tables"""
+    idf = IDF(StringIO(idftxt))
+    outputplan.applyplan(idf, [], tables=[
+        'zone cooling summary', 'AnnualBuildingUtilityPerformanceSummary',
+        'envelopesummary'])
+    assert not idf.idfobjects['OUTPUT:VARIABLE']
+    assert [obj.Name for obj in idf.idfobjects['OUTPUT:TABLE:MONTHLY']] == [
+        'Zone Cooling Summary']
+    reports = idf.idfobjects['OUTPUT:TABLE:SUMMARYREPORTS']
+    assert len(reports) == 1
+    assert reports[0].fieldvalues[1:] == [
+        'AnnualBuildingUtilityPerformanceSummary', 'EnvelopeSummary']
+    # a name which is neither a table nor a report, e.g. a typo
+    with pytest.raises(ValueError):
+        outputplan.applyplan(idf, [], tables=['AnnualBuildingSummary'])
+    assert len(idf.idfobjects['OUTPUT:TABLE:MONTHLY']) == 1
+    assert len(idf.idfobjects['OUTPUT:TABLE:SUMMARYREPORTS']) == 1
+    outputplan.applyplan(idf, [], tables=[])
+    assert not idf.idfobjects['OUTPUT:TABLE:MONTHLY']
+    assert not idf.idfobjects['OUTPUT:TABLE:SUMMARYREPORTS']
+
+
+def test_simulationdays():
+    """py.test for simulationdays"""
+    idf = IDF(StringIO(idftxt))
+    assert outputplan.simulationdays(idf) == (366, 2)
+    idf.idfobjects['RUNPERIOD'][0].Begin_Month = 12
+    idf.idfobjects['RUNPERIOD'][0].End_Month = 1
+    assert outputplan.simulationdays(idf) == (31 + 31 + 1, 2)
+
+
+def test_estimatesize():
+    """py.test for estimatesize"""
+    idf = IDF(StringIO(idftxt))
+    before = outputplan.estimatesize(idf)
+    # 2 zones + 3 surfaces at timestep, 4 nodes + 1 site hourly,
+    # 1 meter hourly and 10 wildcard meters monthly
+    assert before.series == 2 + 3 + 4 + 1 + 1 + 10
+    hours = 366 * 24
+    assert before.values == (
+        (2 + 3) * hours * 4 + (4 + 1 + 1) * hours + 10 * 12)
+    assert before.eso > before.mtr > 0
+    outputplan.applyplan(idf, [
+        ('Zone Mean Air Temperature', 'Zone1', 'Hourly')])
+    after = outputplan.estimatesize(idf)
+    assert after.series == 1
+    assert after.values == hours
+    assert after.mtr == 0
+    assert after.eso < before.eso / 5
@@ -12,10 +12,18 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import collections
+import io
+import os
+
 from bs4 import BeautifulSoup
+import pytest
+
 import eppy.results.readhtml as readhtml
 from eppy.tests.sample_html import sample_html as SAMPLE_HTML
 
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_FILES = os.path.join(THIS_DIR, os.pardir, 'resources', 'outputfiles')
+
 
 def test_table2matrix():
     """py.test for table2matrix"""
@@ -127,6 +135,44 @@ def test_gettables():
             assert rows1 == rows2
         assert result == titlerows
 
+def test_titletable_cells():
+    """py.test that titletable reads cells like table2val_matrix"""
+    html_doc = """<p><b>Cells</b></p>
+    <table>
+        <tr><td></td><td> </td><td>a <br> b</td><td>\n <br>\n</td></tr>
+        <tr><td>  1.5 </td><td>a&amp;b</td><td><!-- note --></td></tr>
+    </table>"""
+    soup = BeautifulSoup(html_doc, "html.parser")
+    expected = readhtml.table2val_matrix(soup.find('table'))
+    assert readhtml.titletable(html_doc) == [('Cells', expected)]
+    assert expected == [['', ' ', 'a \n b', '\n'], [1.5, 'a&b', ' note ']]
+
+
+def test_titletable_notsimple():
+    """py.test that titletable raises NotSimpleTable like table2matrix"""
+    html_doc = """<b>Links</b>
+    <table><tr><td><a href="#top">top</a></td></tr></table>"""
+    with pytest.raises(readhtml.NotSimpleTable):
+        readhtml.titletable(html_doc)
+
+
+def test_titletable_file():
+    """py.test that titletable is the same as before on an E+ report
+    read from a file handle"""
+    fname = os.path.join(
+        OUTPUT_FILES, 'V_7_2', '5ZoneCAVtoVAVWarmestTempFlowTable_ABUPS.html')
+    with io.open(fname, 'rb') as fhandle:
+        result = readhtml.titletable(fhandle)
+    with io.open(fname, 'r', encoding='latin-1') as fhandle:
+        soup = BeautifulSoup(fhandle.read(), "html.parser")
+    tables = soup.find_all('table')
+    assert len(result) == len(tables)
+    for (_title, rows), table in zip(result, tables):
+        assert rows == readhtml.table2val_matrix(table)
+    assert result[0][0] == 'Site and Source Energy'
+    with io.open(fname, 'rb') as fhandle:
+        assert readhtml.titletable(fhandle.read()) == result
+
 def test_has_name():
     """py.test for has_name"""
     soup = BeautifulSoup(SAMPLE_HTML, "lxml")
@@ -190,4 +236,39 @@ def test_make_ntgrid():
     assert result == ntcol(
         x_y=ntrow(a_b=1, b_c=2, c_d=3),
         y_z=ntrow(a_b=4, b_c=5, c_d=6),
-        z_z=ntrow(a_b=7, b_c=8, c_d=9))
\ No newline at end of file
+        z_z=ntrow(a_b=7, b_c=8, c_d=9))
+
+def test_named_grid():
+    """py.test for named_grid_h and named_grid_v"""
+    grid = [
+    ["",  "a b", "b c", "c d"],
+    ["x y", 1,     2,     3 ],
+    ["y z", 4,     5,     6 ],
+    ["z z", 7,     8,     9 ],]
+    h_table = readhtml.named_grid_h(grid)
+    assert h_table == readhtml._make_ntgrid(grid)
+    assert h_table._asdict()['x_y'].c_d == 3
+    assert h_table._replace(x_y=None).x_y is None
+    assert hash(h_table) == hash(readhtml._make_ntgrid(grid))
+    v_table = readhtml.named_grid_v(grid)
+    assert v_table == readhtml._make_ntgrid(readhtml._transpose(grid))
+
+def test_named_table():
+    """py.test for named_table_h and named_table_v"""
+    pytest.importorskip('numpy')
+    grid = [
+    ["",  "a b", "b c", "c d"],
+    ["x y", 1,     2,     3 ],
+    ["y z", 4,     5,     6 ],
+    ["z z", 7,     8,     9 ],]
+    h_table = readhtml.named_table_h(grid)
+    assert h_table == readhtml._make_ntgrid(grid)
+    assert h_table.x_y.c_d == 3
+    assert h_table[0][2] == 3
+    assert h_table.x_y[2] == h_table[0].c_d == 3
+    assert h_table._fields == ('x_y', 'y_z', 'z_z')
+    assert h_table.x_y._fields == ('a_b', 'b_c', 'c_d')
+    v_table = readhtml.named_table_v(grid)
+    assert v_table == readhtml._make_ntgrid(readhtml._transpose(grid))
+    assert v_table.c_d.x_y == 3
+    assert [cell for cell in v_table.a_b] == [1, 4, 7]
@@ -0,0 +1,88 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""py.test for reporttable.py"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from eppy import reporttable
+from eppy.reporttable import ReportTable
+
+GRID = [
+    ['', 'Total Energy [GJ]', 'Energy Per Total Building Area [MJ/m2]',
+     'Note'],
+    ['Total Site Energy', 3206.37, 1377.88, ''],
+    ['Net Site Energy', 3206.37, 1377.88, 'net'],
+    ['Total Source Energy', 10137.09, 4356.39],  # a short row
+]
+
+
+def test_results_reporttable():
+    """py.test that the old eppy.results.reporttable imports still work"""
+    from eppy.results import reporttable as oldreporttable
+    assert oldreporttable.ReportTable is ReportTable
+    assert oldreporttable.stack is reporttable.stack
+
+
+def test_sanitise():
+    """py.test for sanitise"""
+    assert reporttable.sanitise('Total Energy [GJ]') == 'Total_Energy__GJ_'
+    assert reporttable.sanitise('Temp\xe9rature') == 'Temp_rature'
+
+
+def test_ReportTable():
+    """py.test for ReportTable"""
+    table = ReportTable.fromgrid(GRID)
+    assert table.shape == (3, 3)
+    assert table.rows == ('Total Site Energy', 'Net Site Energy',
+                          'Total Source Energy')
+    assert table.columnnames[0] == 'Total_Energy__GJ_'
+    assert table.units == ('GJ', 'MJ/m2', '')
+    assert table.Net_Site_Energy.Note == 'net'
+    assert table.Net_Site_Energy.Total_Energy__GJ_ == 3206.37
+    assert table['Total Source Energy']['Note'] == ''
+    assert table.get('Total Source Energy', 1) == 4356.39
+    assert table.value(0, 'Note') != table.value(0, 'Note')  # NaN
+    assert table.values.dtype == np.float64
+    assert np.allclose(table.column('Total Energy [GJ]'),
+                       [3206.37, 3206.37, 10137.09])
+    assert np.allclose(table.row('Net_Site_Energy')[:2], [3206.37, 1377.88])
+    assert table.T.Note.Net_Site_Energy == 'net'
+    assert table.T.shape == (3, 3)
+    assert table.togrid()[3] == GRID[3] + ['']
+    assert ReportTable.fromgrid(table.togrid()) == table
+    assert [row.Note for row in table] == ['', 'net', '']
+    assert len(table[1:]) == 2
+    with pytest.raises(AttributeError):
+        table.No_Such_Row
+    with pytest.raises(AttributeError):
+        table.Net_Site_Energy.No_Such_Column
+    with pytest.raises(IndexError):
+        table[3]
+
+
+def test_stack():
+    """py.test for stack"""
+    tables = [ReportTable.fromgrid(GRID), ReportTable.fromgrid(GRID)]
+    result = reporttable.stack(tables)
+    assert result.shape == (2, 3, 3)
+    assert np.allclose(result[1, :, 0], [3206.37, 3206.37, 10137.09])
+    with pytest.raises(ValueError):
+        reporttable.stack([tables[0], tables[1].T])
+
+
+def test_to_dataframe():
+    """py.test for ReportTable.to_dataframe"""
+    pytest.importorskip('pandas')
+    frame = ReportTable.fromgrid(GRID).to_dataframe()
+    assert list(frame.index) == [row[0] for row in GRID[1:]]
+    assert frame.loc['Net Site Energy', 'Total Energy [GJ]'] == 3206.37
@@ -21,16 +21,25 @@ import multiprocessing
 import os
 import re
 import shutil
+from subprocess import PIPE
+import sys
+import tempfile
 
 import pytest
+from six import StringIO
 from six.moves import reload_module as reload
 
 from eppy import modeleditor
+from eppy.iddcurrent import iddcurrent
 from eppy.pytest_helpers import do_integration_tests
+from eppy.runner import executors
 from eppy.runner.run_functions import install_paths, EnergyPlusRunError
 from eppy.runner.run_functions import multirunner
 from eppy.runner.run_functions import run
 from eppy.runner.run_functions import runIDFs
+from eppy.runner.run_functions import runIDFvariants
+from eppy.runner.run_functions import count_errors, err_filename
+from eppy.runner.run_functions import wait_call, write_summary
 
 
 def versiontuple(vers):
@@ -66,6 +75,268 @@ def has_severe_errors(results='run_outputs'):
     return num_severe > 0
 
 
+FAKE_EPLUS = """\
+#!{python}
+# stands in for the EnergyPlus executable in tests which do not need it
+import os
+import shutil
+import sys
+
+args = sys.argv[1:]
+output_dir = args[args.index('--output-directory') + 1]
+idf = args[-1]
+with open(idf) as f:
+    fail = 'FAIL' in f.read()
+if not os.path.isdir(output_dir):
+    os.makedirs(output_dir)
+shutil.copy(idf, os.path.join(output_dir, 'in.idf'))
+with open(os.path.join(output_dir, 'eplusout.err'), 'w') as f:
+    f.write('Program Version,EnergyPlus, Version 8.9.0\\n')
+    f.write('   ** Warning ** First warning\\n')
+    f.write('   **   ~~~   ** continued\\n')
+    f.write('   ** Warning ** Second warning\\n')
+    if fail:
+        f.write('   ** Severe  ** Something went wrong\\n')
+        f.write('   **  Fatal  ** Program terminated\\n')
+print('fake EnergyPlus run of ' + idf)
+if fail:
+    sys.stderr.write('EnergyPlus Terminated--Error(s) Detected.\\n')
+    sys.exit(1)
+"""
+
+
+@pytest.fixture()
+def fake_eplus(tmpdir):
+    """An install directory with a fake EnergyPlus executable.
+
+    Returns the path to the IDD in the install directory, which is what
+    `run` uses to find the executable.
+    """
+    if sys.platform.startswith('win'):
+        pytest.skip("fake EnergyPlus executable is a script")
+    install_dir = tmpdir.mkdir('EnergyPlus')
+    exe = install_dir.join('energyplus')
+    exe.write(FAKE_EPLUS.format(python=sys.executable))
+    exe.chmod(0o755)
+    idd = install_dir.join('Energy+.idd')
+    idd.write('!IDD_Version 8.9.0\n')
+    install_dir.join('in.epw').write('')
+    install_dir.join('in.idf').write('Version, 8.9;\n')
+    install_dir.join('bad.idf').write('Version, 8.9;\nFAIL;\n')
+    return str(idd)
+
+
+class TestRunResult(object):
+
+    """Tests for the instrumentation returned by run() and runIDFs().
+    """
+
+    def test_run_returns_result(self, fake_eplus, tmpdir):
+        """Test that a run returns timings, sizes and error counts.
+        """
+        install_dir = os.path.dirname(fake_eplus)
+        output_dir = str(tmpdir.join('out'))
+        # files in the output directory which the run did not write
+        tmpdir.join('out', 'other', 'eplusout.eso').write('x' * 100,
+                                                          ensure=True)
+        tmpdir.join('out', 'notes.txt').write('x' * 100)
+        result = run(os.path.join(install_dir, 'in.idf'),
+                     os.path.join(install_dir, 'in.epw'),
+                     output_directory=output_dir, idd=fake_eplus,
+                     ep_version=VERSION, verbose='q')
+        assert result.exit_code == 0
+        assert result.run_id is None
+        assert result.output_directory == output_dir
+        assert result.wall_time > 0
+        assert result.output_size == os.path.getsize(
+            os.path.join(output_dir, 'eplusout.err'))
+        assert (result.warnings, result.severe_errors) == (2, 0)
+        if hasattr(os, 'wait4'):
+            assert result.cpu_time > 0
+            assert result.max_rss > 0
+
+    def test_run_failure(self, fake_eplus, tmpdir):
+        """Test that a failed run raises EnergyPlusRunError with the stderr
+        of the run and the severe errors from eplusout.err.
+        """
+        install_dir = os.path.dirname(fake_eplus)
+        cwd = os.getcwd()
+        with pytest.raises(EnergyPlusRunError) as exc_info:
+            run(os.path.join(install_dir, 'bad.idf'),
+                os.path.join(install_dir, 'in.epw'),
+                output_directory=str(tmpdir.join('out')), idd=fake_eplus,
+                ep_version=VERSION, verbose='q')
+        assert os.getcwd() == cwd
+        message = str(exc_info.value)
+        assert "fake EnergyPlus run of" in message  # stdout
+        assert "EnergyPlus Terminated--Error(s) Detected." in message
+        assert "** Severe  ** Something went wrong" in message
+        assert "**  Fatal  ** Program terminated" in message
+        assert "First warning" not in message
+        assert "2 warnings not shown" in message
+
+    def test_run_failure_verbose(self, fake_eplus, tmpdir, capfd):
+        """Test that with verbose='v' the stderr of a run is shown and is
+        also in the EnergyPlusRunError.
+        """
+        install_dir = os.path.dirname(fake_eplus)
+        with pytest.raises(EnergyPlusRunError) as exc_info:
+            run(os.path.join(install_dir, 'bad.idf'),
+                os.path.join(install_dir, 'in.epw'),
+                output_directory=str(tmpdir.join('out')), idd=fake_eplus,
+                ep_version=VERSION, verbose='v')
+        out, err = capfd.readouterr()
+        assert "fake EnergyPlus run of" in out
+        assert "EnergyPlus Terminated--Error(s) Detected." in err
+        assert "EnergyPlus Terminated--Error(s) Detected." in str(
+            exc_info.value)
+
+    def test_wait_call_tee(self, capfd):
+        """Test that wait_call copies stderr to a file and to our stderr.
+        """
+        captured = tempfile.TemporaryFile()
+        script = "import sys; sys.stderr.write('one\\ntwo\\n')"
+        exit_code, _rusage = wait_call(
+            [sys.executable, '-c', script], tee=captured, stderr=PIPE)
+        assert exit_code == 0
+        captured.seek(0)
+        assert captured.read() == b'one\ntwo\n'
+        assert capfd.readouterr().err == 'one\ntwo\n'
+        captured.close()
+
+    def test_count_errors(self, tmpdir):
+        """Test counting warnings and severe errors in an error file.
+        """
+        err_file = tmpdir.join('eplusout.err')
+        err_file.write(
+            '   ** Warning ** one\n'
+            '   **   ~~~   ** continued\n'
+            '   ** Severe  ** two\n'
+            '   **  Fatal  ** three\n'
+            '   ************* EnergyPlus Completed\n')
+        assert count_errors(str(err_file)) == (1, 2)
+        assert count_errors(str(tmpdir.join('missing.err'))) == (0, 0)
+
+    def test_runIDFs_validate(self, fake_eplus, tmpdir, monkeypatch):
+        """Test that IDFs which fail validation are not run.
+        """
+        monkeypatch.chdir(tmpdir)
+        if modeleditor.IDF.getiddname() is None:
+            modeleditor.IDF.setiddname(StringIO(iddcurrent.iddtxt))
+        epw = os.path.join(os.path.dirname(fake_eplus), 'in.epw')
+        jobs = []
+        for i, material in enumerate(['Brick', 'NoSuchMaterial', 'Brick']):
+            idf = modeleditor.IDF(StringIO(
+                "Material, Brick, Rough, 0.1, 0.9, 1900, 800;\n"
+                "Construction, Wall, %s;" % material), epw)
+            kwargs = {'output_directory': str(tmpdir.join('results_%i' % i)),
+                      'idd': fake_eplus, 'ep_version': VERSION,
+                      'verbose': 'q'}
+            jobs.append([idf, kwargs])
+        with pytest.warns(UserWarning):
+            results = runIDFs(jobs, 2, validate=True)
+        assert [result.run_id for result in results] == [0, 1, 2]
+        assert [result.exit_code for result in results] == [0, None, 0]
+        assert results[1].severe_errors == 1
+        assert not os.path.isdir(str(tmpdir.join('results_1')))
+
+    def test_runIDFvariants(self, fake_eplus, tmpdir, monkeypatch):
+        """Test running variants of an IDF from dicts of changes.
+        """
+        monkeypatch.chdir(tmpdir)
+        if modeleditor.IDF.getiddname() is None:
+            modeleditor.IDF.setiddname(StringIO(iddcurrent.iddtxt))
+        epw = os.path.join(os.path.dirname(fake_eplus), 'in.epw')
+        idf = modeleditor.IDF(StringIO(
+            "Material, Brick, Rough, 0.1, 0.9, 1900, 800;\n"
+            "Construction, Wall, Brick;"), epw)
+        expected = idf.idfstr()
+        jobs = [
+            ({'idf.Material.Brick.Thickness': 0.2}, {}),
+            ({'idf.Construction.Wall.Outside_Layer': 'NoSuchMaterial'}, {}),
+            ({'idf.Material.Brick.Thickness': 0.3}, {}),
+            ({}, {}),
+        ]
+        for i, (_changes, kwargs) in enumerate(jobs):
+            kwargs.update({
+                'output_directory': str(tmpdir.join('results_%i' % i)),
+                'idd': fake_eplus, 'ep_version': VERSION, 'verbose': 'q'})
+        results = runIDFvariants(idf, jobs, 2, validate=True)
+        assert [result.run_id for result in results] == [0, 1, 2, 3]
+        assert [result.exit_code for result in results] == [0, None, 0, 0]
+        assert idf.idfstr() == expected  # the base IDF is not changed
+        thicknesses = []
+        for i in (0, 2, 3):
+            idfname = str(tmpdir.join('results_%i' % i, 'in.idf'))
+            variant = modeleditor.IDF(idfname)
+            thicknesses.append(variant.idfobjects['MATERIAL'][0].Thickness)
+        assert thicknesses == [0.2, 0.3, 0.1]
+
+    @pytest.mark.parametrize('executor', ['thread', 'filequeue'])
+    def test_executors(self, fake_eplus, tmpdir, monkeypatch, executor):
+        """Test running jobs with an executor other than a process pool.
+        """
+        monkeypatch.chdir(tmpdir)
+        if modeleditor.IDF.getiddname() is None:
+            modeleditor.IDF.setiddname(StringIO(iddcurrent.iddtxt))
+        if executor == 'thread':
+            executor = executors.ThreadExecutor(2)
+        else:
+            executor = executors.FileQueueExecutor(
+                str(tmpdir.join('queue')), workers=2, timeout=60, poll=0.05)
+        epw = os.path.join(os.path.dirname(fake_eplus), 'in.epw')
+        idf = modeleditor.IDF(StringIO(
+            "Material, Brick, Rough, 0.1, 0.9, 1900, 800;"), epw)
+        kwargs = {'idd': fake_eplus, 'ep_version': VERSION, 'verbose': 'q'}
+        jobs = [[idf, dict(kwargs, output_directory='results_%i' % i)]
+                for i in range(3)]
+        results = runIDFs(jobs, executor=executor)
+        assert [result.exit_code for result in results] == [0, 0, 0]
+        assert [result.output_directory for result in results] == [
+            str(tmpdir.join('results_%i' % i)) for i in range(3)]
+        jobs = [({'idf.Material.Brick.Thickness': 0.1 * (i + 1)},
+                 dict(kwargs, output_directory='variants_%i' % i))
+                for i in range(3)]
+        results = runIDFvariants(idf, jobs, executor=executor)
+        assert [result.exit_code for result in results] == [0, 0, 0]
+        for i in range(3):
+            idfname = str(tmpdir.join('variants_%i' % i, 'in.idf'))
+            variant = modeleditor.IDF(idfname)
+            assert variant.idfobjects['MATERIAL'][0].Thickness == pytest.approx(
+                0.1 * (i + 1))
+
+    @pytest.mark.parametrize('prefix, suffix, expected', [
+        (None, None, 'eplusout.err'),
+        ('test', 'L', 'testout.err'),
+        (None, 'C', 'eplus.err'),
+        ('test', 'D', 'test.err'),
+    ])
+    def test_err_filename(self, prefix, suffix, expected):
+        """Test the error file name follows the output prefix and suffix.
+        """
+        assert err_filename(prefix, suffix) == expected
+
+    def test_write_summary(self, fake_eplus, tmpdir):
+        """Test that run results are written one row per run to a CSV.
+        """
+        install_dir = os.path.dirname(fake_eplus)
+        results = []
+        for i in range(2):
+            result = run(os.path.join(install_dir, 'in.idf'),
+                         os.path.join(install_dir, 'in.epw'),
+                         output_directory=str(tmpdir.join('out_%i' % i)),
+                         idd=fake_eplus, ep_version=VERSION, verbose='q')
+            results.append(result._replace(run_id=i))
+        summary = str(tmpdir.join('summary.csv'))
+        write_summary(results, summary)
+        with open(summary, 'r') as f:
+            lines = f.read().splitlines()
+        assert len(lines) == 3
+        assert lines[0].split(',')[:4] == [
+            'run_id', 'idf', 'output_directory', 'exit_code']
+        assert lines[2].startswith('1,')
+
+
 def test_version_reader():
     """Test that get the expected idd_version when reading an IDF/IDD.
     """
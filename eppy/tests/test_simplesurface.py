@@ -0,0 +1,152 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""py.test for simplesurface"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pytest
+from six import StringIO
+
+from eppy import simplesurface
+from eppy.modeleditor import IDF
+from eppy.pytest_helpers import almostequal
+
+pytest.importorskip('numpy')
+
+# the tests use the idd in iddcurrent, see conftest.py
+pytestmark = pytest.mark.usefixtures('current_idd')
+
+idftxt = """
+Zone, Zone1;
+BuildingSurface:Detailed, South, Wall, , Zone1, Outdoors, , SunExposed,
+    WindExposed, , 4, 1, 0, 2.5, 1, 0, 0, 3, 0, 0, 3, 0, 2.5;
+BuildingSurface:Detailed, East, Wall, , Zone1, Outdoors, , SunExposed,
+    WindExposed, , 4, 3, 0, 2.5, 3, 0, 0, 3, 4, 0, 3, 4, 2.5;
+BuildingSurface:Detailed, Roof, Roof, , Zone1, Outdoors, , SunExposed,
+    WindExposed, , 4, 1, 0, 2.5, 3, 0, 2.5, 3, 4, 2.5, 1, 4, 2.5;
+FenestrationSurface:Detailed, Window, Window, , East, , , , , 1, 4,
+    3, 1, 2, 3, 1, 1, 3, 3, 1, 3, 3, 2;
+"""
+
+
+def test_bsdorigin():
+    """py.test for bsdorigin"""
+    idf = IDF(StringIO(idftxt))
+    south, east, roof = idf.idfobjects['BUILDINGSURFACE:DETAILED']
+    assert simplesurface.bsdorigin(south) == (1, 0, 0)
+    assert simplesurface.bsdorigin(east) == (3, 0, 0)
+    assert simplesurface.bsdorigin(south, setto000=True) == (0, 0, 0)
+    # the roof's azimuth is 0, so its lower left corner is at the north
+    # east, as for a wall facing north
+    assert simplesurface.bsdorigin(roof) == (3, 4, 2.5)
+
+
+def test_bsdsize():
+    """py.test for bsdsize"""
+    idf = IDF(StringIO(idftxt))
+    south, _east, roof = idf.idfobjects['BUILDINGSURFACE:DETAILED']
+    assert simplesurface.bsdsize(south) == (2, 2.5)
+    # across the roof is along x, from its corner at the north east
+    assert simplesurface.bsdsize(roof) == (2, 4)
+
+
+def test_fsdorigin():
+    """py.test for fsdorigin"""
+    idf = IDF(StringIO(idftxt))
+    window = idf.idfobjects['FENESTRATIONSURFACE:DETAILED'][0]
+    x, z = simplesurface.fsdorigin(window)
+    assert almostequal(x, 1)
+    assert almostequal(z, 1)
+    assert simplesurface.fsdorigin(window, setto000=True) == (0, 0)
+    window.Building_Surface_Name = 'West'
+    with pytest.raises(ValueError):
+        simplesurface.fsdorigin(window)
+
+
+def test_window():
+    """py.test for window"""
+    idf = IDF(StringIO(idftxt))
+    window = idf.idfobjects['FENESTRATIONSURFACE:DETAILED'][0]
+    simple = simplesurface.window(idf, window)
+    assert not idf.idfobjects['FENESTRATIONSURFACE:DETAILED']
+    assert almostequal(simple.Starting_X_Coordinate, 1)
+    assert almostequal(simple.Starting_Z_Coordinate, 1)
+    assert simple.Length == 2
+    assert simple.Height == 1
+
+
+def test_classify():
+    """py.test for classify"""
+    data = (
+        ('Wall', 'Outdoors', 'WALL:EXTERIOR'),
+        ('wall', 'GroundFCfactorMethod', 'WALL:UNDERGROUND'),
+        ('Wall', 'Zone', 'WALL:INTERZONE'),
+        ('Roof', '', 'ROOF'),
+        ('Ceiling', 'OtherSideCoefficients', 'CEILING:INTERZONE'),
+        ('Floor', 'Ground', 'FLOOR:GROUNDCONTACT'),
+        ('Floor', 'Adiabatic', 'FLOOR:ADIABATIC'),
+        ('Floor', 'Outdoors', ''),
+        ('Wall', 'OtherSideConditionsModel', ''),
+    )  # surfacetype, condition, expected
+    surfacetypes, conditions, expected = zip(*data)
+    result = simplesurface.classify(surfacetypes, conditions)
+    assert list(result) == list(expected)
+
+
+def test_simplify_surfaces():
+    """py.test for simplify_surfaces"""
+    extra = """
+    BuildingSurface:Detailed, Gable, Wall, , Zone1, Outdoors, , SunExposed,
+        WindExposed, , 3, 1, 4, 2.5, 3, 4, 2.5, 2, 4, 3.5;
+    BuildingSurface:Detailed, Floor, Floor, , Zone1, Outdoors, , NoSun,
+        NoWind, , 4, 1, 4, 0, 3, 4, 0, 3, 0, 0, 1, 0, 0;
+    FenestrationSurface:Detailed, Hatch, Window, , Attic, , , , , 1, 4,
+        0, 0, 1, 1, 0, 1, 1, 1, 1, 0, 1, 1;
+    """
+    # the same as one at a time
+    idf = IDF(StringIO(idftxt))
+    expected = [simplesurface.simplesurface(idf, bsd, deletebsd=False)
+                for bsd in idf.idfobjects['BUILDINGSURFACE:DETAILED'][:]]
+    expected += [simplesurface.simplefenestration(idf, fsd) for fsd in
+                 idf.idfobjects['FENESTRATIONSURFACE:DETAILED'][:]]
+    idf = IDF(StringIO(idftxt + extra))
+    simplified, unsimplified = simplesurface.simplify_surfaces(idf)
+    assert [obj.key for obj in simplified] == [
+        obj.key for obj in expected]
+    for obj, expect in zip(simplified, expected):
+        assert obj.Name == expect.Name
+        for field in obj.objls[2:]:
+            if isinstance(expect[field], float):
+                assert almostequal(obj[field], expect[field])
+            else:
+                assert obj[field] == expect[field]
+    # the sides of the roof are measured along the axes its starting
+    # corner is found with, -x and -y for an azimuth of 0
+    roof = simplified[2]
+    assert (roof.Length, roof.Width) == (2, 4)
+    assert [(surface.name, surface.key) for surface in unsimplified] == [
+        ('Gable', 'BUILDINGSURFACE:DETAILED'),
+        ('Floor', 'BUILDINGSURFACE:DETAILED'),
+        ('Hatch', 'FENESTRATIONSURFACE:DETAILED')]
+    assert 'rectangle' in unsimplified[0].reason
+    assert 'Outdoors' in unsimplified[1].reason
+    assert 'Attic' in unsimplified[2].reason
+    # only the surfaces which were simplified are removed
+    assert [obj.Name for obj in
+            idf.idfobjects['BUILDINGSURFACE:DETAILED']] == ['Gable', 'Floor']
+    assert [obj.Name for obj in
+            idf.idfobjects['FENESTRATIONSURFACE:DETAILED']] == ['Hatch']
+    # or none of them
+    idf = IDF(StringIO(idftxt))
+    simplified, unsimplified = simplesurface.simplify_surfaces(
+        idf, deletebsd=False, setto000=True)
+    assert len(simplified) == 4
+    assert not unsimplified
+    assert len(idf.idfobjects['BUILDINGSURFACE:DETAILED']) == 3
+    assert simplified[0].Starting_X_Coordinate == 0
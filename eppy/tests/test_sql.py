@@ -0,0 +1,231 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""py.test for sql.py"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import re
+import sqlite3
+
+import pytest
+
+from eppy.results import sql
+from eppy.results.sql import SQLOutput
+
+SCHEMA = """
+CREATE TABLE TabularDataWithStrings (
+    TabularDataIndex INTEGER PRIMARY KEY, Value TEXT, ReportName TEXT,
+    ReportForString TEXT, TableName TEXT, RowName TEXT, ColumnName TEXT,
+    Units TEXT, RowId INTEGER, ColumnId INTEGER);
+CREATE TABLE ReportDataDictionary (
+    ReportDataDictionaryIndex INTEGER PRIMARY KEY, IsMeter INTEGER,
+    Type TEXT, IndexGroup TEXT, TimestepType TEXT, KeyValue TEXT,
+    Name TEXT, ReportingFrequency TEXT, ScheduleName TEXT, Units TEXT);
+CREATE TABLE ReportData (
+    ReportDataIndex INTEGER PRIMARY KEY, TimeIndex INTEGER,
+    ReportDataDictionaryIndex INTEGER, Value REAL);
+CREATE TABLE Time (
+    TimeIndex INTEGER PRIMARY KEY, Year INTEGER, Month INTEGER,
+    Day INTEGER, Hour INTEGER, Minute INTEGER, Dst INTEGER,
+    Interval INTEGER, IntervalType INTEGER, SimulationDays INTEGER,
+    DayType TEXT, EnvironmentPeriodIndex INTEGER, WarmupFlag INTEGER);
+CREATE TABLE EnvironmentPeriods (
+    EnvironmentPeriodIndex INTEGER PRIMARY KEY, SimulationIndex INTEGER,
+    EnvironmentName TEXT, EnvironmentType INTEGER);
+"""
+SITE = ('AnnualBuildingUtilityPerformanceSummary', 'Entire Facility',
+        'Site and Source Energy')
+TABULAR = [
+    SITE + ('Total Site Energy', 'Total Energy', 'GJ', '   3206.37'),
+    SITE + ('Total Site Energy', 'Energy Per Total Building Area', 'MJ/m2',
+            '  1377.88'),
+    SITE + ('Net Site Energy', 'Total Energy', 'GJ', '   3206.37'),
+    SITE + ('Net Site Energy', 'Energy Per Total Building Area', 'MJ/m2',
+            '  1377.88'),
+    ('InputVerificationandResultsSummary', 'Entire Facility', 'General',
+     'Program Version and Build', 'Value', '', 'EnergyPlus 8.9.0'),
+    ('ZoneSummary', 'Entire Facility', 'Zone Summary', 'ZONE ONE', 'Area',
+     'm2', '100.00'),
+    ('EnvelopeSummary', 'Entire Facility', 'Zone Summary', 'ZONE ONE',
+     'Area', 'm2', '100.00'),
+]
+VARIABLES = [
+    (1, 0, 'Environment', 'Site Outdoor Air Drybulb Temperature', 'Hourly',
+     'C'),
+    (2, 0, 'ZONE ONE', 'Zone Mean Air Temperature', 'Hourly', 'C'),
+    (3, 0, 'ZONE TWO', 'Zone Mean Air Temperature', 'Hourly', 'C'),
+    (4, 1, None, 'Electricity:Facility', 'Hourly', 'J'),
+]
+# (TimeIndex, Month, Day, Hour, EnvironmentPeriodIndex, WarmupFlag)
+TIMES = [
+    (1, 1, 21, 1, 1, 1),
+    (2, 1, 21, 1, 1, 0),
+    (3, 1, 21, 2, 1, 0),
+    (4, 1, 1, 1, 2, 0),
+    (5, 1, 1, 2, 2, 0),
+]
+
+
+@pytest.fixture
+def sqlfile(tmpdir):
+    """a small eplusout.sql"""
+    fname = str(tmpdir.join('eplusout.sql'))
+    conn = sqlite3.connect(fname)
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        'INSERT INTO TabularDataWithStrings (Value, ReportName, '
+        'ReportForString, TableName, RowName, ColumnName, Units) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?)',
+        [(row[6], ) + row[:6] for row in TABULAR])
+    conn.executemany(
+        'INSERT INTO ReportDataDictionary (ReportDataDictionaryIndex, '
+        'IsMeter, KeyValue, Name, ReportingFrequency, Units) '
+        'VALUES (?, ?, ?, ?, ?, ?)', VARIABLES)
+    conn.executemany(
+        'INSERT INTO EnvironmentPeriods (EnvironmentPeriodIndex, '
+        'EnvironmentName) VALUES (?, ?)',
+        [(1, 'DESIGN DAY'), (2, 'RUN PERIOD 1')])
+    conn.executemany(
+        'INSERT INTO Time (TimeIndex, Year, Month, Day, Hour, Minute, Dst, '
+        'Interval, SimulationDays, EnvironmentPeriodIndex, WarmupFlag) '
+        'VALUES (?, 2019, ?, ?, ?, 0, 0, 60, 1, ?, ?)', TIMES)
+    data = []
+    for timeindex, _month, _day, hour, envindex, _warmup in TIMES:
+        for varindex in (1, 2, 3, 4):
+            value = varindex * 10 + envindex + hour / 10
+            if (timeindex, varindex) == (5, 2):
+                value = None
+            data.append((timeindex, varindex, value))
+    conn.executemany(
+        'INSERT INTO ReportData (TimeIndex, ReportDataDictionaryIndex, Value) '
+        'VALUES (?, ?, ?)', data)
+    conn.commit()
+    conn.close()
+    return fname
+
+
+def test_SQLOutput_missing(tmpdir):
+    """py.test for SQLOutput with a missing file"""
+    with pytest.raises(IOError):
+        SQLOutput(str(tmpdir.join('nosuch.sql')))
+    assert not tmpdir.join('nosuch.sql').check()
+
+
+def test_SQLOutput_readonly(sqlfile):
+    """py.test that SQLOutput cannot change the database"""
+    with SQLOutput(sqlfile) as output:
+        with pytest.raises(sqlite3.OperationalError):
+            output.conn.execute('DELETE FROM ReportData')
+
+
+def test_tabulardata(sqlfile):
+    """py.test for SQLOutput.tabulardata"""
+    with SQLOutput(sqlfile) as output:
+        assert len(output.tabulardata()) == len(TABULAR)
+        records = output.tabulardata('site and source energy')
+        assert len(records) == 4
+        assert records[0] == sql.TabularRecord(
+            'AnnualBuildingUtilityPerformanceSummary', 'Entire Facility',
+            'Site and Source Energy', 'Total Site Energy', 'Total Energy',
+            'GJ', 3206.37, '')
+        records = output.tabulardata(['General', 'Zone Summary'],
+                                     reports='ZoneSummary')
+        assert [record.table for record in records] == ['Zone Summary']
+        record = output.tabulardata('General')[0]
+        assert (record.value, record.text) == (None, 'EnergyPlus 8.9.0')
+
+
+def test_table(sqlfile):
+    """py.test for SQLOutput.table"""
+    with SQLOutput(sqlfile) as output:
+        result = output.table('Site and Source Energy')
+        assert result == [
+            ['', 'Total Energy [GJ]', 'Energy Per Total Building Area [MJ/m2]'],
+            ['Total Site Energy', 3206.37, 1377.88],
+            ['Net Site Energy', 3206.37, 1377.88]]
+        result = output.table('Site and Source Energy', tofloat=False)
+        assert result[1] == ['Total Site Energy', '   3206.37', '  1377.88']
+        assert output.table('General')[1] == [
+            'Program Version and Build', 'EnergyPlus 8.9.0']
+        with pytest.raises(ValueError):
+            output.table('Zone Summary')
+        result = output.table('Zone Summary', report='EnvelopeSummary')
+        assert result == [['', 'Area [m2]'], ['ZONE ONE', 100.0]]
+        with pytest.raises(KeyError):
+            output.table('No Such Table')
+
+
+def test_variables(sqlfile):
+    """py.test for SQLOutput.variables"""
+    with SQLOutput(sqlfile) as output:
+        assert len(output.variables()) == 4
+        result = output.variables('zone mean air temperature', 'ZONE TWO')
+        assert result == [sql.Variable(
+            3, 'ZONE TWO', 'Zone Mean Air Temperature', 'C', 'Hourly', False)]
+        result = output.variables(re.compile('Electricity'))
+        assert result == [sql.Variable(
+            4, '', 'Electricity:Facility', 'J', 'Hourly', True)]
+        assert output.environments() == {1: 'DESIGN DAY', 2: 'RUN PERIOD 1'}
+
+
+def test_timeseries(sqlfile):
+    """py.test for SQLOutput.timeseries"""
+    np = pytest.importorskip('numpy')
+    with SQLOutput(sqlfile) as output:
+        result = output.timeseries('Zone Mean Air Temperature')
+        assert [(series.environment, series.variable.key)
+                for series in result] == [
+                    ('DESIGN DAY', 'ZONE ONE'), ('DESIGN DAY', 'ZONE TWO'),
+                    ('RUN PERIOD 1', 'ZONE ONE'), ('RUN PERIOD 1', 'ZONE TWO')]
+        series = result[0]
+        assert series.timecolumns == sql.TIME_COLUMNS
+        assert np.allclose(series.values, [21.1, 21.2])  # no warmup
+        assert series.times.shape == (2, len(sql.TIME_COLUMNS))
+        assert list(series.times[:, 3]) == [1, 2]  # Hour
+        assert np.isnan(result[2].values[1])  # NULL
+        assert np.allclose(result[3].values, [32.1, 32.2])
+        result = output.timeseries('Zone Mean Air Temperature', 'ZONE ONE',
+                                   environments='design day', warmup=True)
+        assert len(result) == 1
+        assert np.allclose(result[0].values, [21.1, 21.1, 21.2])
+        assert output.timeseries('No Such Variable') == []
+        assert output.timeseries(environments='No Such Environment') == []
+
+
+def test_dataframe(sqlfile):
+    """py.test for SQLOutput.dataframe"""
+    pytest.importorskip('pandas')
+    with SQLOutput(sqlfile) as output:
+        frame = output.dataframe(frequencies='hourly',
+                                 environments='RUN PERIOD 1')
+        assert len(frame) == 8
+        assert list(frame.columns[:5]) == [
+            'environment', 'key', 'name', 'units', 'frequency']
+        meter = frame[frame['name'] == 'Electricity:Facility']
+        assert list(meter['value']) == pytest.approx([42.1, 42.2])
+        assert len(output.dataframe('No Such Variable')) == 0
+
+
+def test_manyvalues(sqlfile, monkeypatch):
+    """py.test that more values than SQLite allows parameters can be
+    asked for"""
+    np = pytest.importorskip('numpy')
+    tables = ['No Such Table %i' % (i, ) for i in range(2000)]
+    with SQLOutput(sqlfile) as output:
+        records = output.tabulardata(tables + ['general'])
+        assert [record.table for record in records] == ['General']
+        monkeypatch.setattr(sql, 'MAX_PARAMETERS', 1)
+        result = output.timeseries('Zone Mean Air Temperature')
+        assert len(result) == 4
+        assert np.allclose(result[3].values, [32.1, 32.2])
+        assert output.table('Zone Summary', report=['EnvelopeSummary']) == [
+            ['', 'Area [m2]'], ['ZONE ONE', 100.0]]
+        # the temporary tables are dropped
+        assert output.conn.execute(
+            'SELECT name FROM sqlite_temp_master').fetchall() == []
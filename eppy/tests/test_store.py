@@ -0,0 +1,133 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""py.test for store.py"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import shutil
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from eppy.results import batch
+from eppy.results.store import ResultStore
+from eppy.runner.executors import SerialExecutor
+from eppy.tests.test_batch import REPORT
+
+COLUMNS = [('variant', 'str'), ('wall', 'float'), ('metric', 'str'),
+           ('value', 'float')]
+ROWS = [
+    ('v0', 0.1, 'Heating', 10.0),
+    ('v0', 0.1, 'Cooling', 5.0),
+    ('v1', 0.2, 'Heating', 8.0),
+    ('v1', 0.2, 'Cooling', None),
+    ('v2', 0.2, 'Heating', 6.0),
+    ('v2', 0.2, 'Cooling', 7.0),
+    ('v3', 0.1, None, 1.0),
+]
+
+
+@pytest.fixture
+def store():
+    """a store with ROWS in chunks of 3 rows"""
+    store = ResultStore(COLUMNS, chunksize=3)
+    store.extend(ROWS)
+    return store
+
+
+def test_ResultStore(store):
+    """py.test for appending to and reading a ResultStore"""
+    assert len(store) == len(ROWS)
+    assert store.columns == ['variant', 'wall', 'metric', 'value']
+    assert list(store.column('variant')) == [row[0] for row in ROWS]
+    assert list(store.column('metric')) == [row[2] for row in ROWS]
+    assert store.categories('metric') == ['Heating', 'Cooling']
+    assert list(store.codes('metric')) == [0, 1, 0, 1, 0, 1, -1]
+    assert store.codes('metric').dtype == np.int32
+    values = store.column('value')
+    assert values.dtype == np.float64
+    assert np.isnan(values[3])
+    store.append({'variant': 'v4', 'metric': 'Heating', 'value': 2.0})
+    assert len(store) == len(ROWS) + 1
+    assert store.column('variant')[-1] == 'v4'
+    assert np.isnan(store.column('wall')[-1])
+    with pytest.raises(ValueError):
+        store.append(('v5', 0.3))
+    with pytest.raises(KeyError):
+        store.column('nosuchcolumn')
+    with pytest.raises(ValueError):
+        ResultStore([('value', 'complex')])
+
+
+def test_mask(store):
+    """py.test for ResultStore.mask"""
+    mask = store.mask({'metric': 'Heating', 'wall': [0.2]})
+    assert list(np.flatnonzero(mask)) == [2, 4]
+    assert not store.mask({'metric': 'No Such Metric'}).any()
+    assert list(np.flatnonzero(store.mask({'metric': None}))) == [6]
+
+
+def test_groupby(store):
+    """py.test for ResultStore.groupby"""
+    result = store.groupby('metric', 'value', agg='sum')
+    assert result == {'Heating': 24.0, 'Cooling': 12.0, None: 1.0}
+    assert list(result) == [None, 'Heating', 'Cooling']
+    result = store.groupby('metric', 'value', agg='count')
+    assert result == {'Heating': 3, 'Cooling': 2, None: 1}
+    result = store.groupby(['wall', 'metric'], 'value',
+                           where={'metric': ['Heating', 'Cooling']})
+    assert result == {(0.1, 'Heating'): 10.0, (0.1, 'Cooling'): 5.0,
+                      (0.2, 'Heating'): 7.0, (0.2, 'Cooling'): 7.0}
+    assert store.groupby('wall', 'value', agg='min') == {0.1: 1.0, 0.2: 6.0}
+    assert store.groupby('wall', 'value', agg='max') == {0.1: 10.0, 0.2: 8.0}
+    assert store.groupby('wall', 'value',
+                         where={'variant': 'No Such Variant'}) == {}
+    with pytest.raises(ValueError):
+        store.groupby('wall', 'value', agg='median')
+    with pytest.raises(ValueError):
+        store.groupby('wall', 'metric')
+
+
+def test_spill(tmpdir):
+    """py.test for ResultStore spilling chunks to memmaps"""
+    store = ResultStore(COLUMNS, chunksize=3, spill=str(tmpdir))
+    store.extend(ROWS)
+    assert len(os.listdir(store.spill_dir)) == 2 * len(COLUMNS)
+    assert store.nbytes == 3 * (4 + 8 + 4 + 8)  # only the current chunks
+    assert list(store.column('variant')) == [row[0] for row in ROWS]
+    assert store.groupby('variant', 'value', agg='count') == {
+        'v0': 2, 'v1': 1, 'v2': 2, 'v3': 1}
+    spill_dir = store.spill_dir
+    store.discard()
+    assert len(store) == 0
+    assert not os.path.exists(spill_dir)
+
+
+def test_to_dataframe(store):
+    """py.test for ResultStore.to_dataframe"""
+    pytest.importorskip('pandas')
+    frame = store.to_dataframe()
+    assert list(frame.columns) == store.columns
+    assert len(frame) == len(ROWS)
+    assert frame['metric'].dtype.name == 'category'
+    assert list(frame['variant']) == [row[0] for row in ROWS]
+
+
+def test_extract(tmpdir):
+    """py.test for a ResultStore as the output of batch.extract"""
+    run_dir = tmpdir.join('run_0').ensure(dir=True)
+    shutil.copy(REPORT, str(run_dir.join('eplustbl.htm')))
+    store = ResultStore()
+    batch.extract([str(run_dir)], ['Site and Source Energy'], store,
+                  executor=SerialExecutor())
+    assert len(store) == 12
+    result = store.groupby(['row', 'column'], 'value')
+    assert result[('Total Site Energy', 'Total Energy')] == 3206.37
@@ -0,0 +1,120 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""py.test for eppy.hvac.topology"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+
+import pytest
+from six import StringIO
+
+from eppy import hvacbuilder
+from eppy import loops
+from eppy.hvac.topology import Topology
+from eppy.modeleditor import IDF
+from eppy.walk_hvac import HVACGraph
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+IDF_FILES = os.path.join(THIS_DIR, os.pardir, 'resources', 'idffiles')
+
+# the tests use the idd in iddcurrent, see conftest.py
+pytestmark = pytest.mark.usefixtures('current_idd')
+
+
+def makemodel():
+    """a model with a plant loop, a condenser loop and an air loop"""
+    idf = IDF(StringIO(""))
+    hvacbuilder.makeplantloop(
+        idf, 'p_loop', ['sb0', ['sb1', 'sb2', 'sb3'], 'sb4'],
+        ['db0', ['db1', 'db2', 'db3'], 'db4'])
+    hvacbuilder.makecondenserloop(
+        idf, 'c_loop', ['csb0', ['csb1'], 'csb4'],
+        ['cdb0', ['cdb1'], 'cdb4'])
+    hvacbuilder.makeairloop(
+        idf, 'a_loop', ['asb0', ['asb1'], 'asb4'], ['zone1', 'zone2'])
+    return idf
+
+
+def test_loops():
+    """py.test for Topology.loops and branches"""
+    topology = Topology.fromidf(makemodel())
+    assert list(topology.loops) == ['p_loop', 'c_loop', 'a_loop']
+    plant = topology.loops['p_loop']
+    assert plant.key == 'PLANTLOOP'
+    assert plant.supplyinlet == 'p_loop Supply Inlet'
+    assert plant.demandoutlet == 'p_loop Demand Outlet'
+    assert plant.supplybranches == ['sb0', 'sb1', 'sb2', 'sb3', 'sb4']
+    assert plant.demandbranches == ['db0', 'db1', 'db2', 'db3', 'db4']
+    condenser = topology.loops['c_loop']
+    assert condenser.supplyinlet == 'c_loop Cond_Supply Inlet'
+    assert condenser.demandbranches == ['cdb0', 'cdb1', 'cdb4']
+    air = topology.loops['a_loop']
+    assert air.supplybranches == ['asb0', 'asb1', 'asb4']
+    assert air.demandbranches == []
+    branch = topology.branches['sb1']
+    assert [component.name for component in branch.components] == [
+        'sb1_pipe']
+    assert branch.components[0].key == 'Pipe:Adiabatic'
+    assert (branch.inlet, branch.outlet) == (
+        'sb1_pipe_inlet', 'sb1_pipe_outlet')
+    # the same as loops.branch_inlet_outlet
+    idf = makemodel()
+    topology = Topology.fromidf(idf)
+    for name, branch in topology.branches.items():
+        assert [branch.inlet, branch.outlet] == loops.branch_inlet_outlet(
+            idf.model, idf.idd_info, name)
+
+
+def test_edges():
+    """py.test for Topology.edges"""
+    topology = Topology.fromidf(makemodel())
+    edges = topology.edges
+    assert (('sb0_pipe_outlet', 'epnode'),
+            'p_loop_supply_splitter') in edges
+    assert ('p_loop_supply_splitter', ('sb1_pipe_inlet', 'epnode')) in edges
+    assert ('zone1DirectAir', 'zone1') in edges
+    assert (('zone1 Inlet Node', 'epnode'), 'zone1DirectAir') in edges
+    assert len(topology.branchedges()) == 2 * len(topology.branches)
+    assert isinstance(topology.graph, HVACGraph)
+    assert topology.graph.nextcomponents('sb0_pipe') == [
+        'p_loop_supply_splitter']
+    assert [vertex for vertex in topology.graph.downstream('zone1DirectAir')
+            if isinstance(vertex, tuple) is False] == [
+                'zone1', 'a_loop Demand Side Mixer']
+    # the supply and demand sides of each loop
+    assert len(topology.graph.connectedcomponents()) == 6
+
+
+def test_missingobjects():
+    """py.test for Topology with references to missing objects"""
+    idf = IDF(StringIO("""
+        Connector:Splitter, splitter, nobranch, nobranch2;
+        ZoneHVAC:EquipmentConnections, zone1, nolist, zone1 inlet, ,
+            zone1 air, zone1 return;
+    """))
+    topology = Topology.fromidf(idf)
+    assert topology.edges == [('zone1', ('zone1 return', 'epnode'))]
+    assert not topology.loops
+
+
+def test_renamedfields(v8_8_idd):
+    """py.test for Topology with the field names of E+ 8.8"""
+    idf = IDF(os.path.join(IDF_FILES, 'V8_8', 'smallfile.idf'))
+    # no loops or zone equipment
+    assert Topology.fromidf(idf).edges == []
+    assert HVACGraph.fromidf(idf).edges == []
+    # Zone Return Air Node Name is Zone Return Air Node or NodeList Name
+    idf.newidfobject(
+        'ZONEHVAC:EQUIPMENTCONNECTIONS', Zone_Name='z1',
+        Zone_Conditioning_Equipment_List_Name='z1 equip list',
+        Zone_Air_Node_Name='z1 Node',
+        Zone_Return_Air_Node_or_NodeList_Name='z1 Outlet Node')
+    assert Topology.fromidf(idf).edges == [('z1', ('z1 Outlet Node',
+                                                   'epnode'))]
@@ -0,0 +1,111 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""py.test for validate"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pytest
+from six import StringIO
+
+from eppy.EPlusInterfaceFunctions import iddindex
+from eppy.modeleditor import IDF
+import eppy.validate as validate
+
+# the tests use the idd in iddcurrent, see conftest.py
+pytestmark = pytest.mark.usefixtures('current_idd')
+
+idftxt = """
+Zone, Zone1;
+Material, Brick, Rough, 0.1, 0.9, 1900, 800;
+Construction, Wall, Brick;
+BuildingSurface:Detailed,
+    Wall1, Wall, Wall, Zone1, Outdoors, , SunExposed, WindExposed, 0.5, 4,
+    0, 0, 3, 0, 0, 0, 10, 0, 0, 10, 0, 3;
+"""
+
+
+def test_validate_valid():
+    """py.test for validate with a valid idf"""
+    idf = IDF(StringIO(idftxt))
+    assert idf.validate() == []
+
+
+def test_referencenames():
+    """py.test for referencenames"""
+    idf = IDF(StringIO(idftxt))
+    refnames = validate.referencenames(idf)
+    assert refnames['ZoneNames'] == {'ZONE1'}
+    assert refnames['ConstructionNames'] == {'WALL'}
+    assert 'BRICK' in refnames['MaterialName']
+
+
+def test_referencenames_idd_index(monkeypatch):
+    """py.test for referencenames with and without the idd_index"""
+    idf = IDF(StringIO(idftxt))
+    name2refs = iddindex.makename2refdct(idf.idd_info)
+    monkeypatch.setattr(IDF, 'idd_index', {})
+    expected = validate.referencenames(idf)
+    monkeypatch.setattr(IDF, 'idd_index', {'name2refs': name2refs})
+    assert validate.referencenames(idf) == expected
+
+
+def test_validate():
+    """py.test for validate"""
+    data = (
+        ('BUILDINGSURFACE:DETAILED', 'Zone_Name', 'No Such Zone',
+         'no object found in object-list ZoneNames'),
+        # key, field, value, problem
+        ('BUILDINGSURFACE:DETAILED', 'Construction_Name', 'wall',
+         None),  # references are not case sensitive
+        ('BUILDINGSURFACE:DETAILED', 'Surface_Type', 'Door',
+         'not a valid choice'),
+        ('BUILDINGSURFACE:DETAILED', 'Surface_Type', 'wall', None),
+        ('BUILDINGSURFACE:DETAILED', 'View_Factor_to_Ground', 1.5,
+         "Value 1.5 is not less or equal to the 'maximum' of 1.0"),
+        ('BUILDINGSURFACE:DETAILED', 'View_Factor_to_Ground', 'autocalculate',
+         None),
+        ('BUILDINGSURFACE:DETAILED', 'View_Factor_to_Ground', 'lots',
+         'not a number'),
+        ('MATERIAL', 'Thickness', 0.0,
+         "Value 0.0 is not greater than the 'minimum>' of 0.0"),
+        ('MATERIAL', 'Thickness', '', 'missing required field'),
+    )
+    for key, field, value, problem in data:
+        idf = IDF(StringIO(idftxt))
+        idf.idfobjects[key][0][field] = value
+        issues = idf.validate()
+        if problem is None:
+            assert issues == []
+        else:
+            assert len(issues) == 1
+            assert issues[0].key == key
+            assert issues[0].field == field
+            assert issues[0].value == value
+            assert issues[0].problem == problem
+
+
+def test_validate_missing_fields():
+    """py.test for validate with fields missing from the end of an object"""
+    idf = IDF(StringIO(idftxt))
+    idf.newidfobject('CONSTRUCTION', Name='Bare')
+    issues = idf.validate()
+    assert [(issue.key, issue.name, issue.field, issue.problem)
+            for issue in issues] == [
+                ('CONSTRUCTION', 'Bare', 'Outside_Layer',
+                 'missing required field')]
+
+
+def test_validate_keys():
+    """py.test for validate limited to some keys"""
+    idf = IDF(StringIO(idftxt))
+    idf.idfobjects['MATERIAL'][0].Thickness = -1
+    idf.idfobjects['BUILDINGSURFACE:DETAILED'][0].Zone_Name = 'No Such Zone'
+    assert len(idf.validate()) == 2
+    issues = idf.validate(keys=['Material'])
+    assert [issue.key for issue in issues] == ['MATERIAL']
@@ -262,3 +262,61 @@ def test_prevnode():
         result = walk_hvac.prevnode(edges, comp)
         assert result == [prevcomp]
         
+
+def test_hvacgraph():
+    """py.test for HVACGraph"""
+    graph = walk_hvac.HVACGraph(e1)
+    assert len(graph) == 38
+    assert ('sb1_pipe_inlet', 'epnode') in graph
+    assert graph.successors('p_loop_supply_splitter') == [
+        ('sb1_pipe_inlet', 'epnode'), ('sb2_pipe_inlet', 'epnode'),
+        ('sb3_pipe_inlet', 'epnode')]
+    assert graph.predecessors(('sb1_pipe_inlet', 'epnode')) == [
+        'p_loop_supply_splitter']
+    assert graph.successors('nothing') == []
+    assert graph.nextcomponents('p_loop_supply_splitter') == [
+        'sb1_pipe', 'sb2_pipe', 'sb3_pipe']
+    # the same as nextnode and prevnode with the list of edges
+    for edges in (e1, e2):
+        graph = walk_hvac.HVACGraph(edges)
+        for component in graph.components:
+            assert walk_hvac.nextnode(graph, component) == (
+                walk_hvac.nextnode(edges, component))
+            assert graph.prevcomponents(component) == (
+                walk_hvac.prevnode(edges, component))
+
+
+def test_downstream_upstream():
+    """py.test for HVACGraph.downstream and upstream"""
+    graph = walk_hvac.HVACGraph(e1)
+    result = [vertex for vertex in graph.downstream('np2')
+              if not walk_hvac.isnode(vertex)]
+    assert result == ['p_loop_supply_splitter', 'sb1_pipe', 'sb2_pipe',
+                      'sb3_pipe', 'p_loop_supply_mixer', 'sb4_pipe']
+    assert graph.downstream('sb4_pipe') == [
+        ('p_loop Supply Outlet', 'epnode')]
+    result = [vertex for vertex in graph.upstream('db4_pipe')
+              if not walk_hvac.isnode(vertex)]
+    assert result == ['p_loop_demand_mixer', 'db1_pipe', 'db2_pipe',
+                      'db3_pipe', 'p_loop_demand_splitter', 'db0_pipe']
+
+
+def test_findcycle():
+    """py.test for HVACGraph.findcycle"""
+    assert walk_hvac.HVACGraph(e1).findcycle() == []
+    # join the supply outlet back to the inlet
+    edges = e1 + [('sb4_pipe', ('p_loop Supply Inlet', 'epnode'))]
+    cycle = walk_hvac.HVACGraph(edges).findcycle()
+    assert cycle[0] == ('p_loop Supply Inlet', 'epnode')
+    assert cycle[-1] == 'sb4_pipe'
+    assert 'p_loop_supply_splitter' in cycle
+
+
+def test_connectedcomponents():
+    """py.test for HVACGraph.connectedcomponents"""
+    parts = walk_hvac.HVACGraph(e1).connectedcomponents()
+    assert len(parts) == 2  # the supply and demand sides
+    assert parts[0][:2] == [('p_loop Supply Inlet', 'epnode'),
+                            'Central_Chiller']
+    assert 'db0_pipe' in parts[1]
+    assert sum(len(part) for part in parts) == 38
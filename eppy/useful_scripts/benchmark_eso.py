@@ -0,0 +1,127 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""Benchmark reading time series from a large ESO file.
+
+Writes a synthetic ESO file of about the given size, with hourly values of
+many zone variables, then times reading one variable from it with
+eso.readeso and reports the peak memory used.
+
+    python benchmark_eso.py [--size MB] [--zones N] [--eso path]
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+pathnameto_eppy = '../../'
+sys.path.append(pathnameto_eppy)
+
+from eppy.results import eso
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+HEADER = """Program Version,EnergyPlus, Version 8.9.0-40101eaafd, YMD=2018.06.11 10:10
+1,5,Environment Title[],Latitude[deg],Longitude[deg],Time Zone[],Elevation[m]
+2,8,Day of Simulation[],Month[],Day of Month[],DST Indicator[1=yes 0=no],Hour[],StartMinute[],EndMinute[],DayType
+3,5,Cumulative Day of Simulation[],Month[],Day of Month[],DST Indicator[1=yes 0=no],DayType  ! When Daily Report Variables Requested
+4,2,Cumulative Days of Simulation[],Month[]  ! When Monthly Report Variables Requested
+5,1,Cumulative Days of Simulation[] ! When Run Period Report Variables Requested
+"""
+VARIABLES = ['Zone Mean Air Temperature [C]',
+             'Zone Air Relative Humidity [%]',
+             'Zone Lights Electric Power [W]',
+             'Zone Air System Sensible Heating Rate [W]']
+
+
+def writeeso(fname, size, zones):
+    """write a synthetic ESO file of about size bytes"""
+    ids = []
+    with io.open(fname, 'w', encoding='latin-1', newline='\r\n') as f:
+        f.write(HEADER)
+        for zone in range(zones):
+            for variable in VARIABLES:
+                ids.append(7 + len(ids))
+                f.write('%i,1,ZONE %i,%s !Hourly\n' % (
+                    ids[-1], zone + 1, variable))
+        f.write('End of Data Dictionary\n')
+        hour = 0
+        while True:
+            if hour % 8760 == 0:
+                if f.tell() > size:
+                    break
+                f.write('1,RUN PERIOD %i,  41.98, -87.92,  -6.00, 190.00\n'
+                        % (hour // 8760 + 1, ))
+            day = (hour % 8760) // 24
+            f.write('2,%i, %i,%i, 0,%i, 0.00,60.00,Monday\n' % (
+                day + 1, day // 31 + 1, day % 31 + 1, hour % 24 + 1))
+            f.write(''.join('%i,%.2f\n' % (varid, 20 + (hour + varid) % 7)
+                            for varid in ids))
+            hour += 1
+        f.write('End of Data\n')
+
+
+def peakmemory():
+    """peak resident memory of this process in MB"""
+    if resource is None:
+        return float('nan')
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return maxrss / 1024 / 1024  # bytes
+    return maxrss / 1024
+
+
+def benchmark(fname):
+    """time reading one variable from an ESO file"""
+    before = peakmemory()
+    start = time.time()
+    result = eso.readeso(fname, variables='Zone Mean Air Temperature',
+                         keys='ZONE 1')
+    elapsed = time.time() - start
+    size = os.path.getsize(fname) / 1024 / 1024
+    values = sum(len(series.values) for series in result)
+    print("read %i values of 1 variable from a %.0f MB file in %.1f s "
+          "(%.0f MB/s)" % (values, size, elapsed, size / elapsed))
+    print("peak memory %.0f MB before reading, %.0f MB after" % (
+        before, peakmemory()))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmark reading time series from a large ESO file')
+    parser.add_argument(
+        '--size', type=int, default=2048,
+        help='size of the synthetic ESO file in MB (default: 2048)')
+    parser.add_argument(
+        '--zones', type=int, default=100,
+        help='number of zones in the synthetic ESO file (default: 100)')
+    parser.add_argument(
+        '--eso', default=None,
+        help='read this ESO file instead of writing a synthetic one')
+    nspace = parser.parse_args()
+    if nspace.eso:
+        benchmark(nspace.eso)
+    else:
+        tmpdir = tempfile.mkdtemp()
+        fname = os.path.join(tmpdir, 'eplusout.eso')
+        try:
+            start = time.time()
+            writeeso(fname, nspace.size * 1024 * 1024, nspace.zones)
+            print("wrote %s in %.1f s" % (fname, time.time() - start))
+            benchmark(fname)
+        finally:
+            os.remove(fname)
+            os.rmdir(tmpdir)
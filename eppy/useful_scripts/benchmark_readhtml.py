@@ -0,0 +1,89 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""Benchmark reading the tables in html reports.
+
+Times readhtml.titletable and readhtml.lines_table on each html file in a
+folder (default: eppy/resources/outputfiles) and compares them with
+reading every table through BeautifulSoup and readhtml.table2val_matrix.
+
+    python benchmark_readhtml.py [folder] [--repeat N]
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import io
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+pathnameto_eppy = '../../'
+sys.path.append(pathnameto_eppy)
+
+from eppy.results import readhtml
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_FILES = os.path.join(THIS_DIR, os.pardir, 'resources', 'outputfiles')
+
+
+def soup_tables(html_doc):
+    """read every table with BeautifulSoup, cell by cell"""
+    soup = BeautifulSoup(html_doc, "html.parser")
+    return [readhtml.table2val_matrix(table)
+            for table in soup.find_all('table')]
+
+
+def best_time(func, html_doc, repeat):
+    """best time of repeat calls of func(html_doc), and the last result"""
+    times = []
+    for _ in range(repeat):
+        start = time.time()
+        result = func(html_doc)
+        times.append(time.time() - start)
+    return min(times), result
+
+
+def htmlfiles(folder):
+    """all the html files in a folder and its subfolders"""
+    for dirpath, _dirnames, filenames in os.walk(folder):
+        for filename in sorted(filenames):
+            if filename.endswith(('.html', '.htm')):
+                yield os.path.join(dirpath, filename)
+
+
+def benchmark(folder, repeat=1):
+    """print the timings for each html file in folder"""
+    print("%-45s %8s %7s %11s %11s %11s" % (
+        'file', 'size kB', 'tables', 'soup s', 'titletable', 'lines_table'))
+    for fname in htmlfiles(folder):
+        with io.open(fname, 'r', encoding='latin-1') as fhandle:
+            html_doc = fhandle.read()
+        soup_time, expected = best_time(soup_tables, html_doc, repeat)
+        title_time, result = best_time(readhtml.titletable, html_doc, repeat)
+        lines_time, _ = best_time(readhtml.lines_table, html_doc, repeat)
+        if [rows for _title, rows in result] != expected:
+            print("%s: tables do not match" % (fname, ))
+        print("%-45s %8i %7i %11.3f %11.3f %11.3f" % (
+            os.path.basename(fname)[-45:], len(html_doc) // 1024,
+            len(expected), soup_time, title_time, lines_time))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmark reading the tables in html reports')
+    parser.add_argument(
+        'folder', nargs='?', default=OUTPUT_FILES,
+        help='folder with html reports (default: eppy/resources/outputfiles)')
+    parser.add_argument(
+        '--repeat', type=int, default=1,
+        help='take the best of this many runs')
+    nspace = parser.parse_args()
+    benchmark(nspace.folder, nspace.repeat)
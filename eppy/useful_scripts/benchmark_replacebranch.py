@@ -0,0 +1,127 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""Benchmark replacing branches in the loops of an HVAC file.
+
+Opens an idf file with plant or condenser loops (default: the
+5ZoneWaterLoopHeatPump example for E+ 8.0) and, in each sweep, replaces
+every branch of the loops with a new pipe. The sweeps are timed with
+the nodes renamed in the whole model by renamenodes, with
+hvacbuilder.replacebranch indexing the model for each branch, and with
+one hvacbuilder.NodeIndex for all the branches. The three models are
+checked to be the same.
+
+    python benchmark_replacebranch.py [idffile] [--idd iddfile] [--sweeps N]
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import os
+import sys
+import time
+
+pathnameto_eppy = '../../'
+sys.path.append(pathnameto_eppy)
+
+from eppy import hvacbuilder
+from eppy.modeleditor import IDF
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+RESOURCES = os.path.join(THIS_DIR, os.pardir, 'resources')
+IDFFILE = os.path.join(
+    RESOURCES, 'idffiles', 'V8_0_0', '5ZoneWaterLoopHeatPump.idf')
+IDDFILE = os.path.join(RESOURCES, 'iddfiles', 'Energy+V8_0_0.idd')
+
+
+def renamenodes_replacebranch(idf, loop, branch, listofcomponents, fluid):
+    """replacebranch, with the nodes renamed in the whole model"""
+    listofcomponents = hvacbuilder._clean_listofcomponents(listofcomponents)
+    hvacbuilder.connectcomponents(idf, listofcomponents, fluid=fluid)
+    hvacbuilder.componentsintobranch(idf, branch, listofcomponents,
+                                     fluid=fluid)
+    hvacbuilder.renamenodes(idf, 'node')
+    inletnode, outletnode = hvacbuilder._loopendnodes(idf, loop, branch,
+                                                      fluid)
+    comps = hvacbuilder.getbranchcomponents(idf, branch)
+    if inletnode is not None:
+        fieldname = hvacbuilder.getnodefieldname(comps[0], "Inlet_Node_Name",
+                                                 fluid)
+        comps[0][fieldname] = [comps[0][fieldname], inletnode]
+    if outletnode is not None:
+        fieldname = hvacbuilder.getnodefieldname(comps[-1],
+                                                 "Outlet_Node_Name", fluid)
+        comps[-1][fieldname] = [comps[-1][fieldname], outletnode]
+    hvacbuilder.renamenodes(idf, 'node')
+    return branch
+
+
+def loopbranches(idf):
+    """the (loop, branch names) of the plant and condenser loops"""
+    result = []
+    for key, fields in (('PLANTLOOP', hvacbuilder.SomeFields.p_fields),
+                        ('CONDENSERLOOP', hvacbuilder.SomeFields.c_fields)):
+        for loop in idf.idfobjects[key]:
+            for field in (fields[2], fields[6]):  # the branch lists
+                branchlist = idf.getobject(
+                    'BRANCHLIST', loop[field.replace(' ', '_')])
+                result.append((loop, [name for name in branchlist.obj[2:]
+                                      if name != '']))
+    return result
+
+
+def sweep(idffile, sweeps, how):
+    """replace each branch with a new pipe, in each sweep. Returns the time
+    taken and the model"""
+    idf = IDF(idffile)
+    start = time.time()
+    nodeindex = hvacbuilder.NodeIndex(idf) if how == 'nodeindex' else None
+    for i in range(sweeps):
+        for loop, branchnames in loopbranches(idf):
+            for branchname in branchnames:
+                branch = idf.getobject('BRANCH', branchname)
+                pipe = idf.newidfobject(
+                    'PIPE:ADIABATIC', Name='%s pipe %s' % (branchname, i))
+                if how == 'renamenodes':
+                    renamenodes_replacebranch(idf, loop, branch, [pipe],
+                                              'Water')
+                else:
+                    hvacbuilder.replacebranch(idf, loop, branch, [pipe],
+                                              fluid='Water',
+                                              nodeindex=nodeindex)
+    return time.time() - start, str(idf.model)
+
+
+def benchmark(idffile, iddfile, sweeps):
+    """print the timings of the sweeps"""
+    IDF.setiddname(iddfile)
+    models = []
+    for how, label in (('renamenodes', 'renamenodes on the whole model'),
+                       ('replacebranch', 'replacebranch'),
+                       ('nodeindex', 'replacebranch, one NodeIndex')):
+        seconds, model = sweep(idffile, sweeps, how)
+        models.append(model)
+        print("%-32s %8.3f s" % (label, seconds))
+    if models.count(models[0]) != len(models):
+        print("the models are not the same")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmark replacing branches in the loops of an idf')
+    parser.add_argument(
+        'idffile', nargs='?', default=IDFFILE,
+        help='idf file with plant or condenser loops')
+    parser.add_argument(
+        '--idd', default=IDDFILE,
+        help='the idd file for the idf file')
+    parser.add_argument(
+        '--sweeps', type=int, default=3,
+        help='how many times to replace all the branches')
+    nspace = parser.parse_args()
+    benchmark(nspace.idffile, nspace.idd, nspace.sweeps)
@@ -0,0 +1,215 @@
+# Copyright (c) 2019 Jamie Bull
+# =======================================================================
+#  Distributed under the MIT License.
+#  (See accompanying file LICENSE or copy at
+#  http://opensource.org/licenses/MIT)
+# =======================================================================
+"""Fast pre-flight validation of an IDF against its IDD.
+
+Catches the errors that would otherwise stop EnergyPlus during input
+processing: missing required fields, values outside their minimum/maximum,
+invalid choices and object-list references to objects which do not exist.
+
+The whole model is checked in two linear passes. The first pass indexes
+every name which can be referred to (by reference name, using the
+`name2refs` table of `IDF.idd_index` and the `reference-class-name` tags of
+the name fields), the second checks each field against the IDD and the
+index. Ranges are fetched once per field of each
+object type with `EpBunch.getrange`.
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+
+from six import string_types
+
+from eppy.bunch_subclass import RangeError
+from eppy.bunch_subclass import checkrangevalue
+from eppy.bunch_subclass import getrange
+
+
+Issue = collections.namedtuple(
+    'Issue', ['key', 'name', 'field', 'value', 'problem'])
+Issue.__doc__ = """A problem found in a field of an IDF object.
+
+Attributes
+----------
+key : str
+    The type of IDF object, e.g. 'BUILDINGSURFACE:DETAILED'.
+name : str
+    Value of the first field of the object, usually its name.
+field : str
+    Name of the field with the problem.
+value : str, int or float
+    Value of the field.
+problem : str
+    Description of the problem.
+
+"""
+
+
+def referencenames(idf):
+    """Index every name in the IDF which can be used in an object-list.
+
+    Parameters
+    ----------
+    idf : modeleditor.IDF
+
+    Returns
+    -------
+    dict
+        {reference: set of upper case names}, e.g.
+        {'ZoneNames': {'ZONE 1', 'ZONE 2'}, ...}
+
+    """
+    refnames = collections.defaultdict(set)
+    name2refs = idf.idd_index.get('name2refs', {})
+    for key in idf.model.dtls:
+        idfobjects = idf.idfobjects[key]
+        if not idfobjects:
+            continue
+        nameidd = _nameidd(idfobjects[0])
+        # idd_index only lists objects whose first field is called 'Name',
+        # and is empty when the IDD was already read for another IDF
+        references = name2refs.get(key.upper(), nameidd.get('reference', []))
+        for refclass in nameidd.get('reference-class-name', []):
+            refnames[refclass].add(key.upper())
+        if not references:
+            continue
+        for idfobject in idfobjects:
+            try:
+                value = idfobject.obj[1]
+            except IndexError:
+                continue
+            if value == '':
+                continue
+            value = _upper(value)
+            for reference in references:
+                refnames[reference].add(value)
+    return refnames
+
+
+def _nameidd(idfobject):
+    """IDD info of the name field of an IDF object, {} if it has none"""
+    try:
+        return idfobject.objidd[1]
+    except IndexError:
+        return {}
+
+
+def _upper(value):
+    """upper case string of a field value"""
+    if isinstance(value, string_types):
+        return value.upper()
+    return str(value).upper()
+
+
+def _isnumber(value):
+    """test if value can be used as a number"""
+    if isinstance(value, (int, float)):
+        return True
+    try:
+        float(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def _checkfield(fieldidd, value, therange, refnames):
+    """check one field value, return a description of the problem or None"""
+    if value == '':
+        if 'required-field' in fieldidd and 'default' not in fieldidd:
+            return "missing required field"
+        return None
+    fieldtype = fieldidd.get('type', [None])[0]
+    if fieldtype in ('real', 'integer'):
+        if isinstance(value, string_types):
+            # EnergyPlus treats autosize and autocalculate the same way
+            if value.upper() in ('AUTOSIZE', 'AUTOCALCULATE'):
+                if ('autosizable' in fieldidd or
+                        'autocalculatable' in fieldidd):
+                    return None
+            if not _isnumber(value):
+                return "not a number"
+            value = float(value)
+        try:
+            checkrangevalue(value, therange)
+        except RangeError as e:
+            return str(e)
+    elif fieldtype == 'choice' and 'key' in fieldidd:
+        if _upper(value) not in [key.upper() for key in fieldidd['key']]:
+            return "not a valid choice"
+    elif 'object-list' in fieldidd:
+        value = _upper(value)
+        for reference in fieldidd['object-list']:
+            if reference.startswith('autoRDD'):
+                # old idd files list output variable names as object-lists
+                return None
+            if value in refnames.get(reference, ()):
+                return None
+        return "no object found in object-list %s" % (
+            ', '.join(fieldidd['object-list']), )
+    return None
+
+
+def validate(idf, keys=None):
+    """Check the IDF for errors which would stop EnergyPlus.
+
+    Checks required fields, numeric fields (including minimum and maximum
+    values), choice fields and object-list references.
+
+    Parameters
+    ----------
+    idf : modeleditor.IDF
+        The IDF to check.
+    keys : list of str, optional
+        Only check objects of these types. References to objects of other
+        types are still resolved.
+
+    Returns
+    -------
+    list of Issue
+        Empty if no problems were found.
+
+    """
+    refnames = referencenames(idf)
+    if keys is None:
+        keys = idf.model.dtls
+    issues = []
+    for key in keys:
+        idfobjects = idf.idfobjects[key.upper()]
+        if not idfobjects:
+            continue
+        objidd = idfobjects[0].objidd
+        fieldnames = idfobjects[0].objls
+        ranges = dict((i, getrange(idfobjects[0], fieldnames[i]))
+                      for i, fieldidd in enumerate(objidd)
+                      if fieldidd.get('type', [None])[0] in ('real', 'integer'))
+        # the idd repeats \required-field in every extensible group, but
+        # groups which are not in the object are not required
+        extensible_i = [i for i, fieldidd in enumerate(objidd)
+                        if 'begin-extensible' in fieldidd]
+        extensible_i = extensible_i[0] if extensible_i else len(objidd)
+        for idfobject in idfobjects:
+            values = idfobject.obj
+            name = values[1] if len(values) > 1 else ''
+            for i in range(1, len(objidd)):
+                fieldidd = objidd[i]
+                try:
+                    value = values[i]
+                except IndexError:
+                    if i >= extensible_i:
+                        break
+                    if 'required-field' not in fieldidd:
+                        continue
+                    value = ''
+                problem = _checkfield(
+                    fieldidd, value, ranges.get(i), refnames)
+                if problem:
+                    issues.append(Issue(
+                        key.upper(), name, fieldnames[i], value, problem))
+    return issues
@@ -9,56 +9,243 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import collections
+import itertools
+
 e = [(('p_loop Supply Inlet', 'epnode'), 'Central_Chiller'), ('Central_Chiller', ('Central_Chiller_np1_node', 'epnode')), (('Central_Chiller_np1_node', 'epnode'), 'np1'), ('np1', ('np1_np2_node', 'epnode')), (('np1_np2_node', 'epnode'), 'np2'), ('np2', ('np2_Outlet_Node_Name', 'epnode')), (('sb1_pipe_inlet', 'epnode'), 'sb1_pipe'), ('sb1_pipe', ('sb1_pipe_outlet', 'epnode')), (('sb2_pipe_inlet', 'epnode'), 'sb2_pipe'), ('sb2_pipe', ('sb2_pipe_outlet', 'epnode')), (('sb3_pipe_inlet', 'epnode'), 'sb3_pipe'), ('sb3_pipe', ('sb3_pipe_outlet', 'epnode')), (('sb4_pipe_inlet', 'epnode'), 'sb4_pipe'), ('sb4_pipe', ('p_loop Supply Outlet', 'epnode')), (('p_loop Demand Inlet', 'epnode'), 'db0_pipe'), ('db0_pipe', ('db0_pipe_outlet', 'epnode')), (('db1_pipe_inlet', 'epnode'), 'db1_pipe'), ('db1_pipe', ('db1_pipe_outlet', 'epnode')), (('db2_pipe_inlet', 'epnode'), 'db2_pipe'), ('db2_pipe', ('db2_pipe_outlet', 'epnode')), (('db3_pipe_inlet', 'epnode'), 'db3_pipe'), ('db3_pipe', ('db3_pipe_outlet', 'epnode')), (('db4_pipe_inlet', 'epnode'), 'db4_pipe'), ('db4_pipe', ('p_loop Demand Outlet', 'epnode')), (('np2_Outlet_Node_Name', 'epnode'), 'p_loop_supply_splitter'), ('p_loop_supply_splitter', ('sb1_pipe_inlet', 'epnode')), ('p_loop_supply_splitter', ('sb2_pipe_inlet', 'epnode')), ('p_loop_supply_splitter', ('sb3_pipe_inlet', 'epnode')), (('db0_pipe_outlet', 'epnode'), 'p_loop_demand_splitter'), ('p_loop_demand_splitter', ('db1_pipe_inlet', 'epnode')), ('p_loop_demand_splitter', ('db2_pipe_inlet', 'epnode')), ('p_loop_demand_splitter', ('db3_pipe_inlet', 'epnode')), ('p_loop_supply_mixer', ('sb4_pipe_inlet', 'epnode')), (('sb1_pipe_outlet', 'epnode'), 'p_loop_supply_mixer'), (('sb2_pipe_outlet', 'epnode'), 'p_loop_supply_mixer'), (('sb3_pipe_outlet', 'epnode'), 'p_loop_supply_mixer'), ('p_loop_demand_mixer', ('db4_pipe_inlet', 'epnode')), (('db1_pipe_outlet', 'epnode'), 'p_loop_demand_mixer'), (('db2_pipe_outlet', 'epnode'), 'p_loop_demand_mixer'), (('db3_pipe_outlet', 'epnode'), 'p_loop_demand_mixer')]
 
 
 
+def isnode(vertex):
+    """True for a node of the edges, which is a (name, 'epnode') tuple, False
+    for a component"""
+    return isinstance(vertex, tuple)
+
+
+class HVACGraph(object):
+
+    """The edges of the HVAC loops, indexed in both directions.
+
+    The edges are as made by `eppy.useful_scripts.loopdiagram`, from a
+    component to a node, from a node to a component or from a component to
+    a component. The successors and predecessors of every vertex are found
+    once, so walking the loops does not go through all the edges at each
+    step, as `nextnode` and `prevnode` do when they are given a list of
+    edges.
+
+    Parameters
+    ----------
+    edges : list
+        (from, to) pairs of components and nodes.
+
+    """
+
+    def __init__(self, edges):
+        self.edges = list(edges)
+        self.forward = collections.OrderedDict()
+        self.reverse = collections.OrderedDict()
+        for first, second in self.edges:
+            self.forward.setdefault(first, []).append(second)
+            self.forward.setdefault(second, [])
+            self.reverse.setdefault(first, [])
+            self.reverse.setdefault(second, []).append(first)
+
+    @classmethod
+    def fromidf(cls, idf):
+        """Make the graph of all the loops of an IDF.
+
+        Parameters
+        ----------
+        idf : eppy.modeleditor.IDF
+
+        Returns
+        -------
+        HVACGraph
+
+        """
+        from eppy.hvac.topology import Topology  # imports this module
+        return cls(Topology.fromidf(idf).edges)
+
+    @property
+    def vertices(self):
+        """all the components and nodes, in the order of the edges"""
+        return list(self.forward)
+
+    @property
+    def components(self):
+        """the components, in the order of the edges"""
+        return [vertex for vertex in self.forward if not isnode(vertex)]
+
+    @property
+    def nodes(self):
+        """the nodes, in the order of the edges"""
+        return [vertex for vertex in self.forward if isnode(vertex)]
+
+    def __len__(self):
+        return len(self.forward)
+
+    def __contains__(self, vertex):
+        return vertex in self.forward
+
+    def successors(self, vertex):
+        """the vertices with an edge from vertex"""
+        return list(self.forward.get(vertex, ()))
+
+    def predecessors(self, vertex):
+        """the vertices with an edge to vertex"""
+        return list(self.reverse.get(vertex, ()))
+
+    def nextcomponents(self, component):
+        """The next components in the loop, as from `nextnode`."""
+        result = []
+        following = self.forward.get(component, ())
+        for vertex in following:
+            nexts = self.forward[vertex] if isnode(vertex) else None
+            if not nexts:
+                result = []
+                break
+            result.append(nexts[0])
+        if not isnode(component):
+            # connections that have no nodes
+            result.extend(
+                vertex for vertex in following if not isnode(vertex))
+        return result
+
+    def prevcomponents(self, component):
+        """The previous components in the loop, as from `prevnode`."""
+        result = []
+        preceding = self.reverse.get(component, ())
+        for vertex in preceding:
+            prevs = self.reverse[vertex] if isnode(vertex) else None
+            if not prevs:
+                result = []
+                break
+            result.append(prevs[0])
+        if not isnode(component):
+            # connections that have no nodes
+            result.extend(
+                vertex for vertex in preceding if not isnode(vertex))
+        return result
+
+    def _reach(self, vertex, adjacency):
+        """the vertices reached from vertex, breadth first"""
+        seen = set([vertex])
+        result = []
+        queue = collections.deque([vertex])
+        while queue:
+            for reached in adjacency.get(queue.popleft(), ()):
+                if reached not in seen:
+                    seen.add(reached)
+                    result.append(reached)
+                    queue.append(reached)
+        return result
+
+    def downstream(self, vertex):
+        """All the components and nodes downstream of vertex.
+
+        Parameters
+        ----------
+        vertex : str or tuple
+            A component, or a (name, 'epnode') node.
+
+        Returns
+        -------
+        list
+            The vertices, nearest first. vertex itself is not included.
+
+        """
+        return self._reach(vertex, self.forward)
+
+    def upstream(self, vertex):
+        """All the components and nodes upstream of vertex, as for
+        `downstream`."""
+        return self._reach(vertex, self.reverse)
+
+    def findcycle(self):
+        """Find a loop in the edges.
+
+        The edges from `loopdiagram` do not join the supply and demand
+        sides of a loop, so a cycle is usually a mistake in the model.
+
+        Returns
+        -------
+        list
+            The vertices of a cycle, in order, or [] if there is none.
+
+        """
+        visiting, done = 1, 2
+        state = {}
+        for start in self.forward:
+            if start in state:
+                continue
+            state[start] = visiting
+            path = [start]
+            stack = [iter(self.forward[start])]
+            while stack:
+                for vertex in stack[-1]:
+                    if state.get(vertex) == visiting:
+                        return path[path.index(vertex):]
+                    if vertex not in state:
+                        state[vertex] = visiting
+                        path.append(vertex)
+                        stack.append(iter(self.forward[vertex]))
+                        break
+                else:
+                    state[path.pop()] = done
+                    stack.pop()
+        return []
+
+    def connectedcomponents(self):
+        """The parts of the graph which are not connected to each other,
+        ignoring the direction of the edges, e.g. each loop.
+
+        Returns
+        -------
+        list of lists
+            The vertices of each part, in the order of the edges.
+
+        """
+        part = {}
+        parts = []
+        for start in self.forward:
+            if start in part:
+                continue
+            members = set([start])
+            queue = collections.deque([start])
+            while queue:
+                vertex = queue.popleft()
+                for neighbour in itertools.chain(
+                        self.forward[vertex], self.reverse[vertex]):
+                    if neighbour not in members:
+                        members.add(neighbour)
+                        queue.append(neighbour)
+            for vertex in members:
+                part[vertex] = len(parts)
+            parts.append([])
+        for vertex in self.forward:
+            parts[part[vertex]].append(vertex)
+        return parts
+
+
+def _graph(edges):
+    """edges as an HVACGraph"""
+    if isinstance(edges, HVACGraph):
+        return edges
+    return HVACGraph(edges)
+
+
 def nextnode(edges, component):
-    """get the next component in the loop"""
-    e = edges
-    c = component
-    n2c = [(a, b) for a, b in e if type(a) == tuple]
-    c2nodes = [(a, b) for a, b in e if a == c]
-    node2cs = []
-    for c2node in c2nodes:
-        node2c = [(a, b) for a, b in n2c if a == c2node[-1]]
-        if len(node2c) == 0:
-            # return []
-            node2cs = []
-            break
-        node2cs.append(node2c[0])
-    cs = [b for a, b in node2cs]
-    # test for connections that have no nodes
-    # filter for no nodes
-    nonodes = [(a, b) for a, b in e if type(a) != tuple and type(b) != tuple]
-    for a, b in nonodes:
-        if a == component:
-            cs.append(b)
-    return cs
+    """get the next component in the loop
+
+    edges can be a list of edges or an HVACGraph, which is faster when
+    walking a loop one step at a time."""
+    return _graph(edges).nextcomponents(component)
 
 def prevnode(edges, component):
-    """get the pervious component in the loop"""
-    e = edges
-    c = component
-    n2c = [(a, b) for a, b in e if type(a) == tuple]
-    c2n = [(a, b) for a, b in e if type(b) == tuple]
-    node2cs = [(a, b) for a, b in e if b == c]
-    c2nodes = []
-    for node2c in node2cs:
-        c2node = [(a, b) for a, b in c2n if b == node2c[0]]
-        if len(c2node) == 0:
-            # return []
-            c2nodes = []
-            break
-        c2nodes.append(c2node[0])
-    cs = [a for a, b in c2nodes]
-    # test for connections that have no nodes
-    # filter for no nodes
-    nonodes = [(a, b) for a, b in e if type(a) != tuple and type(b) != tuple]
-    for a, b in nonodes:
-        if b == component:
-            cs.append(a)
-    return cs
+    """get the pervious component in the loop
+
+    edges can be a list of edges or an HVACGraph, as for nextnode."""
+    return _graph(edges).prevcomponents(component)
 
 def main():
     edges = e
@@ -44,7 +44,7 @@ setup(
     description='Scripting language for E+ idf files, and E+ output files',
     long_description=long_description,# TODO set this up
     packages=['eppy', 'eppy.EPlusInterfaceFunctions', 'eppy.geometry', 'eppy.constructions', 
-        'eppy.runner', 'eppy.results', 'eppy.useful_scripts'],
+        'eppy.runner', 'eppy.results', 'eppy.hvac', 'eppy.useful_scripts'],
     include_package_data=True,
     platforms='any',
     test_suite='eppy.test.test_eppy',# TODO make test_eppy